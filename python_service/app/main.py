@@ -8,12 +8,59 @@ Služba komunikuje se Symfony backendem přes HTTP API a poskytuje
 analytické endpointy pro frontend.
 """
 
-from fastapi import FastAPI
+import asyncio
+import logging
+from fastapi import FastAPI, Response
 from contextlib import asynccontextmanager
 import redis.asyncio as redis
 import os
 
-from app.smart_trend_forecaster import ForecastScheduler, forecast_router
+from app.smart_trend_forecaster import (
+    CurrencyForecaster,
+    CrossRateCache,
+    ForecastAgeCollector,
+    ForecastBroadcaster,
+    ForecastExecutor,
+    ForecastL1Cache,
+    ForecastScheduler,
+    ForecastWarmup,
+    HistoryStore,
+    LeaderElection,
+    MetricsMiddleware,
+    ModelStateStore,
+    RateUpdateTrigger,
+    RequestContextMiddleware,
+    StatsCollector,
+    configure_logging,
+    create_http_client,
+    create_codec,
+    create_model,
+    forecast_router,
+    get_preprocessor,
+    log_stats,
+    metrics_available,
+    parse_log_levels,
+    parse_model_overrides,
+    register_collector,
+    render_metrics,
+    set_cache_codec,
+    set_l1_cache,
+    unregister_collector,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Logování - JSON ("json") nebo čitelný text ("text") na stdout; zápis
+# probíhá ve vlákně na pozadí, aby neblokoval event loop. LOG_LEVELS
+# nastavuje úrovně jednotlivých loggerů (např. "cache:DEBUG,leader:WARNING"),
+# LOG_DEBUG_SAMPLE_RATE podíl zapsaných ladicích záznamů (podle požadavku)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_LEVELS = parse_log_levels(os.getenv("LOG_LEVELS", ""))
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+configure_logging(LOG_LEVEL, LOG_FORMAT, LOG_LEVELS, LOG_DEBUG_SAMPLE_RATE, LOG_QUEUE_SIZE)
 
 # Získání konfigurace z prostředí
 REDIS_HOST = os.getenv("REDIS_HOST", "keydb")
@@ -21,8 +68,88 @@ REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
 
 # Konfigurace plánovače prognóz
 FORECAST_UPDATE_INTERVAL = int(os.getenv("FORECAST_UPDATE_INTERVAL", "3600"))
+FORECAST_STALE_TTL = int(os.getenv("FORECAST_STALE_TTL", "86400"))
+FORECAST_HISTORY_DAYS = int(os.getenv("FORECAST_HISTORY_DAYS", "90"))
+# Maximální horizont prognózy ukládané do cache (alespoň 30 dní)
+FORECAST_MAX_DAYS = max(30, int(os.getenv("FORECAST_MAX_DAYS", "30")))
+# Maximální počet souběžných výpočtů v hromadném endpointu /forecasts
+FORECAST_BATCH_CONCURRENCY = int(os.getenv("FORECAST_BATCH_CONCURRENCY", "4"))
 FORECAST_CURRENCIES = os.getenv("FORECAST_CURRENCIES", "EUR,USD,GBP,PLN,CHF").split(",")
 ENABLE_BACKGROUND_TASKS = os.getenv("ENABLE_BACKGROUND_TASKS", "true").lower() == "true"
+FORECAST_REFRESH_CONCURRENCY = int(os.getenv("FORECAST_REFRESH_CONCURRENCY", "4"))
+FORECAST_REFRESH_RATE = float(os.getenv("FORECAST_REFRESH_RATE", "5"))
+FORECAST_REFRESH_BURST = int(os.getenv("FORECAST_REFRESH_BURST", "5"))
+FORECAST_REFRESH_TIMEOUT = float(os.getenv("FORECAST_REFRESH_TIMEOUT", "60"))
+# Dávkový trénink všech měn s lineárním modelem jedním průchodem NumPy
+FORECAST_BATCH_FIT = os.getenv("FORECAST_BATCH_FIT", "false").lower() == "true"
+
+# Zahřátí po startu (importy, pool výpočtů, prognózy z Redis) a lokální
+# snapshot prognóz pro obnovu po restartu Redis (prázdná cesta = bez snapshotu)
+FORECAST_WARMUP_TIMEOUT = float(os.getenv("FORECAST_WARMUP_TIMEOUT", "30"))
+FORECAST_SNAPSHOT_PATH = os.getenv("FORECAST_SNAPSHOT_PATH", "")
+
+# Volba lídra - plánovač běží pouze v jednom workeru/kontejneru
+SCHEDULER_LEADER_ELECTION = os.getenv("SCHEDULER_LEADER_ELECTION", "true").lower() == "true"
+SCHEDULER_LEASE_TTL = int(os.getenv("SCHEDULER_LEASE_TTL", "30"))
+
+# Konfigurace sdíleného HTTP klienta pro volání Symfony API
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_ENABLE_HTTP2 = os.getenv("HTTP_ENABLE_HTTP2", "false").lower() == "true"
+
+# Pool pro CPU-náročné části výpočtu prognóz ("process", "thread" nebo "inline")
+FORECAST_EXECUTOR = os.getenv("FORECAST_EXECUTOR", "process").lower()
+FORECAST_EXECUTOR_WORKERS = int(os.getenv("FORECAST_EXECUTOR_WORKERS", "2"))
+FORECAST_EXECUTOR_MAX_PENDING = int(os.getenv("FORECAST_EXECUTOR_MAX_PENDING", "8"))
+FORECAST_EXECUTOR_TIMEOUT = float(os.getenv("FORECAST_EXECUTOR_TIMEOUT", "10"))
+
+# Lokální úložiště historie kurzů (přírůstkové stahování ze Symfony API)
+HISTORY_STORE_ENABLED = os.getenv("HISTORY_STORE_ENABLED", "true").lower() == "true"
+HISTORY_RECONCILE_INTERVAL = int(os.getenv("HISTORY_RECONCILE_INTERVAL", "86400"))
+HISTORY_RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS", "365"))
+
+# Perzistentní stav lineárního modelu (vyžaduje úložiště historie)
+MODEL_STATE_ENABLED = os.getenv("MODEL_STATE_ENABLED", "true").lower() == "true"
+MODEL_STATE_SLIDING_WINDOW = os.getenv("MODEL_STATE_SLIDING_WINDOW", "true").lower() == "true"
+
+# Výchozí model prognózy a modely podle měny (např. "EUR:holt,USD:drift")
+FORECAST_DEFAULT_MODEL = os.getenv("FORECAST_DEFAULT_MODEL", "linear")
+FORECAST_MODELS = parse_model_overrides(os.getenv("FORECAST_MODELS", ""))
+create_model(FORECAST_DEFAULT_MODEL)  # Neznámý model selže už při startu
+
+# Předzpracování historie: "numpy" (bez pandas) nebo "pandas" (původní cesta)
+FORECAST_PREPROCESS = os.getenv("FORECAST_PREPROCESS", "numpy").lower()
+get_preprocessor(FORECAST_PREPROCESS)  # Neznámá implementace selže už při startu
+
+# Formát prognóz v cache ("columnar" nebo "json") a práh komprese v bajtech
+FORECAST_CACHE_CODEC = os.getenv("FORECAST_CACHE_CODEC", "columnar")
+FORECAST_CACHE_COMPRESS_THRESHOLD = int(os.getenv("FORECAST_CACHE_COMPRESS_THRESHOLD", "2048"))
+set_cache_codec(create_codec(FORECAST_CACHE_CODEC, FORECAST_CACHE_COMPRESS_THRESHOLD))
+
+# Lokální (L1) cache prognóz v procesu před Redis
+FORECAST_L1_ENABLED = os.getenv("FORECAST_L1_ENABLED", "true").lower() == "true"
+FORECAST_L1_MAX_ENTRIES = int(os.getenv("FORECAST_L1_MAX_ENTRIES", "1024"))
+FORECAST_L1_MAX_BYTES = int(os.getenv("FORECAST_L1_MAX_BYTES", str(32 * 1024 * 1024)))
+FORECAST_L1_TTL = float(os.getenv("FORECAST_L1_TTL", "30"))
+
+# Přepočet po aktualizaci kurzů: "interval" (jen periodicky) nebo "event"
+# (navíc hned po signálu z Redis streamu / webhooku, interval jako pojistka)
+FORECAST_TRIGGER_MODE = os.getenv("FORECAST_TRIGGER_MODE", "interval").lower()
+FORECAST_TRIGGER_DEBOUNCE = float(os.getenv("FORECAST_TRIGGER_DEBOUNCE", "2"))
+FORECAST_TRIGGER_MAX_DELAY = float(os.getenv("FORECAST_TRIGGER_MAX_DELAY", "10"))
+
+# Maximální počet odvozených prognóz křížových kurzů v paměti workeru
+FORECAST_CROSS_CACHE_SIZE = int(os.getenv("FORECAST_CROSS_CACHE_SIZE", "1024"))
+
+# Konfigurace streamu aktualizací prognóz (Server-Sent Events)
+STREAM_MAX_SUBSCRIBERS = int(os.getenv("STREAM_MAX_SUBSCRIBERS", "5000"))
+STREAM_SNAPSHOT_CONCURRENCY = int(os.getenv("STREAM_SNAPSHOT_CONCURRENCY", "16"))
+STREAM_HEARTBEAT_INTERVAL = float(os.getenv("STREAM_HEARTBEAT_INTERVAL", "15"))
+
+# Token administrátorských endpointů (hlavička X-Admin-Token), prázdný = endpointy zakázány
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
 
 
 @asynccontextmanager
@@ -31,18 +158,170 @@ async def lifespan(app: FastAPI):
     Správa životního cyklu aplikace.
 
     Zajišťuje inicializaci a uzavření připojení k Redis/KeyDB
-    při startu a ukončení aplikace. Také spouští a zastavuje
-    plánovač prognóz na pozadí.
+    a sdíleného HTTP klienta při startu a ukončení aplikace.
+    Také spouští a zastavuje plánovač prognóz na pozadí.
     """
     # Startup: Připojení k Redis/KeyDB
     app.state.redis = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
+
+    # Startup: Sdílený HTTP klient s poolem spojení k Symfony API
+    app.state.http_client = create_http_client(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        timeout=HTTP_TIMEOUT,
+        http2=HTTP_ENABLE_HTTP2,
+    )
+
+    # Startup: L1 cache prognóz v paměti workeru, zneplatňovaná přes Redis pub/sub
+    app.state.l1_cache = None
+    if FORECAST_L1_ENABLED:
+        app.state.l1_cache = ForecastL1Cache(
+            max_entries=FORECAST_L1_MAX_ENTRIES,
+            max_bytes=FORECAST_L1_MAX_BYTES,
+            ttl=FORECAST_L1_TTL,
+        )
+        app.state.l1_cache.start(app.state.redis)
+    set_l1_cache(app.state.l1_cache)
+
+    # Startup: Rozesílání aktualizací prognóz klientům streamu
+    # (jeden odběr Redis kanálu na worker bez ohledu na počet klientů)
+    app.state.broadcaster = ForecastBroadcaster(
+        max_subscribers=STREAM_MAX_SUBSCRIBERS,
+        snapshot_concurrency=STREAM_SNAPSHOT_CONCURRENCY,
+    )
+    app.state.broadcaster.start(app.state.redis)
+    app.state.stream_heartbeat_interval = STREAM_HEARTBEAT_INTERVAL
+
+    # Startup: Pool výpočtů, aby trénink modelu neblokoval event loop,
+    # a sdílená instance forecasteru pro endpointy i plánovač
+    app.state.executor = ForecastExecutor(
+        kind=FORECAST_EXECUTOR,
+        max_workers=FORECAST_EXECUTOR_WORKERS,
+        max_pending=FORECAST_EXECUTOR_MAX_PENDING,
+        acquire_timeout=FORECAST_EXECUTOR_TIMEOUT,
+    )
+    # Startup: Úložiště historie - ze Symfony API se stahuje jen přírůstek
+    app.state.history_store = None
+    if HISTORY_STORE_ENABLED:
+        app.state.history_store = HistoryStore(
+            app.state.redis,
+            reconcile_interval=HISTORY_RECONCILE_INTERVAL,
+            retention_days=HISTORY_RETENTION_DAYS,
+        )
+
+    # Startup: Stav modelu - prognóza z inkrementálně aktualizovaných statistik
+    app.state.model_store = None
+    if app.state.history_store and MODEL_STATE_ENABLED:
+        app.state.model_store = ModelStateStore(
+            app.state.redis,
+            app.state.history_store,
+            sliding_window=MODEL_STATE_SLIDING_WINDOW,
+        )
+
+    app.state.forecaster = CurrencyForecaster(
+        http_client=app.state.http_client,
+        executor=app.state.executor,
+        history_store=app.state.history_store,
+        model_store=app.state.model_store,
+        preprocess=FORECAST_PREPROCESS,
+    )
     
+    # Měkké TTL prognóz odpovídá intervalu plánovače, po jeho uplynutí
+    # se prognóza ještě FORECAST_STALE_TTL sekund vydává jako zastaralá
+    app.state.forecast_ttl = FORECAST_UPDATE_INTERVAL
+    app.state.forecast_stale_ttl = FORECAST_STALE_TTL
+
+    # Prognóza se počítá jednou s maximálním horizontem, kratší se oříznou
+    app.state.forecast_history_days = FORECAST_HISTORY_DAYS
+    app.state.forecast_max_days = FORECAST_MAX_DAYS
+    app.state.forecast_batch_concurrency = FORECAST_BATCH_CONCURRENCY
+
+    # Křížové kurzy se odvozují z prognóz obou měn, výsledky drží LRU cache
+    app.state.cross_cache = CrossRateCache(max_entries=FORECAST_CROSS_CACHE_SIZE)
+
+    # Výběr modelu: ?model= > FORECAST_MODELS pro měnu > FORECAST_DEFAULT_MODEL
+    app.state.forecast_default_model = FORECAST_DEFAULT_MODEL
+    app.state.forecast_models = FORECAST_MODELS
+    app.state.admin_token = ADMIN_TOKEN
+    if not ADMIN_TOKEN:
+        logger.warning("ADMIN_TOKEN není nastaven, administrátorské endpointy vracejí 403")
+    app.state.rate_trigger_enabled = FORECAST_TRIGGER_MODE == "event"
+
+    # Startup: Metriky počítané až při scrapu (stáří prognóz, L1 cache, křížové kurzy, stream, logování)
+    app.state.metric_collectors = [
+        ForecastAgeCollector(),
+        StatsCollector(
+            "forecast_l1",
+            lambda: app.state.l1_cache.stats() if app.state.l1_cache else None,
+            counters=("hits", "misses", "evictions", "invalidations"),
+        ),
+        StatsCollector(
+            "forecast_stream",
+            app.state.broadcaster.stats,
+            counters=("messages", "deliveries", "rejected"),
+        ),
+        StatsCollector(
+            "forecast_cross",
+            app.state.cross_cache.stats,
+            counters=("hits", "misses", "invalidations", "evictions"),
+        ),
+        StatsCollector("forecast_log", log_stats, counters=("dropped",)),
+    ]
+    for collector in app.state.metric_collectors:
+        register_collector(collector)
+
+    # Startup: Zahřátí na pozadí - start na něj nečeká, /ready vrací 503,
+    # dokud nejsou naimportovány knihovny, spuštěn pool a načteny prognózy
+    app.state.warmup = ForecastWarmup(
+        app.state.redis,
+        currencies=FORECAST_CURRENCIES,
+        history_days=FORECAST_HISTORY_DAYS,
+        forecast_days=FORECAST_MAX_DAYS,
+        default_model=FORECAST_DEFAULT_MODEL,
+        models=FORECAST_MODELS,
+        executor=app.state.executor,
+        snapshot_path=FORECAST_SNAPSHOT_PATH,
+        ttl=FORECAST_UPDATE_INTERVAL,
+        stale_ttl=FORECAST_STALE_TTL,
+        timeout=FORECAST_WARMUP_TIMEOUT,
+    )
+    app.state.warmup.start()
+
     # Startup: Spuštění plánovače prognóz na pozadí
+    # (při volbě lídra provádí aktualizace pouze jedna instance, ostatní čekají)
     if ENABLE_BACKGROUND_TASKS:
+        leader_election = None
+        if SCHEDULER_LEADER_ELECTION:
+            leader_election = LeaderElection(app.state.redis, lease_ttl=SCHEDULER_LEASE_TTL)
+
+        rate_trigger = None
+        if app.state.rate_trigger_enabled:
+            rate_trigger = RateUpdateTrigger(
+                app.state.redis,
+                debounce=FORECAST_TRIGGER_DEBOUNCE,
+                max_delay=FORECAST_TRIGGER_MAX_DELAY,
+            )
+
         app.state.scheduler = ForecastScheduler(
             redis_client=app.state.redis,
             currencies=FORECAST_CURRENCIES,
             update_interval=FORECAST_UPDATE_INTERVAL,
+            http_client=app.state.http_client,
+            stale_ttl=FORECAST_STALE_TTL,
+            history_days=FORECAST_HISTORY_DAYS,
+            forecast_days=FORECAST_MAX_DAYS,
+            refresh_concurrency=FORECAST_REFRESH_CONCURRENCY,
+            refresh_rate=FORECAST_REFRESH_RATE,
+            refresh_burst=FORECAST_REFRESH_BURST,
+            refresh_timeout=FORECAST_REFRESH_TIMEOUT,
+            leader_election=leader_election,
+            forecaster=app.state.forecaster,
+            default_model=FORECAST_DEFAULT_MODEL,
+            models=FORECAST_MODELS,
+            rate_trigger=rate_trigger,
+            batch_fit=FORECAST_BATCH_FIT,
+            snapshot_path=FORECAST_SNAPSHOT_PATH,
         )
         app.state.scheduler.start()
     else:
@@ -50,11 +329,27 @@ async def lifespan(app: FastAPI):
     
     yield
     
-    # Shutdown: Zastavení plánovače
+    # Shutdown: Zastavení plánovače a nedokončeného zahřátí
     if app.state.scheduler:
         await app.state.scheduler.stop()
+    await app.state.warmup.stop()
     
+    # Shutdown: Zastavení odběru zneplatnění L1 cache
+    if app.state.l1_cache:
+        await app.state.l1_cache.stop()
+    set_l1_cache(None)
+
+    # Shutdown: Zastavení odběru aktualizací streamu
+    await app.state.broadcaster.stop()
+
+    for collector in app.state.metric_collectors:
+        unregister_collector(collector)
+
+    # Shutdown: Ukončení poolu výpočtů (mimo event loop, čeká na běžící úlohy)
+    await asyncio.to_thread(app.state.executor.shutdown)
+
     # Shutdown: Uzavření připojení
+    await app.state.http_client.aclose()
     await app.state.redis.close()
 
 
@@ -68,13 +363,22 @@ app = FastAPI(
 # Registrace routeru pro analytické endpointy
 app.include_router(forecast_router)
 
+# Měření doby požadavků podle routy (metriky pro Prometheus)
+app.add_middleware(MetricsMiddleware)
+
+# Identifikátor požadavku (X-Request-ID) v kontextu logů - vnější middleware,
+# aby se vztahoval na celé zpracování požadavku
+app.add_middleware(RequestContextMiddleware)
+
 
 @app.get("/")
 async def healthcheck() -> dict:
     """
     Healthcheck endpoint pro kontrolu dostupnosti služby.
 
-    Vrací základní informace o stavu služby a připojení k Redis.
+    Vrací základní informace o stavu služby, připojení k Redis,
+    stavu plánovače (včetně toho, která instance je lídrem),
+    čítače L1 cache a odběratele streamu tohoto workeru.
 
     Returns:
         dict: Stav služby a verze.
@@ -86,11 +390,16 @@ async def healthcheck() -> dict:
     except Exception:
         redis_status = "disconnected"
 
+    scheduler = app.state.scheduler
+
     return {
         "status": "ok",
         "service": "Smart Trend Forecaster",
         "version": "1.0.0",
         "redis": redis_status,
+        "scheduler": await scheduler.get_status() if scheduler else None,
+        "l1_cache": app.state.l1_cache.stats() if app.state.l1_cache else None,
+        "stream": app.state.broadcaster.stats(),
     }
 
 
@@ -105,3 +414,89 @@ async def api_health() -> dict:
         dict: Stav služby.
     """
     return await healthcheck()
+
+
+@app.get("/live")
+async def liveness() -> dict:
+    """
+    Liveness endpoint - proces běží a event loop odpovídá.
+
+    Nekontroluje závislosti (Redis, Symfony API), aby orchestrátor
+    nerestartoval instanci kvůli výpadku sdílené služby.
+
+    Returns:
+        dict: Stav "alive".
+    """
+    return {"status": "alive"}
+
+
+@app.get("/ready")
+async def readiness(response: Response) -> dict:
+    """
+    Readiness endpoint - instance je zahřátá a může přijímat provoz.
+
+    Vrací 503, dokud neskončí zahřátí po startu (viz warmup) nebo pokud
+    není dostupný Redis.
+
+    Args:
+        response (Response): Odpověď (nastavuje se status kód).
+
+    Returns:
+        dict: Stav připravenosti a souhrn zahřátí.
+    """
+    warmup = app.state.warmup.status()
+    try:
+        await app.state.redis.ping()
+        redis_status = "connected"
+    except Exception:
+        redis_status = "disconnected"
+
+    ready = warmup["ready"] and redis_status == "connected"
+    if not ready:
+        response.status_code = 503
+    return {"status": "ready" if ready else "warming", "redis": redis_status, "warmup": warmup}
+
+
+@app.get("/api/py/live")
+async def api_liveness() -> dict:
+    """
+    Liveness endpoint pod prefixem /api/py/ (volání přes Nginx proxy).
+
+    Returns:
+        dict: Stav "alive".
+    """
+    return await liveness()
+
+
+@app.get("/api/py/ready")
+async def api_readiness(response: Response) -> dict:
+    """
+    Readiness endpoint pod prefixem /api/py/ (volání přes Nginx proxy).
+
+    Args:
+        response (Response): Odpověď (nastavuje se status kód).
+
+    Returns:
+        dict: Stav připravenosti a souhrn zahřátí.
+    """
+    return await readiness(response)
+
+
+@app.get("/metrics")
+async def metrics() -> Response:
+    """
+    Metriky služby ve formátu Prometheus.
+
+    Histogramy horké cesty (stažení historie, prepare_data, predict,
+    Redis, doba požadavků podle routy), čítače cache a plánovače,
+    počet probíhajících výpočtů a stáří prognóz podle měny.
+    Metriky jsou za tento worker.
+
+    Returns:
+        Response: Text ve formátu Prometheus, nebo 503 bez prometheus_client.
+    """
+    if not metrics_available():
+        return Response(content="prometheus_client není nainstalován\n", status_code=503)
+
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
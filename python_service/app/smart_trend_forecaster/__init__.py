@@ -4,30 +4,137 @@ Smart Trend Forecaster - Modul pro predikci směnných kurzů.
 Tento modul obsahuje veškerou logiku pro:
 - Získávání historických dat ze Symfony API
 - Předzpracování časových řad
-- Predikci budoucího vývoje kurzů pomocí scikit-learn
+- Predikci budoucího vývoje kurzů pomocí registru modelů (linear, holt, ...)
+- Dávkový trénink lineárního modelu pro všechny měny jedním průchodem NumPy
 - Ukládání výsledků do Redis cache
+- Odvození prognóz křížových kurzů (páry měn) z prognóz v cache
 - REST API endpointy pro frontend
+- Zahřátí po startu (odložené importy, prognózy z Redis nebo snapshotu)
 """
 
 from .forecaster import CurrencyForecaster
+from .executor import ForecastExecutor
+from .http_client import create_http_client
+from .history import HistoryStore
+from .model_state import ModelStateStore
+from .preprocess import PreparedHistory, prepare_history, prepare_history_pandas, get_preprocessor
+from .models import (
+    ForecastModel,
+    register_model,
+    available_models,
+    create_model,
+    parse_model_overrides,
+    DEFAULT_MODEL,
+)
+from .leader import LeaderElection
+from .codec import CacheCodec, create_codec, set_cache_codec, decode_forecast
+from .backtest import walk_forward, run_backtest
 from .cache import (
     save_forecast_to_cache,
     get_forecast_from_cache,
+    get_forecasts_from_cache,
+    get_precomputed_response,
+    get_forecast_statuses,
     invalidate_forecast_cache,
     get_cache_ttl,
+    build_forecast_key,
+    set_l1_cache,
     FORECAST_KEY_PREFIX,
 )
-from .tasks import ForecastScheduler, get_or_compute_forecast
+from .l1cache import ForecastL1Cache
+from .triggers import RateUpdateTrigger, publish_rates_updated, RATES_UPDATED_STREAM
+from .metrics import (
+    MetricsMiddleware,
+    ForecastAgeCollector,
+    StatsCollector,
+    register_collector,
+    unregister_collector,
+    render_metrics,
+    metrics_available,
+)
+from .broadcast import ForecastBroadcaster, FORECAST_UPDATES_CHANNEL
+from .cross import CrossRateCache, derive_cross_points
+from .batch_fit import batch_fit_and_predict, align_histories
+from .logs import (
+    RequestContextMiddleware,
+    configure_logging,
+    parse_log_levels,
+    log_context,
+    log_stats,
+)
+from .tasks import (
+    ForecastScheduler,
+    get_or_compute_forecast,
+    get_or_compute_forecasts,
+    compute_and_cache_forecast,
+)
+from .lazy import lazy_import, load_heavy_modules
+from .warmup import ForecastWarmup, save_forecast_snapshot, read_forecast_snapshot
 from .routes import router as forecast_router
 
 __all__ = [
     "CurrencyForecaster",
+    "ForecastExecutor",
+    "create_http_client",
+    "HistoryStore",
+    "ModelStateStore",
+    "PreparedHistory",
+    "prepare_history",
+    "prepare_history_pandas",
+    "get_preprocessor",
+    "ForecastModel",
+    "register_model",
+    "available_models",
+    "create_model",
+    "parse_model_overrides",
+    "DEFAULT_MODEL",
     "ForecastScheduler",
+    "LeaderElection",
+    "CacheCodec",
+    "create_codec",
+    "set_cache_codec",
+    "decode_forecast",
+    "walk_forward",
+    "run_backtest",
     "save_forecast_to_cache",
     "get_forecast_from_cache",
+    "get_forecasts_from_cache",
+    "get_precomputed_response",
+    "get_forecast_statuses",
     "invalidate_forecast_cache",
     "get_cache_ttl",
+    "build_forecast_key",
+    "set_l1_cache",
+    "ForecastL1Cache",
+    "RateUpdateTrigger",
+    "publish_rates_updated",
+    "RATES_UPDATED_STREAM",
+    "MetricsMiddleware",
+    "ForecastAgeCollector",
+    "StatsCollector",
+    "register_collector",
+    "unregister_collector",
+    "render_metrics",
+    "metrics_available",
+    "ForecastBroadcaster",
+    "FORECAST_UPDATES_CHANNEL",
+    "CrossRateCache",
+    "derive_cross_points",
+    "batch_fit_and_predict",
+    "align_histories",
+    "RequestContextMiddleware",
+    "configure_logging",
+    "parse_log_levels",
+    "log_context",
+    "log_stats",
     "get_or_compute_forecast",
+    "get_or_compute_forecasts",
+    "compute_and_cache_forecast",
+    "lazy_import",
+    "load_heavy_modules",
+    "ForecastWarmup",
+    "save_forecast_snapshot",
+    "read_forecast_snapshot",
     "forecast_router",
     "FORECAST_KEY_PREFIX",
 ]
@@ -0,0 +1,377 @@
+"""
+Smart Trend Forecaster - Modul pro zpětné testování prognóz (walk-forward).
+
+Přehraje historii kurzů měny den po dni: v každém dni (počátku) natrénuje
+model na okně posledních `history_days` dní stejně jako CurrencyForecaster
+a porovná prognózu na `horizon` dní dopředu se skutečnými kurzy.
+Výsledkem jsou chyby MAE a MAPE a pokrytí intervalu conf_low/conf_high.
+
+Lineární model se přepočítává vektorizovaně z kumulativních součtů
+(klouzavé postačující statistiky) pro všechny počátky najednou, ostatní
+modely z registru se trénují pro každý počátek zvlášť.
+
+Spuštění z příkazové řádky (z adresáře python_service):
+    python -m app.smart_trend_forecaster.backtest EUR USD --horizon 7
+    python -m app.smart_trend_forecaster.backtest EUR --input historie.json --model holt
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Optional
+
+from .forecaster import CurrencyForecaster
+from .models import CONFIDENCE_MULTIPLIER, DEFAULT_MODEL, LinearModel, available_models, create_model
+from .executor import ExecutorSaturatedError
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+
+# Výchozí horizont zpětného testu ve dnech
+DEFAULT_BACKTEST_HORIZON = 7
+
+# Výchozí rozsah přehrávané historie ve dnech (včetně okna pro trénink)
+DEFAULT_BACKTEST_DAYS = 365
+
+# Výchozí krok mezi počátky prognóz (v bodech historie)
+DEFAULT_BACKTEST_STEP = 1
+
+
+def _window_starts(dates: np.ndarray, history_days: int) -> np.ndarray:
+    """
+    Vrátí index prvního bodu trénovacího okna pro každý počátek.
+
+    Okno odpovídá HistoryStore.read_window: dny od (datum počátku - history_days)
+    do data počátku včetně.
+    """
+    return np.searchsorted(dates, dates - np.timedelta64(history_days, "D"), side="left")
+
+
+def _linear_walk_forward(
+    rates: np.ndarray, starts: np.ndarray, origins: np.ndarray, horizon: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Predikce lineárního modelu pro všechny počátky najednou.
+
+    Součty x, x², y, xy a y² přes libovolné okno se získají jako rozdíl
+    kumulativních součtů, takže celý test stojí O(N + počátky × horizont)
+    místo O(N × okno) samostatných tréninků.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Predikce a polovina šířky intervalu
+            ve tvaru (počet počátků, horizon).
+    """
+    x = np.arange(len(rates), dtype=np.float64)
+    # Posun kurzů kolem průměru omezí ztrátu přesnosti při odečítání součtů
+    y = rates - rates.mean()
+
+    def window_sum(values: np.ndarray) -> np.ndarray:
+        cumulative = np.concatenate(([0.0], np.cumsum(values)))
+        return cumulative[origins + 1] - cumulative[starts[origins]]
+
+    n = (origins - starts[origins] + 1).astype(np.float64)
+    sum_x, sum_y = window_sum(x), window_sum(y)
+    sum_xx, sum_xy, sum_yy = window_sum(x * x), window_sum(x * y), window_sum(y * y)
+
+    x_mean = sum_x / n
+    y_mean = sum_y / n
+    sxx = sum_xx - sum_x * x_mean
+    sxy = sum_xy - sum_x * y_mean
+    syy = sum_yy - sum_y * y_mean
+
+    slope = sxy / sxx
+    residual_std = np.sqrt(np.maximum(syy - slope * sxy, 0.0) / n)
+
+    steps = origins[:, None] + np.arange(1, horizon + 1)[None, :]
+    values = rates.mean() + y_mean[:, None] + slope[:, None] * (steps - x_mean[:, None])
+    margins = np.repeat((CONFIDENCE_MULTIPLIER * residual_std)[:, None], horizon, axis=1)
+    return values, margins
+
+
+def _generic_walk_forward(
+    rates: np.ndarray, starts: np.ndarray, origins: np.ndarray, horizon: int, model: str
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Predikce libovolného modelu z registru (samostatný trénink pro každý počátek).
+    """
+    values = np.empty((len(origins), horizon))
+    margins = np.empty((len(origins), horizon))
+    for row, origin in enumerate(origins.tolist()):
+        fitted = create_model(model).fit(rates[starts[origin]:origin + 1])
+        values[row], margins[row] = fitted.forecast(horizon)
+    return values, margins
+
+
+def _error_metrics(errors: np.ndarray, actual: np.ndarray, margins: np.ndarray) -> dict:
+    """
+    Spočítá MAE, MAPE a pokrytí intervalu (NaN = chybějící skutečný kurz).
+    """
+    mask = ~np.isnan(actual)
+    count = int(mask.sum())
+    if count == 0:
+        return {"mae": None, "mape": None, "coverage": None, "count": 0}
+
+    absolute = np.abs(errors[mask])
+    return {
+        "mae": round(float(absolute.mean()), 6),
+        "mape": round(float((absolute / np.abs(actual[mask])).mean() * 100), 4),
+        "coverage": round(float((absolute <= margins[mask]).mean() * 100), 2),
+        "count": count,
+    }
+
+
+def walk_forward(
+    dates: np.ndarray,
+    rates: np.ndarray,
+    history_days: int = 90,
+    horizon: int = DEFAULT_BACKTEST_HORIZON,
+    model: str = DEFAULT_MODEL,
+    step: int = DEFAULT_BACKTEST_STEP,
+) -> Optional[dict]:
+    """
+    Provede walk-forward test modelu nad řadou kurzů.
+
+    Počátky prognóz jsou body, před kterými je k dispozici celé trénovací
+    okno `history_days` dní. Prognóza na den h se porovná s kurzem
+    z data počátek + h dní (dny bez kurzu se do chyb nezapočítají).
+
+    Args:
+        dates (np.ndarray): Data bodů (datetime64[D]) seřazená vzestupně, bez duplicit.
+        rates (np.ndarray): Kurzy odpovídající datům.
+        history_days (int): Délka trénovacího okna ve dnech. Výchozí: 90.
+        horizon (int): Horizont prognózy ve dnech. Výchozí: 7.
+        model (str): Název modelu z registru. Výchozí: "linear".
+        step (int): Krok mezi počátky v bodech historie. Výchozí: 1.
+
+    Returns:
+        Optional[dict]: Výsledky testu:
+            - model, history_days, horizon: parametry testu
+            - origins: počet počátků prognóz
+            - first_origin, last_origin: datum prvního a posledního počátku
+            - mae, mape, coverage, count: souhrnné metriky přes všechny dny
+            - by_horizon: metriky pro jednotlivé dny horizontu
+            Nebo None, pokud historie nestačí na jediný počátek.
+
+    Example:
+        >>> result = walk_forward(dates, rates, history_days=90, horizon=7)
+        >>> print(result["mae"], result["coverage"])
+        0.0412 94.8
+    """
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    rates = np.asarray(rates, dtype=np.float64)
+
+    starts = _window_starts(dates, history_days)
+    # Počátek musí mít celé trénovací okno a alespoň dva body
+    full_window = dates - np.timedelta64(history_days, "D") >= dates[0]
+    enough_points = np.arange(len(rates)) - starts + 1 >= max(2, create_model(model).min_points)
+    origins = np.flatnonzero(full_window & enough_points)[::step]
+    if len(origins) == 0:
+        return None
+
+    if model == LinearModel.name:
+        values, margins = _linear_walk_forward(rates, starts, origins, horizon)
+    else:
+        values, margins = _generic_walk_forward(rates, starts, origins, horizon, model)
+
+    # Skutečné kurzy k datům predikcí (NaN pro dny bez kurzu)
+    targets = dates[origins][:, None] + np.arange(1, horizon + 1)[None, :]
+    positions = np.minimum(np.searchsorted(dates, targets), len(dates) - 1)
+    actual = np.where(dates[positions] == targets, rates[positions], np.nan)
+    errors = actual - values
+
+    by_horizon = [
+        {"day": day + 1, **_error_metrics(errors[:, day], actual[:, day], margins[:, day])}
+        for day in range(horizon)
+    ]
+
+    return {
+        "model": model,
+        "history_days": history_days,
+        "horizon": horizon,
+        "origins": int(len(origins)),
+        "first_origin": str(dates[origins[0]]),
+        "last_origin": str(dates[origins[-1]]),
+        **_error_metrics(errors, actual, margins),
+        "by_horizon": by_horizon,
+    }
+
+
+def backtest_history(
+    history: list[dict],
+    history_days: int = 90,
+    horizon: int = DEFAULT_BACKTEST_HORIZON,
+    model: str = DEFAULT_MODEL,
+    step: int = DEFAULT_BACKTEST_STEP,
+) -> Optional[dict]:
+    """
+    Předzpracuje surovou historii a provede walk-forward test.
+
+    Funkce je definována na úrovni modulu, aby ji bylo možné spustit
+    v poolu procesů (ForecastExecutor).
+
+    Args:
+        history (list[dict]): Surová historie se záznamy "date" a "rate".
+        history_days (int): Délka trénovacího okna ve dnech.
+        horizon (int): Horizont prognózy ve dnech.
+        model (str): Název modelu z registru.
+        step (int): Krok mezi počátky v bodech historie.
+
+    Returns:
+        Optional[dict]: Výsledky testu (viz walk_forward), nebo None.
+    """
+    prepared = CurrencyForecaster().prepare_data(history)
+    if prepared is None or len(prepared) < 2:
+        return None
+
+    return walk_forward(
+        prepared.dates.astype("datetime64[D]"),
+        prepared.rates,
+        history_days,
+        horizon,
+        model,
+        step,
+    )
+
+
+async def run_backtest(
+    forecaster: CurrencyForecaster,
+    currency: str,
+    history_days: int = 90,
+    horizon: int = DEFAULT_BACKTEST_HORIZON,
+    model: str = DEFAULT_MODEL,
+    days: int = DEFAULT_BACKTEST_DAYS,
+    step: int = DEFAULT_BACKTEST_STEP,
+) -> Optional[dict]:
+    """
+    Provede walk-forward test nad uloženou historií měny.
+
+    Historie se načte přes forecaster.fetch_history (s úložištěm historie
+    se ze Symfony API stáhne pouze přírůstek), výpočet běží v poolu
+    výpočtů forecasteru, pokud je nastaven.
+
+    Args:
+        forecaster (CurrencyForecaster): Instance pro načtení historie a pool výpočtů.
+        currency (str): Kód měny (např. "EUR").
+        history_days (int): Délka trénovacího okna ve dnech. Výchozí: 90.
+        horizon (int): Horizont prognózy ve dnech. Výchozí: 7.
+        model (str): Název modelu z registru. Výchozí: "linear".
+        days (int): Rozsah přehrávané historie ve dnech. Výchozí: 365.
+        step (int): Krok mezi počátky v bodech historie. Výchozí: 1.
+
+    Returns:
+        Optional[dict]: Výsledky testu doplněné o currency a elapsed_ms,
+                        nebo None při chybě nebo nedostatku historie.
+
+    Example:
+        >>> result = await run_backtest(forecaster, "EUR", horizon=7)
+        >>> print(result["mape"])
+    """
+    currency = currency.upper()
+    history = await forecaster.fetch_history(currency, max(days, history_days + horizon))
+    if not history:
+        return None
+
+    started = time.perf_counter()
+    try:
+        if forecaster.executor is not None:
+            result = await forecaster.executor.run(
+                backtest_history, history, history_days, horizon, model, step
+            )
+        else:
+            result = backtest_history(history, history_days, horizon, model, step)
+    except ExecutorSaturatedError as e:
+        logger.warning("Zpětný test pro %s odmítnut: %s", currency, e)
+        return None
+
+    if result is None:
+        return None
+
+    return {
+        "currency": currency,
+        **result,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+def _load_input(path: str) -> dict[str, list[dict]]:
+    """
+    Načte historii ze souboru JSON (seznam záznamů, nebo slovník měna -> seznam).
+    """
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    if isinstance(data, dict) and "history" in data:
+        data = data["history"]
+    return data
+
+
+async def _main(args: argparse.Namespace) -> int:
+    models = available_models() if args.model == "all" else [args.model]
+    for model in models:
+        create_model(model)
+
+    histories = {}
+    if args.input:
+        data = _load_input(args.input)
+        if isinstance(data, list):
+            histories = {currency.upper(): data for currency in args.currencies}
+        else:
+            histories = {currency.upper(): data.get(currency.upper()) for currency in args.currencies}
+    else:
+        forecaster = CurrencyForecaster(base_url=args.base_url)
+        fetched = await asyncio.gather(*(
+            forecaster.fetch_history_from_symfony(currency.upper(), max(args.days, args.history_days + args.horizon))
+            for currency in args.currencies
+        ))
+        histories = dict(zip((currency.upper() for currency in args.currencies), fetched))
+
+    print(
+        f"{'měna':>5} {'model':>13} {'počátky':>8} {'MAE':>10} {'MAPE [%]':>9} "
+        f"{'pokrytí [%]':>12} {'čas [ms]':>9}"
+    )
+    failed = 0
+    for currency, history in histories.items():
+        for model in models:
+            started = time.perf_counter()
+            result = backtest_history(history or [], args.history_days, args.horizon, model, args.step)
+            elapsed = (time.perf_counter() - started) * 1000
+
+            if result is None:
+                print(f"{currency:>5} {model:>13}  nedostatek historie")
+                failed += 1
+                continue
+
+            print(
+                f"{currency:>5} {model:>13} {result['origins']:>8} {result['mae']:>10.6f} "
+                f"{result['mape']:>9.4f} {result['coverage']:>12.2f} {elapsed:>9.2f}"
+            )
+            if args.verbose:
+                for row in result["by_horizon"]:
+                    print(
+                        f"{'':>5} {'den ' + str(row['day']):>13} {row['count']:>8} {row['mae']:>10.6f} "
+                        f"{row['mape']:>9.4f} {row['coverage']:>12.2f}"
+                    )
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("currencies", nargs="+", help="Kódy měn, např. EUR USD")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Název modelu, nebo 'all' pro všechny modely")
+    parser.add_argument("--history-days", type=int, default=90, help="Délka trénovacího okna ve dnech")
+    parser.add_argument("--horizon", type=int, default=DEFAULT_BACKTEST_HORIZON, help="Horizont prognózy ve dnech")
+    parser.add_argument("--days", type=int, default=DEFAULT_BACKTEST_DAYS, help="Rozsah přehrávané historie ve dnech")
+    parser.add_argument("--step", type=int, default=DEFAULT_BACKTEST_STEP, help="Krok mezi počátky prognóz")
+    parser.add_argument("--input", help="Soubor JSON s historií místo volání Symfony API")
+    parser.add_argument("--base-url", default="http://nginx", help="Základní URL Symfony API")
+    parser.add_argument("--verbose", action="store_true", help="Vypsat metriky pro jednotlivé dny horizontu")
+    args = parser.parse_args()
+
+    raise SystemExit(asyncio.run(_main(args)))
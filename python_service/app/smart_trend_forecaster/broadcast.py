@@ -0,0 +1,352 @@
+"""
+Smart Trend Forecaster - Modul pro push aktualizací prognóz (Server-Sent Events).
+
+Klienti se dříve na prognózu dotazovali opakovaně (status "processing"
+s retry_after_seconds=30). Streamovací endpoint /wallet/analytics/stream
+drží otevřené spojení a nová prognóza se klientovi pošle hned po uložení.
+
+Každé uložení prognózy (plánovač i výpočet na vyžádání) publikuje
+předpočítanou odpověď do Redis kanálu aktualizací. Každý worker má
+jediný odběr kanálu (ForecastBroadcaster) a zprávu rozdělí lokálně
+odběratelům podle klíče prognózy - tělo události se pro každý
+požadovaný horizont sestaví jen jednou a odběratelům se předá hotové.
+
+Pomalý klient nezvětšuje frontu neomezeně: pro každou měnu se drží
+jen poslední nedoručená událost (starší se nahradí novější).
+"""
+
+import asyncio
+import json
+import logging
+from typing import Optional
+import redis.asyncio as redis
+
+from .responses import load_precomputed_response, render_precomputed_response
+
+logger = logging.getLogger(__name__)
+
+
+# Redis kanál s aktualizacemi prognóz (zpráva "<klíč prognózy> <JSON odpovědi>")
+FORECAST_UPDATES_CHANNEL = "wallet:forecast:updates"
+
+# Výchozí maximální počet souběžných odběratelů na jednom workeru
+DEFAULT_MAX_SUBSCRIBERS = 5000
+
+# Výchozí maximální počet souběžně načítaných úvodních snímků streamu
+DEFAULT_SNAPSHOT_CONCURRENCY = 16
+
+# Výchozí interval komentáře keepalive ve streamu (v sekundách),
+# aby proxy neukončila nečinné spojení
+DEFAULT_HEARTBEAT_INTERVAL = 15.0
+
+# Doporučená prodleva klienta před novým připojením (v milisekundách)
+DEFAULT_RETRY_MS = 5000
+
+# Prodleva před novým připojením k odběru po chybě (v sekundách)
+RESUBSCRIBE_DELAY = 1.0
+
+
+def build_update_message(key: str, response: dict[str, str]) -> str:
+    """
+    Sestaví zprávu pro kanál aktualizací z předpočítané odpovědi.
+
+    Klíč prognózy je před JSON tělem, aby worker bez odběratelů dané
+    prognózy mohl zprávu zahodit bez deserializace.
+
+    Args:
+        key (str): Klíč prognózy v Redis (viz build_forecast_key).
+        response (dict[str, str]): Pole z precompute_forecast_response.
+
+    Returns:
+        str: Zpráva pro FORECAST_UPDATES_CHANNEL.
+    """
+    return f"{key} {json.dumps(response, ensure_ascii=False, separators=(',', ':'))}"
+
+
+def format_sse_event(event: str, data: bytes, event_id: Optional[str] = None) -> bytes:
+    """
+    Naformátuje událost Server-Sent Events.
+
+    Args:
+        event (str): Typ události (např. "forecast").
+        data (bytes): Tělo události (jednořádkový JSON).
+        event_id (Optional[str]): Identifikátor události (pole id).
+
+    Returns:
+        bytes: Událost ukončená prázdným řádkem.
+
+    Example:
+        >>> format_sse_event("forecast", b'{"status":"ready"}')
+        b'event: forecast\\ndata: {"status":"ready"}\\n\\n'
+    """
+    head = f"event: {event}\n"
+    if event_id:
+        head += f"id: {event_id}\n"
+    return head.encode("utf-8") + b"data: " + data + b"\n\n"
+
+
+class StreamSubscription:
+    """
+    Odběr aktualizací prognóz jednoho klienta.
+
+    Nedoručené události se drží podle klíče prognózy - nová událost
+    nahradí starší nedoručenou, takže paměť odběru je omezena počtem
+    odebíraných měn bez ohledu na rychlost klienta.
+
+    Attributes:
+        keys (tuple[str, ...]): Odebírané klíče prognóz.
+        days (int): Horizont prognózy v událostech.
+        delivered (int): Počet událostí předaných klientovi.
+        coalesced (int): Počet událostí nahrazených novější před doručením.
+    """
+
+    def __init__(self, keys: tuple[str, ...], days: int):
+        """
+        Inicializace odběru.
+
+        Args:
+            keys (tuple[str, ...]): Odebírané klíče prognóz.
+            days (int): Horizont prognózy v událostech.
+        """
+        self.keys = keys
+        self.days = days
+        self.delivered = 0
+        self.coalesced = 0
+        self._pending: dict[str, bytes] = {}
+        self._ready = asyncio.Event()
+
+    def push(self, key: str, frame: bytes) -> None:
+        """
+        Zařadí událost k doručení (nahradí nedoručenou událost téhož klíče).
+
+        Args:
+            key (str): Klíč prognózy.
+            frame (bytes): Naformátovaná událost.
+        """
+        if key in self._pending:
+            self.coalesced += 1
+        self._pending[key] = frame
+        self._ready.set()
+
+    async def next_events(self, timeout: float) -> list[bytes]:
+        """
+        Počká na události k doručení.
+
+        Args:
+            timeout (float): Maximální doba čekání v sekundách.
+
+        Returns:
+            list[bytes]: Události k odeslání (prázdný seznam po vypršení timeoutu).
+        """
+        if not self._pending:
+            # asyncio.timeout nevytváří pro čekání další task (na rozdíl od wait_for),
+            # což je u tisíců odběratelů znát
+            try:
+                async with asyncio.timeout(timeout):
+                    await self._ready.wait()
+            except TimeoutError:
+                return []
+
+        frames = list(self._pending.values())
+        self._pending.clear()
+        self._ready.clear()
+        self.delivered += len(frames)
+        return frames
+
+
+class ForecastBroadcaster:
+    """
+    Rozesílání aktualizací prognóz odběratelům streamu v rámci workeru.
+
+    Worker drží jediný odběr Redis kanálu FORECAST_UPDATES_CHANNEL
+    bez ohledu na počet připojených klientů. Odběratelé jsou
+    indexováni podle klíče prognózy a horizontu, takže rozeslání
+    zprávy prochází jen odběratele dané prognózy.
+
+    Attributes:
+        max_subscribers (int): Maximální počet souběžných odběratelů.
+        messages (int): Počet přijatých zpráv z kanálu.
+        deliveries (int): Počet událostí předaných odběratelům.
+        rejected (int): Počet odběrů odmítnutých kvůli limitu.
+        snapshot_semaphore (asyncio.Semaphore): Omezení souběžně načítaných
+                                                úvodních snímků streamu.
+    """
+
+    def __init__(
+        self,
+        max_subscribers: int = DEFAULT_MAX_SUBSCRIBERS,
+        snapshot_concurrency: int = DEFAULT_SNAPSHOT_CONCURRENCY,
+    ):
+        """
+        Inicializace rozesílání.
+
+        Args:
+            max_subscribers (int): Maximální počet souběžných odběratelů. Výchozí: 5000.
+            snapshot_concurrency (int): Maximální počet souběžně načítaných
+                                        úvodních snímků. Výchozí: 16.
+        """
+        self.max_subscribers = max_subscribers
+        self.snapshot_semaphore = asyncio.Semaphore(max(1, snapshot_concurrency))
+        self.messages = 0
+        self.deliveries = 0
+        self.rejected = 0
+        self._subscribers: dict[str, dict[int, set[StreamSubscription]]] = {}
+        self._count = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        """
+        Vrátí počet aktuálně připojených odběratelů.
+
+        Returns:
+            int: Počet odběratelů.
+        """
+        return self._count
+
+    def subscribe(self, keys: list[str], days: int) -> Optional[StreamSubscription]:
+        """
+        Zaregistruje odběr aktualizací zadaných prognóz.
+
+        Args:
+            keys (list[str]): Klíče prognóz v Redis (viz build_forecast_key).
+            days (int): Horizont prognózy v událostech.
+
+        Returns:
+            Optional[StreamSubscription]: Odběr, nebo None při dosažení limitu.
+        """
+        if self._count >= self.max_subscribers:
+            self.rejected += 1
+            return None
+
+        subscription = StreamSubscription(tuple(dict.fromkeys(keys)), days)
+        for key in subscription.keys:
+            self._subscribers.setdefault(key, {}).setdefault(days, set()).add(subscription)
+        self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: StreamSubscription) -> None:
+        """
+        Zruší odběr (volá se při odpojení klienta).
+
+        Args:
+            subscription (StreamSubscription): Odběr ze subscribe.
+        """
+        removed = False
+        for key in subscription.keys:
+            by_days = self._subscribers.get(key)
+            if not by_days:
+                continue
+            group = by_days.get(subscription.days)
+            if group and subscription in group:
+                group.discard(subscription)
+                removed = True
+                if not group:
+                    del by_days[subscription.days]
+            if not by_days:
+                del self._subscribers[key]
+        if removed:
+            self._count -= 1
+
+    def dispatch(self, message: str) -> int:
+        """
+        Rozešle zprávu z kanálu aktualizací odběratelům dané prognózy.
+
+        Args:
+            message (str): Zpráva z build_update_message.
+
+        Returns:
+            int: Počet odběratelů, kterým byla událost předána.
+        """
+        self.messages += 1
+        key, _, payload = message.partition(" ")
+        by_days = self._subscribers.get(key)
+        if not by_days:
+            return 0
+
+        try:
+            precomputed = load_precomputed_response(json.loads(payload))
+        except ValueError:
+            precomputed = None
+        if precomputed is None:
+            logger.warning("Neplatná zpráva aktualizace prognózy pro %s", key)
+            return 0
+
+        delivered = 0
+        # Tělo události se sestaví jednou pro každý horizont, ne pro každého odběratele
+        for days, group in list(by_days.items()):
+            body, etag = render_precomputed_response(precomputed, days)
+            frame = format_sse_event("forecast", body, etag.strip('"'))
+            for subscription in group:
+                subscription.push(key, frame)
+            delivered += len(group)
+
+        self.deliveries += delivered
+        return delivered
+
+    def stats(self) -> dict:
+        """
+        Vrátí čítače rozesílání.
+
+        Returns:
+            dict: subscribers, keys, messages, deliveries a rejected.
+        """
+        return {
+            "subscribers": self._count,
+            "keys": len(self._subscribers),
+            "messages": self.messages,
+            "deliveries": self.deliveries,
+            "rejected": self.rejected,
+        }
+
+    async def _listen(self, redis_client: redis.Redis) -> None:
+        """
+        Odebírá kanál aktualizací a rozesílá zprávy odběratelům.
+
+        Po chybě spojení se odběr obnoví. Aktualizace publikované během
+        výpadku se nedoručí - klient je dostane s další aktualizací
+        nebo po novém připojení (úvodní snímek).
+        """
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(FORECAST_UPDATES_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Chyba odběru aktualizací prognóz: %s", e)
+                await asyncio.sleep(RESUBSCRIBE_DELAY)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def start(self, redis_client: redis.Redis) -> asyncio.Task:
+        """
+        Spustí odběr aktualizací na pozadí.
+
+        Args:
+            redis_client (redis.Redis): Asynchronní Redis klient.
+
+        Returns:
+            asyncio.Task: Reference na vytvořený task.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen(redis_client))
+        return self._task
+
+    async def stop(self) -> None:
+        """
+        Zastaví odběr aktualizací.
+        """
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -6,31 +6,129 @@ směnných kurzů z Redis/KeyDB cache. Zajišťuje rychlý přístup
 k předpočítaným prognózám bez nutnosti opakovaného výpočtu.
 """
 
-import json
+import logging
+import time
 from typing import Optional
 from datetime import datetime
 import redis.asyncio as redis
 
+from .models import DEFAULT_MODEL
+from .codec import decode_forecast, encode_forecast
+from .l1cache import ForecastL1Cache, L1_INVALIDATION_CHANNEL
+from .broadcast import FORECAST_UPDATES_CHANNEL, build_update_message
+from .metrics import (
+    REDIS_GET_SECONDS,
+    REDIS_HGETALL_SECONDS,
+    REDIS_MGET_SECONDS,
+    REDIS_SAVE_SECONDS,
+    observe_forecast_timestamp,
+)
+from .responses import RESPONSE_KEY_SUFFIX, load_precomputed_response, precompute_forecast_response
+
+logger = logging.getLogger(__name__)
+
 
 # Klíčový prefix pro prognózy v cache
 FORECAST_KEY_PREFIX = "wallet:forecast:"
 
+# Výchozí počet dnů historie pro trénink modelu
+DEFAULT_HISTORY_DAYS = 90
+
+# Výchozí (maximální) horizont prognózy uložené v cache - kratší
+# horizonty se vydávají oříznutím téže prognózy
+DEFAULT_FORECAST_DAYS = 30
+
+# Přípona klíče s metadaty prognózy (Redis hash vedle samotné prognózy),
+# aby stavové endpointy nemusely načítat a parsovat celou prognózu
+FORECAST_META_SUFFIX = ":meta"
+
+# Pole ukládaná do hashe s metadaty prognózy
+FORECAST_META_FIELDS = ("generated_at", "cached_at", "cached_ts", "soft_ttl", "history_points")
+
 # Výchozí TTL pro cache (1 hodina v sekundách)
 DEFAULT_TTL = 3600
 
+# Výchozí doba (v sekundách), po kterou je prognóza po vypršení TTL
+# ještě vydávána jako zastaralá (stale), než ji Redis definitivně smaže
+DEFAULT_STALE_TTL = 86400
+
+# Lokální L1 cache před Redis (viz set_l1_cache), None = vypnuto
+_l1_cache: Optional[ForecastL1Cache] = None
+
+
+def set_l1_cache(l1_cache: Optional[ForecastL1Cache]) -> None:
+    """
+    Nastaví lokální L1 cache, přes kterou se čtou prognózy.
+
+    Args:
+        l1_cache (Optional[ForecastL1Cache]): Instance L1 cache, nebo None
+                                              pro čtení přímo z Redis.
+    """
+    global _l1_cache
+    _l1_cache = l1_cache
+
+
+def get_l1_cache() -> Optional[ForecastL1Cache]:
+    """
+    Vrátí nastavenou lokální L1 cache.
+
+    Returns:
+        Optional[ForecastL1Cache]: Instance L1 cache, nebo None.
+    """
+    return _l1_cache
+
+
+def build_forecast_key(
+    currency: str,
+    history_days: int = DEFAULT_HISTORY_DAYS,
+    forecast_days: int = DEFAULT_FORECAST_DAYS,
+    model: str = DEFAULT_MODEL,
+) -> str:
+    """
+    Sestaví klíč prognózy v cache.
+
+    Klíč obsahuje kromě měny i konfiguraci modelu (délku historie,
+    horizont prognózy a název modelu), takže změna konfigurace nikdy
+    nevrátí prognózu spočítanou s jinými parametry.
+
+    Args:
+        currency (str): Kód měny (např. "EUR").
+        history_days (int): Počet dnů historie použité pro trénink.
+        forecast_days (int): Horizont uložené prognózy ve dnech.
+        model (str): Název modelu z registru.
+
+    Returns:
+        str: Klíč ve tvaru "wallet:forecast:EUR:h90:d30:linear".
+    """
+    return f"{FORECAST_KEY_PREFIX}{currency.upper()}:h{history_days}:d{forecast_days}:{model}"
+
 
 async def save_forecast_to_cache(
     redis_client: redis.Redis,
     currency: str,
     forecast_data: dict,
     ttl: int = DEFAULT_TTL,
+    stale_ttl: int = DEFAULT_STALE_TTL,
+    history_days: int = DEFAULT_HISTORY_DAYS,
+    forecast_days: int = DEFAULT_FORECAST_DAYS,
+    model: str = DEFAULT_MODEL,
 ) -> bool:
     """
     Uloží prognózu směnného kurzu do Redis cache.
 
-    Serializuje data prognózy do JSON formátu a uloží je
-    do Redis s nastaveným TTL (Time To Live). Po vypršení TTL
-    bude záznam automaticky odstraněn.
+    Serializuje data prognózy aktivním kodekem (viz codec.set_cache_codec,
+    výchozí sloupcový formát s kompresí) a uloží je do Redis
+    s měkkou a tvrdou expirací:
+    - po uplynutí ttl (měkká expirace) je prognóza považována za zastaralou
+      a při čtení se na pozadí spustí její přepočet,
+    - po uplynutí ttl + stale_ttl (tvrdá expirace) ji Redis smaže.
+
+    Vedle prognózy se v téže transakci uloží hash s metadaty
+    (viz get_forecast_statuses), předpočítaná odpověď endpointu
+    s platností do měkké expirace (viz get_precomputed_response)
+    a klíče se publikují do kanálu zneplatnění L1 cache všech workerů.
+    Předpočítaná odpověď se zároveň publikuje do kanálu aktualizací,
+    odkud ji workery pošlou klientům streamu (viz broadcast).
 
     Args:
         redis_client (redis.Redis): Asynchronní Redis klient.
@@ -41,6 +139,11 @@ async def save_forecast_to_cache(
             - history_points: počet bodů historie
             - forecast: seznam predikcí
         ttl (int): Doba platnosti cache v sekundách. Výchozí je 3600 (1 hodina).
+        stale_ttl (int): Doba v sekundách, po kterou se prognóza po vypršení
+                         ttl ještě vydává jako zastaralá. Výchozí je 86400.
+        history_days (int): Délka historie, se kterou byla prognóza spočítána.
+        forecast_days (int): Horizont uložené prognózy ve dnech.
+        model (str): Model, kterým byla prognóza spočítána.
 
     Returns:
         bool: True pokud bylo uložení úspěšné, False při chybě.
@@ -51,34 +154,73 @@ async def save_forecast_to_cache(
         True
     """
     try:
-        key = f"{FORECAST_KEY_PREFIX}{currency.upper()}"
+        key = build_forecast_key(currency, history_days, forecast_days, model)
         
-        # Přidání timestamp uložení do cache
+        # Přidání timestamp uložení do cache a měkkého TTL
         forecast_data["cached_at"] = datetime.now().isoformat()
+        forecast_data["cached_ts"] = time.time()
+        forecast_data["soft_ttl"] = ttl
         
-        # Serializace a uložení
-        json_data = json.dumps(forecast_data, ensure_ascii=False)
-        await redis_client.setex(key, ttl, json_data)
+        # Serializace a uložení (Redis klíč vyprší až po tvrdé expiraci)
+        encoded = encode_forecast(forecast_data)
+        meta_key = f"{key}{FORECAST_META_SUFFIX}"
+        response_key = f"{key}{RESPONSE_KEY_SUFFIX}"
+        response = precompute_forecast_response(currency.upper(), forecast_data)
+        meta = {
+            field: forecast_data[field]
+            for field in FORECAST_META_FIELDS
+            if forecast_data.get(field) is not None
+        }
+
+        started = time.perf_counter()
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.setex(key, ttl + stale_ttl, encoded)
+            pipe.delete(meta_key)
+            pipe.hset(meta_key, mapping=meta)
+            pipe.expire(meta_key, ttl + stale_ttl)
+            # Předpočítaná odpověď platí jen do měkké expirace, zastaralé
+            # prognózy se vydávají dynamicky (s příznakem stale)
+            pipe.delete(response_key)
+            pipe.hset(response_key, mapping=response)
+            pipe.expire(response_key, ttl)
+            pipe.publish(L1_INVALIDATION_CHANNEL, key)
+            pipe.publish(L1_INVALIDATION_CHANNEL, response_key)
+            pipe.publish(FORECAST_UPDATES_CHANNEL, build_update_message(key, response))
+            await pipe.execute()
+        REDIS_SAVE_SECONDS.observe(time.perf_counter() - started)
+        observe_forecast_timestamp(currency.upper(), model, forecast_data["cached_ts"])
+
+        if _l1_cache is not None:
+            _l1_cache.invalidate(key)
+            _l1_cache.invalidate(response_key)
         
         return True
     except Exception as e:
-        print(f"Chyba při ukládání prognózy do cache: {e}")
+        logger.error("Chyba při ukládání prognózy %s do cache: %s", currency, e)
         return False
 
 
 async def get_forecast_from_cache(
     redis_client: redis.Redis,
     currency: str,
+    history_days: int = DEFAULT_HISTORY_DAYS,
+    forecast_days: int = DEFAULT_FORECAST_DAYS,
+    model: str = DEFAULT_MODEL,
 ) -> Optional[dict]:
     """
     Načte prognózu směnného kurzu z Redis cache.
 
-    Pokusí se načíst a deserializovat prognózu pro zadanou měnu.
+    Pokusí se načíst a deserializovat prognózu pro zadanou měnu
+    (libovolný formát kodeku včetně původního JSON). S nastavenou
+    L1 cache se prognóza nejprve hledá v paměti procesu.
     Pokud záznam neexistuje nebo vypršel, vrátí None.
 
     Args:
         redis_client (redis.Redis): Asynchronní Redis klient.
         currency (str): Kód měny (např. "EUR", "USD").
+        history_days (int): Délka historie použité pro trénink.
+        forecast_days (int): Horizont uložené prognózy ve dnech.
+        model (str): Název modelu z registru.
 
     Returns:
         Optional[dict]: Slovník s daty prognózy, nebo None pokud
@@ -91,21 +233,282 @@ async def get_forecast_from_cache(
         EUR
     """
     try:
-        key = f"{FORECAST_KEY_PREFIX}{currency.upper()}"
+        key = build_forecast_key(currency, history_days, forecast_days, model)
+
+        # Lokální L1 cache (bez round-tripu do Redis)
+        if _l1_cache is not None:
+            cached = _l1_cache.get(key)
+            if cached is not None:
+                return cached
+            generation = _l1_cache.generation
         
         # Načtení z cache
-        json_data = await redis_client.get(key)
+        started = time.perf_counter()
+        encoded = await redis_client.get(key)
+        REDIS_GET_SECONDS.observe(time.perf_counter() - started)
         
-        if json_data is None:
+        if encoded is None:
             return None
         
-        # Deserializace
-        return json.loads(json_data)
+        # Deserializace (formát se rozpozná podle předpony)
+        forecast = decode_forecast(encoded)
+        if _l1_cache is not None:
+            _l1_cache.put(key, forecast, len(encoded), generation)
+        return forecast
     except Exception as e:
-        print(f"Chyba při čtení prognózy z cache: {e}")
+        logger.warning("Chyba při čtení prognózy %s z cache: %s", currency, e)
         return None
 
 
+async def get_precomputed_response(
+    redis_client: redis.Redis,
+    currency: str,
+    history_days: int = DEFAULT_HISTORY_DAYS,
+    forecast_days: int = DEFAULT_FORECAST_DAYS,
+    model: str = DEFAULT_MODEL,
+) -> Optional[dict]:
+    """
+    Načte předpočítanou odpověď endpointu /forecast/{currency}.
+
+    Odpověď uloží save_forecast_to_cache s platností do měkké expirace
+    prognózy. S nastavenou L1 cache se nejprve hledá v paměti procesu.
+
+    Args:
+        redis_client (redis.Redis): Asynchronní Redis klient.
+        currency (str): Kód měny.
+        history_days (int): Délka historie použité pro trénink.
+        forecast_days (int): Horizont uložené prognózy ve dnech.
+        model (str): Název modelu z registru.
+
+    Returns:
+        Optional[dict]: Předpočítaná odpověď (viz responses.load_precomputed_response),
+                        nebo None, pokud není k dispozici.
+
+    Example:
+        >>> precomputed = await get_precomputed_response(redis, "EUR")
+        >>> body, etag = render_precomputed_response(precomputed, 7)
+    """
+    try:
+        key = build_forecast_key(currency, history_days, forecast_days, model) + RESPONSE_KEY_SUFFIX
+
+        if _l1_cache is not None:
+            cached = _l1_cache.get(key)
+            if cached is not None:
+                return cached
+            generation = _l1_cache.generation
+
+        started = time.perf_counter()
+        mapping = await redis_client.hgetall(key)
+        REDIS_HGETALL_SECONDS.observe(time.perf_counter() - started)
+        precomputed = load_precomputed_response(mapping) if mapping else None
+        if precomputed is None:
+            return None
+
+        if _l1_cache is not None:
+            size = len(precomputed["head"]) + len(precomputed["points"])
+            _l1_cache.put(key, precomputed, size, generation)
+        return precomputed
+    except Exception as e:
+        logger.warning("Chyba při čtení předpočítané odpovědi %s z cache: %s", currency, e)
+        return None
+
+
+async def get_forecasts_from_cache(
+    redis_client: redis.Redis,
+    currencies: list[str],
+    history_days: int = DEFAULT_HISTORY_DAYS,
+    forecast_days: int = DEFAULT_FORECAST_DAYS,
+    models: Optional[dict[str, str]] = None,
+) -> dict[str, Optional[dict]]:
+    """
+    Načte prognózy pro více měn najednou jedním příkazem MGET.
+
+    Na rozdíl od opakovaného volání get_forecast_from_cache stačí
+    jeden round-trip do Redis bez ohledu na počet měn. S nastavenou
+    L1 cache se z Redis načtou pouze měny, které v ní nejsou.
+
+    Args:
+        redis_client (redis.Redis): Asynchronní Redis klient.
+        currencies (list[str]): Seznam kódů měn.
+        history_days (int): Délka historie použité pro trénink.
+        forecast_days (int): Horizont uložené prognózy ve dnech.
+        models (Optional[dict[str, str]]): Model podle kódu měny
+                                           (výchozí model pro neuvedené měny).
+
+    Returns:
+        dict[str, Optional[dict]]: Prognózy podle kódu měny (velkými písmeny),
+                                   None pro měny, které v cache nejsou.
+
+    Example:
+        >>> forecasts = await get_forecasts_from_cache(redis, ["EUR", "USD"])
+        >>> print(forecasts["USD"] is None)
+        False
+    """
+    codes = [currency.upper() for currency in currencies]
+    if not codes:
+        return {}
+
+    models = models or {}
+    keys = {
+        code: build_forecast_key(code, history_days, forecast_days, models.get(code, DEFAULT_MODEL))
+        for code in codes
+    }
+
+    result = {}
+    if _l1_cache is not None:
+        for code in codes:
+            cached = _l1_cache.get(keys[code])
+            if cached is not None:
+                result[code] = cached
+        generation = _l1_cache.generation
+
+    missing = [code for code in codes if code not in result]
+    if not missing:
+        return result
+
+    try:
+        started = time.perf_counter()
+        values = await redis_client.mget([keys[code] for code in missing])
+        REDIS_MGET_SECONDS.observe(time.perf_counter() - started)
+    except Exception as e:
+        logger.warning("Chyba při hromadném čtení prognóz z cache: %s", e)
+        return {code: result.get(code) for code in codes}
+
+    for code, encoded in zip(missing, values):
+        try:
+            result[code] = decode_forecast(encoded) if encoded is not None else None
+        except ValueError as e:
+            logger.warning("Chyba při čtení prognózy %s z cache: %s", code, e)
+            result[code] = None
+
+        if _l1_cache is not None and result[code] is not None:
+            _l1_cache.put(keys[code], result[code], len(encoded), generation)
+
+    return {code: result[code] for code in codes}
+
+
+async def get_forecast_statuses(
+    redis_client: redis.Redis,
+    currencies: list[str],
+    history_days: int = DEFAULT_HISTORY_DAYS,
+    forecast_days: int = DEFAULT_FORECAST_DAYS,
+    models: Optional[dict[str, str]] = None,
+) -> dict[str, dict]:
+    """
+    Zjistí stav prognóz pro více měn jedním round-tripem do Redis.
+
+    Pro každou měnu se v jedné pipeline načte TTL klíče prognózy
+    a metadata z hashe (HMGET). Samotné prognózy se nenačítají
+    ani neparsují.
+
+    Args:
+        redis_client (redis.Redis): Asynchronní Redis klient.
+        currencies (list[str]): Seznam kódů měn.
+        history_days (int): Délka historie použité pro trénink.
+        forecast_days (int): Horizont uložené prognózy ve dnech.
+        models (Optional[dict[str, str]]): Model podle kódu měny
+                                           (výchozí model pro neuvedené měny).
+
+    Returns:
+        dict[str, dict]: Stav podle kódu měny se klíči:
+            - available: zda je prognóza v cache
+            - key_ttl: TTL klíče v sekundách (tvrdá expirace)
+            - generated_at, cached_at, cached_ts, soft_ttl, history_points:
+              metadata (None u záznamů uložených bez metadat)
+
+    Example:
+        >>> statuses = await get_forecast_statuses(redis, ["EUR", "USD"])
+        >>> print(statuses["EUR"]["available"])
+        True
+    """
+    codes = [currency.upper() for currency in currencies]
+    if not codes:
+        return {}
+
+    models = models or {}
+
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for code in codes:
+                key = build_forecast_key(code, history_days, forecast_days, models.get(code, DEFAULT_MODEL))
+                pipe.ttl(key)
+                pipe.hmget(f"{key}{FORECAST_META_SUFFIX}", FORECAST_META_FIELDS)
+            replies = await pipe.execute()
+    except Exception as e:
+        logger.warning("Chyba při hromadném čtení stavu prognóz: %s", e)
+        replies = [-2, [None] * len(FORECAST_META_FIELDS)] * len(codes)
+
+    statuses = {}
+    for index, code in enumerate(codes):
+        key_ttl = replies[2 * index]
+        meta = dict(zip(FORECAST_META_FIELDS, replies[2 * index + 1]))
+
+        statuses[code] = {
+            # TTL -2 znamená, že klíč neexistuje
+            "available": key_ttl != -2,
+            "key_ttl": key_ttl,
+            "generated_at": meta["generated_at"],
+            "cached_at": meta["cached_at"],
+            "cached_ts": float(meta["cached_ts"]) if meta["cached_ts"] else None,
+            "soft_ttl": int(meta["soft_ttl"]) if meta["soft_ttl"] else None,
+            "history_points": int(meta["history_points"]) if meta["history_points"] else 0,
+        }
+
+    return statuses
+
+
+def get_forecast_age(forecast_data: dict) -> Optional[float]:
+    """
+    Vrátí stáří prognózy z cache v sekundách.
+
+    Args:
+        forecast_data (dict): Prognóza načtená z cache (nebo její metadata).
+
+    Returns:
+        Optional[float]: Stáří v sekundách, nebo None u záznamů
+                         uložených bez časové značky.
+    """
+    cached_ts = forecast_data.get("cached_ts")
+    if cached_ts is None:
+        return None
+    return max(0.0, time.time() - cached_ts)
+
+
+def is_forecast_stale(forecast_data: dict) -> bool:
+    """
+    Zjistí, zda prognóza z cache překročila měkké TTL.
+
+    Args:
+        forecast_data (dict): Prognóza načtená z cache (nebo její metadata).
+
+    Returns:
+        bool: True pokud je prognóza zastaralá a měla by být přepočítána.
+    """
+    age = get_forecast_age(forecast_data)
+    soft_ttl = forecast_data.get("soft_ttl")
+    if age is None or soft_ttl is None:
+        return False
+    return age > soft_ttl
+
+
+def get_fresh_ttl(forecast_data: dict) -> Optional[int]:
+    """
+    Vrátí zbývající dobu (v sekundách) do měkké expirace prognózy.
+
+    Args:
+        forecast_data (dict): Prognóza načtená z cache (nebo její metadata).
+
+    Returns:
+        Optional[int]: Zbývající sekundy (0 u zastaralé prognózy),
+                       nebo None u záznamů bez časové značky.
+    """
+    age = get_forecast_age(forecast_data)
+    soft_ttl = forecast_data.get("soft_ttl")
+    if age is None or soft_ttl is None:
+        return None
+    return max(0, int(soft_ttl - age))
+
+
 async def invalidate_forecast_cache(
     redis_client: redis.Redis,
     currency: Optional[str] = None,
@@ -113,8 +516,9 @@ async def invalidate_forecast_cache(
     """
     Zneplatní (smaže) prognózy z cache.
 
-    Může smazat prognózu pro konkrétní měnu, nebo všechny prognózy
-    pokud není měna specifikována.
+    Může smazat prognózy pro konkrétní měnu (ve všech konfiguracích
+    historie, horizontu a modelu), nebo všechny prognózy pokud není měna
+    specifikována.
 
     Args:
         redis_client (redis.Redis): Asynchronní Redis klient.
@@ -131,38 +535,50 @@ async def invalidate_forecast_cache(
     """
     try:
         if currency:
-            # Smazání konkrétní měny
-            key = f"{FORECAST_KEY_PREFIX}{currency.upper()}"
-            deleted = await redis_client.delete(key)
-            return deleted
+            # Smazání všech konfigurací konkrétní měny
+            pattern = f"{FORECAST_KEY_PREFIX}{currency.upper()}:*"
         else:
-            # Smazání všech prognóz (pattern matching)
+            # Smazání všech prognóz
             pattern = f"{FORECAST_KEY_PREFIX}*"
-            keys = []
-            async for key in redis_client.scan_iter(pattern):
-                keys.append(key)
-            
-            if keys:
-                deleted = await redis_client.delete(*keys)
-                return deleted
-            return 0
+
+        keys = []
+        async for key in redis_client.scan_iter(pattern):
+            keys.append(key)
+
+        deleted = await redis_client.delete(*keys) if keys else 0
+
+        # Zneplatnění L1 cache ve všech workerech (i v tomto) až po smazání,
+        # aby si žádný worker nestihl znovu načíst mazanou prognózu
+        if _l1_cache is not None:
+            _l1_cache.invalidate(pattern)
+        await redis_client.publish(L1_INVALIDATION_CHANNEL, pattern)
+
+        return deleted
     except Exception as e:
-        print(f"Chyba při mazání cache: {e}")
+        logger.error("Chyba při mazání cache: %s", e)
         return 0
 
 
 async def get_cache_ttl(
     redis_client: redis.Redis,
     currency: str,
+    history_days: int = DEFAULT_HISTORY_DAYS,
+    forecast_days: int = DEFAULT_FORECAST_DAYS,
+    model: str = DEFAULT_MODEL,
 ) -> int:
     """
     Vrátí zbývající TTL (Time To Live) pro prognózu v cache.
 
     Užitečné pro zjištění, jak dlouho je prognóza ještě platná.
+    Jde o tvrdou expiraci klíče, tj. včetně doby, po kterou je
+    prognóza vydávána jako zastaralá.
 
     Args:
         redis_client (redis.Redis): Asynchronní Redis klient.
         currency (str): Kód měny.
+        history_days (int): Délka historie použité pro trénink.
+        forecast_days (int): Horizont uložené prognózy ve dnech.
+        model (str): Název modelu z registru.
 
     Returns:
         int: Zbývající čas v sekundách. -2 pokud klíč neexistuje,
@@ -173,8 +589,8 @@ async def get_cache_ttl(
         >>> print(f"Prognóza vyprší za {ttl} sekund")
     """
     try:
-        key = f"{FORECAST_KEY_PREFIX}{currency.upper()}"
+        key = build_forecast_key(currency, history_days, forecast_days, model)
         return await redis_client.ttl(key)
     except Exception as e:
-        print(f"Chyba při čtení TTL: {e}")
+        logger.warning("Chyba při čtení TTL prognózy %s: %s", currency, e)
         return -2
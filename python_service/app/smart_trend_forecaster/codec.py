@@ -0,0 +1,242 @@
+"""
+Smart Trend Forecaster - Modul se serializací prognóz pro cache.
+
+Prognóza se v cache původně ukládala jako JSON se seznamem slovníků
+pro každý den (klíče "date", "value", "conf_low" a "conf_high" se tak
+opakovaly pro každý den horizontu). Sloupcový kodek ukládá body
+prognózy jako paralelní pole, serializuje je pomocí orjson (pokud je
+nainstalován) a od zadané velikosti je komprimuje zlibem.
+
+Každý formát je označen verzovanou předponou, takže čtení je nezávislé
+na nastaveném kodeku a záznamy uložené dříve (čistý JSON bez předpony)
+zůstávají čitelné. Redis klient pracuje s textem (decode_responses=True),
+komprimovaná data se proto ukládají v base64.
+"""
+
+import base64
+import json
+import zlib
+from typing import Callable, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson je volitelná závislost
+    orjson = None
+
+
+# Předpona sloupcového formátu (verze 1)
+COLUMNAR_PREFIX = "c1:"
+
+# Předpona komprimovaného sloupcového formátu (verze 1, zlib + base64)
+COMPRESSED_PREFIX = "z1:"
+
+# Výchozí kodek pro zápis prognóz do cache
+DEFAULT_CODEC = "columnar"
+
+# Výchozí velikost serializované prognózy (v bajtech), od které se komprimuje
+DEFAULT_COMPRESS_THRESHOLD = 2048
+
+# Úroveň komprese zlib (kompromis mezi velikostí a časem)
+DEFAULT_COMPRESS_LEVEL = 6
+
+# Sloupce bodů prognózy ve sloupcovém formátu
+FORECAST_COLUMNS = ("date", "value", "conf_low", "conf_high")
+
+
+def _dumps(data: dict) -> bytes:
+    """
+    Serializuje data do JSON (orjson, pokud je k dispozici).
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(raw) -> dict:
+    """
+    Deserializuje JSON (orjson, pokud je k dispozici).
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class CacheCodec:
+    """
+    Rozhraní kodeku prognóz ukládaných do cache.
+
+    Kodek určuje pouze formát zápisu. Čtení obstarává decode_forecast,
+    která rozpozná formát podle předpony, takže změna kodeku nevyžaduje
+    smazání cache.
+
+    Attributes:
+        name (str): Název kodeku v registru.
+    """
+
+    name = ""
+
+    def encode(self, forecast_data: dict) -> str:
+        """
+        Serializuje prognózu do textu pro Redis.
+
+        Args:
+            forecast_data (dict): Prognóza se seznamem bodů v klíči "forecast".
+
+        Returns:
+            str: Serializovaná prognóza.
+        """
+        raise NotImplementedError
+
+
+class JsonCodec(CacheCodec):
+    """
+    Původní formát - JSON se seznamem slovníků pro každý den.
+    """
+
+    name = "json"
+
+    def __init__(self, compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD):
+        # Původní formát se nekomprimuje (parametr kvůli jednotné továrně)
+        pass
+
+    def encode(self, forecast_data: dict) -> str:
+        return json.dumps(forecast_data, ensure_ascii=False)
+
+
+class ColumnarCodec(CacheCodec):
+    """
+    Sloupcový formát (paralelní pole dat, hodnot a intervalů) s volitelnou kompresí.
+
+    Attributes:
+        compress_threshold (int): Velikost v bajtech, od které se komprimuje
+                                  (0 = vždy, záporná hodnota = nikdy).
+        compress_level (int): Úroveň komprese zlib.
+    """
+
+    name = "columnar"
+
+    def __init__(
+        self,
+        compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD,
+        compress_level: int = DEFAULT_COMPRESS_LEVEL,
+    ):
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+
+    def encode(self, forecast_data: dict) -> str:
+        points = forecast_data.get("forecast") or []
+        data = {key: value for key, value in forecast_data.items() if key != "forecast"}
+        data["forecast"] = {
+            column: [point[column] for point in points]
+            for column in FORECAST_COLUMNS
+        }
+
+        raw = _dumps(data)
+        if 0 <= self.compress_threshold <= len(raw):
+            compressed = zlib.compress(raw, self.compress_level)
+            return COMPRESSED_PREFIX + base64.b64encode(compressed).decode("ascii")
+        return COLUMNAR_PREFIX + raw.decode("utf-8")
+
+
+def decode_forecast(text: str) -> dict:
+    """
+    Deserializuje prognózu z cache v libovolném podporovaném formátu.
+
+    Args:
+        text (str): Hodnota klíče prognózy z Redis.
+
+    Returns:
+        dict: Prognóza se seznamem bodů v klíči "forecast" (stejný tvar,
+              jaký vrací CurrencyForecaster.get_forecast).
+
+    Raises:
+        ValueError: Pokud hodnotu nelze deserializovat.
+    """
+    if text.startswith(COMPRESSED_PREFIX):
+        try:
+            raw = zlib.decompress(base64.b64decode(text[len(COMPRESSED_PREFIX):]))
+        except (zlib.error, ValueError) as e:
+            raise ValueError(f"Poškozená komprimovaná prognóza: {e}")
+        data = _loads(raw)
+    elif text.startswith(COLUMNAR_PREFIX):
+        data = _loads(text[len(COLUMNAR_PREFIX):])
+    else:
+        # Původní formát bez předpony (čistý JSON se seznamem bodů)
+        return _loads(text)
+
+    # Převod sloupců zpět na body (literál slovníku je rychlejší než dict(zip(...)))
+    columns = data.get("forecast") or {}
+    data["forecast"] = [
+        {"date": day, "value": value, "conf_low": low, "conf_high": high}
+        for day, value, low, high in zip(*(columns.get(column, []) for column in FORECAST_COLUMNS))
+    ]
+    return data
+
+
+# Registr kodeků: název -> továrna (přijímá práh komprese)
+CODEC_REGISTRY: dict[str, Callable[..., CacheCodec]] = {
+    JsonCodec.name: JsonCodec,
+    ColumnarCodec.name: ColumnarCodec,
+}
+
+# Kodek používaný pro zápis do cache (viz set_cache_codec)
+_active_codec: CacheCodec = ColumnarCodec()
+
+
+def create_codec(name: str, compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD) -> CacheCodec:
+    """
+    Vytvoří kodek z registru.
+
+    Args:
+        name (str): Název kodeku ("columnar" nebo "json").
+        compress_threshold (int): Velikost v bajtech, od které se komprimuje.
+
+    Returns:
+        CacheCodec: Instance kodeku.
+
+    Raises:
+        ValueError: Pokud kodek není registrován.
+    """
+    try:
+        factory = CODEC_REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"Neznámý kodek cache: {name}. Dostupné: {', '.join(CODEC_REGISTRY)}")
+    return factory(compress_threshold=compress_threshold)
+
+
+def set_cache_codec(codec: CacheCodec) -> None:
+    """
+    Nastaví kodek, kterým se prognózy zapisují do cache.
+
+    Args:
+        codec (CacheCodec): Instance kodeku.
+
+    Example:
+        >>> set_cache_codec(create_codec("columnar", compress_threshold=1024))
+    """
+    global _active_codec
+    _active_codec = codec
+
+
+def get_cache_codec() -> CacheCodec:
+    """
+    Vrátí kodek, kterým se prognózy zapisují do cache.
+
+    Returns:
+        CacheCodec: Aktivní kodek.
+    """
+    return _active_codec
+
+
+def encode_forecast(forecast_data: dict, codec: Optional[CacheCodec] = None) -> str:
+    """
+    Serializuje prognózu aktivním (nebo zadaným) kodekem.
+
+    Args:
+        forecast_data (dict): Prognóza se seznamem bodů v klíči "forecast".
+        codec (Optional[CacheCodec]): Kodek. Výchozí: aktivní kodek.
+
+    Returns:
+        str: Serializovaná prognóza.
+    """
+    return (codec or _active_codec).encode(forecast_data)
@@ -0,0 +1,279 @@
+"""
+Smart Trend Forecaster - Modul pro křížové kurzy (např. EUR/USD).
+
+Prognózy se počítají vždy vůči hlavní měně peněženky (kurz = počet
+jednotek měny za pevnou částku hlavní měny, viz Symfony RateHistoryService).
+Prognóza libovolného páru se proto odvodí z prognóz obou měn v cache
+bez stahování historie a tréninku modelu pro každý pár (O(N) místo O(N²)):
+
+    BASE/QUOTE = kurz(QUOTE) / kurz(BASE)    (cena 1 BASE v QUOTE)
+
+Interval spolehlivosti se šíří v logaritmickém měřítku (delta metoda,
+nezávislé chyby): relativní pološířky obou prognóz se sčítají
+kvadraticky a meze jsou kurz · exp(±δ), takže zůstávají kladné.
+Předpoklad nezávislosti je konzervativní - kurzy vůči stejné hlavní
+měně bývají kladně korelované a skutečný interval páru je užší.
+
+Odvozené prognózy se drží v omezené LRU cache podle páru a modelů.
+Záznam je platný jen pro konkrétní verze obou prognóz (generated_at
+a cached_at), takže přepočet kterékoli z nich ho zneplatní.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Optional
+
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+# Výchozí maximální počet odvozených párů v paměti workeru
+DEFAULT_CROSS_CACHE_SIZE = 1024
+
+# Počet desetinných míst odvozeného kurzu (páry jako JPY/EUR mají malé hodnoty)
+CROSS_RATE_DECIMALS = 6
+
+# Klíč záznamu: (base, quote, history_days, model base, model quote)
+CrossKey = tuple[str, str, int, str, str]
+
+
+def _forecast_version(forecast: dict) -> tuple:
+    """
+    Vrátí verzi prognózy, podle které se pozná její přepočet.
+    """
+    return forecast.get("generated_at"), forecast.get("cached_at")
+
+
+def derive_cross_points(base_points: list[dict], quote_points: list[dict]) -> list[dict]:
+    """
+    Odvodí body prognózy páru BASE/QUOTE z prognóz obou měn.
+
+    Body se spárují podle data (prognózy mohly vzniknout v různé dny,
+    použije se jen společná část). Výpočet je vektorizovaný v NumPy.
+    Body s nekladným kurzem se vynechají.
+
+    Args:
+        base_points (list[dict]): Body prognózy měny BASE (date, value, conf_low, conf_high).
+        quote_points (list[dict]): Body prognózy měny QUOTE.
+
+    Returns:
+        list[dict]: Body prognózy páru s klíči date, value, conf_low a conf_high.
+
+    Example:
+        >>> derive_cross_points(
+        ...     [{"date": "2026-01-19", "value": 4.0, "conf_low": 3.96, "conf_high": 4.04}],
+        ...     [{"date": "2026-01-19", "value": 4.3, "conf_low": 4.3, "conf_high": 4.3}],
+        ... )
+        [{"date": "2026-01-19", "value": 1.075, "conf_low": 1.064304, "conf_high": 1.085804}]
+    """
+    if not base_points or not quote_points:
+        return []
+
+    base_dates = np.array([point["date"] for point in base_points], dtype="datetime64[D]")
+    quote_dates = np.array([point["date"] for point in quote_points], dtype="datetime64[D]")
+    dates, base_index, quote_index = np.intersect1d(base_dates, quote_dates, return_indices=True)
+
+    base = np.array(
+        [(point["value"], point["conf_low"], point["conf_high"]) for point in base_points], dtype=np.float64
+    )[base_index]
+    quote = np.array(
+        [(point["value"], point["conf_low"], point["conf_high"]) for point in quote_points], dtype=np.float64
+    )[quote_index]
+
+    base_value, quote_value = base[:, 0], quote[:, 0]
+    valid = (base_value > 0) & (quote_value > 0)
+    if not valid.all():
+        dates, base, quote = dates[valid], base[valid], quote[valid]
+        base_value, quote_value = base[:, 0], quote[:, 0]
+
+    # Relativní pološířky intervalů (konstantní "hlavní" měna má nulovou šířku)
+    base_relative = (base[:, 2] - base[:, 1]) / (2 * base_value)
+    quote_relative = (quote[:, 2] - quote[:, 1]) / (2 * quote_value)
+    delta = np.hypot(base_relative, quote_relative)
+
+    value = quote_value / base_value
+    low = value * np.exp(-delta)
+    high = value * np.exp(delta)
+
+    return [
+        {"date": day, "value": v, "conf_low": lo, "conf_high": hi}
+        for day, v, lo, hi in zip(
+            dates.astype(str).tolist(),
+            np.round(value, CROSS_RATE_DECIMALS).tolist(),
+            np.round(low, CROSS_RATE_DECIMALS).tolist(),
+            np.round(high, CROSS_RATE_DECIMALS).tolist(),
+        )
+    ]
+
+
+class CrossRateCache:
+    """
+    Omezená LRU cache odvozených prognóz párů.
+
+    Každý pár má nejvýše jeden záznam; záznam se vydá jen pokud se verze
+    obou zdrojových prognóz shodují s verzemi, ze kterých byl odvozen.
+
+    Attributes:
+        max_entries (int): Maximální počet párů.
+        hits (int): Počet zásahů.
+        misses (int): Počet výpadků (chybějící záznam).
+        invalidations (int): Počet záznamů zahozených kvůli změně zdrojové prognózy.
+        evictions (int): Počet záznamů vytlačených kvůli limitu.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CROSS_CACHE_SIZE):
+        """
+        Inicializace cache.
+
+        Args:
+            max_entries (int): Maximální počet párů. Výchozí: 1024.
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self._entries: OrderedDict[CrossKey, tuple[tuple, tuple, list[dict]]] = OrderedDict()
+
+    def get(self, key: CrossKey, base_forecast: dict, quote_forecast: dict) -> Optional[list[dict]]:
+        """
+        Vrátí odvozené body páru, pokud odpovídají aktuálním prognózám.
+
+        Args:
+            key (CrossKey): Klíč páru.
+            base_forecast (dict): Aktuální prognóza měny BASE.
+            quote_forecast (dict): Aktuální prognóza měny QUOTE.
+
+        Returns:
+            Optional[list[dict]]: Body prognózy páru, nebo None.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        base_version, quote_version, points = entry
+        if base_version != _forecast_version(base_forecast) or quote_version != _forecast_version(quote_forecast):
+            del self._entries[key]
+            self.invalidations += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return points
+
+    def put(self, key: CrossKey, base_forecast: dict, quote_forecast: dict, points: list[dict]) -> None:
+        """
+        Uloží odvozené body páru a vytlačí nejdéle nepoužité záznamy.
+
+        Args:
+            key (CrossKey): Klíč páru.
+            base_forecast (dict): Prognóza měny BASE, ze které byly body odvozeny.
+            quote_forecast (dict): Prognóza měny QUOTE.
+            points (list[dict]): Body prognózy páru.
+        """
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (_forecast_version(base_forecast), _forecast_version(quote_forecast), points)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Zahodí všechny záznamy.
+        """
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Vrátí čítače a obsazenost cache.
+
+        Returns:
+            dict: hits, misses, hit_ratio, invalidations, evictions a entries.
+        """
+        lookups = self.hits + self.misses + self.invalidations
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+        }
+
+
+def build_cross_response(
+    base: str,
+    quote: str,
+    base_forecast: Optional[dict],
+    quote_forecast: Optional[dict],
+    days: int,
+    history_days: int,
+    cache: Optional[CrossRateCache] = None,
+) -> dict:
+    """
+    Sestaví odpověď endpointu /forecast/{base}/{quote}.
+
+    Args:
+        base (str): Kód měny BASE.
+        quote (str): Kód měny QUOTE.
+        base_forecast (Optional[dict]): Prognóza měny BASE (z cache nebo nově vypočítaná).
+        quote_forecast (Optional[dict]): Prognóza měny QUOTE.
+        days (int): Požadovaný počet dnů (prognóza se ořízne).
+        history_days (int): Počet dnů historie zdrojových prognóz (součást klíče cache).
+        cache (Optional[CrossRateCache]): Cache odvozených párů.
+
+    Returns:
+        dict: Odpověď se statusem "ready", nebo "processing", pokud některá
+              ze zdrojových prognóz není k dispozici.
+    """
+    pair = f"{base}/{quote}"
+    if not base_forecast or not quote_forecast:
+        missing = [code for code, forecast in ((base, base_forecast), (quote, quote_forecast)) if not forecast]
+        return {
+            "status": "processing",
+            "pair": pair,
+            "base": base,
+            "quote": quote,
+            "message": (
+                f"Prognóza pro {', '.join(missing)} není momentálně k dispozici. "
+                "Systém ji právě počítá. Zkuste to prosím za chvíli."
+            ),
+            "retry_after_seconds": 30,
+        }
+
+    key = (base, quote, history_days, base_forecast.get("model", ""), quote_forecast.get("model", ""))
+    points = cache.get(key, base_forecast, quote_forecast) if cache is not None else None
+    memoized = points is not None
+    if points is None:
+        points = derive_cross_points(base_forecast["forecast"], quote_forecast["forecast"])
+        if cache is not None:
+            cache.put(key, base_forecast, quote_forecast, points)
+
+    stale = bool(base_forecast.get("stale") or quote_forecast.get("stale"))
+    sources = {
+        code: {
+            "model": forecast.get("model"),
+            "generated_at": forecast["generated_at"],
+            "history_points": forecast.get("history_points", 0),
+            "stale": forecast.get("stale", False),
+        }
+        for code, forecast in ((base, base_forecast), (quote, quote_forecast))
+    }
+
+    return {
+        "status": "ready",
+        "pair": pair,
+        "base": base,
+        "quote": quote,
+        "generated_at": min(base_forecast["generated_at"], quote_forecast["generated_at"]),
+        "stale": stale,
+        "derived": True,
+        "memoized": memoized,
+        "sources": sources,
+        "forecast": points[:days],
+    }
@@ -0,0 +1,167 @@
+"""
+Smart Trend Forecaster - Modul pro výpočty mimo event loop.
+
+Předzpracování dat (pandas) a trénink modelu jsou CPU-náročné
+a při běhu přímo v asynchronních handlerech by blokovaly event loop,
+který obsluhuje HTTP požadavky. Tento modul poskytuje executor
+(pool procesů nebo vláken) spravovaný lifespan hookem aplikace,
+s omezením počtu čekajících úloh (backpressure).
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import multiprocessing
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from .logs import init_worker_logging, worker_logging_settings
+
+logger = logging.getLogger(__name__)
+
+
+# Podporované druhy executoru
+EXECUTOR_KINDS = ("process", "thread", "inline")
+
+# Výchozí počet workerů poolu
+DEFAULT_MAX_WORKERS = 2
+
+# Výchozí maximální doba čekání na volné místo v poolu (v sekundách)
+DEFAULT_ACQUIRE_TIMEOUT = 10.0
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """
+    Výjimka vyhozená, pokud je pool přetížen a úloha nezískala místo včas.
+    """
+
+
+class ForecastExecutor:
+    """
+    Executor pro CPU-náročné části výpočtu prognózy.
+
+    Úlohy běží v poolu procesů (výchozí) nebo vláken, takže event loop
+    zůstává volný pro obsluhu HTTP požadavků. Počet rozpracovaných
+    a čekajících úloh je omezen na max_pending; další volající čekají
+    nejvýše acquire_timeout sekund, poté dostanou ExecutorSaturatedError.
+
+    Attributes:
+        kind (str): Druh executoru ("process", "thread" nebo "inline").
+        max_workers (int): Počet workerů poolu.
+        max_pending (int): Maximální počet rozpracovaných a čekajících úloh.
+        acquire_timeout (float): Maximální doba čekání na místo v poolu.
+    """
+
+    def __init__(
+        self,
+        kind: str = "process",
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_pending: Optional[int] = None,
+        acquire_timeout: float = DEFAULT_ACQUIRE_TIMEOUT,
+    ):
+        """
+        Inicializace executoru a vytvoření poolu.
+
+        Args:
+            kind (str): "process" (ProcessPoolExecutor), "thread"
+                        (ThreadPoolExecutor) nebo "inline" (výpočet přímo
+                        v event loopu, např. pro ladění). Výchozí: "process".
+            max_workers (int): Počet workerů poolu. Výchozí: 2.
+            max_pending (Optional[int]): Maximální počet rozpracovaných
+                        a čekajících úloh. Výchozí: 4 × max_workers.
+            acquire_timeout (float): Maximální doba čekání na místo v poolu
+                        v sekundách. Výchozí: 10.
+
+        Raises:
+            ValueError: Pokud je zadán neznámý druh executoru.
+        """
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Neznámý druh executoru: {kind}. Podporované: {EXECUTOR_KINDS}")
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending or max_workers * 4
+        self.acquire_timeout = acquire_timeout
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._pool: Optional[Executor] = self._create_pool()
+
+    def _create_pool(self) -> Optional[Executor]:
+        """
+        Vytvoří pool podle druhu executoru.
+
+        Returns:
+            Optional[Executor]: Pool procesů nebo vláken, None pro "inline".
+        """
+        if self.kind == "process":
+            # "spawn" je bezpečný i v procesu s běžícími vlákny a event loopem;
+            # workery logují ve stejném formátu jako hlavní proces
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker_logging,
+                initargs=(worker_logging_settings(),),
+            )
+        if self.kind == "thread":
+            return ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="forecast",
+            )
+        return None
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Spustí funkci v poolu a počká na její výsledek.
+
+        U poolu procesů musí být funkce i argumenty serializovatelné
+        (pickle), tj. typicky funkce definovaná na úrovni modulu.
+
+        Args:
+            fn (Callable[..., Any]): Funkce k provedení.
+            *args (Any): Argumenty funkce.
+
+        Returns:
+            Any: Návratová hodnota funkce.
+
+        Raises:
+            ExecutorSaturatedError: Pokud se úloha nedostala do poolu včas.
+            BrokenExecutor: Pokud worker poolu neočekávaně skončil
+                            (pool se pro další úlohy vytvoří znovu).
+
+        Example:
+            >>> result = await executor.run(compute, history, 30)
+        """
+        if self._pool is None:
+            return fn(*args)
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise ExecutorSaturatedError(
+                f"Pool výpočtů je přetížen ({self.max_pending} úloh), zkuste to později"
+            )
+
+        pool = self._pool
+        if self.kind == "thread":
+            # Kontext logování (request_id, měna) se přenese i do vlákna poolu
+            fn = functools.partial(contextvars.copy_context().run, fn)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(pool, fn, *args)
+        except BrokenExecutor:
+            # Pád workeru (např. OOM) rozbije celý pool - nahradíme ho novým
+            if self._pool is pool:
+                logger.error("Pool výpočtů selhal, vytvářím nový")
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._create_pool()
+            raise
+        finally:
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        """
+        Ukončí pool a zruší úlohy, které ještě nezačaly.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
@@ -4,16 +4,27 @@ Smart Trend Forecaster - Modul pro predikci směnných kurzů.
 Tento modul obsahuje třídu CurrencyForecaster, která zajišťuje:
 - Získání historických dat ze Symfony API
 - Předzpracování a čištění dat
-- Predikci budoucího vývoje kurzů pomocí lineární regrese
+- Predikci budoucího vývoje kurzů modely z registru (výchozí lineární regrese)
 - Výpočet dovolených intervalů
 """
 
+import logging
+import time
 from typing import Optional
 import httpx
-import pandas as pd
-import numpy as np
-from sklearn.linear_model import LinearRegression
-from datetime import datetime, timedelta
+from datetime import datetime
+from concurrent.futures import BrokenExecutor
+
+from .batch_fit import batch_fit_and_predict
+from .executor import ForecastExecutor, ExecutorSaturatedError
+from .history import HistoryStore
+from .model_state import ModelStateStore
+from .models import DEFAULT_MODEL, LinearModel, create_model, forecast_points
+from .preprocess import DEFAULT_PREPROCESS, PreparedHistory, get_preprocessor
+from .metrics import COMPUTATIONS_IN_FLIGHT, PREDICT_SECONDS, PREPARE_DATA_SECONDS, UPSTREAM_FETCH_SECONDS
+from .logs import log_context
+
+logger = logging.getLogger(__name__)
 
 
 class CurrencyForecaster:
@@ -29,9 +40,22 @@ class CurrencyForecaster:
     Attributes:
         base_url (str): Základní URL pro Symfony API.
         default_days (int): Výchozí počet dnů pro predikci.
+        http_client (Optional[httpx.AsyncClient]): Sdílený HTTP klient s poolem spojení.
+        executor (Optional[ForecastExecutor]): Pool pro CPU-náročné části výpočtu.
+        history_store (Optional[HistoryStore]): Lokální úložiště historie kurzů.
+        model_store (Optional[ModelStateStore]): Perzistentní stav lineárního modelu.
+        preprocess (str): Implementace předzpracování historie ("numpy" nebo "pandas").
     """
 
-    def __init__(self, base_url: str = "http://nginx"):
+    def __init__(
+        self,
+        base_url: str = "http://nginx",
+        http_client: Optional[httpx.AsyncClient] = None,
+        executor: Optional[ForecastExecutor] = None,
+        history_store: Optional[HistoryStore] = None,
+        model_store: Optional[ModelStateStore] = None,
+        preprocess: str = DEFAULT_PREPROCESS,
+    ):
         """
         Inicializace třídy CurrencyForecaster.
 
@@ -40,9 +64,32 @@ class CurrencyForecaster:
 
         Args:
             base_url (str): Základní URL pro API. Výchozí je "http://nginx".
+            http_client (Optional[httpx.AsyncClient]): Sdílený klient vytvořený
+                v lifespan hooku. Pokud není zadán, vytvoří se pro každý
+                požadavek nový klient.
+            executor (Optional[ForecastExecutor]): Pool vytvořený v lifespan
+                hooku, ve kterém běží předzpracování a predikce. Pokud není
+                zadán, počítá se přímo v event loopu.
+            history_store (Optional[HistoryStore]): Úložiště historie v Redis,
+                ze kterého se ze Symfony API dotahuje pouze přírůstek. Pokud
+                není zadáno, stahuje se pokaždé celé okno historie.
+            model_store (Optional[ModelStateStore]): Úložiště postačujících
+                statistik modelu. Pokud je zadáno, prognóza se počítá přímo
+                z inkrementálně aktualizovaného stavu bez pandas a tréninku.
+            preprocess (str): Implementace předzpracování historie - "numpy"
+                (výchozí, bez pandas) nebo "pandas" (původní cesta přes DataFrame).
+
+        Raises:
+            ValueError: Pokud implementace předzpracování neexistuje.
         """
         self.base_url = base_url
         self.default_days = 7
+        self.http_client = http_client
+        self.executor = executor
+        self.history_store = history_store
+        self.model_store = model_store
+        self.preprocess = preprocess
+        self._preprocessor = get_preprocessor(preprocess)
 
     async def fetch_history_from_symfony(
         self, currency: str, days: int = 90
@@ -73,110 +120,110 @@ class CurrencyForecaster:
         url = f"{self.base_url}/api/multi-currency-wallet/history"
         params = {"currency": currency, "days": days}
 
+        started = time.perf_counter()
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                
-                # Symfony API vrací data ve formátu {success, history: [...]}
-                result = response.json()
-                
-                # Kontrola úspěšnosti a extrakce historie
-                if result.get("success") and "history" in result:
-                    return result["history"]
-                else:
-                    print(f"API vrátilo neúspěšný výsledek: {result}")
-                    return None
-                    
+            if self.http_client is not None:
+                # Sdílený klient - spojení se znovu použije z poolu
+                response = await self.http_client.get(url, params=params)
+            else:
+                async with httpx.AsyncClient(timeout=30.0) as client:
+                    response = await client.get(url, params=params)
+            UPSTREAM_FETCH_SECONDS.observe(time.perf_counter() - started)
+
+            response.raise_for_status()
+
+            # Symfony API vrací data ve formátu {success, history: [...]}
+            result = response.json()
+
+            # Kontrola úspěšnosti a extrakce historie
+            if result.get("success") and "history" in result:
+                return result["history"]
+            else:
+                logger.warning("API vrátilo neúspěšný výsledek pro %s: %s", currency, result)
+                return None
+
         except httpx.HTTPStatusError as e:
-            print(f"HTTP chyba při získávání historie: {e}")
+            logger.warning("HTTP chyba při získávání historie %s: %s", currency, e)
             return None
         except httpx.RequestError as e:
-            print(f"Chyba při síťovém požadavku: {e}")
+            UPSTREAM_FETCH_SECONDS.observe(time.perf_counter() - started)
+            logger.warning("Chyba při síťovém požadavku na historii %s: %s", currency, e)
             return None
 
-    def prepare_data(self, data: list[dict]) -> Optional[pd.DataFrame]:
+    async def fetch_history(self, currency: str, days: int = 90) -> Optional[list[dict]]:
         """
-        Předzpracuje surová data do formátu pandas DataFrame.
+        Získá historii kurzů, přednostně přes lokální úložiště historie.
 
-        Provádí následující kroky:
-        1. Konverze seznamu slovníků na DataFrame
-        2. Parsování sloupce "date" na datetime
-        3. Seřazení podle data vzestupně
-        4. Odstranění duplicit a prázdných hodnot
-        5. Vytvoření numerického indexu pro regresní model
+        S nastaveným history_store se ze Symfony API stáhne pouze přírůstek
+        od posledního uloženého dne a vrátí se sloučená historie. Při chybě
+        úložiště (např. nedostupný Redis) se stáhne celé okno přímo.
 
         Args:
-            data (list[dict]): Seznam slovníků s klíči "date" a "rate".
+            currency (str): Kód měny (např. "EUR", "USD").
+            days (int): Počet dnů historie. Výchozí je 90.
 
         Returns:
-            Optional[pd.DataFrame]: Předzpracovaný DataFrame se sloupci:
-                                    - date: datum jako datetime
-                                    - rate: kurz jako float
-                                    - day_index: numerický index dne
-                                    Nebo None, pokud jsou data neplatná.
-
-        Example:
-            >>> data = [{"date": "2026-01-01", "rate": 25.1}]
-            >>> df = forecaster.prepare_data(data)
-            >>> print(df.columns)
-            Index(['date', 'rate', 'day_index'], dtype='object')
+            Optional[list[dict]]: Seznam slovníků s klíči "date" a "rate",
+                                  nebo None při chybě.
         """
-        if not data:
-            return None
-
-        try:
-            # Vytvoření DataFrame
-            df = pd.DataFrame(data)
-
-            # Kontrola požadovaných sloupců
-            if "date" not in df.columns or "rate" not in df.columns:
-                print("Chybí požadované sloupce 'date' nebo 'rate'")
-                return None
-
-            # Konverze datumu
-            df["date"] = pd.to_datetime(df["date"])
+        if self.history_store is not None:
+            try:
+                return await self.history_store.get_history(
+                    currency, days, self.fetch_history_from_symfony
+                )
+            except Exception as e:
+                logger.warning("Chyba úložiště historie pro %s, stahuji celé okno: %s", currency, e)
 
-            # Konverze kurzu na float
-            df["rate"] = pd.to_numeric(df["rate"], errors="coerce")
+        return await self.fetch_history_from_symfony(currency, days)
 
-            # Odstranění prázdných hodnot
-            df = df.dropna(subset=["date", "rate"])
-
-            # Seřazení podle data
-            df = df.sort_values("date").reset_index(drop=True)
+    def prepare_data(self, data: list[dict]) -> Optional[PreparedHistory]:
+        """
+        Předzpracuje surová data do polí dat a kurzů pro model.
 
-            # Odstranění duplicit (ponechání posledního záznamu pro každé datum)
-            df = df.drop_duplicates(subset=["date"], keep="last")
+        Provádí následující kroky (implementace podle atributu preprocess,
+        viz modul preprocess):
+        1. Parsování data na datetime64 a konverze kurzu na float
+        2. Odstranění prázdných a neplatných hodnot
+        3. Seřazení podle data vzestupně
+        4. Odstranění duplicit (ponechání posledního záznamu pro každé datum)
 
-            # Vytvoření numerického indexu pro regresní model
-            df["day_index"] = range(len(df))
+        Args:
+            data (list[dict]): Seznam slovníků s klíči "date" a "rate".
 
-            return df
+        Returns:
+            Optional[PreparedHistory]: Očištěná historie s poli:
+                                       - dates: data bodů (datetime64)
+                                       - rates: kurzy jako float64
+                                       Nebo None, pokud jsou data neplatná.
 
-        except Exception as e:
-            print(f"Chyba při předzpracování dat: {e}")
-            return None
+        Example:
+            >>> data = [{"date": "2026-01-01", "rate": 25.1}]
+            >>> prepared = forecaster.prepare_data(data)
+            >>> print(prepared.rates)
+            [25.1]
+        """
+        return self._preprocessor(data)
 
     def predict(
-        self, df: pd.DataFrame, days: int = 7
+        self, prepared: PreparedHistory, days: int = 7, model: str = DEFAULT_MODEL
     ) -> Optional[list[dict]]:
         """
-        Provede predikci budoucích kurzů pomocí lineární regrese.
+        Provede predikci budoucích kurzů zvoleným modelem z registru.
 
-        Trénuje model lineární regrese na historických datech a generuje
-        predikce pro zadaný počet dnů dopředu. Vypočítává také dovolené
-        intervaly na základě reziduální směrodatné odchylky.
+        Natrénuje model (výchozí lineární regrese) na historických datech
+        a generuje predikce pro zadaný počet dnů dopředu včetně 95%
+        dovolených intervalů. Dostupné modely viz models.MODEL_REGISTRY.
 
-        Algoritmus:
-        1. Extrahuje features (day_index) a target (rate)
-        2. Trénuje model LinearRegression
-        3. Generuje predikce pro budoucí dny
-        4. Počítá 95% dovolený interval pomocí 1.96 * std(residuals)
+        Algoritmus (vektorizovaně v NumPy, bez smyčky přes dny):
+        1. Vezme kurzy v pořadí bodů očištěné historie
+        2. Natrénuje model (lineární: přímka v uzavřeném tvaru)
+        3. Generuje predikce a data pro všechny budoucí dny najednou
+        4. Počítá 95% dovolený interval (lineární: 1.96 * std(residuals))
 
         Args:
-            df (pd.DataFrame): Předzpracovaný DataFrame z metody prepare_data().
+            prepared (PreparedHistory): Očištěná historie z metody prepare_data().
             days (int): Počet dnů pro predikci dopředu. Výchozí je 7.
+            model (str): Název modelu z registru. Výchozí je "linear".
 
         Returns:
             Optional[list[dict]]: Seznam slovníků s predikcemi:
@@ -187,79 +234,86 @@ class CurrencyForecaster:
                 Nebo None při chybě.
 
         Example:
-            >>> predictions = forecaster.predict(df, days=7)
+            >>> predictions = forecaster.predict(prepared, days=7, model="holt")
             >>> print(predictions[0])
             {"date": "2026-01-19", "value": 25.5, "conf_low": 25.2, "conf_high": 25.8}
         """
-        if df is None or len(df) < 2:
-            print("Nedostatek dat pro predikci (minimálně 2 záznamy)")
+        if prepared is None or len(prepared) < 2:
+            logger.warning("Nedostatek dat pro predikci (minimálně 2 záznamy)")
             return None
 
         try:
-            # Příprava features a target
-            X = df["day_index"].values.reshape(-1, 1)
-            y = df["rate"].values
+            # Trénink modelu na kurzech seřazených podle data
+            fitted = create_model(model).fit(prepared.rates)
 
-            # Trénink modelu
-            model = LinearRegression()
-            model.fit(X, y)
+            # Generování predikcí a dat pro všechny budoucí dny najednou
+            values, margins = fitted.forecast(days)
+            return forecast_points(prepared.last_date, values, margins)
 
-            # Výpočet reziduí pro dovolené intervaly
-            predictions_train = model.predict(X)
-            residuals = y - predictions_train
-            residual_std = np.std(residuals)
-
-            # 95% dovolený interval (1.96 * std)
-            confidence_multiplier = 1.96
-
-            # Generování predikcí pro budoucí dny
-            last_date = df["date"].max()
-            last_index = df["day_index"].max()
-
-            forecast = []
-            for i in range(1, days + 1):
-                future_index = last_index + i
-                future_date = last_date + timedelta(days=i)
-
-                # Predikce hodnoty
-                predicted_value = model.predict([[future_index]])[0]
-
-                # Dovolené intervaly
-                conf_low = predicted_value - confidence_multiplier * residual_std
-                conf_high = predicted_value + confidence_multiplier * residual_std
-
-                forecast.append({
-                    "date": future_date.strftime("%Y-%m-%d"),
-                    "value": round(float(predicted_value), 4),
-                    "conf_low": round(float(conf_low), 4),
-                    "conf_high": round(float(conf_high), 4),
-                })
+        except Exception:
+            logger.exception("Chyba při predikci modelem %s", model)
+            return None
 
-            return forecast
+    async def _fit_and_predict(
+        self, currency: str, history_days: int, forecast_days: int, model: str
+    ) -> Optional[tuple[int, list[dict]]]:
+        """
+        Stáhne historii a natrénuje model z celé historie (mimo event loop).
+        """
+        # Krok 1: Získání historických dat (přírůstkově přes úložiště historie)
+        history = await self.fetch_history(currency, history_days)
+        if not history:
+            return None
 
-        except Exception as e:
-            print(f"Chyba při predikci: {e}")
+        # Krok 2 a 3: Předzpracování dat a predikce (mimo event loop)
+        try:
+            if self.executor is not None:
+                result, prepare_seconds, predict_seconds = await self.executor.run(
+                    fit_and_predict_timed, history, forecast_days, model, self.preprocess
+                )
+            else:
+                result, prepare_seconds, predict_seconds = fit_and_predict_timed(
+                    history, forecast_days, model, self.preprocess
+                )
+        except (ExecutorSaturatedError, BrokenExecutor) as e:
+            logger.warning("Výpočet prognózy pro %s odmítnut: %s", currency, e)
             return None
 
+        # Časy se měří v poolu (i v jiném procesu) a zaznamenávají se zde
+        PREPARE_DATA_SECONDS.observe(prepare_seconds)
+        if predict_seconds is not None:
+            PREDICT_SECONDS.labels(model).observe(predict_seconds)
+        return result
+
     async def get_forecast(
-        self, currency: str, history_days: int = 90, forecast_days: int = 7
+        self,
+        currency: str,
+        history_days: int = 90,
+        forecast_days: int = 7,
+        model: str = DEFAULT_MODEL,
     ) -> Optional[dict]:
         """
         Kompletní pipeline pro získání predikce směnného kurzu.
 
         Tato metoda orchestruje celý proces:
-        1. Získání historických dat ze Symfony API
+        1. Získání historických dat (Symfony API / úložiště historie)
         2. Předzpracování dat
         3. Trénink modelu a generování predikcí
 
+        Kroky 2 a 3 jsou CPU-náročné, a pokud je nastaven executor,
+        běží v jeho poolu mimo event loop. S nastaveným model_store se
+        místo nich pouze aktualizuje uložený stav modelu o nové dny.
+
         Args:
             currency (str): Kód měny (např. "EUR", "USD").
             history_days (int): Počet dnů historie pro trénink. Výchozí je 90.
             forecast_days (int): Počet dnů pro predikci. Výchozí je 7.
+            model (str): Název modelu z registru. Výchozí je "linear".
 
         Returns:
             Optional[dict]: Slovník s výsledky:
                 - currency: kód měny
+                - model: název použitého modelu
                 - generated_at: timestamp generování
                 - history_points: počet bodů historie použitých pro trénink
                 - forecast: seznam predikcí
@@ -270,24 +324,150 @@ class CurrencyForecaster:
             >>> print(result["currency"])
             "EUR"
         """
-        # Krok 1: Získání historických dat
-        history = await self.fetch_history_from_symfony(currency, history_days)
-        if not history:
-            return None
+        COMPUTATIONS_IN_FLIGHT.inc()
+        try:
+            with log_context(currency=currency, model=model):
+                result = await self._compute(currency, history_days, forecast_days, model)
+        finally:
+            COMPUTATIONS_IN_FLIGHT.dec()
 
-        # Krok 2: Předzpracování dat
-        df = self.prepare_data(history)
-        if df is None:
+        if result is None:
             return None
 
-        # Krok 3: Predikce
-        forecast = self.predict(df, forecast_days)
-        if not forecast:
-            return None
+        history_points, forecast = result
 
         return {
             "currency": currency,
+            "model": model,
             "generated_at": datetime.now().isoformat(),
-            "history_points": len(df),
+            "history_points": history_points,
             "forecast": forecast,
         }
+
+    async def get_forecasts_batch(
+        self, histories: dict[str, list[dict]], forecast_days: int = 7
+    ) -> dict[str, Optional[dict]]:
+        """
+        Spočítá prognózy lineárního modelu pro více měn jedním dávkovým tréninkem.
+
+        Historie všech měn se zarovnají na společnou mřížku dat a regrese
+        se spočítají najednou (viz batch_fit). Celá dávka běží jako jediná
+        úloha v poolu executoru. Uložený stav modelu (model_store) se
+        nepoužívá - model se trénuje z předaných historií.
+
+        Args:
+            histories (dict[str, list[dict]]): Surová historie podle kódu měny.
+            forecast_days (int): Počet dnů pro predikci. Výchozí je 7.
+
+        Returns:
+            dict[str, Optional[dict]]: Prognóza podle kódu měny ve stejném tvaru
+                jako u get_forecast, nebo None pro měny s nedostatkem dat.
+                Při odmítnutí poolem jsou všechny hodnoty None.
+
+        Example:
+            >>> forecasts = await forecaster.get_forecasts_batch({"EUR": eur, "USD": usd}, 30)
+            >>> print(forecasts["EUR"]["model"])
+            "linear"
+        """
+        started = time.perf_counter()
+        COMPUTATIONS_IN_FLIGHT.inc()
+        try:
+            if self.executor is not None:
+                results = await self.executor.run(batch_fit_and_predict, histories, forecast_days)
+            else:
+                results = batch_fit_and_predict(histories, forecast_days)
+        except (ExecutorSaturatedError, BrokenExecutor) as e:
+            logger.warning("Dávkový výpočet %d prognóz odmítnut: %s", len(histories), e)
+            return dict.fromkeys(histories)
+        finally:
+            COMPUTATIONS_IN_FLIGHT.dec()
+
+        logger.debug(
+            "Dávkový trénink %d měn za %.3fs", len(histories), time.perf_counter() - started
+        )
+
+        generated_at = datetime.now().isoformat()
+        return {
+            currency: None if result is None else {
+                "currency": currency,
+                "model": LinearModel.name,
+                "generated_at": generated_at,
+                "history_points": result[0],
+                "forecast": result[1],
+            }
+            for currency, result in results.items()
+        }
+
+    async def _compute(
+        self, currency: str, history_days: int, forecast_days: int, model: str
+    ) -> Optional[tuple[int, list[dict]]]:
+        """
+        Vypočítá prognózu ze stavu modelu, nebo z celé historie.
+        """
+        if self.model_store is not None and model == LinearModel.name:
+            # Inkrementální aktualizace uloženého stavu lineárního modelu
+            try:
+                return await self.model_store.forecast(
+                    currency, history_days, forecast_days, self.fetch_history_from_symfony
+                )
+            except Exception as e:
+                logger.warning("Chyba stavu modelu pro %s, počítám z celé historie: %s", currency, e)
+        return await self._fit_and_predict(currency, history_days, forecast_days, model)
+
+
+def fit_and_predict(
+    history: list[dict], forecast_days: int, model: str = DEFAULT_MODEL, preprocess: str = DEFAULT_PREPROCESS
+) -> Optional[tuple[int, list[dict]]]:
+    """
+    Předzpracuje historii a vypočítá predikci (CPU-náročná část pipeline).
+
+    Funkce je definována na úrovni modulu, aby ji bylo možné spustit
+    v poolu procesů (ForecastExecutor) - přenáší se pouze surová historie
+    a výsledné predikce.
+
+    Args:
+        history (list[dict]): Surová historie se záznamy "date" a "rate".
+        forecast_days (int): Počet dnů pro predikci.
+        model (str): Název modelu z registru.
+        preprocess (str): Implementace předzpracování ("numpy" nebo "pandas").
+
+    Returns:
+        Optional[tuple[int, list[dict]]]: Počet bodů historie použitých
+            pro trénink a seznam predikcí, nebo None při chybě.
+    """
+    return fit_and_predict_timed(history, forecast_days, model, preprocess)[0]
+
+
+def fit_and_predict_timed(
+    history: list[dict], forecast_days: int, model: str = DEFAULT_MODEL, preprocess: str = DEFAULT_PREPROCESS
+) -> tuple[Optional[tuple[int, list[dict]]], float, Optional[float]]:
+    """
+    Stejné jako fit_and_predict, navíc vrací doby předzpracování a predikce.
+
+    Metriky zaznamenané v procesu poolu by se ztratily, proto se doby
+    vracejí volajícímu spolu s výsledkem.
+
+    Args:
+        history (list[dict]): Surová historie se záznamy "date" a "rate".
+        forecast_days (int): Počet dnů pro predikci.
+        model (str): Název modelu z registru.
+        preprocess (str): Implementace předzpracování ("numpy" nebo "pandas").
+
+    Returns:
+        tuple: Výsledek jako u fit_and_predict, doba prepare_data
+               a doba predict v sekundách (None, pokud predikce neproběhla).
+    """
+    forecaster = CurrencyForecaster(preprocess=preprocess)
+
+    started = time.perf_counter()
+    prepared = forecaster.prepare_data(history)
+    prepared_at = time.perf_counter()
+    if prepared is None:
+        return None, prepared_at - started, None
+
+    forecast = forecaster.predict(prepared, forecast_days, model)
+    predict_seconds = time.perf_counter() - prepared_at
+    if not forecast:
+        return None, prepared_at - started, predict_seconds
+
+    return (len(prepared), forecast), prepared_at - started, predict_seconds
@@ -0,0 +1,355 @@
+"""
+Smart Trend Forecaster - Modul pro lokální úložiště historie kurzů.
+
+Místo stahování celého okna historie (např. 90 dní) při každém výpočtu
+prognózy si služba drží historii každé měny v Redis a od Symfony API
+stahuje pouze přírůstek od posledního známého dne. Jednou za čas
+(reconcile_interval) proběhne plná synchronizace, která opraví případné
+zpětné korekce kurzů ve starších dnech.
+"""
+
+import logging
+import math
+import time
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Optional
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+
+# Klíčový prefix pro historii kurzů v Redis (hash datum -> kurz)
+HISTORY_KEY_PREFIX = "wallet:history:"
+
+# Suffix klíče s metadaty historie
+HISTORY_META_SUFFIX = ":meta"
+
+# Výchozí interval plné synchronizace historie (1 den v sekundách)
+DEFAULT_RECONCILE_INTERVAL = 86400
+
+# Počet posledních dnů, které se při přírůstkovém stažení načtou znovu
+# (poslední kurz dne se může ještě během dne změnit)
+DEFAULT_OVERLAP_DAYS = 2
+
+# Výchozí maximální stáří uchovávané historie (ve dnech)
+DEFAULT_RETENTION_DAYS = 365
+
+# Maximální počet dnů, které Symfony API vrátí v jednom požadavku
+MAX_FETCH_DAYS = 365
+
+# Typ funkce pro stažení historie ze Symfony API (měna, počet dnů)
+HistoryFetcher = Callable[[str, int], Awaitable[Optional[list[dict]]]]
+
+
+def build_history_key(currency: str) -> str:
+    """
+    Sestaví klíč historie kurzů měny v Redis.
+
+    Args:
+        currency (str): Kód měny.
+
+    Returns:
+        str: Klíč, např. "wallet:history:EUR".
+    """
+    return f"{HISTORY_KEY_PREFIX}{currency.upper()}"
+
+
+def _date_key(value) -> Optional[str]:
+    """
+    Převede datum záznamu historie na klíč ve formátu YYYY-MM-DD.
+    """
+    try:
+        return str(value)[:10] if value else None
+    except Exception:
+        return None
+
+
+def _rate_value(value) -> Optional[float]:
+    """
+    Převede kurz záznamu historie na float (None pro neplatnou hodnotu).
+    """
+    try:
+        rate = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(rate) else rate
+
+
+class HistoryStore:
+    """
+    Přírůstkové úložiště historie kurzů v Redis.
+
+    Historie každé měny je uložena v hashi datum -> kurz, metadata
+    (poslední den, začátek úplné historie, čas plné synchronizace
+    a revize) v samostatném hashi. Revize se zvyšuje při každé změně
+    uložené historie, takže na ni mohou navazovat odvozené výpočty.
+
+    Attributes:
+        redis_client (redis.Redis): Asynchronní Redis klient.
+        reconcile_interval (int): Interval plné synchronizace v sekundách.
+        overlap_days (int): Počet dnů načítaných znovu při přírůstku.
+        retention_days (int): Maximální stáří uchovávané historie ve dnech.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        reconcile_interval: int = DEFAULT_RECONCILE_INTERVAL,
+        overlap_days: int = DEFAULT_OVERLAP_DAYS,
+        retention_days: int = DEFAULT_RETENTION_DAYS,
+    ):
+        """
+        Inicializace úložiště historie.
+
+        Args:
+            redis_client (redis.Redis): Asynchronní Redis klient.
+            reconcile_interval (int): Interval plné synchronizace v sekundách.
+                                      Výchozí: 86400 (1 den).
+            overlap_days (int): Počet posledních dnů načítaných znovu
+                                při přírůstkovém stažení. Výchozí: 2.
+            retention_days (int): Maximální stáří uchovávané historie
+                                  ve dnech. Výchozí: 365.
+        """
+        self.redis_client = redis_client
+        self.reconcile_interval = reconcile_interval
+        self.overlap_days = overlap_days
+        self.retention_days = retention_days
+
+    async def get_meta(self, currency: str) -> dict:
+        """
+        Načte metadata uložené historie měny.
+
+        Args:
+            currency (str): Kód měny.
+
+        Returns:
+            dict: Metadata (prázdný slovník, pokud historie není uložena).
+        """
+        meta = await self.redis_client.hgetall(build_history_key(currency) + HISTORY_META_SUFFIX)
+        return meta or {}
+
+    def _needs_full_sync(self, meta: dict, window_start: str) -> bool:
+        """
+        Rozhodne, zda je potřeba plná synchronizace místo přírůstku.
+        """
+        if not meta.get("last_date") or not meta.get("covered_from"):
+            return True
+
+        # Uložená historie nepokrývá začátek požadovaného okna
+        if meta["covered_from"] > window_start:
+            return True
+
+        # Pravidelná plná synchronizace (zpětné korekce kurzů)
+        return time.time() - float(meta.get("last_full_sync", 0)) >= self.reconcile_interval
+
+    async def sync(
+        self,
+        currency: str,
+        days: int,
+        fetch: HistoryFetcher,
+    ) -> Optional[dict]:
+        """
+        Dotáhne ze Symfony API chybějící dny historie a uloží je.
+
+        Pokud plná synchronizace ještě není potřeba, stáhne pouze dny
+        od posledního uloženého dne (plus overlap_days). Práce v Redis
+        je úměrná počtu stažených a vypršelých dní, nikoli délce historie.
+
+        Args:
+            currency (str): Kód měny (např. "EUR").
+            days (int): Počet dnů historie, které musí úložiště pokrývat.
+            fetch (HistoryFetcher): Funkce pro stažení historie ze Symfony API,
+                                    typicky CurrencyForecaster.fetch_history_from_symfony.
+
+        Returns:
+            Optional[dict]: Výsledek synchronizace:
+                - full_sync: zda proběhla plná synchronizace
+                - changed: zda se uložená historie změnila
+                - updates: stažené dny (datum -> kurz)
+                - rev: revize historie po synchronizaci
+                - covered_from: začátek úplné uložené historie
+                - last_full_sync: čas poslední plné synchronizace
+                Nebo None při chybě stažení.
+        """
+        currency = currency.upper()
+        key = build_history_key(currency)
+        meta_key = key + HISTORY_META_SUFFIX
+        today = date.today()
+        window_start = (today - timedelta(days=days)).isoformat()
+
+        meta = await self.get_meta(currency)
+        full_sync = self._needs_full_sync(meta, window_start)
+
+        if full_sync:
+            # Plná synchronizace požadovaného okna, případně celého dosud
+            # pokrytého rozsahu (v mezích doby uchovávání)
+            fetch_days = days
+            if meta.get("covered_from"):
+                covered_days = (today - date.fromisoformat(meta["covered_from"])).days
+                fetch_days = max(days, min(covered_days, self.retention_days))
+        else:
+            last_date = date.fromisoformat(meta["last_date"])
+            fetch_days = max((today - last_date).days, 0) + self.overlap_days
+
+        fetch_days = min(fetch_days, MAX_FETCH_DAYS)
+        fetched = await fetch(currency, fetch_days)
+        if not fetched:
+            return None
+
+        updates = {}
+        for entry in fetched:
+            day = _date_key(entry.get("date"))
+            rate = _rate_value(entry.get("rate"))
+            if day is None or rate is None:
+                continue
+            updates[day] = repr(rate)
+
+        retention_start = (today - timedelta(days=max(days, self.retention_days))).isoformat()
+        updates = {day: rate for day, rate in updates.items() if day >= retention_start}
+
+        if full_sync:
+            # Plná synchronizace nahradí celou historii - změnu zjistíme porovnáním
+            previous = await self.redis_client.hgetall(key)
+            changed = previous != updates
+            expired = []
+            covered_from = (today - timedelta(days=fetch_days)).isoformat()
+        else:
+            # Přírůstek - porovnáme pouze stažené dny
+            previous = await self.redis_client.hmget(key, list(updates)) if updates else []
+            changed = any(old != new for old, new in zip(previous, updates.values()))
+            # Vypršelé dny (od začátku pokrytí po začátek doby uchovávání)
+            start = date.fromisoformat(meta["covered_from"])
+            expired = [
+                (start + timedelta(days=i)).isoformat()
+                for i in range((date.fromisoformat(retention_start) - start).days)
+            ]
+            covered_from = meta["covered_from"]
+
+        covered_from = max(covered_from, retention_start)
+        last_date = max([meta.get("last_date", ""), *updates]) if not full_sync else max(updates, default="")
+        now = time.time()
+        new_meta = {
+            "last_date": last_date,
+            "covered_from": covered_from,
+            "last_sync": now,
+            "last_full_sync": now if full_sync else meta.get("last_full_sync", now),
+        }
+
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            if full_sync:
+                pipe.delete(key)
+            if updates:
+                pipe.hset(key, mapping=updates)
+            if expired:
+                pipe.hdel(key, *expired)
+            pipe.hset(meta_key, mapping=new_meta)
+            pipe.hincrby(meta_key, "rev", 1 if changed or expired else 0)
+            results = await pipe.execute()
+
+        kind = "plná synchronizace" if full_sync else "přírůstek"
+        logger.debug("Historie %s: %s, staženo %d dní", currency, kind, len(updates))
+
+        return {
+            "full_sync": full_sync,
+            "changed": changed or bool(expired),
+            "updates": {day: float(rate) for day, rate in updates.items()},
+            "rev": int(results[-1]),
+            "covered_from": covered_from,
+            "last_full_sync": float(new_meta["last_full_sync"]),
+        }
+
+    async def read_window(self, currency: str, days: int) -> list[dict]:
+        """
+        Načte uloženou historii měny za posledních `days` dní.
+
+        Args:
+            currency (str): Kód měny.
+            days (int): Počet dnů historie.
+
+        Returns:
+            list[dict]: Záznamy s klíči "date" a "rate" seřazené podle data.
+        """
+        window_start = (date.today() - timedelta(days=days)).isoformat()
+        series = await self.redis_client.hgetall(build_history_key(currency))
+        return [
+            {"date": day, "rate": float(series[day])}
+            for day in sorted(series)
+            if day >= window_start
+        ]
+
+    async def read_days(self, currency: str, days: list[str]) -> list[Optional[float]]:
+        """
+        Načte kurzy vybraných dní (None pro dny, které nejsou uloženy).
+
+        Args:
+            currency (str): Kód měny.
+            days (list[str]): Data ve formátu YYYY-MM-DD.
+
+        Returns:
+            list[Optional[float]]: Kurzy ve stejném pořadí jako `days`.
+        """
+        if not days:
+            return []
+        rates = await self.redis_client.hmget(build_history_key(currency), days)
+        return [float(rate) if rate is not None else None for rate in rates]
+
+    async def get_history(
+        self,
+        currency: str,
+        days: int,
+        fetch: HistoryFetcher,
+    ) -> Optional[list[dict]]:
+        """
+        Vrátí historii kurzů měny za posledních `days` dní.
+
+        Nejprve dotáhne chybějící dny (viz sync), poté vrátí sloučenou
+        historii požadovaného okna.
+
+        Args:
+            currency (str): Kód měny (např. "EUR").
+            days (int): Počet dnů historie.
+            fetch (HistoryFetcher): Funkce pro stažení historie ze Symfony API,
+                                    typicky CurrencyForecaster.fetch_history_from_symfony.
+
+        Returns:
+            Optional[list[dict]]: Záznamy s klíči "date" a "rate" seřazené
+                                  podle data, nebo None při chybě stažení.
+
+        Example:
+            >>> store = HistoryStore(redis)
+            >>> history = await store.get_history("EUR", 90, forecaster.fetch_history_from_symfony)
+        """
+        if await self.sync(currency, days, fetch) is None:
+            return None
+
+        return await self.read_window(currency, days)
+
+    async def get_revision(self, currency: str) -> int:
+        """
+        Vrátí revizi uložené historie měny.
+
+        Args:
+            currency (str): Kód měny.
+
+        Returns:
+            int: Revize (0, pokud historie není uložena).
+        """
+        rev = await self.redis_client.hget(build_history_key(currency) + HISTORY_META_SUFFIX, "rev")
+        return int(rev or 0)
+
+    async def invalidate(self, currency: Optional[str] = None) -> int:
+        """
+        Smaže uloženou historii měny (nebo všech měn).
+
+        Args:
+            currency (Optional[str]): Kód měny. Pokud None, smaže historii všech měn.
+
+        Returns:
+            int: Počet smazaných klíčů.
+        """
+        if currency:
+            key = build_history_key(currency)
+            return await self.redis_client.delete(key, key + HISTORY_META_SUFFIX)
+
+        keys = [key async for key in self.redis_client.scan_iter(match=f"{HISTORY_KEY_PREFIX}*")]
+        return await self.redis_client.delete(*keys) if keys else 0
@@ -0,0 +1,63 @@
+"""
+Smart Trend Forecaster - Modul pro sdílený HTTP klient.
+
+Tento modul vytváří jeden dlouhožijící httpx.AsyncClient pro celý proces.
+Klient udržuje pool spojení (keep-alive) k Symfony API, takže jednotlivé
+prognózy nemusí pokaždé navazovat nové TCP spojení.
+"""
+
+import httpx
+
+
+# Výchozí maximální počet souběžných spojení v poolu
+DEFAULT_MAX_CONNECTIONS = 20
+
+# Výchozí počet spojení udržovaných v poolu pro opakované použití
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+
+# Výchozí doba (v sekundách), po kterou zůstává nečinné spojení otevřené
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+# Výchozí timeout požadavku na Symfony API (v sekundách)
+DEFAULT_TIMEOUT = 30.0
+
+
+def create_http_client(
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    timeout: float = DEFAULT_TIMEOUT,
+    http2: bool = False,
+) -> httpx.AsyncClient:
+    """
+    Vytvoří sdílený asynchronní HTTP klient s poolem spojení.
+
+    Klient je určen k vytvoření jednou v lifespan hooku aplikace
+    a k uzavření při jejím ukončení (await client.aclose()).
+
+    Args:
+        max_connections (int): Maximální počet souběžných spojení.
+        max_keepalive_connections (int): Počet spojení držených v poolu.
+        keepalive_expiry (float): Doba nečinnosti, po které se spojení zavře.
+        timeout (float): Timeout jednoho požadavku v sekundách.
+        http2 (bool): Povolí HTTP/2 (vyžaduje balíček h2).
+
+    Returns:
+        httpx.AsyncClient: Nakonfigurovaný klient.
+
+    Example:
+        >>> client = create_http_client(max_connections=50, http2=True)
+        >>> forecaster = CurrencyForecaster(http_client=client)
+        >>> await client.aclose()
+    """
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+
+    return httpx.AsyncClient(
+        limits=limits,
+        timeout=timeout,
+        http2=http2,
+    )
@@ -0,0 +1,264 @@
+"""
+Smart Trend Forecaster - Modul s lokální (L1) cache prognóz v procesu.
+
+Prognóza se mění nejvýše jednou za interval plánovače, přesto každé
+čtení chodilo do Redis a znovu ji deserializovalo. L1 cache drží
+naposledy čtené prognózy v paměti workeru (LRU s TTL a limity počtu
+záznamů i bajtů), takže často čtené měny se vydávají bez síťového
+round-tripu.
+
+Zápis prognózy (save_forecast_to_cache) i její zneplatnění
+(invalidate_forecast_cache) publikuje klíč do Redis kanálu
+a každý worker odebírající kanál odpovídající záznamy zahodí.
+TTL záznamu omezuje nekonzistenci pro případ ztracené zprávy.
+"""
+
+import asyncio
+import fnmatch
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+
+# Redis kanál se zneplatněnými klíči prognóz (klíč nebo glob vzor)
+L1_INVALIDATION_CHANNEL = "wallet:forecast:invalidate"
+
+# Výchozí maximální počet záznamů v L1 cache
+DEFAULT_L1_MAX_ENTRIES = 1024
+
+# Výchozí maximální velikost L1 cache v bajtech (podle serializovaných dat)
+DEFAULT_L1_MAX_BYTES = 32 * 1024 * 1024
+
+# Výchozí doba platnosti záznamu v L1 cache (v sekundách)
+DEFAULT_L1_TTL = 30.0
+
+# Prodleva před novým připojením k odběru po chybě (v sekundách)
+RESUBSCRIBE_DELAY = 1.0
+
+
+class ForecastL1Cache:
+    """
+    Omezená LRU cache prognóz v paměti procesu s TTL.
+
+    Záznamy jsou uloženy podle klíče prognózy v Redis. Velikost záznamu
+    se počítá z délky serializované hodnoty v Redis. Každé zneplatnění
+    zvyšuje generaci cache - hodnota načtená z Redis před zneplatněním
+    se do cache už neuloží (ochrana proti souběhu čtení a zápisu).
+
+    Attributes:
+        max_entries (int): Maximální počet záznamů.
+        max_bytes (int): Maximální součet velikostí záznamů v bajtech.
+        ttl (float): Doba platnosti záznamu v sekundách.
+        hits (int): Počet zásahů.
+        misses (int): Počet výpadků (chybějící nebo prošlý záznam).
+        evictions (int): Počet záznamů vytlačených kvůli limitům.
+        invalidations (int): Počet záznamů zahozených zneplatněním.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_L1_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_L1_MAX_BYTES,
+        ttl: float = DEFAULT_L1_TTL,
+    ):
+        """
+        Inicializace L1 cache.
+
+        Args:
+            max_entries (int): Maximální počet záznamů. Výchozí: 1024.
+            max_bytes (int): Maximální velikost v bajtech. Výchozí: 32 MiB.
+            ttl (float): Doba platnosti záznamu v sekundách. Výchozí: 30.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[str, tuple[dict, int, float]] = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def generation(self) -> int:
+        """
+        Vrátí generaci cache (zvyšuje se při každém zneplatnění).
+
+        Returns:
+            int: Aktuální generace.
+        """
+        return self._generation
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Vrátí kopii prognózy z L1 cache.
+
+        Args:
+            key (str): Klíč prognózy v Redis.
+
+        Returns:
+            Optional[dict]: Mělká kopie prognózy (volající ji může doplnit
+                            o příznaky), nebo None při výpadku.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, size, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(value)
+
+    def put(self, key: str, value: dict, size: int, generation: Optional[int] = None) -> bool:
+        """
+        Uloží prognózu do L1 cache a vytlačí nejdéle nepoužité záznamy.
+
+        Args:
+            key (str): Klíč prognózy v Redis.
+            value (dict): Prognóza (uloží se její mělká kopie).
+            size (int): Velikost serializované prognózy v bajtech.
+            generation (Optional[int]): Generace zjištěná před čtením z Redis.
+                                        Pokud se mezitím změnila, hodnota se neuloží.
+
+        Returns:
+            bool: True pokud byla hodnota uložena.
+        """
+        if generation is not None and generation != self._generation:
+            return False
+        if size > self.max_bytes or self.max_entries <= 0:
+            return False
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (dict(value), size, time.monotonic() + self.ttl)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+        return True
+
+    def _remove(self, key: str) -> None:
+        """
+        Odebere záznam a upraví součet velikostí.
+        """
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def invalidate(self, pattern: str) -> int:
+        """
+        Zahodí záznamy odpovídající klíči nebo glob vzoru.
+
+        Args:
+            pattern (str): Klíč prognózy nebo vzor (např. "wallet:forecast:EUR:*").
+
+        Returns:
+            int: Počet zahozených záznamů.
+        """
+        self._generation += 1
+
+        if any(char in pattern for char in "*?["):
+            keys = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+        else:
+            keys = [pattern] if pattern in self._entries else []
+
+        for key in keys:
+            self._remove(key)
+
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        """
+        Zahodí všechny záznamy (např. po výpadku odběru zneplatnění).
+        """
+        self._generation += 1
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Vrátí čítače a obsazenost L1 cache.
+
+        Returns:
+            dict: hits, misses, hit_ratio, evictions, invalidations,
+                  entries a bytes.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    async def _listen(self, redis_client: redis.Redis) -> None:
+        """
+        Odebírá kanál zneplatnění a zahazuje odpovídající záznamy.
+
+        Po chybě spojení se cache vyprázdní (zprávy mohly být ztraceny)
+        a odběr se obnoví.
+        """
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(L1_INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.invalidate(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Chyba odběru zneplatnění L1 cache: %s", e)
+                self.clear()
+                await asyncio.sleep(RESUBSCRIBE_DELAY)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def start(self, redis_client: redis.Redis) -> asyncio.Task:
+        """
+        Spustí odběr zneplatnění na pozadí.
+
+        Args:
+            redis_client (redis.Redis): Asynchronní Redis klient.
+
+        Returns:
+            asyncio.Task: Reference na vytvořený task.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen(redis_client))
+        return self._task
+
+    async def stop(self) -> None:
+        """
+        Zastaví odběr zneplatnění.
+        """
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
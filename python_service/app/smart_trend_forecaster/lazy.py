@@ -0,0 +1,91 @@
+"""
+Smart Trend Forecaster - Modul pro odložený import těžkých knihoven.
+
+Import NumPy trvá desítky milisekund a při importu balíčku by se platil
+v každém workeru uvicornu i v každém procesu poolu výpočtů, i když
+healthcheck nebo odpověď z cache NumPy vůbec nepotřebují. Moduly proto
+místo `import numpy as np` používají `np = lazy_import("numpy")`:
+knihovna se naimportuje až při prvním přístupu k atributu (typicky při
+prvním výpočtu), nebo dříve na pozadí při zahřátí služby (viz warmup).
+
+Anotace typů (np.ndarray) se při importu nevyhodnocují díky
+`from __future__ import annotations`.
+"""
+
+import importlib
+import threading
+import types
+
+
+# Knihovny, které se načítají odloženě a zahřívají na pozadí
+HEAVY_MODULES = ("numpy",)
+
+
+class LazyModule(types.ModuleType):
+    """
+    Zástupce modulu, který skutečný modul naimportuje při prvním přístupu.
+
+    Po načtení se atributy modulu zkopírují do zástupce, takže další
+    přístupy (np.arange, np.float64, ...) jsou běžné vyhledání atributu
+    bez režie __getattr__. Načtení je chráněno zámkem (pool vláken).
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_lock"] = threading.Lock()
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        """
+        Naimportuje skutečný modul (nejvýše jednou) a převezme jeho atributy.
+        """
+        module = self.__dict__["_lazy_module"]
+        if module is not None:
+            return module
+        with self.__dict__["_lazy_lock"]:
+            module = self.__dict__["_lazy_module"]
+            if module is None:
+                module = importlib.import_module(self.__name__)
+                self.__dict__.update(module.__dict__)
+                self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, name: str):
+        return getattr(self._load(), name)
+
+    def __repr__(self) -> str:
+        state = "načten" if self.__dict__["_lazy_module"] is not None else "nenačten"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Vrátí zástupce modulu, který se naimportuje až při prvním použití.
+
+    Pokud je modul již naimportován (např. jiným modulem), nic se neodkládá
+    a první přístup jen převezme jeho atributy.
+
+    Args:
+        name (str): Název modulu (např. "numpy").
+
+    Returns:
+        LazyModule: Zástupce modulu.
+
+    Example:
+        >>> np = lazy_import("numpy")
+        >>> np.arange(3)  # NumPy se naimportuje zde
+        array([0, 1, 2])
+    """
+    return LazyModule(name)
+
+
+def load_heavy_modules() -> list[str]:
+    """
+    Naimportuje odložené těžké knihovny (volá se při zahřátí na pozadí).
+
+    Returns:
+        list[str]: Názvy načtených knihoven.
+    """
+    for name in HEAVY_MODULES:
+        importlib.import_module(name)
+    return list(HEAVY_MODULES)
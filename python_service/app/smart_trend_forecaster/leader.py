@@ -0,0 +1,210 @@
+"""
+Smart Trend Forecaster - Modul pro volbu lídra mezi instancemi.
+
+Při běhu více uvicorn workerů nebo více kontejnerů musí plánovač
+prognóz běžet pouze v jedné instanci. Tento modul implementuje
+pronájem (lease) v Redis: lídr drží klíč s omezenou platností
+a pravidelně ho obnovuje. Pokud lídr spadne, klíč vyprší
+a roli převezme jiná instance.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import Optional
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+
+# Klíč pronájmu lídra plánovače v Redis
+LEADER_KEY = "wallet:scheduler:leader"
+
+# Výchozí doba platnosti pronájmu (v sekundách)
+DEFAULT_LEASE_TTL = 30
+
+# Lua skript pro obnovení pronájmu - prodlouží platnost pouze tehdy,
+# pokud klíč stále patří této instanci
+RENEW_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+else
+    return 0
+end
+"""
+
+# Lua skript pro uvolnění pronájmu při ukončení instance
+RELEASE_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+else
+    return 0
+end
+"""
+
+
+def default_instance_id() -> str:
+    """
+    Vytvoří identifikátor instance (hostname kontejneru, PID a náhodná přípona).
+
+    Returns:
+        str: Např. "3f2a9c1b7d4e:12:a1b2c3".
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class LeaderElection:
+    """
+    Volba lídra pomocí pronájmu (lease) v Redis.
+
+    Každá instance se periodicky pokouší získat klíč pronájmu
+    (SET NX PX). Instance, která ho drží, je lídrem a pronájem
+    obnovuje každou třetinu jeho platnosti. Ostatní instance
+    čekají v pohotovosti a roli převezmou po vypršení pronájmu.
+
+    Attributes:
+        redis_client (redis.Redis): Asynchronní Redis klient.
+        key (str): Klíč pronájmu v Redis.
+        instance_id (str): Identifikátor této instance.
+        lease_ttl (int): Doba platnosti pronájmu v sekundách.
+        renew_interval (float): Interval obnovy/pokusu o získání v sekundách.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        key: str = LEADER_KEY,
+        instance_id: Optional[str] = None,
+        lease_ttl: int = DEFAULT_LEASE_TTL,
+    ):
+        """
+        Inicializace volby lídra (bez spuštění).
+
+        Args:
+            redis_client (redis.Redis): Asynchronní Redis klient.
+            key (str): Klíč pronájmu. Výchozí: "wallet:scheduler:leader".
+            instance_id (Optional[str]): Identifikátor instance.
+                                         Výchozí: hostname:pid:náhodná přípona.
+            lease_ttl (int): Doba platnosti pronájmu v sekundách. Výchozí: 30.
+        """
+        self.redis_client = redis_client
+        self.key = key
+        self.instance_id = instance_id or default_instance_id()
+        self.lease_ttl = lease_ttl
+        self.renew_interval = lease_ttl / 3
+        self._is_leader = False
+        self._became_leader = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_leader(self) -> bool:
+        """
+        Vrátí, zda tato instance aktuálně drží pronájem lídra.
+
+        Returns:
+            bool: True pokud je instance lídrem.
+        """
+        return self._is_leader
+
+    def _set_leader(self, is_leader: bool) -> None:
+        """
+        Nastaví roli instance a vypíše změnu role.
+        """
+        if is_leader != self._is_leader:
+            role = "lídrem" if is_leader else "v pohotovosti (standby)"
+            logger.info("Instance %s je nyní %s", self.instance_id, role)
+
+        self._is_leader = is_leader
+        if is_leader:
+            self._became_leader.set()
+        else:
+            self._became_leader.clear()
+
+    async def try_acquire_or_renew(self) -> bool:
+        """
+        Obnoví pronájem (pokud je instance lídrem), nebo se ho pokusí získat.
+
+        Returns:
+            bool: True pokud je instance po volání lídrem.
+        """
+        lease_ms = int(self.lease_ttl * 1000)
+
+        if self._is_leader:
+            renewed = await self.redis_client.eval(
+                RENEW_LEASE_SCRIPT, 1, self.key, self.instance_id, lease_ms
+            )
+            self._set_leader(bool(renewed))
+        else:
+            acquired = await self.redis_client.set(
+                self.key, self.instance_id, nx=True, px=lease_ms
+            )
+            self._set_leader(bool(acquired))
+
+        return self._is_leader
+
+    async def _run(self) -> None:
+        """
+        Smyčka pravidelné obnovy pronájmu / pokusů o jeho získání.
+        """
+        while True:
+            try:
+                await self.try_acquire_or_renew()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Bez spojení s Redis nelze pronájem potvrdit - raději se vzdáme role,
+                # než aby běželi dva lídři současně
+                logger.warning("Chyba při obnově pronájmu lídra: %s", e)
+                self._set_leader(False)
+
+            await asyncio.sleep(self.renew_interval)
+
+    async def wait_until_leader(self) -> None:
+        """
+        Počká, dokud se tato instance nestane lídrem.
+        """
+        await self._became_leader.wait()
+
+    async def get_leader_id(self) -> Optional[str]:
+        """
+        Vrátí identifikátor aktuálního lídra.
+
+        Returns:
+            Optional[str]: ID instance, která drží pronájem, nebo None.
+        """
+        try:
+            return await self.redis_client.get(self.key)
+        except Exception:
+            return None
+
+    def start(self) -> asyncio.Task:
+        """
+        Spustí smyčku volby lídra na pozadí.
+
+        Returns:
+            asyncio.Task: Reference na vytvořený task.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def stop(self) -> None:
+        """
+        Zastaví smyčku a uvolní pronájem, aby jej jiná instance převzala okamžitě.
+        """
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._is_leader:
+            try:
+                await self.redis_client.eval(RELEASE_LEASE_SCRIPT, 1, self.key, self.instance_id)
+            except Exception as e:
+                logger.warning("Nepodařilo se uvolnit pronájem lídra: %s", e)
+            self._set_leader(False)
@@ -0,0 +1,399 @@
+"""
+Smart Trend Forecaster - Modul pro strukturované logování.
+
+Záznamy se v event loopu pouze vloží do omezené fronty (QueueHandler),
+serializaci do JSON a zápis na stdout provádí samostatné vlákno
+(QueueListener) - zápis logu tak nikdy neblokuje event loop. Při
+zahlcení se záznamy zahazují a počítají (viz log_stats), místo aby
+event loop čekal.
+
+Ke každému záznamu se připojí kontext aktuálního požadavku či úlohy
+(request_id z RequestContextMiddleware, měna, spouštěč, ...) uložený
+v contextvars, takže se přenáší i do tasků vytvořených v jeho rámci.
+Ladicí záznamy (DEBUG) lze vzorkovat - rozhoduje se podle request_id,
+takže vybraný požadavek se zaloguje celý.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+
+# Výchozí úroveň logování
+DEFAULT_LOG_LEVEL = "INFO"
+
+# Výchozí formát výstupu ("json" nebo "text")
+DEFAULT_LOG_FORMAT = "json"
+
+# Výchozí podíl ladicích záznamů, které se zapíší (1.0 = všechny)
+DEFAULT_DEBUG_SAMPLE_RATE = 1.0
+
+# Výchozí maximální počet záznamů čekajících na zápis
+DEFAULT_LOG_QUEUE_SIZE = 10000
+
+# Podporované formáty výstupu
+LOG_FORMATS = ("json", "text")
+
+# HTTP hlavička s identifikátorem požadavku (ASGI názvy hlaviček jsou malými písmeny)
+REQUEST_ID_HEADER = b"x-request-id"
+
+# Maximální délka převzatého identifikátoru požadavku
+MAX_REQUEST_ID_LENGTH = 128
+
+# Logger balíčku - relativní názvy v LOG_LEVELS se vztahují k němu
+PACKAGE_LOGGER = __name__.rpartition(".")[0]
+
+# Atributy LogRecord, které nejsou uživatelskými poli (extra)
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "context"}
+
+# Kontext aktuálního požadavku či úlohy (request_id, currency, ...)
+_log_context: ContextVar[dict] = ContextVar("log_context", default={})
+
+# Aktuální konfigurace (předává se workerům poolu procesů)
+_settings: Optional[dict] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+
+
+@contextmanager
+def log_context(**fields):
+    """
+    Přidá pole do kontextu všech záznamů zalogovaných uvnitř bloku.
+
+    Kontext se dědí do tasků vytvořených uvnitř bloku (asyncio.create_task,
+    asyncio.gather), takže souběžné aktualizace měn se nepřepisují.
+
+    Args:
+        **fields: Pole kontextu (např. currency="EUR", trigger="interval").
+
+    Example:
+        >>> with log_context(currency="EUR"):
+        ...     logger.info("Aktualizuji prognózu")
+    """
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def get_log_context() -> dict:
+    """
+    Vrátí kontext aktuálního požadavku či úlohy.
+
+    Returns:
+        dict: Pole kontextu (prázdný slovník mimo log_context).
+    """
+    return _log_context.get()
+
+
+def parse_log_levels(value: str) -> dict[str, str]:
+    """
+    Načte úrovně jednotlivých loggerů z proměnné prostředí.
+
+    Názvy bez tečky se vztahují k modulům balíčku (např. "cache"),
+    názvy s tečkou jsou absolutní (např. "uvicorn.access").
+
+    Args:
+        value (str): Seznam "logger:úroveň" oddělený čárkami.
+
+    Returns:
+        dict[str, str]: Plný název loggeru -> úroveň.
+
+    Raises:
+        ValueError: Pokud položka nemá tvar "logger:úroveň" nebo úroveň neexistuje.
+
+    Example:
+        >>> parse_log_levels("cache:DEBUG,uvicorn.access:WARNING")
+        {'app.smart_trend_forecaster.cache': 'DEBUG', 'uvicorn.access': 'WARNING'}
+    """
+    levels = {}
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, separator, level = item.partition(":")
+        name, level = name.strip(), level.strip().upper()
+        if not separator or not name or not isinstance(logging.getLevelName(level), int):
+            raise ValueError(f"Neplatná úroveň logování: {item!r} (očekáváno logger:LEVEL)")
+        levels[name if "." in name else f"{PACKAGE_LOGGER}.{name}"] = level
+    return levels
+
+
+class ContextFilter(logging.Filter):
+    """
+    Připojí k záznamu kontext z contextvars a vzorkuje ladicí záznamy.
+
+    Běží v event loopu před vložením do fronty, takže zahozený ladicí
+    záznam se ani neformátuje.
+
+    Attributes:
+        debug_sample_rate (float): Podíl ladicích záznamů, které projdou.
+    """
+
+    def __init__(self, debug_sample_rate: float = DEFAULT_DEBUG_SAMPLE_RATE):
+        super().__init__()
+        self.debug_sample_rate = debug_sample_rate
+
+    def _sampled(self, context: dict) -> bool:
+        """
+        Rozhodne, zda ladicí záznam projde vzorkováním.
+        """
+        request_id = context.get("request_id")
+        if request_id:
+            # Stejné rozhodnutí pro všechny záznamy jednoho požadavku
+            return zlib.crc32(request_id.encode("utf-8")) % 10000 < self.debug_sample_rate * 10000
+        return random.random() < self.debug_sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        if record.levelno <= logging.DEBUG and self.debug_sample_rate < 1.0 and not self._sampled(context):
+            return False
+        record.context = context
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler, který při plné frontě záznam zahodí místo čekání.
+
+    Attributes:
+        dropped (int): Počet zahozených záznamů.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Zpráva a traceback se složí hned (argumenty nemusí být
+        # bezpečné pro jiné vlákno), serializace proběhne ve vlákně listeneru
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formátuje záznam jako jednořádkový JSON.
+
+    Obsahuje čas (UTC, ISO 8601), úroveň, logger, zprávu, pole kontextu
+    a pole předaná přes extra=.
+
+    Example:
+        {"ts": "2026-01-18T10:00:00.123Z", "level": "INFO", "logger": "app.smart_trend_forecaster.tasks",
+         "msg": "Aktualizace dokončena", "request_id": "4f1c...", "currency": "EUR"}
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "context", None) or {})
+        for name, value in record.__dict__.items():
+            if name not in _RECORD_ATTRIBUTES:
+                entry[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """
+    Čitelný formát pro lokální vývoj (kontext a extra jako klíč=hodnota).
+    """
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = dict(getattr(record, "context", None) or {})
+        fields.update((name, value) for name, value in record.__dict__.items() if name not in _RECORD_ATTRIBUTES)
+        if not fields:
+            return line
+        head, newline, rest = line.partition("\n")
+        suffix = " ".join(f"{name}={value}" for name, value in fields.items())
+        return f"{head} [{suffix}]{newline}{rest}"
+
+
+def _create_formatter(log_format: str) -> logging.Formatter:
+    """
+    Vytvoří formatter podle názvu formátu.
+    """
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Neznámý formát logování: {log_format}. Podporované: {LOG_FORMATS}")
+    return JsonFormatter() if log_format == "json" else TextFormatter()
+
+
+def configure_logging(
+    level: str = DEFAULT_LOG_LEVEL,
+    log_format: str = DEFAULT_LOG_FORMAT,
+    levels: Optional[dict[str, str]] = None,
+    debug_sample_rate: float = DEFAULT_DEBUG_SAMPLE_RATE,
+    queue_size: int = DEFAULT_LOG_QUEUE_SIZE,
+    use_queue: bool = True,
+) -> None:
+    """
+    Nastaví kořenový logger (opakované volání předchozí nastavení nahradí).
+
+    Args:
+        level (str): Úroveň kořenového loggeru. Výchozí: "INFO".
+        log_format (str): "json" nebo "text". Výchozí: "json".
+        levels (Optional[dict[str, str]]): Úrovně jednotlivých loggerů
+                                           (viz parse_log_levels).
+        debug_sample_rate (float): Podíl zapsaných ladicích záznamů. Výchozí: 1.0.
+        queue_size (int): Maximální počet záznamů čekajících na zápis. Výchozí: 10000.
+        use_queue (bool): Zapisovat přes frontu a vlákno listeneru. Bez fronty
+                          se zapisuje přímo (např. ve workerech poolu procesů,
+                          kde neběží event loop).
+
+    Raises:
+        ValueError: Pokud je zadán neznámý formát nebo úroveň.
+
+    Example:
+        >>> configure_logging("INFO", "json", parse_log_levels("cache:DEBUG"))
+    """
+    global _settings, _listener, _queue_handler
+
+    formatter = _create_formatter(log_format)
+    shutdown_logging()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+    context_filter = ContextFilter(debug_sample_rate)
+
+    if use_queue:
+        _queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=max(1, queue_size)))
+        _queue_handler.addFilter(context_filter)
+        _listener = logging.handlers.QueueListener(_queue_handler.queue, stream_handler)
+        _listener.start()
+        handler = _queue_handler
+    else:
+        stream_handler.addFilter(context_filter)
+        handler = stream_handler
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    for name, logger_level in (levels or {}).items():
+        logging.getLogger(name).setLevel(logger_level)
+
+    _settings = {
+        "level": level,
+        "log_format": log_format,
+        "levels": dict(levels or {}),
+        "debug_sample_rate": debug_sample_rate,
+    }
+
+
+def shutdown_logging() -> None:
+    """
+    Zastaví vlákno listeneru a zapíše záznamy, které zbyly ve frontě.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def worker_logging_settings() -> Optional[dict]:
+    """
+    Vrátí aktuální konfiguraci pro workery poolu procesů.
+
+    Returns:
+        Optional[dict]: Argumenty configure_logging, None pokud logování
+                        nebylo nastaveno.
+    """
+    return dict(_settings) if _settings is not None else None
+
+
+def init_worker_logging(settings: Optional[dict]) -> None:
+    """
+    Inicializátor workeru poolu procesů - stejný formát jako hlavní proces.
+
+    Args:
+        settings (Optional[dict]): Konfigurace z worker_logging_settings.
+    """
+    if settings is not None:
+        configure_logging(**settings, use_queue=False)
+
+
+def log_stats() -> dict:
+    """
+    Vrátí čítače fronty logování.
+
+    Returns:
+        dict: queued (záznamy čekající na zápis) a dropped (zahozené záznamy).
+    """
+    if _queue_handler is None:
+        return {"queued": 0, "dropped": 0}
+    return {"queued": _queue_handler.queue.qsize(), "dropped": _queue_handler.dropped}
+
+
+atexit.register(shutdown_logging)
+
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware přiřazující požadavku identifikátor pro logy.
+
+    Převezme hlavičku X-Request-ID (např. z Nginx nebo Symfony), jinak
+    vygeneruje nový identifikátor, a vrátí ho v odpovědi. Všechny záznamy
+    zalogované při obsluze požadavku obsahují pole request_id.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == REQUEST_ID_HEADER:
+                candidate = value.decode("latin-1").strip()
+                if candidate and len(candidate) <= MAX_REQUEST_ID_LENGTH and candidate.isprintable():
+                    request_id = candidate
+                break
+        request_id = request_id or uuid.uuid4().hex
+        header = (REQUEST_ID_HEADER, request_id.encode("latin-1"))
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), header]
+            await send(message)
+
+        with log_context(request_id=request_id):
+            await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,280 @@
+"""
+Smart Trend Forecaster - Modul s metrikami pro Prometheus.
+
+Definuje histogramy, čítače a gauge horké cesty (stažení historie,
+předzpracování, predikce, Redis, HTTP požadavky), ASGI middleware
+pro měření doby odpovědi podle routy a endpoint /metrics.
+
+Metriky se zaznamenávají přímo (observe/inc bez kontextových manažerů
+a s předem navázanými štítky), aby režie zůstala zanedbatelná i při
+trvalém zapnutí - viz benchmarks/bench_metrics.py. Stáří prognóz
+a čítače L1 cache či streamu se počítají až při scrapu.
+
+Knihovna prometheus_client je volitelná: bez ní jsou metriky no-op
+a /metrics vrací 503.
+"""
+
+import time
+from typing import Callable, Optional
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+except ImportError:  # pragma: no cover - prometheus_client je volitelná závislost
+    REGISTRY = None
+
+
+# Hranice histogramů rychlých operací (Redis, předzpracování, predikce) v sekundách
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Hranice histogramů síťových operací a HTTP požadavků v sekundách
+SLOW_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Štítek routy pro požadavky, které neodpovídají žádné routě (omezení kardinality)
+UNMATCHED_ROUTE = "unmatched"
+
+
+class _NoopMetric:
+    """
+    Náhrada metriky, pokud prometheus_client není nainstalován.
+    """
+
+    def labels(self, *args, **kwargs) -> "_NoopMetric":
+        return self
+
+    def observe(self, value: float) -> None:
+        pass
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+
+if REGISTRY is not None:
+    UPSTREAM_FETCH_SECONDS = Histogram(
+        "forecast_upstream_fetch_seconds",
+        "Doba stažení historie kurzů ze Symfony API",
+        buckets=SLOW_BUCKETS,
+    )
+    PREPARE_DATA_SECONDS = Histogram(
+        "forecast_prepare_data_seconds",
+        "Doba předzpracování historie (prepare_data)",
+        buckets=FAST_BUCKETS,
+    )
+    PREDICT_SECONDS = Histogram(
+        "forecast_predict_seconds",
+        "Doba tréninku modelu a predikce (predict)",
+        ["model"],
+        buckets=FAST_BUCKETS,
+    )
+    REDIS_SECONDS = Histogram(
+        "forecast_redis_seconds",
+        "Doba operace s cache prognóz v Redis",
+        ["operation"],
+        buckets=FAST_BUCKETS,
+    )
+    REQUEST_SECONDS = Histogram(
+        "forecast_http_request_seconds",
+        "Doba do začátku odpovědi HTTP požadavku podle routy",
+        ["method", "route"],
+        buckets=SLOW_BUCKETS,
+    )
+    REQUESTS_TOTAL = Counter(
+        "forecast_http_requests",
+        "Počet HTTP požadavků podle routy a stavového kódu",
+        ["method", "route", "status"],
+    )
+    CACHE_LOOKUPS_TOTAL = Counter(
+        "forecast_cache_lookups",
+        "Výsledky čtení prognóz z cache (hit, stale, miss)",
+        ["result"],
+    )
+    SCHEDULER_REFRESHES_TOTAL = Counter(
+        "forecast_scheduler_refreshes",
+        "Výsledky aktualizací prognóz plánovačem podle spouštěče",
+        ["trigger", "outcome"],
+    )
+    SCHEDULER_CYCLE_SECONDS = Histogram(
+        "forecast_scheduler_cycle_seconds",
+        "Doba hromadné aktualizace prognóz plánovačem",
+        ["trigger"],
+        buckets=SLOW_BUCKETS,
+    )
+    COMPUTATIONS_IN_FLIGHT = Gauge(
+        "forecast_computations_in_flight",
+        "Počet právě probíhajících výpočtů prognóz v tomto procesu",
+    )
+else:  # pragma: no cover
+    UPSTREAM_FETCH_SECONDS = PREPARE_DATA_SECONDS = PREDICT_SECONDS = _NoopMetric()
+    REDIS_SECONDS = REQUEST_SECONDS = REQUESTS_TOTAL = _NoopMetric()
+    CACHE_LOOKUPS_TOTAL = SCHEDULER_REFRESHES_TOTAL = SCHEDULER_CYCLE_SECONDS = _NoopMetric()
+    COMPUTATIONS_IN_FLIGHT = _NoopMetric()
+
+# Předem navázané štítky horké cesty (bez vyhledávání potomka při každém volání)
+REDIS_GET_SECONDS = REDIS_SECONDS.labels("get")
+REDIS_MGET_SECONDS = REDIS_SECONDS.labels("mget")
+REDIS_HGETALL_SECONDS = REDIS_SECONDS.labels("hgetall")
+REDIS_SAVE_SECONDS = REDIS_SECONDS.labels("save")
+CACHE_HITS = CACHE_LOOKUPS_TOTAL.labels("hit")
+CACHE_STALE = CACHE_LOOKUPS_TOTAL.labels("stale")
+CACHE_MISSES = CACHE_LOOKUPS_TOTAL.labels("miss")
+
+# Čas uložení posledních viděných prognóz: (měna, model) -> cached_ts
+_forecast_timestamps: dict[tuple[str, str], float] = {}
+
+
+def observe_forecast_timestamp(currency: str, model: str, cached_ts: Optional[float]) -> None:
+    """
+    Zaznamená čas uložení prognózy pro gauge forecast_age_seconds.
+
+    Args:
+        currency (str): Kód měny.
+        model (str): Název modelu.
+        cached_ts (Optional[float]): Unix timestamp uložení do cache.
+    """
+    if cached_ts is not None:
+        _forecast_timestamps[(currency, model)] = cached_ts
+
+
+def metrics_available() -> bool:
+    """
+    Zjistí, zda je k dispozici prometheus_client.
+
+    Returns:
+        bool: True pokud se metriky skutečně zaznamenávají.
+    """
+    return REGISTRY is not None
+
+
+class ForecastAgeCollector:
+    """
+    Collector stáří prognóz podle měny a modelu (počítá se při scrapu).
+    """
+
+    def collect(self):
+        gauge = GaugeMetricFamily(
+            "forecast_age_seconds",
+            "Stáří poslední viděné prognózy podle měny a modelu",
+            labels=["currency", "model"],
+        )
+        now = time.time()
+        for (currency, model), cached_ts in list(_forecast_timestamps.items()):
+            gauge.add_metric([currency, model], max(0.0, now - cached_ts))
+        yield gauge
+
+
+class StatsCollector:
+    """
+    Collector, který při scrapu převede slovník čítačů (stats()) na metriky.
+
+    Číselné hodnoty uvedené v `counters` se exportují jako čítače,
+    ostatní číselné hodnoty jako gauge. Nečíselné hodnoty se přeskočí.
+
+    Attributes:
+        prefix (str): Předpona názvů metrik (např. "forecast_l1").
+        stats (Callable[[], Optional[dict]]): Funkce vracející aktuální čítače.
+        counters (frozenset[str]): Klíče, které jsou monotónní čítače.
+    """
+
+    def __init__(self, prefix: str, stats: Callable[[], Optional[dict]], counters: tuple[str, ...] = ()):
+        self.prefix = prefix
+        self.stats = stats
+        self.counters = frozenset(counters)
+
+    def collect(self):
+        values = self.stats() or {}
+        for name, value in values.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if name in self.counters:
+                yield CounterMetricFamily(f"{self.prefix}_{name}", f"{self.prefix} {name}", value=value)
+            else:
+                yield GaugeMetricFamily(f"{self.prefix}_{name}", f"{self.prefix} {name}", value=value)
+
+
+def register_collector(collector) -> None:
+    """
+    Zaregistruje collector do výchozího registru (bez prometheus_client nic nedělá).
+
+    Args:
+        collector: Objekt s metodou collect().
+    """
+    if REGISTRY is not None:
+        REGISTRY.register(collector)
+
+
+def unregister_collector(collector) -> None:
+    """
+    Odregistruje collector (např. při ukončení aplikace).
+
+    Args:
+        collector: Dříve zaregistrovaný collector.
+    """
+    if REGISTRY is not None:
+        try:
+            REGISTRY.unregister(collector)
+        except KeyError:
+            pass
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    Vyrenderuje metriky v textovém formátu Prometheus.
+
+    Returns:
+        tuple[bytes, str]: Tělo odpovědi a jeho Content-Type.
+    """
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware měřící dobu HTTP požadavků podle šablony routy.
+
+    Měří se doba do začátku odpovědi (u streamu úvodní snímek, ne délka
+    spojení). Štítkem je šablona routy (např. /wallet/analytics/forecast/{currency}),
+    ne konkrétní cesta, takže kardinalita zůstává omezená.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        # Potomci histogramu podle (metoda, routa) a čítače podle (metoda, routa, stav)
+        # - štítky se váží jen jednou
+        self._children: dict[tuple[str, str], object] = {}
+        self._counters: dict[tuple[str, str, int], object] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                status["elapsed"] = time.perf_counter() - started
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            method = scope.get("method", "")
+            key = (method, route_path)
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = REQUEST_SECONDS.labels(method, route_path)
+            child.observe(status.get("elapsed", time.perf_counter() - started))
+            counter_key = (method, route_path, status["code"])
+            counter = self._counters.get(counter_key)
+            if counter is None:
+                counter = self._counters[counter_key] = REQUESTS_TOTAL.labels(method, route_path, str(status["code"]))
+            counter.inc()
@@ -0,0 +1,429 @@
+"""
+Smart Trend Forecaster - Modul pro perzistentní stav lineárního modelu.
+
+Lineární regrese je plně určena postačujícími statistikami
+(n, Σx, Σy, Σx², Σxy, Σy²). Tento modul je drží pro každou měnu
+a délku historie v Redis a při příchodu nových dní z úložiště historie
+je aktualizuje v čase úměrném počtu nových (a vypršelých) bodů.
+Prognóza pro libovolný horizont se pak počítá přímo ze statistik,
+bez předzpracování v pandas a bez opakovaného trénování.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+from datetime import date, timedelta
+from typing import Optional
+import redis.asyncio as redis
+
+from .history import HistoryStore, HistoryFetcher
+from .models import CONFIDENCE_MULTIPLIER, forecast_points
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+
+# Klíčový prefix pro stav lineárního modelu v Redis
+MODEL_STATE_KEY_PREFIX = "wallet:model:linear:"
+
+# Počet posledních bodů, jejichž kurzy si stav pamatuje pro opravy
+# (musí pokrýt dny, které úložiště historie stahuje znovu)
+DEFAULT_TAIL_SIZE = 7
+
+def build_model_state_key(currency: str, history_days: int) -> str:
+    """
+    Sestaví klíč stavu modelu měny v Redis.
+
+    Args:
+        currency (str): Kód měny.
+        history_days (int): Délka historie (okna) ve dnech.
+
+    Returns:
+        str: Klíč, např. "wallet:model:linear:EUR:h90".
+    """
+    return f"{MODEL_STATE_KEY_PREFIX}{currency.upper()}:h{history_days}"
+
+
+def linear_forecast(
+    intercept: float,
+    slope: float,
+    last_index: float,
+    last_date: np.datetime64,
+    margin: float,
+    days: int,
+) -> list[dict]:
+    """
+    Vygeneruje body prognózy lineárního modelu pro `days` dní dopředu.
+
+    Args:
+        intercept (float): Absolutní člen přímky.
+        slope (float): Směrnice přímky (změna kurzu na jeden bod historie).
+        last_index (float): Index posledního bodu historie.
+        last_date (np.datetime64): Datum posledního bodu historie.
+        margin (float): Polovina šířky intervalu spolehlivosti.
+        days (int): Počet dnů prognózy.
+
+    Returns:
+        list[dict]: Body prognózy s klíči date, value, conf_low a conf_high.
+    """
+    values = intercept + slope * (last_index + np.arange(1, days + 1))
+    return forecast_points(last_date, values, np.full(days, margin))
+
+
+class LinearModelState:
+    """
+    Postačující statistiky lineární regrese kurzu na pořadí bodu.
+
+    Body mají x = 0 .. n-1 (stejně jako pořadí bodů z prepare_data), kurzy
+    jsou posunuty o referenční hodnotu y_ref kvůli numerické přesnosti.
+    Odebrání nejstaršího bodu posune všechna x o jedna dolů, což lze
+    ve statistikách provést v konstantním čase.
+
+    Attributes:
+        n (int): Počet bodů.
+        y_ref (float): Referenční kurz, o který jsou hodnoty y posunuty.
+        sx, sy, sxx, sxy, syy (float): Součty Σx, Σy, Σx², Σxy, Σy².
+        start (str): Začátek okna - stav obsahuje body s datem >= start.
+        last_date (str): Datum posledního bodu.
+        tail (dict): Kurzy posledních bodů (datum -> kurz) pro opravy.
+        history_rev (int): Revize historie, ze které stav vychází.
+        history_full_sync (float): Čas plné synchronizace historie,
+                                   ze které byl stav sestaven.
+    """
+
+    FLOAT_FIELDS = ("y_ref", "sx", "sy", "sxx", "sxy", "syy", "history_full_sync")
+
+    def __init__(self, y_ref: float = 0.0):
+        self.n = 0
+        self.y_ref = y_ref
+        self.sx = 0.0
+        self.sy = 0.0
+        self.sxx = 0.0
+        self.sxy = 0.0
+        self.syy = 0.0
+        self.start = ""
+        self.last_date = ""
+        self.tail: dict[str, float] = {}
+        self.history_rev = 0
+        self.history_full_sync = 0.0
+
+    @classmethod
+    def from_points(cls, points: list[dict], start: str) -> "LinearModelState":
+        """
+        Sestaví stav z celé historie okna (vektorizovaně v NumPy).
+
+        Args:
+            points (list[dict]): Body seřazené podle data s klíči "date" a "rate".
+            start (str): Začátek okna.
+
+        Returns:
+            LinearModelState: Nový stav.
+        """
+        y = np.array([point["rate"] for point in points], dtype=np.float64)
+        state = cls(y_ref=float(y[0]) if len(y) else 0.0)
+        state.start = start
+
+        if len(y):
+            x = np.arange(len(y), dtype=np.float64)
+            y = y - state.y_ref
+            state.n = len(y)
+            state.sx = float(x.sum())
+            state.sy = float(y.sum())
+            state.sxx = float(x @ x)
+            state.sxy = float(x @ y)
+            state.syy = float(y @ y)
+            state.last_date = points[-1]["date"]
+            state.tail = {point["date"]: point["rate"] for point in points[-DEFAULT_TAIL_SIZE:]}
+
+        return state
+
+    def append(self, day: str, rate: float, tail_size: int = DEFAULT_TAIL_SIZE) -> None:
+        """
+        Přidá nový bod na konec historie (x = n).
+        """
+        x = float(self.n)
+        y = rate - self.y_ref
+        self.n += 1
+        self.sx += x
+        self.sy += y
+        self.sxx += x * x
+        self.sxy += x * y
+        self.syy += y * y
+        self.last_date = day
+        self.tail[day] = rate
+        while len(self.tail) > tail_size:
+            del self.tail[next(iter(self.tail))]
+
+    def replace(self, day: str, rate: float) -> None:
+        """
+        Opraví kurz bodu, který je v posledních bodech (tail).
+        """
+        position = list(self.tail).index(day)
+        x = float(self.n - len(self.tail) + position)
+        old = self.tail[day] - self.y_ref
+        new = rate - self.y_ref
+        self.sy += new - old
+        self.syy += new * new - old * old
+        self.sxy += x * (new - old)
+        self.tail[day] = rate
+
+    def remove_first(self, rate: float) -> None:
+        """
+        Odebere nejstarší bod (x = 0) a posune ostatní body o jedna dolů.
+        """
+        y = rate - self.y_ref
+        self.n -= 1
+        self.sy -= y
+        self.syy -= y * y
+        # Posun x -> x - 1 pro zbývající body (Σx a Σx² se bodem x=0 nemění)
+        self.sxx += -2.0 * self.sx + self.n
+        self.sx -= self.n
+        self.sxy -= self.sy
+
+    def fit(self) -> Optional[tuple[float, float, float]]:
+        """
+        Spočítá přímku metodou nejmenších čtverců ze statistik.
+
+        Returns:
+            Optional[tuple[float, float, float]]: Absolutní člen, směrnice
+                a směrodatná odchylka reziduí, nebo None pro méně než 2 body.
+        """
+        if self.n < 2:
+            return None
+
+        sxx_c = self.sxx - self.sx * self.sx / self.n
+        sxy_c = self.sxy - self.sx * self.sy / self.n
+        syy_c = self.syy - self.sy * self.sy / self.n
+
+        slope = sxy_c / sxx_c
+        intercept = (self.sy - slope * self.sx) / self.n + self.y_ref
+        residual_std = math.sqrt(max(syy_c - slope * sxy_c, 0.0) / self.n)
+        return intercept, slope, residual_std
+
+    def predict(self, days: int) -> Optional[list[dict]]:
+        """
+        Vygeneruje prognózu pro `days` dní dopředu přímo ze statistik.
+
+        Returns:
+            Optional[list[dict]]: Body prognózy, nebo None pro méně než 2 body.
+        """
+        fitted = self.fit()
+        if fitted is None:
+            return None
+
+        intercept, slope, residual_std = fitted
+        return linear_forecast(
+            intercept,
+            slope,
+            self.n - 1,
+            np.datetime64(self.last_date, "D"),
+            CONFIDENCE_MULTIPLIER * residual_std,
+            days,
+        )
+
+    def to_mapping(self) -> dict:
+        """
+        Převede stav na mapování pro uložení do Redis hashe.
+        """
+        mapping = {field: repr(getattr(self, field)) for field in self.FLOAT_FIELDS}
+        mapping.update({
+            "n": self.n,
+            "start": self.start,
+            "last_date": self.last_date,
+            "tail": json.dumps(self.tail),
+            "history_rev": self.history_rev,
+        })
+        return mapping
+
+    @classmethod
+    def from_mapping(cls, mapping: dict) -> "LinearModelState":
+        """
+        Obnoví stav z Redis hashe.
+        """
+        state = cls()
+        for field in cls.FLOAT_FIELDS:
+            setattr(state, field, float(mapping[field]))
+        state.n = int(mapping["n"])
+        state.start = mapping["start"]
+        state.last_date = mapping["last_date"]
+        state.tail = json.loads(mapping["tail"])
+        state.history_rev = int(mapping["history_rev"])
+        return state
+
+
+class ModelStateStore:
+    """
+    Úložiště stavů lineárního modelu v Redis navázané na HistoryStore.
+
+    Při každém výpočtu prognózy dotáhne přírůstek historie a aplikuje
+    ho na uložený stav: nové dny přidá, opravené poslední dny přepočítá
+    a (při klouzavém okně) odebere dny, které z okna vypadly. Stav se
+    sestaví znovu z celé historie pouze po plné synchronizaci historie,
+    při změně historie jinou cestou nebo při doplnění starších dní.
+
+    Attributes:
+        redis_client (redis.Redis): Asynchronní Redis klient.
+        history_store (HistoryStore): Úložiště historie kurzů.
+        sliding_window (bool): Pokud True, body starší než okno se odebírají;
+                               jinak okno roste od posledního sestavení stavu.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        history_store: HistoryStore,
+        sliding_window: bool = True,
+    ):
+        """
+        Inicializace úložiště stavů.
+
+        Args:
+            redis_client (redis.Redis): Asynchronní Redis klient.
+            history_store (HistoryStore): Úložiště historie kurzů.
+            sliding_window (bool): Odebírat body starší než okno. Výchozí: True.
+        """
+        self.redis_client = redis_client
+        self.history_store = history_store
+        self.sliding_window = sliding_window
+
+    async def _load(self, key: str) -> Optional[LinearModelState]:
+        """
+        Načte stav z Redis (None, pokud neexistuje nebo je poškozený).
+        """
+        mapping = await self.redis_client.hgetall(key)
+        if not mapping:
+            return None
+        try:
+            return LinearModelState.from_mapping(mapping)
+        except (KeyError, ValueError) as e:
+            logger.warning("Poškozený stav modelu %s: %s", key, e)
+            return None
+
+    async def _save(self, key: str, state: LinearModelState) -> None:
+        """
+        Uloží stav do Redis (celý hash najednou).
+        """
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping=state.to_mapping())
+            await pipe.execute()
+
+    async def _rebuild(self, currency: str, history_days: int, window_start: str) -> LinearModelState:
+        """
+        Sestaví stav znovu z celé historie okna.
+        """
+        points = await self.history_store.read_window(currency, history_days)
+        state = LinearModelState.from_points(points, window_start)
+        logger.debug("Stav modelu %s h%d sestaven z %d bodů", currency, history_days, state.n)
+        return state
+
+    async def _apply(
+        self, state: LinearModelState, currency: str, window_start: str, sync: dict
+    ) -> bool:
+        """
+        Aplikuje přírůstek historie na stav.
+
+        Returns:
+            bool: False, pokud přírůstek nelze aplikovat a stav je třeba sestavit znovu.
+        """
+        for day, rate in sorted(sync["updates"].items()):
+            if day > state.last_date:
+                state.append(day, rate)
+            elif day in state.tail:
+                if state.tail[day] != rate:
+                    state.replace(day, rate)
+            elif day >= state.start:
+                # Doplněný den uprostřed historie - posunul by pořadí bodů
+                return False
+
+        if self.sliding_window and state.start < window_start:
+            if state.start < sync["covered_from"]:
+                # Vypršelé dny už v úložišti historie nejsou
+                return False
+
+            start = date.fromisoformat(state.start)
+            expired_days = [
+                (start + timedelta(days=i)).isoformat()
+                for i in range((date.fromisoformat(window_start) - start).days)
+            ]
+            for day, rate in zip(expired_days, await self.history_store.read_days(currency, expired_days)):
+                if rate is not None and state.n > 0:
+                    state.remove_first(rate)
+                    state.tail.pop(day, None)
+            state.start = window_start
+
+        return True
+
+    async def forecast(
+        self,
+        currency: str,
+        history_days: int,
+        forecast_days: int,
+        fetch: HistoryFetcher,
+    ) -> Optional[tuple[int, list[dict]]]:
+        """
+        Aktualizuje stav modelu o přírůstek historie a vrátí prognózu.
+
+        Args:
+            currency (str): Kód měny (např. "EUR").
+            history_days (int): Délka historie (okna) ve dnech.
+            forecast_days (int): Počet dnů prognózy.
+            fetch (HistoryFetcher): Funkce pro stažení historie ze Symfony API.
+
+        Returns:
+            Optional[tuple[int, list[dict]]]: Počet bodů historie a body
+                prognózy, nebo None při chybě či nedostatku dat.
+
+        Example:
+            >>> store = ModelStateStore(redis, history_store)
+            >>> points, forecast = await store.forecast("EUR", 90, 30, forecaster.fetch_history_from_symfony)
+        """
+        currency = currency.upper()
+        sync = await self.history_store.sync(currency, history_days, fetch)
+        if sync is None:
+            return None
+
+        key = build_model_state_key(currency, history_days)
+        window_start = (date.today() - timedelta(days=history_days)).isoformat()
+        state = await self._load(key)
+
+        # Stav lze aktualizovat přírůstkem, jen pokud vychází z historie
+        # bezprostředně před touto synchronizací
+        base_rev = sync["rev"] - (1 if sync["changed"] else 0)
+        incremental = (
+            state is not None
+            and not sync["full_sync"]
+            and state.history_full_sync == sync["last_full_sync"]
+            and state.history_rev == base_rev
+        )
+
+        if not incremental or not await self._apply(state, currency, window_start, sync):
+            state = await self._rebuild(currency, history_days, window_start)
+
+        state.history_rev = sync["rev"]
+        state.history_full_sync = sync["last_full_sync"]
+        await self._save(key, state)
+
+        forecast = state.predict(forecast_days)
+        if not forecast:
+            return None
+
+        return state.n, forecast
+
+    async def invalidate(self, currency: Optional[str] = None) -> int:
+        """
+        Smaže uložené stavy modelu měny (nebo všech měn).
+
+        Args:
+            currency (Optional[str]): Kód měny. Pokud None, smaže stavy všech měn.
+
+        Returns:
+            int: Počet smazaných klíčů.
+        """
+        pattern = f"{MODEL_STATE_KEY_PREFIX}{currency.upper()}:*" if currency else f"{MODEL_STATE_KEY_PREFIX}*"
+        keys = [key async for key in self.redis_client.scan_iter(match=pattern)]
+        return await self.redis_client.delete(*keys) if keys else 0
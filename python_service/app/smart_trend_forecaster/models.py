@@ -0,0 +1,388 @@
+"""
+Smart Trend Forecaster - Modul s registrem predikčních modelů.
+
+Tento modul definuje jednotné rozhraní modelu (fit/forecast) a registr
+dostupných modelů, ze kterého si CurrencyForecaster vybírá model
+podle měny nebo podle požadavku:
+- linear: lineární regrese přes celou historii
+- rolling: lineární regrese přes posledních N bodů
+- holt: Holtovo dvojité exponenciální vyrovnávání (úroveň + trend)
+- holt_winters: Holt-Winters s aditivní týdenní sezónností
+- drift: poslední hodnota + průměrná změna (drift)
+- naive: poslední hodnota (referenční baseline)
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Optional
+
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+# Výchozí model prognózy
+DEFAULT_MODEL = "linear"
+
+# Násobek směrodatné odchylky pro 95% interval spolehlivosti
+CONFIDENCE_MULTIPLIER = 1.96
+
+
+class ForecastModel:
+    """
+    Rozhraní predikčního modelu časové řady.
+
+    Model se natrénuje na řadě kurzů (v pořadí bodů historie) metodou
+    fit() a metodou forecast() vrátí predikce a polovinu šířky 95%
+    intervalu spolehlivosti pro zadaný počet kroků dopředu.
+
+    Attributes:
+        name (str): Název modelu v registru.
+        min_points (int): Minimální počet bodů historie pro trénink.
+    """
+
+    name = ""
+    min_points = 2
+
+    def fit(self, y: np.ndarray) -> "ForecastModel":
+        """
+        Natrénuje model na řadě kurzů.
+
+        Args:
+            y (np.ndarray): Kurzy seřazené podle data.
+
+        Returns:
+            ForecastModel: Natrénovaný model (self).
+        """
+        raise NotImplementedError
+
+    def forecast(self, steps: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vrátí predikce pro `steps` kroků dopředu.
+
+        Args:
+            steps (int): Počet kroků (dnů) prognózy.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Predikované hodnoty a polovina
+                šířky 95% intervalu spolehlivosti pro každý krok.
+        """
+        raise NotImplementedError
+
+
+def _least_squares(x: np.ndarray, y: np.ndarray) -> tuple[float, float, float]:
+    """
+    Přímka metodou nejmenších čtverců v uzavřeném tvaru.
+
+    Returns:
+        tuple[float, float, float]: Absolutní člen, směrnice a směrodatná
+            odchylka reziduí.
+    """
+    x_mean = x.mean()
+    y_mean = y.mean()
+    x_centered = x - x_mean
+    slope = (x_centered @ (y - y_mean)) / (x_centered @ x_centered)
+    intercept = y_mean - slope * x_mean
+    residual_std = np.std(y - (intercept + slope * x))
+    return intercept, slope, residual_std
+
+
+class LinearModel(ForecastModel):
+    """
+    Lineární regrese kurzu na pořadí bodu přes celou historii.
+    """
+
+    name = "linear"
+
+    def fit(self, y: np.ndarray) -> "LinearModel":
+        self.last_index = len(y) - 1
+        self.intercept, self.slope, self.residual_std = _least_squares(
+            np.arange(len(y), dtype=np.float64), y
+        )
+        return self
+
+    def forecast(self, steps: int) -> tuple[np.ndarray, np.ndarray]:
+        values = self.intercept + self.slope * (self.last_index + np.arange(1, steps + 1))
+        margin = float(CONFIDENCE_MULTIPLIER * self.residual_std)
+        return values, np.full(steps, margin)
+
+
+class RollingLinearModel(LinearModel):
+    """
+    Lineární regrese přes posledních `window` bodů historie.
+
+    Reaguje rychleji na změnu trendu než regrese přes celou historii.
+    """
+
+    name = "rolling"
+
+    def __init__(self, window: int = 30):
+        self.window = window
+
+    def fit(self, y: np.ndarray) -> "RollingLinearModel":
+        tail = y[-self.window:]
+        super().fit(tail)
+        return self
+
+
+class HoltModel(ForecastModel):
+    """
+    Holtovo dvojité exponenciální vyrovnávání (úroveň + trend).
+
+    Interval spolehlivosti roste s horizontem podle rozptylu
+    h-krokové chyby: σ² · (1 + Σ α²(1 + jβ)²).
+    """
+
+    name = "holt"
+
+    def __init__(self, alpha: float = 0.5, beta: float = 0.1):
+        self.alpha = alpha
+        self.beta = beta
+
+    def fit(self, y: np.ndarray) -> "HoltModel":
+        alpha, beta = self.alpha, self.beta
+        level = float(y[0])
+        trend = float(y[1] - y[0])
+        errors = np.empty(len(y) - 1)
+
+        for i, value in enumerate(y[1:].tolist()):
+            predicted = level + trend
+            errors[i] = value - predicted
+            previous_level = level
+            level = alpha * value + (1 - alpha) * predicted
+            trend = beta * (level - previous_level) + (1 - beta) * trend
+
+        self.level = level
+        self.trend = trend
+        self.residual_std = float(np.sqrt(np.mean(errors ** 2)))
+        return self
+
+    def _margins(self, steps: int) -> np.ndarray:
+        j = np.arange(steps, dtype=np.float64)
+        variance_factor = 1 + np.cumsum(np.where(j > 0, self.alpha ** 2 * (1 + j * self.beta) ** 2, 0.0))
+        return CONFIDENCE_MULTIPLIER * self.residual_std * np.sqrt(variance_factor)
+
+    def forecast(self, steps: int) -> tuple[np.ndarray, np.ndarray]:
+        values = self.level + self.trend * np.arange(1, steps + 1)
+        return values, self._margins(steps)
+
+
+class HoltWintersModel(HoltModel):
+    """
+    Holt-Winters s aditivní sezónností (výchozí perioda 7 bodů).
+
+    Při historii kratší než dvě sezóny se chová jako Holtův model.
+    Interval spolehlivosti se počítá jako u Holtova modelu.
+    """
+
+    name = "holt_winters"
+
+    def __init__(self, alpha: float = 0.5, beta: float = 0.1, gamma: float = 0.1, season_length: int = 7):
+        super().__init__(alpha, beta)
+        self.gamma = gamma
+        self.season_length = season_length
+
+    def fit(self, y: np.ndarray) -> "HoltWintersModel":
+        m = self.season_length
+        if len(y) < 2 * m:
+            self.seasonals = np.zeros(m)
+            self.offset = 0
+            super().fit(y)
+            return self
+
+        alpha, beta, gamma = self.alpha, self.beta, self.gamma
+        level = float(y[:m].mean())
+        trend = float((y[m:2 * m].mean() - y[:m].mean()) / m)
+        seasonals = (y[:m] - level).tolist()
+        errors = np.empty(len(y) - m)
+
+        for i, value in enumerate(y[m:].tolist()):
+            season = seasonals[i % m]
+            predicted = level + trend + season
+            errors[i] = value - predicted
+            previous_level = level
+            level = alpha * (value - season) + (1 - alpha) * (level + trend)
+            trend = beta * (level - previous_level) + (1 - beta) * trend
+            seasonals[i % m] = gamma * (value - level) + (1 - gamma) * season
+
+        self.level = level
+        self.trend = trend
+        self.seasonals = np.array(seasonals)
+        # Index sezóny pro první krok prognózy
+        self.offset = (len(y) - m) % m
+        self.residual_std = float(np.sqrt(np.mean(errors ** 2)))
+        return self
+
+    def forecast(self, steps: int) -> tuple[np.ndarray, np.ndarray]:
+        values, margins = super().forecast(steps)
+        season_index = (self.offset + np.arange(steps)) % self.season_length
+        return values + self.seasonals[season_index], margins
+
+
+class DriftModel(ForecastModel):
+    """
+    Poslední hodnota prodloužená o průměrnou denní změnu (drift).
+    """
+
+    name = "drift"
+
+    def fit(self, y: np.ndarray) -> "DriftModel":
+        self.n = len(y)
+        self.last = float(y[-1])
+        self.drift = float((y[-1] - y[0]) / (len(y) - 1))
+        self.residual_std = float(np.std(np.diff(y) - self.drift))
+        return self
+
+    def forecast(self, steps: int) -> tuple[np.ndarray, np.ndarray]:
+        h = np.arange(1, steps + 1, dtype=np.float64)
+        margins = CONFIDENCE_MULTIPLIER * self.residual_std * np.sqrt(h * (1 + h / (self.n - 1)))
+        return self.last + self.drift * h, margins
+
+
+class NaiveModel(ForecastModel):
+    """
+    Poslední známá hodnota (náhodná procházka) - referenční baseline.
+    """
+
+    name = "naive"
+
+    def fit(self, y: np.ndarray) -> "NaiveModel":
+        self.last = float(y[-1])
+        self.residual_std = float(np.std(np.diff(y)))
+        return self
+
+    def forecast(self, steps: int) -> tuple[np.ndarray, np.ndarray]:
+        h = np.arange(1, steps + 1, dtype=np.float64)
+        return np.full(steps, self.last), CONFIDENCE_MULTIPLIER * self.residual_std * np.sqrt(h)
+
+
+# Registr modelů: název -> továrna vytvářející novou (nenatrénovanou) instanci
+MODEL_REGISTRY: dict[str, Callable[[], ForecastModel]] = {}
+
+
+def register_model(name: str, factory: Callable[[], ForecastModel]) -> None:
+    """
+    Zaregistruje model pod zadaným názvem.
+
+    Args:
+        name (str): Název modelu (používá se v konfiguraci a v ?model=).
+        factory (Callable[[], ForecastModel]): Továrna vytvářející instanci.
+
+    Example:
+        >>> register_model("rolling60", lambda: RollingLinearModel(window=60))
+    """
+    MODEL_REGISTRY[name] = factory
+
+
+def available_models() -> list[str]:
+    """
+    Vrátí seznam názvů registrovaných modelů.
+
+    Returns:
+        list[str]: Názvy modelů.
+    """
+    return list(MODEL_REGISTRY)
+
+
+def create_model(name: str) -> ForecastModel:
+    """
+    Vytvoří novou instanci modelu z registru.
+
+    Args:
+        name (str): Název modelu.
+
+    Returns:
+        ForecastModel: Nenatrénovaná instance modelu.
+
+    Raises:
+        ValueError: Pokud model není registrován.
+    """
+    try:
+        return MODEL_REGISTRY[name]()
+    except KeyError:
+        raise ValueError(f"Neznámý model: {name}. Dostupné: {', '.join(available_models())}")
+
+
+def parse_model_overrides(value: str) -> dict[str, str]:
+    """
+    Načte přiřazení modelů k měnám z konfigurace.
+
+    Args:
+        value (str): Např. "EUR:holt,USD:drift".
+
+    Returns:
+        dict[str, str]: Model podle kódu měny.
+
+    Raises:
+        ValueError: Pokud je některý model neznámý.
+    """
+    overrides = {}
+    for item in value.split(","):
+        if ":" not in item:
+            continue
+        currency, model = (part.strip() for part in item.split(":", 1))
+        create_model(model)
+        overrides[currency.upper()] = model
+    return overrides
+
+
+def resolve_model(
+    currency: str,
+    requested: Optional[str] = None,
+    overrides: Optional[dict[str, str]] = None,
+    default: str = DEFAULT_MODEL,
+) -> str:
+    """
+    Určí model pro měnu: požadavek > nastavení měny > výchozí model.
+
+    Args:
+        currency (str): Kód měny.
+        requested (Optional[str]): Model z požadavku (?model=).
+        overrides (Optional[dict[str, str]]): Modely podle měny z konfigurace.
+        default (str): Výchozí model.
+
+    Returns:
+        str: Název modelu.
+    """
+    if requested:
+        return requested
+    return (overrides or {}).get(currency.upper(), default)
+
+
+def forecast_points(last_date: np.datetime64, values: np.ndarray, margins: np.ndarray) -> list[dict]:
+    """
+    Sestaví body prognózy (datum, hodnota a interval spolehlivosti).
+
+    Args:
+        last_date (np.datetime64): Datum posledního bodu historie.
+        values (np.ndarray): Predikované hodnoty pro dny 1..N.
+        margins (np.ndarray): Polovina šířky intervalu pro dny 1..N.
+
+    Returns:
+        list[dict]: Body prognózy s klíči date, value, conf_low a conf_high.
+    """
+    steps = np.arange(1, len(values) + 1)
+    dates = (last_date.astype("datetime64[D]") + steps).astype(str)
+
+    return [
+        {
+            "date": day,
+            "value": round(value, 4),
+            "conf_low": round(low, 4),
+            "conf_high": round(high, 4),
+        }
+        for day, value, low, high in zip(
+            dates.tolist(),
+            values.tolist(),
+            (values - margins).tolist(),
+            (values + margins).tolist(),
+        )
+    ]
+
+
+register_model(LinearModel.name, LinearModel)
+register_model(RollingLinearModel.name, RollingLinearModel)
+register_model(HoltModel.name, HoltModel)
+register_model(HoltWintersModel.name, HoltWintersModel)
+register_model(DriftModel.name, DriftModel)
+register_model(NaiveModel.name, NaiveModel)
@@ -0,0 +1,225 @@
+"""
+Smart Trend Forecaster - Modul pro předzpracování historie kurzů.
+
+Historie jedné měny má typicky desítky až stovky bodů. Při této velikosti
+převažuje režie pandas (sestavení DataFrame, to_datetime, to_numeric,
+dropna, sort_values, drop_duplicates) nad samotnou prací, proto výchozí
+cesta ("numpy") parsuje data přímo do pole datetime64 a kurzy do pole
+float64 bez pandas. Původní implementace nad pandas zůstává k dispozici
+("pandas") a pandas se importuje až při jejím použití.
+
+Obě cesty mají stejnou sémantiku čištění:
+1. kurzy se převedou na float, neplatné hodnoty na NaN (errors="coerce"),
+2. body s neplatným datem nebo kurzem se vynechají,
+3. body se stabilně seřadí podle data,
+4. pro každé datum se ponechá poslední záznam.
+
+Shoda obou cest a jejich náklady (latence, RSS) viz
+benchmarks/bench_preprocess.py.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Optional
+
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+
+# Dostupné implementace předzpracování
+PREPROCESS_BACKENDS = ("numpy", "pandas")
+
+# Výchozí implementace předzpracování
+DEFAULT_PREPROCESS = "numpy"
+
+
+class PreparedHistory:
+    """
+    Očištěná historie kurzů seřazená podle data.
+
+    Pořadí bodu v polích odpovídá regresoru modelů (dříve sloupec
+    day_index v DataFrame).
+
+    Attributes:
+        dates (np.ndarray): Data bodů (datetime64) vzestupně, bez duplicit.
+        rates (np.ndarray): Kurzy (float64) odpovídající datům.
+    """
+
+    __slots__ = ("dates", "rates")
+
+    def __init__(self, dates: np.ndarray, rates: np.ndarray):
+        self.dates = dates
+        self.rates = rates
+
+    def __len__(self) -> int:
+        return len(self.rates)
+
+    @property
+    def last_date(self) -> np.datetime64:
+        """
+        Datum posledního bodu historie.
+        """
+        return self.dates[-1]
+
+
+def _to_float(value) -> float:
+    """
+    Převede kurz na float, neplatné hodnoty na NaN (jako pd.to_numeric s errors="coerce").
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _clean(dates: np.ndarray, rates: np.ndarray) -> PreparedHistory:
+    """
+    Vynechá neplatné body, stabilně seřadí podle data a ponechá poslední záznam pro každé datum.
+    """
+    valid = ~np.isnat(dates) & ~np.isnan(rates)
+    if not valid.all():
+        dates, rates = dates[valid], rates[valid]
+
+    if len(dates) > 1 and not (dates[1:] > dates[:-1]).all():
+        order = np.argsort(dates, kind="stable")
+        dates, rates = dates[order], rates[order]
+        keep = np.ones(len(dates), dtype=bool)
+        keep[:-1] = dates[1:] != dates[:-1]
+        dates, rates = dates[keep], rates[keep]
+
+    return PreparedHistory(dates, rates)
+
+
+def prepare_history(data: list[dict]) -> Optional[PreparedHistory]:
+    """
+    Předzpracuje surovou historii bez pandas (NumPy a standardní knihovna).
+
+    Data ve formátu YYYY-MM-DD (formát Symfony API) se parsují přímo
+    do datetime64[D]. Historii s jiným formátem data (čas, časové pásmo,
+    chybějící datum apod.) zpracuje původní cesta přes pandas, aby se
+    výklad dat obou cest nelišil.
+
+    Args:
+        data (list[dict]): Seznam slovníků s klíči "date" a "rate".
+
+    Returns:
+        Optional[PreparedHistory]: Očištěná historie, nebo None, pokud jsou
+            data prázdná nebo v nich chybí klíč "date" či "rate".
+
+    Example:
+        >>> prepared = prepare_history([
+        ...     {"date": "2026-01-02", "rate": "25.2"},
+        ...     {"date": "2026-01-01", "rate": 25.1},
+        ...     {"date": "2026-01-02", "rate": None},
+        ... ])
+        >>> prepared.dates, prepared.rates
+        (array(['2026-01-01', '2026-01-02'], dtype='datetime64[D]'), array([25.1, 25.2]))
+    """
+    if not data:
+        return None
+
+    try:
+        raw_dates = [point["date"] for point in data]
+        raw_rates = [point["rate"] for point in data]
+    except KeyError:
+        # Klíč chybí jen v některých záznamech - chybějící hodnoty jsou NaN/NaT
+        if not any("date" in point for point in data) or not any("rate" in point for point in data):
+            logger.warning("Chybí požadované sloupce 'date' nebo 'rate'")
+            return None
+        raw_dates = [point.get("date") for point in data]
+        raw_rates = [point.get("rate") for point in data]
+    except TypeError as e:
+        logger.warning("Chyba při předzpracování dat: %s", e)
+        return None
+
+    if not all(type(day) is str and len(day) == 10 and day[4] == day[7] == "-" for day in raw_dates):
+        return prepare_history_pandas(data)
+
+    try:
+        dates = np.array(raw_dates, dtype="datetime64[D]")
+    except ValueError:
+        # Neplatné datum (např. 2026-13-01) - pandas celou historii odmítne
+        return prepare_history_pandas(data)
+
+    try:
+        rates = np.array(raw_rates, dtype=np.float64)
+    except (TypeError, ValueError):
+        rates = np.array([_to_float(rate) for rate in raw_rates], dtype=np.float64)
+
+    return _clean(dates, rates)
+
+
+def prepare_history_pandas(data: list[dict]) -> Optional[PreparedHistory]:
+    """
+    Předzpracuje surovou historii původní cestou přes pandas DataFrame.
+
+    Args:
+        data (list[dict]): Seznam slovníků s klíči "date" a "rate".
+
+    Returns:
+        Optional[PreparedHistory]: Očištěná historie, nebo None, pokud jsou
+            data prázdná, v nich chybí sloupec "date" či "rate", nebo je
+            nelze zpracovat.
+    """
+    if not data:
+        return None
+
+    import pandas as pd
+
+    try:
+        # Vytvoření DataFrame
+        df = pd.DataFrame(data)
+
+        # Kontrola požadovaných sloupců
+        if "date" not in df.columns or "rate" not in df.columns:
+            logger.warning("Chybí požadované sloupce 'date' nebo 'rate'")
+            return None
+
+        # Konverze datumu
+        df["date"] = pd.to_datetime(df["date"])
+
+        # Konverze kurzu na float
+        df["rate"] = pd.to_numeric(df["rate"], errors="coerce")
+
+        # Odstranění prázdných hodnot
+        df = df.dropna(subset=["date", "rate"])
+
+        # Stabilní seřazení podle data (pořadí záznamů se stejným datem se zachová)
+        df = df.sort_values("date", kind="stable").reset_index(drop=True)
+
+        # Odstranění duplicit (ponechání posledního záznamu pro každé datum)
+        df = df.drop_duplicates(subset=["date"], keep="last")
+
+        # Data s časovým pásmem se převedou na UTC (stejně jako v NumPy)
+        dates = df["date"] if df["date"].dt.tz is None else df["date"].dt.tz_convert(None)
+        return PreparedHistory(dates.to_numpy(), df["rate"].to_numpy(dtype=np.float64))
+
+    except Exception as e:
+        logger.warning("Chyba při předzpracování dat: %s", e)
+        return None
+
+
+def get_preprocessor(name: str):
+    """
+    Vrátí funkci předzpracování podle názvu implementace.
+
+    Args:
+        name (str): "numpy" nebo "pandas".
+
+    Returns:
+        Callable[[list[dict]], Optional[PreparedHistory]]: Funkce předzpracování.
+
+    Raises:
+        ValueError: Pokud implementace neexistuje.
+    """
+    if name == "numpy":
+        return prepare_history
+    if name == "pandas":
+        return prepare_history_pandas
+    raise ValueError(
+        f"Neznámá implementace předzpracování '{name}', dostupné: {', '.join(PREPROCESS_BACKENDS)}"
+    )
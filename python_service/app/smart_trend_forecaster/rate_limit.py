@@ -0,0 +1,71 @@
+"""
+Smart Trend Forecaster - Modul pro omezení rychlosti volání.
+
+Tento modul obsahuje asynchronní token bucket, kterým plánovač
+omezuje počet volání Symfony API za sekundu při souběžné
+aktualizaci velkého množství měn.
+"""
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Asynchronní token bucket pro omezení rychlosti volání.
+
+    Bucket se plní rychlostí `rate` tokenů za sekundu až do kapacity
+    `burst`. Každé volání acquire() spotřebuje jeden token; pokud
+    žádný není k dispozici, volající počká na doplnění.
+
+    Attributes:
+        rate (float): Počet tokenů doplněných za sekundu.
+        burst (int): Maximální počet tokenů (velikost dávky).
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Inicializace bucketu (na začátku je plný).
+
+        Args:
+            rate (float): Povolený počet volání za sekundu (> 0).
+            burst (int): Maximální počet volání provedených okamžitě za sebou.
+
+        Raises:
+            ValueError: Pokud rate nebo burst nejsou kladné.
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError("TokenBucket vyžaduje rate > 0 a burst >= 1")
+
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        """
+        Doplní tokeny podle času uplynulého od poslední aktualizace.
+        """
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """
+        Počká na volný token a spotřebuje jej.
+
+        Čekající volající jsou obslouženi v pořadí příchodu.
+
+        Example:
+            >>> bucket = TokenBucket(rate=5, burst=5)
+            >>> await bucket.acquire()
+        """
+        async with self._lock:
+            self._refill()
+
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+
+            self._tokens -= 1
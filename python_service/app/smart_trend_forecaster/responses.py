@@ -0,0 +1,188 @@
+"""
+Smart Trend Forecaster - Modul pro sestavení odpovědí endpointů prognóz.
+
+Kromě sestavení odpovědi ze slovníku prognózy (build_forecast_response)
+umí odpověď předpočítat při zápisu do cache: odpověď s maximálním
+horizontem se serializuje jednou a uloží se spolu s bajtovými offsety
+jednotlivých bodů. Odpověď pro libovolný kratší horizont je pak jen
+spojení předpočítaných částí (bez serializace) a má silný ETag
+odvozený z obsahu.
+"""
+
+import hashlib
+import json
+from typing import Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson je volitelná závislost
+    orjson = None
+
+from .models import DEFAULT_MODEL
+
+
+# Přípona klíče s předpočítanou odpovědí (hash vedle prognózy v cache)
+RESPONSE_KEY_SUFFIX = ":response"
+
+
+def _dumps(data) -> bytes:
+    """
+    Serializuje data do kompaktního JSON (orjson, pokud je k dispozici).
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def build_forecast_response(currency: str, forecast: Optional[dict], days: int) -> dict:
+    """
+    Sestaví odpověď s prognózou (status "ready"), nebo status "processing".
+
+    Args:
+        currency (str): Kód měny.
+        forecast (Optional[dict]): Prognóza z cache nebo nově vypočítaná.
+        days (int): Požadovaný počet dnů (prognóza se ořízne).
+
+    Returns:
+        dict: Odpověď ve formátu endpointu /forecast/{currency}.
+    """
+    if not forecast:
+        # Prognóza není k dispozici - vrátíme status processing
+        return {
+            "status": "processing",
+            "currency": currency,
+            "message": (
+                f"Prognóza pro {currency} není momentálně k dispozici. "
+                "Systém ji právě počítá. Zkuste to prosím za chvíli."
+            ),
+            "retry_after_seconds": 30,
+        }
+
+    response = {
+        "status": "ready",
+        "currency": forecast["currency"],
+        "model": forecast.get("model", DEFAULT_MODEL),
+        "generated_at": forecast["generated_at"],
+        "history_points": forecast.get("history_points", 0),
+        "from_cache": forecast.get("from_cache", False),
+        "cached_at": forecast.get("cached_at"),
+        "stale": forecast.get("stale", False),
+        "forecast": forecast["forecast"][:days],  # Omezení na požadovaný počet dnů
+    }
+
+    if response["stale"]:
+        response["age_seconds"] = forecast.get("age_seconds")
+
+    return response
+
+
+def precompute_forecast_response(currency: str, forecast: dict) -> dict[str, str]:
+    """
+    Předpočítá odpověď endpointu /forecast/{currency} pro všechny horizonty.
+
+    Odpověď se serializuje jednou s celým horizontem a rozdělí se na
+    hlavičku (vše před seznamem bodů), body a offsety konce každého bodu.
+    Odpověď vydávaná z cache má from_cache=True a stale=False - zastaralé
+    prognózy se vydávají dynamicky s příznakem stale.
+
+    Args:
+        currency (str): Kód měny.
+        forecast (dict): Prognóza ukládaná do cache (s cached_ts a soft_ttl).
+
+    Returns:
+        dict[str, str]: Pole pro Redis hash: head, points, offsets, digest,
+                        cached_ts a soft_ttl.
+    """
+    response = build_forecast_response(
+        currency, dict(forecast, from_cache=True, stale=False), len(forecast["forecast"])
+    )
+    points = response.pop("forecast")
+
+    # Hlavička je JSON objekt bez uzavírací závorky, body následují v poli "forecast"
+    head = _dumps(response)[:-1] + b',"forecast":['
+    encoded_points = [_dumps(point) for point in points]
+    offsets = []
+    end = 0
+    for index, point in enumerate(encoded_points):
+        end += len(point) + (1 if index else 0)
+        offsets.append(end)
+    body = b",".join(encoded_points)
+
+    return {
+        "head": head.decode("utf-8"),
+        "points": body.decode("utf-8"),
+        "offsets": ",".join(map(str, offsets)),
+        "digest": hashlib.sha256(head + body).hexdigest()[:20],
+        "cached_ts": repr(forecast["cached_ts"]),
+        "soft_ttl": str(forecast["soft_ttl"]),
+    }
+
+
+def load_precomputed_response(mapping: dict) -> Optional[dict]:
+    """
+    Převede hash z Redis na předpočítanou odpověď připravenou k vydání.
+
+    Args:
+        mapping (dict): Pole hashe z precompute_forecast_response.
+
+    Returns:
+        Optional[dict]: head a points (bytes), offsets (list[int]), digest,
+                        cached_ts a soft_ttl, nebo None pro neúplný hash.
+    """
+    try:
+        return {
+            "head": mapping["head"].encode("utf-8"),
+            "points": mapping["points"].encode("utf-8"),
+            "offsets": [int(offset) for offset in mapping["offsets"].split(",") if offset],
+            "digest": mapping["digest"],
+            "cached_ts": float(mapping["cached_ts"]),
+            "soft_ttl": int(mapping["soft_ttl"]),
+        }
+    except (KeyError, ValueError):
+        return None
+
+
+def render_precomputed_response(precomputed: dict, days: int) -> tuple[bytes, str]:
+    """
+    Sestaví tělo odpovědi pro zadaný horizont z předpočítaných částí.
+
+    Args:
+        precomputed (dict): Předpočítaná odpověď z load_precomputed_response.
+        days (int): Požadovaný počet dnů.
+
+    Returns:
+        tuple[bytes, str]: Tělo odpovědi (JSON) a silný ETag.
+
+    Example:
+        >>> body, etag = render_precomputed_response(precomputed, 7)
+    """
+    offsets = precomputed["offsets"]
+    days = min(days, len(offsets))
+    end = offsets[days - 1] if days > 0 else 0
+    body = precomputed["head"] + precomputed["points"][:end] + b"]}"
+    return body, f'"{precomputed["digest"]}-{days}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Zjistí, zda hlavička If-None-Match odpovídá ETagu (slabé porovnání).
+
+    Args:
+        if_none_match (Optional[str]): Hodnota hlavičky If-None-Match.
+        etag (str): ETag aktuální odpovědi.
+
+    Returns:
+        bool: True pokud klient má aktuální verzi (odpověď 304).
+    """
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
@@ -6,12 +6,31 @@ směnných kurzů. Implementuje cache-first strategii a poskytuje
 RESTful rozhraní pro frontend aplikace.
 """
 
-from fastapi import APIRouter, Request, HTTPException, Query, BackgroundTasks
-from typing import Optional
+import asyncio
+import hmac
+import json
+from fastapi import APIRouter, Request, HTTPException, Query, BackgroundTasks, Header, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, Field
+from typing import Optional, Union
 from datetime import datetime
 
-from .tasks import get_or_compute_forecast
-from .cache import get_forecast_from_cache, get_cache_ttl
+from .tasks import get_or_compute_forecast, get_or_compute_forecasts
+from .cache import (
+    build_forecast_key,
+    get_forecast_statuses,
+    get_fresh_ttl,
+    get_precomputed_response,
+    is_forecast_stale,
+)
+from .models import available_models, resolve_model
+from .responses import build_forecast_response, etag_matches, render_precomputed_response
+from .backtest import DEFAULT_BACKTEST_DAYS, DEFAULT_BACKTEST_HORIZON, run_backtest
+from .broadcast import DEFAULT_RETRY_MS, format_sse_event
+from .triggers import publish_rates_updated
+from .metrics import CACHE_HITS, observe_forecast_timestamp
+from .cross import build_cross_response
 
 
 # Vytvoření routeru pro analytické endpointy
@@ -20,43 +39,225 @@ router = APIRouter(
     tags=["analytics", "forecast"],
 )
 
+# Maximální počet měn v jednom hromadném požadavku
+MAX_BATCH_CURRENCIES = 200
+
+
+class BatchForecastRequest(BaseModel):
+    """
+    Tělo POST požadavku na hromadné prognózy.
+
+    Attributes:
+        currencies (list[str]): Seznam ISO kódů měn.
+        days (int): Počet dnů pro predikci.
+        history_days (Optional[int]): Počet dnů historie pro trénink modelu.
+        force_refresh (bool): Vynutit přepočet prognóz.
+        model (Optional[str]): Název modelu prognózy (výchozí podle konfigurace).
+    """
+
+    currencies: list[str] = Field(min_length=1, max_length=MAX_BATCH_CURRENCIES)
+    days: int = Field(default=7, ge=1, le=365)
+    history_days: Optional[int] = Field(default=None, ge=2, le=365)
+    force_refresh: bool = False
+    model: Optional[str] = None
+
+
+class RatesUpdatedRequest(BaseModel):
+    """
+    Tělo webhooku o aktualizaci kurzů (volá Symfony po importu kurzů).
+
+    Attributes:
+        currencies (list[str]): Kódy měn s novými kurzy.
+        full_sync (bool): Vyžádat plnou synchronizaci historie
+                          (zpětná korekce starších kurzů).
+    """
+
+    currencies: list[str] = Field(min_length=1, max_length=MAX_BATCH_CURRENCIES)
+    full_sync: bool = False
+
 
-@router.get("/forecast/{currency}")
+def _normalize_currency(currency: str) -> str:
+    """
+    Normalizuje a zvaliduje kód měny.
+
+    Raises:
+        HTTPException: 400 pokud kód není 3-písmenný ISO kód.
+    """
+    currency = currency.upper().strip()
+
+    if len(currency) != 3 or not currency.isalpha():
+        raise HTTPException(
+            status_code=400,
+            detail=f"Neplatný kód měny: {currency}. Očekává se 3-písmenný ISO kód.",
+        )
+
+    return currency
+
+
+def _normalize_currencies(currencies: list[str]) -> list[str]:
+    """
+    Normalizuje seznam kódů měn (bez duplicit) a ověří jeho délku.
+
+    Raises:
+        HTTPException: 400 pokud je seznam prázdný, příliš dlouhý
+                       nebo obsahuje neplatný kód.
+    """
+    codes = list(dict.fromkeys(_normalize_currency(currency) for currency in currencies if currency.strip()))
+
+    if not codes:
+        raise HTTPException(status_code=400, detail="Nebyla zadána žádná měna.")
+    if len(codes) > MAX_BATCH_CURRENCIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximální počet měn v jednom požadavku je {MAX_BATCH_CURRENCIES}.",
+        )
+
+    return codes
+
+
+def _validate_days(request: Request, days: int) -> int:
+    """
+    Ověří horizont vůči maximu, které se ukládá do cache.
+
+    Raises:
+        HTTPException: 400 pokud days překračuje FORECAST_MAX_DAYS.
+
+    Returns:
+        int: Maximální horizont (horizont prognóz uložených v cache).
+    """
+    max_days = request.app.state.forecast_max_days
+    if days > max_days:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximální horizont prognózy je {max_days} dní.",
+        )
+    return max_days
+
+
+def _validate_model(model: Optional[str]) -> Optional[str]:
+    """
+    Ověří, že požadovaný model je registrován.
+
+    Raises:
+        HTTPException: 400 pokud model není registrován.
+    """
+    if model and model not in available_models():
+        raise HTTPException(
+            status_code=400,
+            detail=f"Neznámý model: {model}. Dostupné: {', '.join(available_models())}.",
+        )
+    return model
+
+
+def _resolve_models(request: Request, currencies: list[str], model: Optional[str]) -> dict[str, str]:
+    """
+    Určí model pro každou měnu (požadavek > nastavení měny > výchozí model).
+    """
+    return {
+        code: resolve_model(
+            code,
+            model,
+            request.app.state.forecast_models,
+            request.app.state.forecast_default_model,
+        )
+        for code in currencies
+    }
+
+
+def _fresh_ttl_seconds(forecast: dict, key_ttl: int) -> int:
+    """
+    Vrátí zbývající dobu platnosti prognózy pro výstup endpointů.
+
+    U prognóz s měkkou expirací jde o čas do jejího přepočtu, u starších
+    záznamů bez časové značky (a bez metadat) o TTL klíče v Redis.
+    """
+    fresh_ttl = get_fresh_ttl(forecast)
+    if fresh_ttl is not None:
+        return fresh_ttl
+    return key_ttl if key_ttl > 0 else 0
+
+
+def _precomputed_response(precomputed: dict, days: int, if_none_match: Optional[str]) -> Optional[Response]:
+    """
+    Vydá předpočítanou odpověď (200 nebo 304), pokud je prognóza ještě čerstvá.
+
+    Cache-Control odpovídá zbývající době do měkké expirace, aby odpověď
+    mohly cachovat i nginx a prohlížeče.
+    """
+    fresh_ttl = get_fresh_ttl(precomputed)
+    if not fresh_ttl:
+        return None
+    CACHE_HITS.inc()
+
+    body, etag = render_precomputed_response(precomputed, days)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={fresh_ttl}"}
+
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/forecast/{currency}", response_model=None)
 async def get_forecast(
     request: Request,
     currency: str,
     background_tasks: BackgroundTasks,
-    days: int = Query(default=7, ge=1, le=30, description="Počet dnů pro predikci"),
+    days: int = Query(default=7, ge=1, le=365, description="Počet dnů pro predikci"),
+    history_days: Optional[int] = Query(
+        default=None, ge=2, le=365, description="Počet dnů historie pro trénink modelu"
+    ),
     force_refresh: bool = Query(default=False, description="Vynutit přepočet prognózy"),
-) -> dict:
+    model: Optional[str] = Query(default=None, description="Název modelu prognózy"),
+    if_none_match: Optional[str] = Header(default=None),
+) -> Union[dict, Response]:
     """
     Získá prognózu směnného kurzu pro zadanou měnu.
 
     Tento endpoint implementuje strategii cache-first:
     1. Pokusí se načíst prognózu z Redis cache
-    2. Pokud není v cache, spustí výpočet na pozadí a vrátí status "processing"
-    3. Při force_refresh=True vždy přepočítá prognózu
+    2. Zastaralou prognózu (po měkké expiraci) vrátí okamžitě s příznakem
+       stale=True a přepočítá ji na pozadí
+    3. Pokud není v cache, spustí výpočet na pozadí a vrátí status "processing"
+    4. Při force_refresh=True vždy přepočítá prognózu
 
     Prognóza obsahuje predikované hodnoty kurzu s uvedením
-    dovolených intervalů (confidence intervals).
+    dovolených intervalů (confidence intervals). V cache je uložena
+    vždy s maximálním horizontem (FORECAST_MAX_DAYS) a libovolný
+    kratší horizont se z ní pouze ořízne bez nového výpočtu.
+
+    Čerstvá prognóza se vydává jako předpočítané tělo odpovědi uložené
+    při zápisu do cache (bez serializace) se silným ETagem
+    a Cache-Control podle zbývající doby platnosti. Při shodě
+    If-None-Match vrátí 304 Not Modified.
 
     Args:
         request (Request): FastAPI request objekt pro přístup k app.state.
         currency (str): ISO kód měny (např. "EUR", "USD").
         background_tasks (BackgroundTasks): FastAPI background tasks pro async výpočty.
-        days (int): Počet dnů pro predikci (1-30). Výchozí: 7.
+        days (int): Počet dnů pro predikci (1 až FORECAST_MAX_DAYS). Výchozí: 7.
+        history_days (Optional[int]): Počet dnů historie pro trénink (2-365).
+                                      Výchozí: FORECAST_HISTORY_DAYS.
         force_refresh (bool): Pokud True, vynutí přepočet i když je v cache.
+        model (Optional[str]): Název modelu (např. "linear", "holt").
+                               Výchozí: FORECAST_MODELS pro měnu, jinak
+                               FORECAST_DEFAULT_MODEL.
+        if_none_match (Optional[str]): Hlavička If-None-Match s ETagem klienta.
 
     Returns:
-        dict: Slovník s prognózou v následujícím formátu:
+        Union[dict, Response]: Předpočítaná odpověď (200/304), nebo slovník s prognózou v následujícím formátu:
             - status: "ready" nebo "processing"
             - currency: kód měny
+            - model: název použitého modelu
             - generated_at: timestamp generování prognózy
+            - stale: True pokud je prognóza zastaralá a přepočítává se
+            - age_seconds: stáří zastaralé prognózy v sekundách
             - forecast: seznam predikcí (pokud status="ready")
             - message: informační zpráva (pokud status="processing")
 
     Raises:
-        HTTPException: 400 pokud je měna neplatná nebo není podporována.
+        HTTPException: 400 pokud je měna neplatná nebo není podporována,
+                       pokud days překračuje maximální horizont,
+                       nebo pokud model není registrován.
 
     Example:
         GET /wallet/analytics/forecast/EUR?days=7
@@ -65,6 +266,7 @@ async def get_forecast(
         {
             "status": "ready",
             "currency": "EUR",
+            "model": "linear",
             "generated_at": "2026-01-18T10:00:00",
             "history_points": 90,
             "forecast": [
@@ -73,71 +275,189 @@ async def get_forecast(
             ]
         }
     """
-    # Normalizace kódu měny
-    currency = currency.upper().strip()
+    # Normalizace a validace kódu měny
+    currency = _normalize_currency(currency)
     
-    # Validace kódu měny (základní kontrola)
-    if len(currency) != 3 or not currency.isalpha():
-        raise HTTPException(
-            status_code=400,
-            detail=f"Neplatný kód měny: {currency}. Očekává se 3-písmenný ISO kód.",
-        )
+    # Validace horizontu vůči maximu, které se ukládá do cache
+    max_days = _validate_days(request, days)
+    model = _resolve_models(request, [currency], _validate_model(model))[currency]
+    
+    history_days = history_days or request.app.state.forecast_history_days
     
     # Získání Redis klienta z app state
     redis_client = request.app.state.redis
+
+    # Čerstvá prognóza - předpočítané tělo odpovědi bez serializace
+    if not force_refresh:
+        precomputed = await get_precomputed_response(
+            redis_client, currency, history_days, max_days, model
+        )
+        if precomputed is not None:
+            response = _precomputed_response(precomputed, days, if_none_match)
+            if response is not None:
+                observe_forecast_timestamp(currency, model, precomputed["cached_ts"])
+                return response
     
     # Pokus o získání prognózy (cache-first strategie)
     forecast = await get_or_compute_forecast(
         redis_client=redis_client,
         currency=currency,
         force_refresh=force_refresh,
+        http_client=request.app.state.http_client,
+        forecaster=request.app.state.forecaster,
+        ttl=request.app.state.forecast_ttl,
+        stale_ttl=request.app.state.forecast_stale_ttl,
+        history_days=history_days,
+        forecast_days=max_days,
+        model=model,
     )
     
-    if forecast:
-        # Prognóza je k dispozici
-        return {
-            "status": "ready",
-            "currency": forecast["currency"],
-            "generated_at": forecast["generated_at"],
-            "history_points": forecast.get("history_points", 0),
-            "from_cache": forecast.get("from_cache", False),
-            "cached_at": forecast.get("cached_at"),
-            "forecast": forecast["forecast"][:days],  # Omezení na požadovaný počet dnů
-        }
-    else:
-        # Prognóza není k dispozici - vrátíme status processing
-        return {
-            "status": "processing",
-            "currency": currency,
-            "message": (
-                f"Prognóza pro {currency} není momentálně k dispozici. "
-                "Systém ji právě počítá. Zkuste to prosím za chvíli."
-            ),
-            "retry_after_seconds": 30,
+    return build_forecast_response(currency, forecast, days)
+
+
+async def _get_batch_forecasts(
+    request: Request,
+    currencies: list[str],
+    days: int,
+    history_days: Optional[int],
+    force_refresh: bool,
+    model: Optional[str] = None,
+) -> dict:
+    """
+    Společná implementace GET a POST varianty hromadného endpointu.
+    """
+    codes = _normalize_currencies(currencies)
+    max_days = _validate_days(request, days)
+    models = _resolve_models(request, codes, _validate_model(model))
+
+    forecasts = await get_or_compute_forecasts(
+        redis_client=request.app.state.redis,
+        currencies=codes,
+        force_refresh=force_refresh,
+        http_client=request.app.state.http_client,
+        forecaster=request.app.state.forecaster,
+        ttl=request.app.state.forecast_ttl,
+        stale_ttl=request.app.state.forecast_stale_ttl,
+        history_days=history_days or request.app.state.forecast_history_days,
+        forecast_days=max_days,
+        max_concurrency=request.app.state.forecast_batch_concurrency,
+        models=models,
+    )
+
+    return {
+        "forecasts": {
+            code: build_forecast_response(code, forecast, days)
+            for code, forecast in forecasts.items()
+        },
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+@router.get("/forecasts")
+async def get_forecasts(
+    request: Request,
+    currencies: str = Query(..., description="Seznam kódů měn oddělených čárkou, např. EUR,USD"),
+    days: int = Query(default=7, ge=1, le=365, description="Počet dnů pro predikci"),
+    history_days: Optional[int] = Query(
+        default=None, ge=2, le=365, description="Počet dnů historie pro trénink modelu"
+    ),
+    force_refresh: bool = Query(default=False, description="Vynutit přepočet prognóz"),
+    model: Optional[str] = Query(default=None, description="Název modelu prognózy"),
+) -> dict:
+    """
+    Získá prognózy pro více měn jedním požadavkem.
+
+    Všechny prognózy se z cache načtou jedním round-tripem do Redis (MGET).
+    Chybějící prognózy se dopočítají souběžně s omezeným paralelismem
+    (FORECAST_BATCH_CONCURRENCY). Každá položka má stejný formát jako
+    odpověď endpointu /forecast/{currency}.
+
+    Args:
+        request (Request): FastAPI request objekt.
+        currencies (str): Kódy měn oddělené čárkou.
+        days (int): Počet dnů pro predikci. Výchozí: 7.
+        history_days (Optional[int]): Počet dnů historie pro trénink.
+        force_refresh (bool): Pokud True, vynutí přepočet všech prognóz.
+        model (Optional[str]): Název modelu pro všechny měny
+                               (výchozí podle konfigurace měny).
+
+    Returns:
+        dict: Slovník "forecasts" s prognózami podle kódu měny.
+
+    Raises:
+        HTTPException: 400 pokud je některá měna neplatná nebo je jich příliš mnoho.
+
+    Example:
+        GET /wallet/analytics/forecasts?currencies=EUR,USD&days=7
+
+        Response:
+        {
+            "forecasts": {
+                "EUR": {"status": "ready", "currency": "EUR", "forecast": [...]},
+                "USD": {"status": "processing", "currency": "USD", ...}
+            },
+            "timestamp": "2026-01-18T10:00:00"
         }
+    """
+    return await _get_batch_forecasts(
+        request, currencies.split(","), days, history_days, force_refresh, model
+    )
+
+
+@router.post("/forecasts")
+async def post_forecasts(request: Request, payload: BatchForecastRequest) -> dict:
+    """
+    Získá prognózy pro více měn jedním požadavkem (POST varianta).
+
+    Vhodné pro dlouhé seznamy měn, které se nevejdou do query stringu.
+    Chování a formát odpovědi jsou shodné s GET /forecasts.
+
+    Args:
+        request (Request): FastAPI request objekt.
+        payload (BatchForecastRequest): Seznam měn a parametry prognózy.
+
+    Returns:
+        dict: Slovník "forecasts" s prognózami podle kódu měny.
+
+    Example:
+        POST /wallet/analytics/forecasts
+        {"currencies": ["EUR", "USD"], "days": 14}
+    """
+    return await _get_batch_forecasts(
+        request,
+        payload.currencies,
+        payload.days,
+        payload.history_days,
+        payload.force_refresh,
+        payload.model,
+    )
 
 
 @router.get("/forecast/{currency}/status")
 async def get_forecast_status(
     request: Request,
     currency: str,
+    model: Optional[str] = Query(default=None, description="Název modelu prognózy"),
 ) -> dict:
     """
     Zjistí stav prognózy pro zadanou měnu.
 
     Tento endpoint je užitečný pro polling - umožňuje klientovi
     zjistit, zda je prognóza již k dispozici v cache, jaký je
-    její TTL a kdy byla vygenerována.
+    její TTL a kdy byla vygenerována. Stav se zjistí jedním
+    round-tripem do Redis z metadat, bez načtení celé prognózy.
 
     Args:
         request (Request): FastAPI request objekt.
         currency (str): ISO kód měny.
+        model (Optional[str]): Název modelu (výchozí podle konfigurace měny).
 
     Returns:
         dict: Informace o stavu prognózy:
             - available: True/False
             - currency: kód měny
-            - ttl_seconds: zbývající čas platnosti cache
+            - ttl_seconds: zbývající čas do měkké expirace prognózy
+            - stale: True pokud je prognóza po měkké expiraci
             - generated_at: timestamp generování (pokud k dispozici)
 
     Example:
@@ -152,20 +472,28 @@ async def get_forecast_status(
         }
     """
     currency = currency.upper().strip()
-    redis_client = request.app.state.redis
+    models = _resolve_models(request, [currency], _validate_model(model))
     
-    # Kontrola existence v cache
-    forecast = await get_forecast_from_cache(redis_client, currency)
-    ttl = await get_cache_ttl(redis_client, currency)
+    # Kontrola existence v cache (TTL + metadata v jedné pipeline)
+    statuses = await get_forecast_statuses(
+        request.app.state.redis,
+        [currency],
+        request.app.state.forecast_history_days,
+        request.app.state.forecast_max_days,
+        models,
+    )
+    status = statuses[currency]
     
-    if forecast:
+    if status["available"]:
         return {
             "available": True,
             "currency": currency,
-            "ttl_seconds": ttl if ttl > 0 else 0,
-            "generated_at": forecast.get("generated_at"),
-            "cached_at": forecast.get("cached_at"),
-            "history_points": forecast.get("history_points", 0),
+            "model": models[currency],
+            "ttl_seconds": _fresh_ttl_seconds(status, status["key_ttl"]),
+            "stale": is_forecast_stale(status),
+            "generated_at": status["generated_at"],
+            "cached_at": status["cached_at"],
+            "history_points": status["history_points"],
         }
     else:
         return {
@@ -176,6 +504,237 @@ async def get_forecast_status(
         }
 
 
+@router.get("/forecast/{base}/{quote}")
+async def get_cross_forecast(
+    request: Request,
+    base: str,
+    quote: str,
+    days: int = Query(default=7, ge=1, le=365, description="Počet dnů pro predikci"),
+    history_days: Optional[int] = Query(
+        default=None, ge=2, le=365, description="Počet dnů historie pro trénink modelu"
+    ),
+    model: Optional[str] = Query(default=None, description="Název modelu prognóz obou měn"),
+) -> dict:
+    """
+    Získá prognózu křížového kurzu páru BASE/QUOTE (cena 1 BASE v QUOTE).
+
+    Prognóza páru se neodhaduje samostatným modelem, ale odvodí se
+    z prognóz obou měn vůči hlavní měně (načtených z cache jedním MGET,
+    chybějící se dopočítají). Interval spolehlivosti se šíří z intervalů
+    obou prognóz. Odvozené prognózy se drží v LRU cache workeru
+    a přepočet kterékoli ze zdrojových prognóz je zneplatní.
+
+    Routa je registrována za /forecast/{currency}/status, takže
+    /forecast/EUR/status zůstává stavovým endpointem.
+
+    Args:
+        request (Request): FastAPI request objekt.
+        base (str): ISO kód měny BASE (např. "EUR").
+        quote (str): ISO kód měny QUOTE (např. "USD").
+        days (int): Počet dnů pro predikci (1 až FORECAST_MAX_DAYS). Výchozí: 7.
+        history_days (Optional[int]): Počet dnů historie pro trénink (2-365).
+        model (Optional[str]): Název modelu pro obě měny
+                               (výchozí podle konfigurace měny).
+
+    Returns:
+        dict: Odpověď ve formátu:
+            - status: "ready" nebo "processing"
+            - pair, base, quote: pár a kódy měn
+            - generated_at: čas generování starší ze zdrojových prognóz
+            - stale: True pokud je některá ze zdrojových prognóz zastaralá
+            - memoized: True pokud byl pár vydán z cache odvozených párů
+            - sources: model, generated_at a history_points zdrojových prognóz
+            - forecast: seznam predikcí páru (pokud status="ready")
+
+    Raises:
+        HTTPException: 400 pokud je některá měna neplatná, BASE a QUOTE
+                       jsou stejné, days překračuje maximální horizont
+                       nebo model není registrován.
+
+    Example:
+        GET /wallet/analytics/forecast/EUR/USD?days=7
+
+        Response:
+        {
+            "status": "ready",
+            "pair": "EUR/USD",
+            "base": "EUR",
+            "quote": "USD",
+            "forecast": [
+                {"date": "2026-01-19", "value": 1.084512, "conf_low": 1.071203, "conf_high": 1.097986},
+                ...
+            ],
+            ...
+        }
+    """
+    base = _normalize_currency(base)
+    quote = _normalize_currency(quote)
+    if base == quote:
+        raise HTTPException(status_code=400, detail="Měny páru musí být různé.")
+
+    max_days = _validate_days(request, days)
+    models = _resolve_models(request, [base, quote], _validate_model(model))
+    history_days = history_days or request.app.state.forecast_history_days
+
+    forecasts = await get_or_compute_forecasts(
+        redis_client=request.app.state.redis,
+        currencies=[base, quote],
+        http_client=request.app.state.http_client,
+        forecaster=request.app.state.forecaster,
+        ttl=request.app.state.forecast_ttl,
+        stale_ttl=request.app.state.forecast_stale_ttl,
+        history_days=history_days,
+        forecast_days=max_days,
+        max_concurrency=2,
+        models=models,
+    )
+
+    return build_cross_response(
+        base,
+        quote,
+        forecasts[base],
+        forecasts[quote],
+        days,
+        history_days,
+        request.app.state.cross_cache,
+    )
+
+
+async def _stream_snapshot(
+    request: Request,
+    codes: list[str],
+    days: int,
+    history_days: int,
+    max_days: int,
+    models: dict[str, str],
+) -> list[bytes]:
+    """
+    Sestaví úvodní snímek streamu - aktuální prognózy odebíraných měn.
+
+    Čerstvé prognózy se vydají z předpočítaných odpovědí, ostatní přes
+    cache-first výpočet (zastaralé se přepočítají na pozadí a klient
+    novou prognózu dostane jako aktualizaci).
+    """
+    redis_client = request.app.state.redis
+    frames = []
+    missing = []
+
+    for code in codes:
+        precomputed = await get_precomputed_response(
+            redis_client, code, history_days, max_days, models[code]
+        )
+        if precomputed is None or not get_fresh_ttl(precomputed):
+            missing.append(code)
+            continue
+        body, etag = render_precomputed_response(precomputed, days)
+        frames.append(format_sse_event("forecast", body, etag.strip('"')))
+
+    if missing:
+        forecasts = await get_or_compute_forecasts(
+            redis_client=redis_client,
+            currencies=missing,
+            http_client=request.app.state.http_client,
+            forecaster=request.app.state.forecaster,
+            ttl=request.app.state.forecast_ttl,
+            stale_ttl=request.app.state.forecast_stale_ttl,
+            history_days=history_days,
+            forecast_days=max_days,
+            max_concurrency=request.app.state.forecast_batch_concurrency,
+            models=models,
+        )
+        for code, forecast in forecasts.items():
+            response = build_forecast_response(code, forecast, days)
+            body = json.dumps(response, ensure_ascii=False, separators=(",", ":"))
+            frames.append(format_sse_event("forecast", body.encode("utf-8")))
+
+    return frames
+
+
+@router.get("/stream", response_model=None)
+async def stream_forecasts(
+    request: Request,
+    currencies: str = Query(..., description="Seznam kódů měn oddělených čárkou, např. EUR,USD"),
+    days: int = Query(default=7, ge=1, le=365, description="Počet dnů pro predikci"),
+    history_days: Optional[int] = Query(
+        default=None, ge=2, le=365, description="Počet dnů historie pro trénink modelu"
+    ),
+    model: Optional[str] = Query(default=None, description="Název modelu prognózy"),
+) -> StreamingResponse:
+    """
+    Stream aktualizací prognóz (Server-Sent Events).
+
+    Náhrada pollingu stavového endpointu: klient se přihlásí k odběru
+    zvolených měn, hned dostane aktuální prognózy (úvodní snímek)
+    a poté každou nově uloženou prognózu - ať ji spočítal plánovač,
+    nebo výpočet na vyžádání na libovolném workeru. Každá událost
+    "forecast" má stejné tělo jako odpověď /forecast/{currency}.
+    Nečinné spojení udržuje komentář keepalive.
+
+    Args:
+        request (Request): FastAPI request objekt.
+        currencies (str): Kódy měn oddělené čárkou.
+        days (int): Počet dnů pro predikci. Výchozí: 7.
+        history_days (Optional[int]): Počet dnů historie pro trénink.
+        model (Optional[str]): Název modelu pro všechny měny
+                               (výchozí podle konfigurace měny).
+
+    Returns:
+        StreamingResponse: Stream text/event-stream.
+
+    Raises:
+        HTTPException: 400 pro neplatné parametry, 503 při dosažení
+                       limitu odběratelů na workeru.
+
+    Example:
+        GET /wallet/analytics/stream?currencies=EUR,USD&days=7
+
+        event: forecast
+        id: 3f1c9a0b2d4e5f6a7b8c-7
+        data: {"status":"ready","currency":"EUR",...,"forecast":[...]}
+    """
+    codes = _normalize_currencies(currencies.split(","))
+    max_days = _validate_days(request, days)
+    models = _resolve_models(request, codes, _validate_model(model))
+    history_days = history_days or request.app.state.forecast_history_days
+
+    # Odběr vzniká před úvodním snímkem, aby se neztratila aktualizace
+    # uložená mezi načtením snímku a přihlášením
+    broadcaster = request.app.state.broadcaster
+    keys = [build_forecast_key(code, history_days, max_days, models[code]) for code in codes]
+    subscription = broadcaster.subscribe(keys, days)
+    if subscription is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Dosažen maximální počet odběratelů streamu. Zkuste to prosím později.",
+        )
+
+    async def events():
+        try:
+            yield f"retry: {DEFAULT_RETRY_MS}\n\n".encode("utf-8")
+
+            # Souběžné načítání snímků je omezené, aby hromadné připojení
+            # klientů (např. po nasazení) nezahltilo Redis a výpočty
+            async with broadcaster.snapshot_semaphore:
+                snapshot = await _stream_snapshot(request, codes, days, history_days, max_days, models)
+            yield b"".join(snapshot)
+
+            # Aktualizace rozesílané přes Redis pub/sub (viz ForecastBroadcaster)
+            heartbeat = request.app.state.stream_heartbeat_interval
+            while True:
+                frames = await subscription.next_events(heartbeat)
+                yield b"".join(frames) if frames else b": keepalive\n\n"
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Odhlášení i pro klienta odpojeného dřív, než stream začal
+        background=BackgroundTask(broadcaster.unsubscribe, subscription),
+    )
+
+
 @router.get("/currencies")
 async def list_supported_currencies(request: Request) -> dict:
     """
@@ -183,6 +742,7 @@ async def list_supported_currencies(request: Request) -> dict:
 
     Tento endpoint vrací seznam měn nakonfigurovaných v plánovači
     a informaci o tom, které z nich mají aktuální prognózu v cache.
+    Stav všech měn se zjistí jedním round-tripem do Redis.
 
     Args:
         request (Request): FastAPI request objekt.
@@ -202,24 +762,191 @@ async def list_supported_currencies(request: Request) -> dict:
             ]
         }
     """
-    redis_client = request.app.state.redis
     scheduler = request.app.state.scheduler
     
     # Získání seznamu měn z plánovače
     currencies = scheduler.currencies if scheduler else ["EUR", "USD"]
     
+    models = _resolve_models(request, [currency.upper() for currency in currencies], None)
+    statuses = await get_forecast_statuses(
+        request.app.state.redis,
+        currencies,
+        request.app.state.forecast_history_days,
+        request.app.state.forecast_max_days,
+        models,
+    )
+    
     result = []
     for currency in currencies:
-        forecast = await get_forecast_from_cache(redis_client, currency)
-        ttl = await get_cache_ttl(redis_client, currency)
+        status = statuses[currency.upper()]
         
         result.append({
             "code": currency,
-            "has_forecast": forecast is not None,
-            "ttl_seconds": ttl if ttl > 0 else 0,
+            "model": models[currency.upper()],
+            "has_forecast": status["available"],
+            "ttl_seconds": _fresh_ttl_seconds(status, status["key_ttl"]) if status["available"] else 0,
         })
     
     return {
         "currencies": result,
         "timestamp": datetime.now().isoformat(),
     }
+
+
+def _require_admin(request: Request, admin_token: Optional[str]) -> None:
+    """
+    Ověří token administrátorského endpointu.
+
+    Bez nastaveného ADMIN_TOKEN jsou administrátorské endpointy zakázané.
+    Tokeny se porovnávají v konstantním čase (hmac.compare_digest).
+
+    Raises:
+        HTTPException: 403 pokud ADMIN_TOKEN není nastaven, nebo token
+                       chybí či nesouhlasí.
+    """
+    expected = request.app.state.admin_token
+    if not expected:
+        raise HTTPException(status_code=403, detail="Administrátorské endpointy nejsou povoleny (chybí ADMIN_TOKEN).")
+    if not hmac.compare_digest((admin_token or "").encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Neplatný administrátorský token.")
+
+
+@router.get("/admin/backtest")
+async def get_backtest(
+    request: Request,
+    currencies: Optional[str] = Query(
+        default=None, description="Kódy měn oddělené čárkou (výchozí: měny plánovače)"
+    ),
+    model: Optional[str] = Query(default=None, description="Název modelu prognózy"),
+    history_days: Optional[int] = Query(
+        default=None, ge=2, le=365, description="Délka trénovacího okna ve dnech"
+    ),
+    horizon: int = Query(default=DEFAULT_BACKTEST_HORIZON, ge=1, le=90, description="Horizont prognózy"),
+    days: int = Query(
+        default=DEFAULT_BACKTEST_DAYS, ge=2, le=365, description="Rozsah přehrávané historie ve dnech"
+    ),
+    step: int = Query(default=1, ge=1, description="Krok mezi počátky prognóz"),
+    x_admin_token: Optional[str] = Header(default=None),
+) -> dict:
+    """
+    Zpětný test (walk-forward) prognóz nad uloženou historií měn.
+
+    Pro každou měnu přehraje historii za posledních `days` dní, v každém
+    dni natrénuje model na okně `history_days` dní a porovná prognózu
+    se skutečnými kurzy. Měny se testují souběžně, výpočet běží v poolu
+    výpočtů. Vyžaduje hlavičku X-Admin-Token s hodnotou ADMIN_TOKEN.
+
+    Args:
+        request (Request): FastAPI request objekt.
+        currencies (Optional[str]): Kódy měn oddělené čárkou.
+        model (Optional[str]): Název modelu (výchozí podle konfigurace měny).
+        history_days (Optional[int]): Délka trénovacího okna.
+                                      Výchozí: FORECAST_HISTORY_DAYS.
+        horizon (int): Horizont prognózy ve dnech. Výchozí: 7.
+        days (int): Rozsah přehrávané historie ve dnech. Výchozí: 365.
+        step (int): Krok mezi počátky prognóz. Výchozí: 1.
+        x_admin_token (Optional[str]): Administrátorský token z hlavičky.
+
+    Returns:
+        dict: Výsledky podle kódu měny (None, pokud historie nestačí).
+
+    Raises:
+        HTTPException: 400 pro neplatnou měnu nebo model, 403 pro neplatný token.
+
+    Example:
+        GET /wallet/analytics/admin/backtest?currencies=EUR&horizon=7
+
+        Response:
+        {
+            "results": {
+                "EUR": {"model": "linear", "origins": 275, "mae": 0.041,
+                        "mape": 0.16, "coverage": 95.1, "by_horizon": [...]}
+            },
+            "timestamp": "2026-01-18T10:00:00"
+        }
+    """
+    _require_admin(request, x_admin_token)
+
+    scheduler = request.app.state.scheduler
+    if currencies:
+        codes = [_normalize_currency(currency) for currency in currencies.split(",") if currency.strip()]
+    else:
+        codes = [currency.upper() for currency in (scheduler.currencies if scheduler else ["EUR", "USD"])]
+    codes = list(dict.fromkeys(codes))
+
+    models = _resolve_models(request, codes, _validate_model(model))
+    history_days = history_days or request.app.state.forecast_history_days
+
+    results = await asyncio.gather(*(
+        run_backtest(
+            request.app.state.forecaster,
+            code,
+            history_days=history_days,
+            horizon=horizon,
+            model=models[code],
+            days=days,
+            step=step,
+        )
+        for code in codes
+    ))
+
+    return {
+        "results": dict(zip(codes, results)),
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+@router.post("/hooks/rates-updated", status_code=202)
+async def post_rates_updated(
+    request: Request,
+    payload: RatesUpdatedRequest,
+    x_admin_token: Optional[str] = Header(default=None),
+) -> dict:
+    """
+    Webhook o aktualizaci kurzů - vyvolá přepočet dotčených prognóz.
+
+    Signál se zapíše do Redis streamu, odkud ho převezme lídr plánovače
+    (na kterémkoli workeru) a po krátkém sdružení signálů přepočítá
+    pouze dotčené měny. Symfony může místo webhooku zapisovat do streamu
+    přímo (XADD). Vyžaduje hlavičku X-Admin-Token s hodnotou ADMIN_TOKEN
+    (bez nastaveného tokenu je webhook zakázán - full_sync by jinak umožnil
+    komukoli vynutit plnou synchronizaci historie ze Symfony API).
+
+    Args:
+        request (Request): FastAPI request objekt.
+        payload (RatesUpdatedRequest): Měny s novými kurzy.
+        x_admin_token (Optional[str]): Token interních endpointů.
+
+    Returns:
+        dict: Přijaté měny a ID signálu ve streamu.
+
+    Raises:
+        HTTPException: 403 pokud ADMIN_TOKEN není nastaven nebo token nesouhlasí,
+                       400 pro neplatné měny, 503 pokud není přepočet
+                       po aktualizaci kurzů zapnut.
+
+    Example:
+        POST /wallet/analytics/hooks/rates-updated
+        {"currencies": ["EUR", "USD"]}
+
+        Response (202):
+        {"accepted": ["EUR", "USD"], "full_sync": false, "id": "1768730401123-0"}
+    """
+    _require_admin(request, x_admin_token)
+
+    if not request.app.state.rate_trigger_enabled:
+        raise HTTPException(
+            status_code=503,
+            detail="Přepočet po aktualizaci kurzů není zapnut (FORECAST_TRIGGER_MODE).",
+        )
+
+    codes = _normalize_currencies(payload.currencies)
+    entry_id = await publish_rates_updated(
+        request.app.state.redis, codes, full_sync=payload.full_sync, source="webhook"
+    )
+
+    return {
+        "accepted": codes,
+        "full_sync": payload.full_sync,
+        "id": entry_id,
+    }
@@ -0,0 +1,151 @@
+"""
+Smart Trend Forecaster - Modul pro deduplikaci souběžných výpočtů.
+
+Tento modul poskytuje dvě úrovně ochrany proti "cache stampede":
+- SingleFlight: v rámci jednoho procesu sdílí souběžní volající
+  jeden rozpracovaný výpočet (jednu asyncio úlohu).
+- RedisLock: mezi workery a replikami zajistí zámek v Redis
+  (SET NX PX), že výpočet běží pouze jednou.
+"""
+
+import asyncio
+import logging
+import uuid
+from typing import Awaitable, Callable, Optional, TypeVar
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+
+T = TypeVar("T")
+
+# Lua skript pro bezpečné uvolnění zámku - smaže klíč pouze tehdy,
+# pokud stále obsahuje token vlastníka (zámek mezitím mohl vypršet
+# a získat jej jiný worker)
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+else
+    return 0
+end
+"""
+
+
+class SingleFlight:
+    """
+    Deduplikace souběžných asynchronních volání v rámci procesu.
+
+    První volající pro daný klíč spustí výpočet jako samostatnou
+    asyncio úlohu, ostatní souběžní volající čekají na její výsledek.
+    Zrušení jednoho čekajícího (např. odpojení klienta) nezruší
+    výpočet pro ostatní.
+
+    Attributes:
+        _calls (dict[str, asyncio.Task]): Rozpracované výpočty podle klíče.
+    """
+
+    def __init__(self):
+        """
+        Inicializace prázdné tabulky rozpracovaných výpočtů.
+        """
+        self._calls: dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Provede výpočet pro klíč, nebo se připojí k již běžícímu.
+
+        Args:
+            key (str): Klíč deduplikace (např. kód měny).
+            fn (Callable[[], Awaitable[T]]): Továrna na korutinu s výpočtem.
+
+        Returns:
+            T: Výsledek sdíleného výpočtu.
+
+        Example:
+            >>> flight = SingleFlight()
+            >>> result = await flight.do("EUR", lambda: compute("EUR"))
+        """
+        task = self._calls.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        """
+        Vrátí počet právě rozpracovaných výpočtů.
+
+        Returns:
+            int: Počet klíčů s běžícím výpočtem.
+        """
+        return len(self._calls)
+
+
+class RedisLock:
+    """
+    Distribuovaný zámek v Redis založený na SET NX PX.
+
+    Zámek má omezenou dobu platnosti, takže při pádu vlastníka
+    se automaticky uvolní. Uvolnění je atomické (Lua skript)
+    a smaže pouze zámek, který stále patří tomuto vlastníkovi.
+
+    Attributes:
+        redis_client (redis.Redis): Asynchronní Redis klient.
+        key (str): Klíč zámku v Redis.
+        ttl_ms (int): Doba platnosti zámku v milisekundách.
+        token (str): Náhodný identifikátor vlastníka zámku.
+    """
+
+    def __init__(self, redis_client: redis.Redis, key: str, ttl_ms: int):
+        """
+        Inicializace zámku (bez jeho získání).
+
+        Args:
+            redis_client (redis.Redis): Asynchronní Redis klient.
+            key (str): Klíč zámku.
+            ttl_ms (int): Doba platnosti zámku v milisekundách.
+        """
+        self.redis_client = redis_client
+        self.key = key
+        self.ttl_ms = ttl_ms
+        self.token = uuid.uuid4().hex
+
+    async def acquire(self) -> bool:
+        """
+        Pokusí se získat zámek (neblokující).
+
+        Returns:
+            bool: True pokud byl zámek získán, False pokud jej drží jiný vlastník.
+        """
+        acquired = await self.redis_client.set(self.key, self.token, nx=True, px=self.ttl_ms)
+        return bool(acquired)
+
+    async def release(self) -> bool:
+        """
+        Uvolní zámek, pokud jej tento vlastník stále drží.
+
+        Returns:
+            bool: True pokud byl zámek smazán.
+        """
+        try:
+            deleted = await self.redis_client.eval(RELEASE_LOCK_SCRIPT, 1, self.key, self.token)
+            return bool(deleted)
+        except Exception as e:
+            logger.warning("Chyba při uvolňování zámku %s: %s", self.key, e)
+            return False
+
+    async def is_held_elsewhere(self) -> Optional[bool]:
+        """
+        Zjistí, zda zámek stále drží jiný vlastník.
+
+        Returns:
+            Optional[bool]: True/False, nebo None pokud se stav nepodařilo zjistit.
+        """
+        try:
+            owner = await self.redis_client.get(self.key)
+            return owner is not None and owner != self.token
+        except Exception:
+            return None
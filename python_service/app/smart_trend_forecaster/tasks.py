@@ -7,12 +7,43 @@ na pozadí a automaticky obnovují prognózy v pravidelných intervalech.
 """
 
 import asyncio
+import logging
+import time
 from typing import Optional
 from datetime import datetime
+import httpx
 import redis.asyncio as redis
 
 from .forecaster import CurrencyForecaster
-from .cache import save_forecast_to_cache, get_forecast_from_cache
+from .cache import (
+    save_forecast_to_cache,
+    get_forecast_from_cache,
+    get_forecasts_from_cache,
+    get_forecast_statuses,
+    get_forecast_age,
+    is_forecast_stale,
+    DEFAULT_TTL,
+    DEFAULT_STALE_TTL,
+    DEFAULT_HISTORY_DAYS,
+    DEFAULT_FORECAST_DAYS,
+)
+from .singleflight import SingleFlight, RedisLock
+from .rate_limit import TokenBucket
+from .leader import LeaderElection
+from .triggers import RateUpdateTrigger
+from .models import DEFAULT_MODEL, LinearModel, resolve_model
+from .logs import log_context
+from .warmup import save_forecast_snapshot
+from .metrics import (
+    CACHE_HITS,
+    CACHE_MISSES,
+    CACHE_STALE,
+    SCHEDULER_CYCLE_SECONDS,
+    SCHEDULER_REFRESHES_TOTAL,
+    observe_forecast_timestamp,
+)
+
+logger = logging.getLogger(__name__)
 
 
 # Výchozí interval pro aktualizaci prognóz (1 hodina v sekundách)
@@ -21,6 +52,42 @@ DEFAULT_UPDATE_INTERVAL = 3600
 # Seznam měn pro automatické prognózování
 DEFAULT_CURRENCIES = ["EUR", "USD", "GBP", "PLN", "CHF"]
 
+# Výchozí maximální počet měn aktualizovaných souběžně
+DEFAULT_REFRESH_CONCURRENCY = 4
+
+# Výchozí limit volání Symfony API při hromadné aktualizaci (za sekundu)
+DEFAULT_REFRESH_RATE = 5.0
+
+# Výchozí počet volání, které lze provést okamžitě za sebou
+DEFAULT_REFRESH_BURST = 5
+
+# Výchozí timeout aktualizace jedné měny (v sekundách)
+DEFAULT_REFRESH_TIMEOUT = 60
+
+# Klíč s časem posledního dokončeného cyklu aktualizace (sdílený mezi instancemi,
+# aby nový lídr po převzetí role navázal na interval předchozího lídra)
+LAST_CYCLE_KEY = "wallet:scheduler:last_cycle"
+
+# Klíčový prefix pro zámky výpočtu prognóz v Redis
+FORECAST_LOCK_PREFIX = "wallet:lock:forecast:"
+
+# Doba platnosti zámku výpočtu (v sekundách) - zároveň maximální doba,
+# po kterou ostatní workery čekají na výsledek
+DEFAULT_LOCK_TTL = 60
+
+# Interval dotazování cache při čekání na výsledek jiného workeru (v sekundách)
+LOCK_POLL_INTERVAL = 0.2
+
+# Výchozí maximální počet souběžných výpočtů v hromadném požadavku
+DEFAULT_BATCH_CONCURRENCY = 4
+
+# Deduplikace souběžných výpočtů v rámci tohoto procesu
+_single_flight = SingleFlight()
+
+# Reference na běžící přepočty zastaralých prognóz na pozadí
+# (asyncio drží na úlohy pouze slabé reference)
+_background_refreshes: set[asyncio.Task] = set()
+
 
 class ForecastScheduler:
     """
@@ -36,6 +103,25 @@ class ForecastScheduler:
         forecaster (CurrencyForecaster): Instance třídy pro prognózování.
         currencies (list[str]): Seznam měn ke sledování.
         update_interval (int): Interval aktualizace v sekundách.
+        stale_ttl (int): Doba, po kterou se prognóza po intervalu vydává jako zastaralá.
+        history_days (int): Počet dnů historie pro trénink modelu.
+        forecast_days (int): Horizont prognózy ukládané do cache.
+        default_model (str): Výchozí model prognózy.
+        models (dict[str, str]): Model podle kódu měny.
+        http_client (Optional[httpx.AsyncClient]): Sdílený HTTP klient.
+        refresh_concurrency (int): Maximální počet souběžně aktualizovaných měn.
+        refresh_timeout (float): Timeout aktualizace jedné měny v sekundách.
+        rate_limiter (TokenBucket): Omezení rychlosti volání Symfony API.
+        last_cycle (Optional[dict]): Souhrn poslední hromadné aktualizace.
+        leader_election (Optional[LeaderElection]): Volba lídra mezi instancemi;
+            pokud je zadána, aktualizace provádí pouze instance, která je lídrem.
+        rate_trigger (Optional[RateUpdateTrigger]): Přepočet dotčených měn
+            po signálu o nových kurzech (intervalová smyčka zůstává jako pojistka).
+        last_trigger (Optional[dict]): Souhrn posledního přepočtu po signálu.
+        batch_fit (bool): Měny s lineárním modelem se trénují dávkově
+            (jedním průchodem NumPy pro všechny měny, viz batch_fit).
+        snapshot_path (Optional[str]): Lokální snapshot prognóz zapisovaný
+            po každém cyklu (obnova po restartu, viz warmup).
         _task (asyncio.Task): Reference na běžící úlohu na pozadí.
         _running (bool): Příznak, zda plánovač běží.
     """
@@ -45,6 +131,21 @@ class ForecastScheduler:
         redis_client: redis.Redis,
         currencies: Optional[list[str]] = None,
         update_interval: int = DEFAULT_UPDATE_INTERVAL,
+        http_client: Optional[httpx.AsyncClient] = None,
+        stale_ttl: int = DEFAULT_STALE_TTL,
+        history_days: int = DEFAULT_HISTORY_DAYS,
+        forecast_days: int = DEFAULT_FORECAST_DAYS,
+        refresh_concurrency: int = DEFAULT_REFRESH_CONCURRENCY,
+        refresh_rate: float = DEFAULT_REFRESH_RATE,
+        refresh_burst: int = DEFAULT_REFRESH_BURST,
+        refresh_timeout: float = DEFAULT_REFRESH_TIMEOUT,
+        leader_election: Optional[LeaderElection] = None,
+        forecaster: Optional[CurrencyForecaster] = None,
+        default_model: str = DEFAULT_MODEL,
+        models: Optional[dict[str, str]] = None,
+        rate_trigger: Optional[RateUpdateTrigger] = None,
+        batch_fit: bool = False,
+        snapshot_path: Optional[str] = None,
     ):
         """
         Inicializace plánovače prognóz.
@@ -58,11 +159,59 @@ class ForecastScheduler:
                                               Výchozí: ["EUR", "USD", "GBP", "PLN", "CHF"]
             update_interval (int): Interval mezi aktualizacemi v sekundách.
                                    Výchozí: 3600 (1 hodina).
+            http_client (Optional[httpx.AsyncClient]): Sdílený HTTP klient
+                                   pro volání Symfony API.
+            stale_ttl (int): Doba v sekundách, po kterou se prognóza po vypršení
+                                   intervalu ještě vydává jako zastaralá.
+            history_days (int): Počet dnů historie pro trénink. Výchozí: 90.
+            forecast_days (int): Horizont prognózy ukládané do cache.
+                                   Výchozí: 30 (kratší horizonty se oříznou).
+            refresh_concurrency (int): Maximální počet souběžně aktualizovaných
+                                   měn. Výchozí: 4.
+            refresh_rate (float): Maximální počet volání Symfony API za sekundu.
+                                   Výchozí: 5.
+            refresh_burst (int): Počet volání, které lze provést okamžitě
+                                   za sebou. Výchozí: 5.
+            refresh_timeout (float): Timeout aktualizace jedné měny v sekundách.
+                                   Výchozí: 60.
+            leader_election (Optional[LeaderElection]): Volba lídra. Pokud je
+                                   zadána, smyčka aktualizací běží pouze v instanci,
+                                   která drží pronájem, ostatní čekají v pohotovosti.
+            forecaster (Optional[CurrencyForecaster]): Sdílená instance pro výpočet
+                                   prognóz (např. s poolem výpočtů). Výchozí: nová
+                                   instance se sdíleným http_client.
+            default_model (str): Výchozí model prognózy. Výchozí: "linear".
+            models (Optional[dict[str, str]]): Model podle kódu měny
+                                   (přebíjí default_model).
+            rate_trigger (Optional[RateUpdateTrigger]): Odběr signálů o nových
+                                   kurzech. Pokud je zadán, lídr navíc přepočítá
+                                   dotčené měny hned po aktualizaci kurzů.
+            batch_fit (bool): Trénovat měny s lineárním modelem dávkově
+                                   místo samostatného výpočtu pro každou měnu.
+                                   Výchozí: False.
+            snapshot_path (Optional[str]): Soubor, do kterého lídr po každém
+                                   cyklu zapíše prognózy sledovaných měn.
+                                   Výchozí: bez snapshotu.
         """
         self.redis_client = redis_client
-        self.forecaster = CurrencyForecaster()
+        self.http_client = http_client
+        self.forecaster = forecaster or CurrencyForecaster(http_client=http_client)
         self.currencies = currencies or DEFAULT_CURRENCIES
         self.update_interval = update_interval
+        self.stale_ttl = stale_ttl
+        self.history_days = history_days
+        self.forecast_days = forecast_days
+        self.default_model = default_model
+        self.models = models or {}
+        self.refresh_concurrency = refresh_concurrency
+        self.refresh_timeout = refresh_timeout
+        self.rate_limiter = TokenBucket(refresh_rate, refresh_burst)
+        self.last_cycle: Optional[dict] = None
+        self.leader_election = leader_election
+        self.rate_trigger = rate_trigger
+        self.last_trigger: Optional[dict] = None
+        self.batch_fit = batch_fit
+        self.snapshot_path = snapshot_path or None
         self._task: Optional[asyncio.Task] = None
         self._running = False
 
@@ -84,44 +233,40 @@ class ForecastScheduler:
             >>> print(f"EUR aktualizace: {'OK' if success else 'FAILED'}")
         """
         try:
-            print(f"[{datetime.now().isoformat()}] Aktualizuji prognózu pro {currency}...")
-            
-            # Výpočet prognózy
-            forecast = await self.forecaster.get_forecast(
-                currency=currency,
-                history_days=90,
-                forecast_days=7,
-            )
+            logger.debug("Aktualizuji prognózu pro %s", currency)
             
-            if forecast is None:
-                print(f"  ⚠ Prognóza pro {currency} se nepodařila vypočítat")
-                return False
-            
-            # Uložení do cache
-            success = await save_forecast_to_cache(
+            # Výpočet prognózy a uložení do cache (deduplikováno se souběžnými
+            # požadavky v tomto procesu i s ostatními workery)
+            forecast = await compute_and_cache_forecast(
                 self.redis_client,
                 currency,
-                forecast,
+                forecaster=self.forecaster,
                 ttl=self.update_interval,
+                stale_ttl=self.stale_ttl,
+                history_days=self.history_days,
+                forecast_days=self.forecast_days,
+                model=resolve_model(currency, None, self.models, self.default_model),
             )
             
-            if success:
-                print(f"  ✓ Prognóza pro {currency} uložena do cache")
-            else:
-                print(f"  ✗ Nepodařilo se uložit prognózu pro {currency}")
+            if forecast is None:
+                logger.warning("Prognóza pro %s se nepodařila vypočítat", currency)
+                return False
             
-            return success
+            logger.debug("Prognóza pro %s uložena do cache", currency)
+            return True
             
-        except Exception as e:
-            print(f"  ✗ Chyba při aktualizaci {currency}: {e}")
+        except Exception:
+            logger.exception("Chyba při aktualizaci prognózy pro %s", currency)
             return False
 
     async def update_all_forecasts(self) -> dict[str, bool]:
         """
         Aktualizuje prognózy pro všechny sledované měny.
 
-        Iteruje přes všechny nakonfigurované měny a aktualizuje
-        jejich prognózy. Vrací souhrn úspěšnosti pro každou měnu.
+        Měny se aktualizují souběžně (nejvýše refresh_concurrency najednou),
+        volání Symfony API jsou omezena token bucketem a každá měna má
+        vlastní timeout, takže pomalá nebo chybující měna nezdrží ostatní.
+        Souhrn cyklu (doba trvání, chyby) se uloží do atributu last_cycle.
 
         Returns:
             dict[str, bool]: Slovník s měnami jako klíči a bool hodnotami
@@ -132,46 +277,318 @@ class ForecastScheduler:
             >>> print(results)
             {"EUR": True, "USD": True, "GBP": False}
         """
-        results = {}
-        print(f"\n[{datetime.now().isoformat()}] === Zahajuji hromadnou aktualizaci prognóz ===")
+        started_at = datetime.now()
+        started = time.monotonic()
+        logger.info("Zahajuji hromadnou aktualizaci prognóz", extra={"currencies": len(self.currencies)})
         
-        for currency in self.currencies:
-            results[currency] = await self.update_forecast_for_currency(currency)
-            # Malá pauza mezi měnami pro snížení zátěže API
-            await asyncio.sleep(1)
+        results, failures = await self._refresh_currencies(self.currencies, "interval")
         
         successful = sum(1 for v in results.values() if v)
-        print(f"[{datetime.now().isoformat()}] === Aktualizace dokončena: {successful}/{len(self.currencies)} úspěšných ===\n")
+        duration = time.monotonic() - started
+        SCHEDULER_CYCLE_SECONDS.labels("interval").observe(duration)
+        self.last_cycle = {
+            "started_at": started_at.isoformat(),
+            "duration_seconds": round(duration, 3),
+            "total": len(results),
+            "successful": successful,
+            "failed": failures,
+        }
+
+        # Jediný souhrnný záznam za cyklus (jednotlivé měny jsou na úrovni DEBUG)
+        logger.log(
+            logging.WARNING if failures else logging.INFO,
+            "Aktualizace dokončena: %d/%d úspěšných za %.1fs",
+            successful,
+            len(self.currencies),
+            duration,
+            extra={"trigger": "interval", "duration_seconds": round(duration, 3), "failed": failures},
+        )
         
         return results
 
+    async def _refresh_currencies(
+        self, currencies: list[str], trigger: str
+    ) -> tuple[dict[str, bool], dict[str, str]]:
+        """
+        Souběžně aktualizuje zadané měny (limit souběhu, token bucket a timeout).
+
+        S batch_fit se měny s lineárním modelem aktualizují jedním dávkovým
+        tréninkem (viz _refresh_batch), ostatní jednotlivě.
+
+        Args:
+            currencies (list[str]): Kódy měn.
+            trigger (str): Spouštěč aktualizace pro metriky ("interval" nebo "event").
+
+        Returns:
+            tuple[dict[str, bool], dict[str, str]]: Úspěšnost podle měny
+                a důvody selhání ("timeout" nebo "error").
+        """
+        semaphore = asyncio.Semaphore(self.refresh_concurrency)
+        failures: dict[str, str] = {}
+
+        # V dávkovém režimu se měny s lineárním modelem trénují najednou
+        batched: list[str] = []
+        if self.batch_fit:
+            batched = [
+                currency
+                for currency in currencies
+                if resolve_model(currency, None, self.models, self.default_model) == LinearModel.name
+            ]
+        batched_set = set(batched)
+        single = [currency for currency in currencies if currency not in batched_set]
+
+        async def refresh(currency: str) -> bool:
+            with log_context(currency=currency, trigger=trigger):
+                return await refresh_one(currency)
+
+        async def refresh_one(currency: str) -> bool:
+            async with semaphore:
+                # Omezení rychlosti volání Symfony API
+                await self.rate_limiter.acquire()
+
+                try:
+                    success = await asyncio.wait_for(
+                        self.update_forecast_for_currency(currency),
+                        timeout=self.refresh_timeout,
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning("Aktualizace %s překročila timeout %ss", currency, self.refresh_timeout)
+                    failures[currency] = "timeout"
+                    SCHEDULER_REFRESHES_TOTAL.labels(trigger, "timeout").inc()
+                    return False
+
+                if not success:
+                    failures[currency] = "error"
+                SCHEDULER_REFRESHES_TOTAL.labels(trigger, "success" if success else "error").inc()
+                return success
+
+        outcomes, batch_results = await asyncio.gather(
+            asyncio.gather(*(refresh(currency) for currency in single)),
+            self._refresh_batch(batched, trigger, semaphore, failures),
+        )
+        results = {**dict(zip(single, outcomes)), **batch_results}
+        return {currency: results[currency] for currency in currencies}, failures
+
+    async def _refresh_batch(
+        self,
+        currencies: list[str],
+        trigger: str,
+        semaphore: asyncio.Semaphore,
+        failures: dict[str, str],
+    ) -> dict[str, bool]:
+        """
+        Aktualizuje měny s lineárním modelem jedním dávkovým tréninkem.
+
+        Historie se stahují souběžně se stejným limitem souběhu, token
+        bucketem a timeoutem jako při aktualizaci jednotlivých měn. Modely
+        všech měn se pak natrénují najednou (CurrencyForecaster.get_forecasts_batch)
+        a prognózy se uloží do cache. Výpočet dávky neprochází zámky
+        jednotlivých měn - běží pouze v lídrovi plánovače.
+
+        Args:
+            currencies (list[str]): Kódy měn s lineárním modelem.
+            trigger (str): Spouštěč aktualizace pro metriky ("interval" nebo "event").
+            semaphore (asyncio.Semaphore): Sdílený limit souběhu aktualizace.
+            failures (dict[str, str]): Důvody selhání (doplňují se).
+
+        Returns:
+            dict[str, bool]: Úspěšnost podle měny.
+        """
+        if not currencies:
+            return {}
+
+        async def fetch(currency: str) -> Optional[list[dict]]:
+            with log_context(currency=currency, trigger=trigger):
+                async with semaphore:
+                    await self.rate_limiter.acquire()
+                    try:
+                        return await asyncio.wait_for(
+                            self.forecaster.fetch_history(currency, self.history_days),
+                            timeout=self.refresh_timeout,
+                        )
+                    except asyncio.TimeoutError:
+                        logger.warning("Stažení historie %s překročilo timeout %ss", currency, self.refresh_timeout)
+                        failures[currency] = "timeout"
+                    except Exception:
+                        logger.exception("Chyba při stahování historie %s", currency)
+                    return None
+
+        fetched = await asyncio.gather(*(fetch(currency) for currency in currencies))
+        histories = {currency: history for currency, history in zip(currencies, fetched) if history}
+
+        forecasts: dict[str, Optional[dict]] = {}
+        if histories:
+            try:
+                forecasts = await asyncio.wait_for(
+                    self.forecaster.get_forecasts_batch(histories, self.forecast_days),
+                    timeout=self.refresh_timeout,
+                )
+            except asyncio.TimeoutError:
+                logger.warning("Dávkový trénink %d měn překročil timeout %ss", len(histories), self.refresh_timeout)
+                failures.update(dict.fromkeys(histories, "timeout"))
+            except Exception:
+                logger.exception("Chyba dávkového tréninku %d měn", len(histories))
+
+        async def save(currency: str, forecast: dict) -> bool:
+            async with semaphore:
+                return await save_forecast_to_cache(
+                    self.redis_client,
+                    currency,
+                    forecast,
+                    ttl=self.update_interval,
+                    stale_ttl=self.stale_ttl,
+                    history_days=self.history_days,
+                    forecast_days=self.forecast_days,
+                    model=LinearModel.name,
+                )
+
+        ready = [currency for currency, forecast in forecasts.items() if forecast]
+        outcomes = await asyncio.gather(*(save(currency, forecasts[currency]) for currency in ready))
+        saved = dict(zip(ready, outcomes))
+
+        results = {}
+        for currency in currencies:
+            success = saved.get(currency, False)
+            if not success:
+                failures.setdefault(currency, "error")
+            SCHEDULER_REFRESHES_TOTAL.labels(trigger, failures.get(currency, "success")).inc()
+            results[currency] = success
+        return results
+
+    async def refresh_updated_currencies(self, updates: dict[str, bool]) -> dict[str, bool]:
+        """
+        Přepočítá prognózy měn, pro které přišly nové kurzy.
+
+        Přepočítají se sledované měny a z ostatních jen ty, které mají
+        prognózu v cache (spočítanou na vyžádání). Měnám s vyžádanou
+        plnou synchronizací se nejdřív smaže uložená historie, aby se
+        načetly i zpětné korekce starších kurzů.
+
+        Args:
+            updates (dict[str, bool]): Měna -> vyžádána plná synchronizace historie.
+
+        Returns:
+            dict[str, bool]: Úspěšnost přepočtu podle měny.
+
+        Example:
+            >>> await scheduler.refresh_updated_currencies({"EUR": False, "USD": True})
+            {"EUR": True, "USD": True}
+        """
+        started_at = datetime.now()
+        started = time.monotonic()
+        tracked = set(self.currencies)
+        untracked = [code for code in updates if code not in tracked]
+
+        affected = [code for code in updates if code in tracked]
+        if untracked:
+            models = {
+                code: resolve_model(code, None, self.models, self.default_model) for code in untracked
+            }
+            statuses = await get_forecast_statuses(
+                self.redis_client, untracked, self.history_days, self.forecast_days, models
+            )
+            affected += [code for code in untracked if statuses[code]["available"]]
+
+        history_store = self.forecaster.history_store
+        if history_store is not None:
+            for code in affected:
+                if updates[code]:
+                    await history_store.invalidate(code)
+
+        results, failures = await self._refresh_currencies(affected, "event")
+        SCHEDULER_CYCLE_SECONDS.labels("event").observe(time.monotonic() - started)
+        self.last_trigger = {
+            "started_at": started_at.isoformat(),
+            "duration_seconds": round(time.monotonic() - started, 3),
+            "requested": sorted(updates),
+            "refreshed": sorted(code for code, success in results.items() if success),
+            "failed": failures,
+        }
+        return results
+
+    async def _seconds_until_next_cycle(self) -> float:
+        """
+        Vrátí, za kolik sekund má proběhnout další cyklus podle času
+        posledního cyklu uloženého v Redis (libovolnou instancí).
+
+        Returns:
+            float: Počet sekund do dalšího cyklu (0 = ihned).
+        """
+        try:
+            last_cycle_ts = await self.redis_client.get(LAST_CYCLE_KEY)
+        except Exception:
+            return 0.0
+
+        if last_cycle_ts is None:
+            return 0.0
+        return max(0.0, float(last_cycle_ts) + self.update_interval - time.time())
+
+    async def _mark_cycle_done(self) -> None:
+        """
+        Uloží čas dokončení cyklu do Redis pro případné převzetí role lídra.
+        """
+        try:
+            await self.redis_client.set(LAST_CYCLE_KEY, time.time(), ex=self.update_interval * 2)
+        except Exception as e:
+            logger.warning("Nepodařilo se uložit čas cyklu plánovače: %s", e)
+
+    async def _write_snapshot(self) -> None:
+        """
+        Zapíše prognózy sledovaných měn do lokálního snapshotu (je-li nastaven).
+        """
+        if not self.snapshot_path:
+            return
+        count = await save_forecast_snapshot(
+            self.redis_client,
+            self.snapshot_path,
+            self.currencies,
+            history_days=self.history_days,
+            forecast_days=self.forecast_days,
+            default_model=self.default_model,
+            models=self.models,
+        )
+        logger.debug("Snapshot prognóz zapsán", extra={"path": self.snapshot_path, "forecasts": count})
+
     async def _background_loop(self) -> None:
         """
         Hlavní smyčka na pozadí pro periodické aktualizace.
 
         Běží nekonečně a v pravidelných intervalech spouští
-        aktualizaci všech prognóz. Tato metoda by neměla být
-        volána přímo - použijte metodu start().
+        aktualizaci všech prognóz. Při zapnuté volbě lídra čeká
+        instance v pohotovosti, dokud nezíská pronájem. Lídr (nový
+        i po restartu) navazuje na interval posledního cyklu uloženého
+        v Redis, takže restart s platnými prognózami v cache nespouští
+        hned celou aktualizaci.
+        Tato metoda by neměla být volána přímo - použijte metodu start().
         """
-        print(f"[{datetime.now().isoformat()}] ForecastScheduler: Spuštěna smyčka na pozadí")
-        print(f"  Interval: {self.update_interval}s, Měny: {self.currencies}")
-        
-        # První aktualizace ihned po startu
-        await self.update_all_forecasts()
+        logger.info(
+            "Spuštěna smyčka plánovače na pozadí",
+            extra={"interval_seconds": self.update_interval, "currencies": self.currencies},
+        )
         
         while self._running:
             try:
+                if self.leader_election is not None and not self.leader_election.is_leader:
+                    # Pohotovost - aktualizace provádí jiná instance
+                    await self.leader_election.wait_until_leader()
+
+                delay = await self._seconds_until_next_cycle()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+
+                await self.update_all_forecasts()
+                await self._mark_cycle_done()
+                await self._write_snapshot()
+
                 # Čekání na další interval
                 await asyncio.sleep(self.update_interval)
-                
-                if self._running:
-                    await self.update_all_forecasts()
                     
             except asyncio.CancelledError:
-                print(f"[{datetime.now().isoformat()}] ForecastScheduler: Smyčka zrušena")
+                logger.info("Smyčka plánovače zrušena")
                 break
-            except Exception as e:
-                print(f"[{datetime.now().isoformat()}] ForecastScheduler: Neočekávaná chyba: {e}")
+            except Exception:
+                logger.exception("Neočekávaná chyba ve smyčce plánovače")
                 # Pokračovat v běhu i po chybě
                 await asyncio.sleep(60)
 
@@ -198,7 +615,11 @@ class ForecastScheduler:
             raise RuntimeError("ForecastScheduler je již spuštěn")
         
         self._running = True
+        if self.leader_election is not None:
+            self.leader_election.start()
         self._task = asyncio.create_task(self._background_loop())
+        if self.rate_trigger is not None:
+            self.rate_trigger.start(self.refresh_updated_currencies, self.leader_election)
         return self._task
 
     async def stop(self) -> None:
@@ -214,7 +635,7 @@ class ForecastScheduler:
         if not self._running:
             return
         
-        print(f"[{datetime.now().isoformat()}] ForecastScheduler: Zastavuji...")
+        logger.info("Zastavuji plánovač")
         self._running = False
         
         if self._task:
@@ -224,8 +645,25 @@ class ForecastScheduler:
             except asyncio.CancelledError:
                 pass
             self._task = None
+
+        if self.rate_trigger is not None:
+            await self.rate_trigger.stop()
         
-        print(f"[{datetime.now().isoformat()}] ForecastScheduler: Zastaven")
+        # Uvolnění pronájmu - jiná instance převezme roli lídra okamžitě
+        if self.leader_election is not None:
+            await self.leader_election.stop()
+        
+        logger.info("Plánovač zastaven")
+
+    @property
+    def is_leader(self) -> bool:
+        """
+        Vrátí, zda tato instance provádí aktualizace (je lídrem).
+
+        Returns:
+            bool: True pokud je instance lídrem, nebo volba lídra není zapnuta.
+        """
+        return self.leader_election is None or self.leader_election.is_leader
 
     @property
     def is_running(self) -> bool:
@@ -233,23 +671,345 @@ class ForecastScheduler:
         Vrátí stav plánovače.
 
         Returns:
-            bool: True pokud plánovač běží, False jinak.
+            bool: True pokud smyčka běží a tato instance je lídrem (tj. skutečně
+                  provádí aktualizace), False jinak (včetně pohotovosti).
+        """
+        loop_alive = self._running and self._task is not None and not self._task.done()
+        return loop_alive and self.is_leader
+
+    async def get_status(self) -> dict:
+        """
+        Vrátí stav plánovače pro healthcheck.
+
+        Returns:
+            dict: Stav plánovače:
+                - running: zda tato instance provádí aktualizace
+                - role: "leader" nebo "standby"
+                - instance_id: identifikátor této instance (při volbě lídra)
+                - leader_id: identifikátor aktuálního lídra (při volbě lídra)
+                - last_cycle: souhrn posledního cyklu této instance
+                - trigger: čítače přepočtu po signálu o nových kurzech (je-li zapnut)
+                - last_trigger: souhrn posledního přepočtu po signálu
+                - batch_fit: zda se měny s lineárním modelem trénují dávkově
         """
-        return self._running and self._task is not None and not self._task.done()
+        status = {
+            "running": self.is_running,
+            "role": "leader" if self.is_leader else "standby",
+            "last_cycle": self.last_cycle,
+            "batch_fit": self.batch_fit,
+        }
+
+        if self.rate_trigger is not None:
+            status["trigger"] = self.rate_trigger.stats()
+            status["last_trigger"] = self.last_trigger
+
+        if self.leader_election is not None:
+            status["instance_id"] = self.leader_election.instance_id
+            status["leader_id"] = await self.leader_election.get_leader_id()
+
+        return status
+
+
+async def _wait_for_cached_forecast(
+    redis_client: redis.Redis,
+    currency: str,
+    lock: RedisLock,
+    timeout: float,
+    history_days: int,
+    forecast_days: int,
+    model: str,
+) -> Optional[dict]:
+    """
+    Počká, až jiný worker dokončí výpočet a uloží prognózu do cache.
+
+    Čekání skončí, jakmile se v cache objeví čerstvá (nezastaralá)
+    prognóza, jakmile jiný worker zámek uvolní (např. po neúspěšném výpočtu), nebo po vypršení
+    timeoutu.
+
+    Args:
+        redis_client (redis.Redis): Asynchronní Redis klient.
+        currency (str): Kód měny.
+        lock (RedisLock): Zámek držený jiným workerem.
+        timeout (float): Maximální doba čekání v sekundách.
+        history_days (int): Délka historie (součást klíče cache).
+        forecast_days (int): Horizont prognózy (součást klíče cache).
+        model (str): Název modelu (součást klíče cache).
+
+    Returns:
+        Optional[dict]: Prognóza z cache, nebo None pokud se neobjevila.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    while loop.time() < deadline:
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+
+        cached = await get_forecast_from_cache(redis_client, currency, history_days, forecast_days, model)
+        if cached and not is_forecast_stale(cached):
+            return cached
+
+        if await lock.is_held_elsewhere() is False:
+            # Zámek byl uvolněn bez uložení výsledku - výpočet selhal
+            break
+
+    return None
+
+
+async def _compute_with_lock(
+    redis_client: redis.Redis,
+    currency: str,
+    forecaster: CurrencyForecaster,
+    ttl: int,
+    stale_ttl: int,
+    lock_ttl: int,
+    history_days: int,
+    forecast_days: int,
+    model: str,
+) -> Optional[dict]:
+    """
+    Vypočítá a uloží prognózu pod distribuovaným zámkem.
+
+    Pokud zámek drží jiný worker, výpočet se neopakuje a funkce
+    místo toho čeká na jeho výsledek v cache.
+
+    Args:
+        redis_client (redis.Redis): Asynchronní Redis klient.
+        currency (str): Kód měny.
+        forecaster (CurrencyForecaster): Instance pro výpočet prognózy.
+        ttl (int): Měkké TTL uložené prognózy v sekundách.
+        stale_ttl (int): Doba vydávání zastaralé prognózy v sekundách.
+        lock_ttl (int): Doba platnosti zámku v sekundách.
+        history_days (int): Počet dnů historie pro trénink.
+        forecast_days (int): Horizont prognózy ve dnech.
+        model (str): Název modelu z registru.
+
+    Returns:
+        Optional[dict]: Prognóza, nebo None při chybě.
+    """
+    lock = RedisLock(
+        redis_client,
+        f"{FORECAST_LOCK_PREFIX}{currency}:h{history_days}:d{forecast_days}:{model}",
+        lock_ttl * 1000,
+    )
+
+    try:
+        acquired = await lock.acquire()
+    except Exception as e:
+        # Redis nedostupný - raději počítáme bez zámku, než abychom selhali
+        logger.warning("Nepodařilo se získat zámek pro %s: %s", currency, e)
+        acquired = None
+
+    if acquired is False:
+        logger.debug("Prognózu pro %s počítá jiný worker, čekám na výsledek", currency)
+        return await _wait_for_cached_forecast(
+            redis_client, currency, lock, lock_ttl, history_days, forecast_days, model
+        )
+
+    try:
+        forecast = await forecaster.get_forecast(
+            currency, history_days=history_days, forecast_days=forecast_days, model=model
+        )
+
+        if forecast:
+            await save_forecast_to_cache(
+                redis_client,
+                currency,
+                forecast,
+                ttl=ttl,
+                stale_ttl=stale_ttl,
+                history_days=history_days,
+                forecast_days=forecast_days,
+                model=model,
+            )
+
+        return forecast
+    finally:
+        if acquired:
+            await lock.release()
+
+
+async def compute_and_cache_forecast(
+    redis_client: redis.Redis,
+    currency: str,
+    forecaster: Optional[CurrencyForecaster] = None,
+    http_client: Optional[httpx.AsyncClient] = None,
+    ttl: int = DEFAULT_TTL,
+    stale_ttl: int = DEFAULT_STALE_TTL,
+    lock_ttl: int = DEFAULT_LOCK_TTL,
+    history_days: int = DEFAULT_HISTORY_DAYS,
+    forecast_days: int = DEFAULT_FORECAST_DAYS,
+    model: str = DEFAULT_MODEL,
+) -> Optional[dict]:
+    """
+    Vypočítá prognózu a uloží ji do cache s deduplikací souběžných výpočtů.
+
+    Souběžná volání pro stejnou měnu a konfiguraci v rámci procesu sdílí jeden výpočet
+    (single-flight). Mezi workery a replikami zajistí Redis zámek
+    (SET NX PX), že prognózu počítá a ukládá pouze jeden z nich;
+    ostatní čekají na jeho výsledek v cache.
+
+    Args:
+        redis_client (redis.Redis): Asynchronní Redis klient.
+        currency (str): Kód měny (např. "EUR").
+        forecaster (Optional[CurrencyForecaster]): Instance pro výpočet prognózy.
+                              Pokud None, vytvoří se nová se sdíleným http_client.
+        http_client (Optional[httpx.AsyncClient]): Sdílený HTTP klient.
+        ttl (int): Měkké TTL uložené prognózy v sekundách. Výchozí: 3600.
+        stale_ttl (int): Doba vydávání zastaralé prognózy v sekundách. Výchozí: 86400.
+        lock_ttl (int): Doba platnosti zámku v sekundách. Výchozí: 60.
+        history_days (int): Počet dnů historie pro trénink. Výchozí: 90.
+        forecast_days (int): Horizont prognózy ve dnech. Výchozí: 30.
+        model (str): Název modelu z registru. Výchozí: "linear".
+
+    Returns:
+        Optional[dict]: Kopie prognózy, nebo None při chybě.
+
+    Example:
+        >>> forecast = await compute_and_cache_forecast(redis, "EUR")
+        >>> print(forecast["currency"])
+        EUR
+    """
+    currency = currency.upper()
+    forecaster = forecaster or CurrencyForecaster(http_client=http_client)
+
+    forecast = await _single_flight.do(
+        f"{currency}:h{history_days}:d{forecast_days}:{model}",
+        lambda: _compute_with_lock(
+            redis_client,
+            currency,
+            forecaster,
+            ttl,
+            stale_ttl,
+            lock_ttl,
+            history_days,
+            forecast_days,
+            model,
+        ),
+    )
+
+    # Každý volající dostane vlastní kopii, protože ji dále upravuje
+    return dict(forecast) if forecast else None
+
+
+def _schedule_background_refresh(
+    redis_client: redis.Redis,
+    currency: str,
+    forecaster: CurrencyForecaster,
+    ttl: int,
+    stale_ttl: int,
+    history_days: int,
+    forecast_days: int,
+    model: str,
+) -> None:
+    """
+    Naplánuje přepočet zastaralé prognózy na pozadí.
+
+    Přepočet prochází přes compute_and_cache_forecast, takže více
+    souběžných požadavků na zastaralou prognózu vyvolá jediný výpočet.
+
+    Args:
+        redis_client (redis.Redis): Asynchronní Redis klient.
+        currency (str): Kód měny.
+        forecaster (CurrencyForecaster): Instance pro výpočet prognózy.
+        ttl (int): Měkké TTL nové prognózy v sekundách.
+        stale_ttl (int): Doba vydávání zastaralé prognózy v sekundách.
+        history_days (int): Počet dnů historie pro trénink.
+        forecast_days (int): Horizont prognózy ve dnech.
+        model (str): Název modelu z registru.
+    """
+    task = asyncio.create_task(
+        compute_and_cache_forecast(
+            redis_client,
+            currency,
+            forecaster=forecaster,
+            ttl=ttl,
+            stale_ttl=stale_ttl,
+            history_days=history_days,
+            forecast_days=forecast_days,
+            model=model,
+        )
+    )
+    _background_refreshes.add(task)
+    task.add_done_callback(_background_refreshes.discard)
+
+
+def _serve_cached_forecast(
+    cached: dict,
+    redis_client: redis.Redis,
+    currency: str,
+    forecaster: CurrencyForecaster,
+    ttl: int,
+    stale_ttl: int,
+    history_days: int,
+    forecast_days: int,
+    model: str,
+) -> dict:
+    """
+    Označí prognózu nalezenou v cache a případně naplánuje její přepočet.
+
+    Zastaralá prognóza (po měkké expiraci) dostane příznak stale=True
+    a své stáří a na pozadí se spustí její deduplikovaný přepočet.
+
+    Args:
+        cached (dict): Prognóza načtená z cache.
+        redis_client (redis.Redis): Asynchronní Redis klient.
+        currency (str): Kód měny.
+        forecaster (CurrencyForecaster): Instance pro výpočet prognózy.
+        ttl (int): Měkké TTL nové prognózy v sekundách.
+        stale_ttl (int): Doba vydávání zastaralé prognózy v sekundách.
+        history_days (int): Počet dnů historie pro trénink.
+        forecast_days (int): Horizont prognózy ve dnech.
+        model (str): Název modelu z registru.
+
+    Returns:
+        dict: Prognóza doplněná o příznaky from_cache a stale.
+    """
+    cached["from_cache"] = True
+    cached["stale"] = is_forecast_stale(cached)
+    (CACHE_STALE if cached["stale"] else CACHE_HITS).inc()
+    observe_forecast_timestamp(currency.upper(), model, cached.get("cached_ts"))
+
+    if cached["stale"]:
+        # Zastaralou prognózu vrátíme hned a přepočítáme ji na pozadí
+        cached["age_seconds"] = int(get_forecast_age(cached))
+        _schedule_background_refresh(
+            redis_client,
+            currency,
+            forecaster,
+            ttl,
+            stale_ttl,
+            history_days,
+            forecast_days,
+            model,
+        )
+
+    return cached
 
 
 async def get_or_compute_forecast(
     redis_client: redis.Redis,
     currency: str,
     force_refresh: bool = False,
+    http_client: Optional[httpx.AsyncClient] = None,
+    forecaster: Optional[CurrencyForecaster] = None,
+    ttl: int = DEFAULT_TTL,
+    stale_ttl: int = DEFAULT_STALE_TTL,
+    history_days: int = DEFAULT_HISTORY_DAYS,
+    forecast_days: int = DEFAULT_FORECAST_DAYS,
+    model: str = DEFAULT_MODEL,
 ) -> Optional[dict]:
     """
     Získá prognózu z cache nebo ji vypočítá na vyžádání.
 
-    Tato funkce implementuje strategii "cache-first":
+    Tato funkce implementuje strategii "cache-first" se stale-while-revalidate:
     1. Pokusí se načíst prognózu z cache
-    2. Pokud není v cache (nebo force_refresh=True), vypočítá novou
-    3. Uloží novou prognózu do cache
+    2. Pokud je prognóza po měkké expiraci, vrátí ji okamžitě s příznakem
+       stale=True a jejím stářím a spustí přepočet na pozadí
+    3. Pokud není v cache (po tvrdé expiraci nebo force_refresh=True),
+       vypočítá novou a uloží ji do cache
+
+    Souběžné požadavky pro stejnou měnu sdílí jeden výpočet
+    (viz compute_and_cache_forecast).
 
     Tato metoda je vhodná pro synchronní požadavky, kdy je třeba
     vrátit prognózu okamžitě bez čekání na background task.
@@ -259,6 +1019,18 @@ async def get_or_compute_forecast(
         currency (str): Kód měny (např. "EUR").
         force_refresh (bool): Pokud True, vždy přepočítá prognózu.
                               Výchozí: False.
+        http_client (Optional[httpx.AsyncClient]): Sdílený HTTP klient
+                              pro volání Symfony API.
+        forecaster (Optional[CurrencyForecaster]): Sdílená instance pro výpočet
+                              prognózy (např. s poolem výpočtů). Pokud None,
+                              vytvoří se nová se sdíleným http_client.
+        ttl (int): Měkké TTL nově uložené prognózy v sekundách.
+        stale_ttl (int): Doba vydávání zastaralé prognózy v sekundách.
+        history_days (int): Počet dnů historie pro trénink. Výchozí: 90.
+        forecast_days (int): Horizont prognózy ve dnech. Výchozí: 30.
+                              Prognóza se ukládá s tímto horizontem jednou
+                              a kratší horizonty se z ní pouze oříznou.
+        model (str): Název modelu z registru. Výchozí: "linear".
 
     Returns:
         Optional[dict]: Slovník s prognózou, nebo None při chybě.
@@ -268,20 +1040,147 @@ async def get_or_compute_forecast(
         >>> print(forecast["currency"])
         EUR
     """
+    forecaster = forecaster or CurrencyForecaster(http_client=http_client)
+
     # Pokus o načtení z cache (pokud není vynucen refresh)
     if not force_refresh:
-        cached = await get_forecast_from_cache(redis_client, currency)
+        cached = await get_forecast_from_cache(
+            redis_client, currency, history_days, forecast_days, model
+        )
         if cached:
-            cached["from_cache"] = True
-            return cached
+            return _serve_cached_forecast(
+                cached,
+                redis_client,
+                currency,
+                forecaster,
+                ttl,
+                stale_ttl,
+                history_days,
+                forecast_days,
+                model,
+            )
+        CACHE_MISSES.inc()
     
-    # Výpočet nové prognózy
-    forecaster = CurrencyForecaster()
-    forecast = await forecaster.get_forecast(currency, history_days=90, forecast_days=7)
+    # Výpočet nové prognózy a uložení do cache pro příští požadavky
+    forecast = await compute_and_cache_forecast(
+        redis_client,
+        currency,
+        forecaster=forecaster,
+        ttl=ttl,
+        stale_ttl=stale_ttl,
+        history_days=history_days,
+        forecast_days=forecast_days,
+        model=model,
+    )
     
     if forecast:
         forecast["from_cache"] = False
-        # Uložení do cache pro příští požadavky
-        await save_forecast_to_cache(redis_client, currency, forecast)
+        forecast["stale"] = False
     
     return forecast
+
+
+async def get_or_compute_forecasts(
+    redis_client: redis.Redis,
+    currencies: list[str],
+    force_refresh: bool = False,
+    http_client: Optional[httpx.AsyncClient] = None,
+    forecaster: Optional[CurrencyForecaster] = None,
+    ttl: int = DEFAULT_TTL,
+    stale_ttl: int = DEFAULT_STALE_TTL,
+    history_days: int = DEFAULT_HISTORY_DAYS,
+    forecast_days: int = DEFAULT_FORECAST_DAYS,
+    max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    models: Optional[dict[str, str]] = None,
+) -> dict[str, Optional[dict]]:
+    """
+    Získá prognózy pro více měn najednou.
+
+    Všechny prognózy se z cache načtou jedním příkazem MGET. Dopočítávají
+    se pouze chybějící měny, a to souběžně s omezeným počtem paralelních
+    výpočtů. Zastaralé prognózy se vrátí okamžitě a přepočítají na pozadí
+    stejně jako v get_or_compute_forecast.
+
+    Args:
+        redis_client (redis.Redis): Asynchronní Redis klient.
+        currencies (list[str]): Seznam kódů měn.
+        force_refresh (bool): Pokud True, přepočítá všechny prognózy.
+        http_client (Optional[httpx.AsyncClient]): Sdílený HTTP klient.
+        forecaster (Optional[CurrencyForecaster]): Sdílená instance pro výpočet
+                              prognóz. Pokud None, vytvoří se nová.
+        ttl (int): Měkké TTL nově uložených prognóz v sekundách.
+        stale_ttl (int): Doba vydávání zastaralé prognózy v sekundách.
+        history_days (int): Počet dnů historie pro trénink. Výchozí: 90.
+        forecast_days (int): Horizont prognózy ve dnech. Výchozí: 30.
+        max_concurrency (int): Maximální počet souběžných výpočtů. Výchozí: 4.
+        models (Optional[dict[str, str]]): Model podle kódu měny
+                              (výchozí model pro neuvedené měny).
+
+    Returns:
+        dict[str, Optional[dict]]: Prognózy podle kódu měny,
+                                   None pro měny, které se nepodařilo vypočítat.
+
+    Example:
+        >>> forecasts = await get_or_compute_forecasts(redis, ["EUR", "USD"])
+        >>> print(sorted(forecasts))
+        ['EUR', 'USD']
+    """
+    codes = list(dict.fromkeys(currency.upper() for currency in currencies))
+    forecaster = forecaster or CurrencyForecaster(http_client=http_client)
+    models = {code: (models or {}).get(code, DEFAULT_MODEL) for code in codes}
+
+    if force_refresh:
+        cached = {code: None for code in codes}
+    else:
+        cached = await get_forecasts_from_cache(redis_client, codes, history_days, forecast_days, models)
+
+    results: dict[str, Optional[dict]] = {}
+    for code, forecast in cached.items():
+        if forecast:
+            results[code] = _serve_cached_forecast(
+                forecast,
+                redis_client,
+                code,
+                forecaster,
+                ttl,
+                stale_ttl,
+                history_days,
+                forecast_days,
+                models[code],
+            )
+
+    misses = [code for code in codes if code not in results]
+    if not force_refresh:
+        CACHE_MISSES.inc(len(misses))
+    if misses:
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def compute(code: str) -> Optional[dict]:
+            async with semaphore:
+                return await compute_and_cache_forecast(
+                    redis_client,
+                    code,
+                    forecaster=forecaster,
+                    ttl=ttl,
+                    stale_ttl=stale_ttl,
+                    history_days=history_days,
+                    forecast_days=forecast_days,
+                    model=models[code],
+                )
+
+        computed = await asyncio.gather(
+            *(compute(code) for code in misses),
+            return_exceptions=True,
+        )
+
+        for code, forecast in zip(misses, computed):
+            if isinstance(forecast, BaseException):
+                logger.error("Chyba při výpočtu prognózy %s: %s", code, forecast, extra={"currency": code})
+                forecast = None
+            elif forecast:
+                forecast["from_cache"] = False
+                forecast["stale"] = False
+            results[code] = forecast
+
+    # Zachování pořadí měn podle požadavku
+    return {code: results[code] for code in codes}
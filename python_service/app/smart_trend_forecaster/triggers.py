@@ -0,0 +1,304 @@
+"""
+Smart Trend Forecaster - Modul pro přepočet prognóz vyvolaný novými kurzy.
+
+Plánovač přepočítává všechny měny v pevném intervalu bez ohledu na to,
+zda přibyly nové kurzy, a po aktualizaci kurzů zůstávají prognózy
+až do dalšího cyklu neaktuální. Signál "kurzy aktualizovány" se
+zapisuje do Redis streamu - buď přímo ze Symfony (XADD), nebo přes
+webhook /wallet/analytics/hooks/rates-updated na libovolném workeru.
+
+Stream čte pouze lídr plánovače (consumer group, takže nový lídr
+naváže tam, kde předchozí skončil). Signály se sdružují: přepočet
+proběhne až po uplynutí debounce od posledního signálu (nejpozději
+max_delay od prvního) a každá měna se v dávce přepočítá jen jednou.
+Intervalová smyčka plánovače zůstává jako pojistka pro ztracené signály.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
+
+from .leader import LeaderElection, default_instance_id
+
+logger = logging.getLogger(__name__)
+
+
+# Redis stream se signály o aktualizaci kurzů
+RATES_UPDATED_STREAM = "wallet:rates:updated"
+
+# Consumer group plánovače prognóz
+RATES_UPDATED_GROUP = "forecast-scheduler"
+
+# Přibližná maximální délka streamu (starší signály se ořezávají)
+DEFAULT_STREAM_MAXLEN = 10000
+
+# Výchozí doba klidu po posledním signálu, po které se spustí přepočet (v sekundách)
+DEFAULT_TRIGGER_DEBOUNCE = 2.0
+
+# Výchozí maximální zpoždění přepočtu od prvního signálu dávky (v sekundách)
+DEFAULT_TRIGGER_MAX_DELAY = 10.0
+
+# Maximální doba blokujícího čtení streamu bez čekajících signálů (v milisekundách)
+READ_BLOCK_MS = 5000
+
+# Maximální počet signálů přečtených najednou
+READ_COUNT = 100
+
+# Prodleva před opakováním po chybě čtení (v sekundách)
+RETRY_DELAY = 1.0
+
+# Typ funkce pro přepočet dávky (měna -> vyžádána plná synchronizace historie)
+RefreshCallback = Callable[[dict[str, bool]], Awaitable[object]]
+
+
+async def publish_rates_updated(
+    redis_client: redis.Redis,
+    currencies: list[str],
+    full_sync: bool = False,
+    source: str = "webhook",
+    maxlen: int = DEFAULT_STREAM_MAXLEN,
+) -> str:
+    """
+    Zapíše signál o aktualizaci kurzů do Redis streamu.
+
+    Args:
+        redis_client (redis.Redis): Asynchronní Redis klient.
+        currencies (list[str]): Kódy měn s novými kurzy.
+        full_sync (bool): Vyžádat plnou synchronizaci historie
+                          (např. po zpětné korekci starších kurzů).
+        source (str): Původ signálu (pro logování).
+        maxlen (int): Přibližná maximální délka streamu.
+
+    Returns:
+        str: ID záznamu ve streamu.
+
+    Example:
+        >>> await publish_rates_updated(redis, ["EUR", "USD"])
+        '1768730401123-0'
+    """
+    fields = {
+        "currencies": ",".join(currency.upper() for currency in currencies),
+        "full_sync": "1" if full_sync else "0",
+        "source": source,
+        "ts": repr(time.time()),
+    }
+    return await redis_client.xadd(RATES_UPDATED_STREAM, fields, maxlen=maxlen, approximate=True)
+
+
+class RateUpdateTrigger:
+    """
+    Odběr signálů o aktualizaci kurzů s debounce a sdružováním měn.
+
+    Attributes:
+        redis_client (redis.Redis): Asynchronní Redis klient.
+        debounce (float): Doba klidu po posledním signálu v sekundách.
+        max_delay (float): Maximální zpoždění přepočtu od prvního signálu v sekundách.
+        consumer_name (str): Jméno konzumenta v consumer group.
+        received (int): Počet přijatých signálů.
+        coalesced (int): Počet měn sloučených do již čekající dávky.
+        batches (int): Počet spuštěných přepočtů.
+        last_batch (Optional[dict]): Souhrn poslední dávky.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        debounce: float = DEFAULT_TRIGGER_DEBOUNCE,
+        max_delay: float = DEFAULT_TRIGGER_MAX_DELAY,
+        consumer_name: Optional[str] = None,
+    ):
+        """
+        Inicializace odběru signálů (bez spuštění).
+
+        Args:
+            redis_client (redis.Redis): Asynchronní Redis klient.
+            debounce (float): Doba klidu po posledním signálu v sekundách. Výchozí: 2.
+            max_delay (float): Maximální zpoždění od prvního signálu v sekundách. Výchozí: 10.
+            consumer_name (Optional[str]): Jméno konzumenta.
+                                           Výchozí: hostname:pid:náhodná přípona.
+        """
+        self.redis_client = redis_client
+        self.debounce = debounce
+        self.max_delay = max(max_delay, debounce)
+        self.consumer_name = consumer_name or default_instance_id()
+        self.received = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.last_batch: Optional[dict] = None
+        self._pending: dict[str, bool] = {}
+        self._first_at: Optional[float] = None
+        self._last_at: Optional[float] = None
+        self._group_ready = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def _ensure_group(self) -> None:
+        """
+        Vytvoří consumer group (a stream), pokud ještě neexistuje.
+
+        Nová skupina začíná od konce streamu - starší signály pokryl
+        intervalový přepočet.
+        """
+        if self._group_ready:
+            return
+        try:
+            await self.redis_client.xgroup_create(
+                RATES_UPDATED_STREAM, RATES_UPDATED_GROUP, id="$", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    def _add(self, fields: dict) -> None:
+        """
+        Přidá měny ze signálu do čekající dávky.
+        """
+        self.received += 1
+        full_sync = fields.get("full_sync") == "1"
+        now = time.monotonic()
+
+        for currency in fields.get("currencies", "").split(","):
+            currency = currency.strip().upper()
+            if not currency:
+                continue
+            if currency in self._pending:
+                self.coalesced += 1
+            self._pending[currency] = self._pending.get(currency, False) or full_sync
+
+        if self._pending:
+            self._last_at = now
+            if self._first_at is None:
+                self._first_at = now
+
+    def _due_in(self) -> Optional[float]:
+        """
+        Vrátí počet sekund do spuštění čekající dávky (None bez dávky).
+        """
+        if not self._pending:
+            return None
+        deadline = min(self._last_at + self.debounce, self._first_at + self.max_delay)
+        return deadline - time.monotonic()
+
+    async def _flush(self, callback: RefreshCallback) -> None:
+        """
+        Spustí přepočet čekající dávky.
+
+        Signály přijaté během přepočtu se sdruží do další dávky.
+        """
+        batch = self._pending
+        waited = time.monotonic() - self._first_at
+        self._pending = {}
+        self._first_at = self._last_at = None
+        self.batches += 1
+
+        logger.info(
+            "Přepočet po aktualizaci kurzů %s (sdruženo %.1fs)",
+            sorted(batch),
+            waited,
+            extra={"trigger": "event"},
+        )
+        started = time.monotonic()
+        await callback(batch)
+        self.last_batch = {
+            "at": datetime.now().isoformat(),
+            "currencies": sorted(batch),
+            "full_sync": sorted(code for code, full in batch.items() if full),
+            "waited_seconds": round(waited, 3),
+            "duration_seconds": round(time.monotonic() - started, 3),
+        }
+
+    async def _consume(self, callback: RefreshCallback, leader_election: Optional[LeaderElection]) -> None:
+        """
+        Čte stream signálů a po uplynutí debounce spouští přepočet.
+
+        Signály se potvrzují (XACK) hned po převzetí do dávky. Dávka
+        ztracená pádem instance před přepočtem se dožene intervalovou
+        smyčkou plánovače.
+        """
+        while True:
+            try:
+                if leader_election is not None and not leader_election.is_leader and not self._pending:
+                    # Stream čte pouze lídr plánovače
+                    await leader_election.wait_until_leader()
+
+                await self._ensure_group()
+
+                due_in = self._due_in()
+                block_ms = READ_BLOCK_MS if due_in is None else max(1, int(due_in * 1000))
+                response = await self.redis_client.xreadgroup(
+                    RATES_UPDATED_GROUP,
+                    self.consumer_name,
+                    {RATES_UPDATED_STREAM: ">"},
+                    count=READ_COUNT,
+                    block=block_ms,
+                )
+
+                entry_ids = []
+                for _, entries in response or []:
+                    for entry_id, fields in entries:
+                        entry_ids.append(entry_id)
+                        self._add(fields or {})
+                if entry_ids:
+                    await self.redis_client.xack(RATES_UPDATED_STREAM, RATES_UPDATED_GROUP, *entry_ids)
+
+                due_in = self._due_in()
+                if due_in is not None and due_in <= 0:
+                    await self._flush(callback)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Chyba čtení signálů o aktualizaci kurzů: %s", e)
+                # Skupina mohla zaniknout (např. po smazání streamu) - vytvoří se znovu
+                self._group_ready = False
+                await asyncio.sleep(RETRY_DELAY)
+
+    def stats(self) -> dict:
+        """
+        Vrátí čítače odběru pro stav plánovače.
+
+        Returns:
+            dict: received, coalesced, batches, pending a last_batch.
+        """
+        return {
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "pending": sorted(self._pending),
+            "last_batch": self.last_batch,
+        }
+
+    def start(
+        self,
+        callback: RefreshCallback,
+        leader_election: Optional[LeaderElection] = None,
+    ) -> asyncio.Task:
+        """
+        Spustí odběr signálů na pozadí.
+
+        Args:
+            callback (RefreshCallback): Přepočet dávky (měna -> plná synchronizace).
+            leader_election (Optional[LeaderElection]): Volba lídra - stream
+                                   čte pouze instance, která je lídrem.
+
+        Returns:
+            asyncio.Task: Reference na vytvořený task.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._consume(callback, leader_election))
+        return self._task
+
+    async def stop(self) -> None:
+        """
+        Zastaví odběr signálů.
+        """
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
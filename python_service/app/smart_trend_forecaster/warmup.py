@@ -0,0 +1,426 @@
+"""
+Smart Trend Forecaster - Modul pro zahřátí služby po startu.
+
+Po startu workeru je cache procesu prázdná, NumPy ještě není
+naimportován (viz lazy) a procesy poolu výpočtů se teprve spouštějí
+(každý importuje balíček znovu). První požadavky by tyto náklady platily
+v cestě odpovědi. Zahřátí proto na pozadí, bez blokování startu:
+
+1. naimportuje odložené těžké knihovny (ve vlákně mimo event loop),
+2. spustí procesy poolu výpočtů a nechá je naimportovat totéž,
+3. načte poslední prognózy sledovaných měn z Redis (a tím je uloží do L1
+   cache workeru); prognózy, které v Redis chybí (např. po restartu
+   Redis), obnoví z lokálního snapshotu, pokud je nastaven.
+
+Dokud zahřátí neskončí (nebo nevyprší jeho timeout), endpoint /ready
+vrací 503 a orchestrátor na instanci neposílá provoz; /live odpovídá
+vždy. Snapshot zapisuje plánovač po každém cyklu (viz
+write_forecast_snapshot).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Optional
+
+import redis.asyncio as redis
+
+from .cache import (
+    DEFAULT_TTL,
+    DEFAULT_STALE_TTL,
+    DEFAULT_HISTORY_DAYS,
+    DEFAULT_FORECAST_DAYS,
+    get_forecasts_from_cache,
+    get_precomputed_response,
+    save_forecast_to_cache,
+)
+from .executor import ForecastExecutor
+from .lazy import load_heavy_modules
+from .models import DEFAULT_MODEL, resolve_model
+
+logger = logging.getLogger(__name__)
+
+
+# Výchozí maximální doba zahřátí v sekundách (poté je služba připravena i tak)
+DEFAULT_WARMUP_TIMEOUT = 30.0
+
+# Verze formátu snapshotu prognóz
+SNAPSHOT_VERSION = 1
+
+# Příznaky doplňované při vydání prognózy, které do snapshotu nepatří
+TRANSIENT_FORECAST_FIELDS = ("from_cache", "stale", "age_seconds")
+
+
+def warm_worker() -> int:
+    """
+    Naimportuje těžké knihovny v procesu poolu výpočtů.
+
+    Funkce je definována na úrovni modulu, aby ji bylo možné spustit
+    v poolu procesů (ForecastExecutor).
+
+    Returns:
+        int: PID procesu, ve kterém zahřátí proběhlo.
+    """
+    load_heavy_modules()
+    return os.getpid()
+
+
+def write_forecast_snapshot(path: str, entries: list[dict]) -> None:
+    """
+    Atomicky zapíše snapshot prognóz do lokálního souboru.
+
+    Soubor se zapíše do dočasného souboru ve stejném adresáři a přejmenuje
+    (os.replace), takže čtenář nikdy neuvidí rozepsaný snapshot.
+
+    Args:
+        path (str): Cesta k souboru snapshotu.
+        entries (list[dict]): Záznamy s klíči currency, history_days,
+            forecast_days, model a forecast.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    payload = {"version": SNAPSHOT_VERSION, "written_ts": time.time(), "entries": entries}
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".forecast-snapshot-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_forecast_snapshot(path: str) -> list[dict]:
+    """
+    Načte snapshot prognóz z lokálního souboru.
+
+    Args:
+        path (str): Cesta k souboru snapshotu.
+
+    Returns:
+        list[dict]: Záznamy snapshotu, prázdný seznam, pokud soubor
+                    neexistuje nebo je neplatný.
+    """
+    try:
+        with open(path, encoding="utf-8") as handle:
+            payload = json.load(handle)
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError) as e:
+        logger.warning("Snapshot prognóz %s nelze načíst: %s", path, e)
+        return []
+
+    if not isinstance(payload, dict) or payload.get("version") != SNAPSHOT_VERSION:
+        logger.warning("Snapshot prognóz %s má nepodporovaný formát", path)
+        return []
+    return [entry for entry in payload.get("entries", []) if isinstance(entry, dict)]
+
+
+async def save_forecast_snapshot(
+    redis_client: redis.Redis,
+    path: str,
+    currencies: list[str],
+    history_days: int = DEFAULT_HISTORY_DAYS,
+    forecast_days: int = DEFAULT_FORECAST_DAYS,
+    default_model: str = DEFAULT_MODEL,
+    models: Optional[dict[str, str]] = None,
+) -> int:
+    """
+    Uloží aktuální prognózy sledovaných měn z cache do snapshotu.
+
+    Args:
+        redis_client (redis.Redis): Asynchronní Redis klient.
+        path (str): Cesta k souboru snapshotu.
+        currencies (list[str]): Kódy sledovaných měn.
+        history_days (int): Délka historie prognóz.
+        forecast_days (int): Horizont prognóz ukládaných do cache.
+        default_model (str): Výchozí model prognózy.
+        models (Optional[dict[str, str]]): Model podle kódu měny.
+
+    Returns:
+        int: Počet prognóz ve snapshotu (0, pokud se snapshot nezapsal).
+
+    Example:
+        >>> await save_forecast_snapshot(redis, "/var/lib/forecaster/snapshot.json", ["EUR", "USD"])
+        2
+    """
+    resolved = {currency.upper(): resolve_model(currency, None, models, default_model) for currency in currencies}
+    forecasts = await get_forecasts_from_cache(redis_client, list(resolved), history_days, forecast_days, resolved)
+
+    entries = []
+    for code, forecast in forecasts.items():
+        if forecast is None:
+            continue
+        data = {field: value for field, value in forecast.items() if field not in TRANSIENT_FORECAST_FIELDS}
+        entries.append(
+            {
+                "currency": code,
+                "history_days": history_days,
+                "forecast_days": forecast_days,
+                "model": resolved[code],
+                "forecast": data,
+            }
+        )
+    if not entries:
+        return 0
+
+    try:
+        await asyncio.to_thread(write_forecast_snapshot, path, entries)
+    except OSError as e:
+        logger.warning("Snapshot prognóz %s nelze zapsat: %s", path, e)
+        return 0
+    return len(entries)
+
+
+class ForecastWarmup:
+    """
+    Zahřátí workeru na pozadí a stav připravenosti pro endpoint /ready.
+
+    Attributes:
+        redis_client (redis.Redis): Asynchronní Redis klient.
+        currencies (list[str]): Kódy sledovaných měn.
+        history_days (int): Délka historie prognóz.
+        forecast_days (int): Horizont prognóz ukládaných do cache.
+        default_model (str): Výchozí model prognózy.
+        models (dict[str, str]): Model podle kódu měny.
+        executor (Optional[ForecastExecutor]): Pool výpočtů k zahřátí.
+        snapshot_path (Optional[str]): Lokální snapshot prognóz.
+        ttl (int): Měkké TTL prognóz obnovených ze snapshotu.
+        stale_ttl (int): Doba vydávání zastaralé prognózy po měkké expiraci.
+        timeout (float): Maximální doba zahřátí v sekundách.
+        ready (bool): Zda zahřátí skončilo (úspěšně, s chybou nebo timeoutem).
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        currencies: list[str],
+        history_days: int = DEFAULT_HISTORY_DAYS,
+        forecast_days: int = DEFAULT_FORECAST_DAYS,
+        default_model: str = DEFAULT_MODEL,
+        models: Optional[dict[str, str]] = None,
+        executor: Optional[ForecastExecutor] = None,
+        snapshot_path: Optional[str] = None,
+        ttl: int = DEFAULT_TTL,
+        stale_ttl: int = DEFAULT_STALE_TTL,
+        timeout: float = DEFAULT_WARMUP_TIMEOUT,
+    ):
+        """
+        Inicializace zahřátí. Zahřátí se spustí metodou start().
+
+        Args:
+            redis_client (redis.Redis): Asynchronní Redis klient.
+            currencies (list[str]): Kódy sledovaných měn.
+            history_days (int): Délka historie prognóz. Výchozí: 90.
+            forecast_days (int): Horizont prognóz v cache. Výchozí: 30.
+            default_model (str): Výchozí model prognózy. Výchozí: "linear".
+            models (Optional[dict[str, str]]): Model podle kódu měny.
+            executor (Optional[ForecastExecutor]): Pool výpočtů, jehož
+                        procesy se spustí předem.
+            snapshot_path (Optional[str]): Lokální snapshot prognóz pro obnovu
+                        prognóz chybějících v Redis. Výchozí: bez snapshotu.
+            ttl (int): Měkké TTL prognóz v sekundách. Výchozí: 3600.
+            stale_ttl (int): Doba vydávání zastaralé prognózy. Výchozí: 86400.
+            timeout (float): Maximální doba zahřátí v sekundách. Výchozí: 30.
+        """
+        self.redis_client = redis_client
+        self.currencies = [currency.upper() for currency in currencies]
+        self.history_days = history_days
+        self.forecast_days = forecast_days
+        self.default_model = default_model
+        self.models = models or {}
+        self.executor = executor
+        self.snapshot_path = snapshot_path or None
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.timeout = timeout
+        self.ready = False
+        self._started = time.monotonic()
+        self._summary: dict = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> asyncio.Task:
+        """
+        Spustí zahřátí na pozadí (start aplikace na něj nečeká).
+
+        Returns:
+            asyncio.Task: Úloha zahřátí.
+        """
+        self._started = time.monotonic()
+        self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Počká na dokončení zahřátí.
+
+        Args:
+            timeout (Optional[float]): Maximální doba čekání v sekundách.
+
+        Returns:
+            bool: Zda je služba připravena.
+        """
+        if self._task is not None and not self._task.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(self._task), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.ready
+
+    async def stop(self) -> None:
+        """
+        Zruší nedokončené zahřátí.
+        """
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _run(self) -> None:
+        """
+        Provede zahřátí s timeoutem a označí službu za připravenou.
+        """
+        try:
+            await asyncio.wait_for(self._warm(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self._summary["timed_out"] = True
+            logger.warning("Zahřátí nedokončeno do %ss, služba je připravena bez něj", self.timeout)
+        except Exception:
+            self._summary["error"] = True
+            logger.exception("Chyba při zahřátí služby")
+        finally:
+            self._summary["duration_seconds"] = round(time.monotonic() - self._started, 3)
+            self.ready = True
+
+        logger.info("Služba připravena", extra=self._summary)
+
+    async def _warm(self) -> None:
+        """
+        Zahřeje importy, pool výpočtů a prognózy sledovaných měn souběžně.
+        """
+        await asyncio.gather(self._warm_modules(), self._warm_forecasts())
+
+    async def _warm_modules(self) -> None:
+        """
+        Naimportuje těžké knihovny ve vlákně a spustí procesy poolu výpočtů.
+        """
+        self._summary["modules"] = await asyncio.to_thread(load_heavy_modules)
+
+        executor = self.executor
+        if executor is not None and executor.kind == "process":
+            # Souběžné úlohy spustí všechny procesy poolu (každý dostane jednu)
+            pids = await asyncio.gather(
+                *(executor.run(warm_worker) for _ in range(executor.max_workers)),
+                return_exceptions=True,
+            )
+            self._summary["executor_workers"] = len({pid for pid in pids if isinstance(pid, int)})
+
+    async def _warm_forecasts(self) -> None:
+        """
+        Načte prognózy sledovaných měn z Redis a chybějící obnoví ze snapshotu.
+        """
+        resolved = {
+            currency: resolve_model(currency, None, self.models, self.default_model)
+            for currency in self.currencies
+        }
+        forecasts = await get_forecasts_from_cache(
+            self.redis_client, list(resolved), self.history_days, self.forecast_days, resolved
+        )
+        missing = [code for code, forecast in forecasts.items() if forecast is None]
+
+        restored = []
+        if missing and self.snapshot_path:
+            restored = await self._restore_from_snapshot(missing, resolved)
+
+        # Předpočítané odpovědi endpointu /forecast/{currency} do L1 cache
+        loaded = [code for code in resolved if code not in missing or code in restored]
+        await asyncio.gather(
+            *(
+                get_precomputed_response(
+                    self.redis_client, code, self.history_days, self.forecast_days, resolved[code]
+                )
+                for code in loaded
+            )
+        )
+
+        self._summary["forecasts"] = {
+            "loaded": len(resolved) - len(missing),
+            "restored": len(restored),
+            "missing": sorted(set(missing) - set(restored)),
+        }
+
+    async def _restore_from_snapshot(self, missing: list[str], resolved: dict[str, str]) -> list[str]:
+        """
+        Obnoví chybějící prognózy v Redis z lokálního snapshotu.
+
+        Obnovená prognóza si ponechá zbývající dobu platnosti: měkká
+        i tvrdá expirace se počítají od původního uložení, takže stará
+        prognóza se vydá jako zastaralá (a přepočítá) a prošlá se neobnoví.
+
+        Args:
+            missing (list[str]): Kódy měn, jejichž prognóza v Redis chybí.
+            resolved (dict[str, str]): Model podle kódu měny.
+
+        Returns:
+            list[str]: Kódy obnovených měn.
+        """
+        entries = await asyncio.to_thread(read_forecast_snapshot, self.snapshot_path)
+        by_key = {
+            (entry.get("currency"), entry.get("history_days"), entry.get("forecast_days"), entry.get("model")): entry
+            for entry in entries
+        }
+
+        now = time.time()
+        restored = []
+        for code in missing:
+            entry = by_key.get((code, self.history_days, self.forecast_days, resolved[code]))
+            forecast = entry.get("forecast") if entry else None
+            if not isinstance(forecast, dict) or "forecast" not in forecast:
+                continue
+
+            age = now - float(forecast.get("cached_ts", now))
+            soft_ttl = int(forecast.get("soft_ttl", self.ttl))
+            remaining = int(soft_ttl + self.stale_ttl - age)
+            if remaining <= 1:
+                continue
+
+            ttl = max(1, min(int(soft_ttl - age), remaining - 1))
+            saved = await save_forecast_to_cache(
+                self.redis_client,
+                code,
+                forecast,
+                ttl=ttl,
+                stale_ttl=remaining - ttl,
+                history_days=self.history_days,
+                forecast_days=self.forecast_days,
+                model=resolved[code],
+            )
+            if saved:
+                restored.append(code)
+
+        if restored:
+            logger.info("Prognózy obnoveny ze snapshotu", extra={"currencies": restored})
+        return restored
+
+    def status(self) -> dict:
+        """
+        Vrátí stav zahřátí pro endpoint /ready.
+
+        Returns:
+            dict: ready, doba od startu (nebo trvání zahřátí) a souhrn
+                  (načtené knihovny, procesy poolu, načtené/obnovené/chybějící prognózy).
+        """
+        status = {"ready": self.ready, **self._summary}
+        if not self.ready:
+            status["elapsed_seconds"] = round(time.monotonic() - self._started, 3)
+        return status
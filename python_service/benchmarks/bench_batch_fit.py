@@ -0,0 +1,130 @@
+"""
+Benchmark - dávkový trénink lineárního modelu (modul batch_fit).
+
+Porovná pro N syntetických měn s historií o zadané délce:
+- smyčku přes měny s fit_and_predict (předzpracování přes pandas
+  + LinearModel, tj. původní výpočet plánovače pro každou měnu),
+- smyčku přes měny s prepare_history + LinearModel (bez pandas),
+- dávkový trénink batch_fit_and_predict (zarovnání na společnou mřížku
+  dat, maskované nejmenší čtverce pro všechny řady najednou) a jeho fáze.
+
+Historie mají mezery (víkendy a náhodně chybějící dny) a různé počátky,
+takže mřížka je řídká. Výsledky obou cest se porovnají (maximální rozdíl
+hodnot prognózy). Výsledkem je medián z `repeat` opakování.
+
+Spuštění (z adresáře python_service):
+    python -m benchmarks.bench_batch_fit --series 10 100 1000 --days 90 3650 --repeat 3
+"""
+
+import argparse
+
+import numpy as np
+
+from app.smart_trend_forecaster.batch_fit import (
+    align_histories,
+    batch_fit_and_predict,
+    fit_linear_batch,
+)
+from app.smart_trend_forecaster.forecaster import fit_and_predict
+from app.smart_trend_forecaster.models import LinearModel, forecast_points
+from app.smart_trend_forecaster.preprocess import prepare_history
+from benchmarks.bench_models import measure, synthetic_series
+
+
+def synthetic_histories(count: int, days: int, seed: int = 42) -> dict[str, list[dict]]:
+    """
+    Vygeneruje historie `count` měn (bez víkendů, 2 % chybějících dnů, posunuté počátky).
+    """
+    rng = np.random.default_rng(seed)
+    end = np.datetime64("2026-01-16")
+    histories = {}
+    for index in range(count):
+        offset = int(rng.integers(0, 30))
+        dates = end - offset - np.arange(days)[::-1]
+        weekday = (dates.astype("datetime64[D]").view("int64") - 4) % 7
+        keep = (weekday < 5) & (rng.random(days) > 0.02)
+        rates = synthetic_series(days, seed + index) * float(rng.uniform(0.5, 2.0))
+        histories[f"C{index:04d}"] = [
+            {"date": day, "rate": rate}
+            for day, rate in zip(dates[keep].astype(str).tolist(), rates[keep].tolist())
+        ]
+    return histories
+
+
+def loop_pandas(histories: dict[str, list[dict]], horizon: int) -> dict:
+    return {code: fit_and_predict(history, horizon, preprocess="pandas") for code, history in histories.items()}
+
+
+def loop_numpy(histories: dict[str, list[dict]], horizon: int) -> dict:
+    results = {}
+    for code, history in histories.items():
+        prepared = prepare_history(history)
+        values, margins = LinearModel().fit(prepared.rates).forecast(horizon)
+        results[code] = (len(prepared), forecast_points(prepared.last_date, values, margins))
+    return results
+
+
+def max_difference(expected: dict, actual: dict) -> float:
+    """
+    Vrátí maximální absolutní rozdíl hodnot a mezí prognóz obou cest.
+    """
+    difference = 0.0
+    for code, (points, forecast) in expected.items():
+        other_points, other_forecast = actual[code]
+        assert points == other_points, code
+        for first, second in zip(forecast, other_forecast):
+            assert first["date"] == second["date"], code
+            for field in ("value", "conf_low", "conf_high"):
+                difference = max(difference, abs(first[field] - second[field]))
+    return difference
+
+
+def main(series_counts: list[int], day_counts: list[int], horizon: int, repeat: int) -> None:
+    print(
+        f"{'měn':>6} {'dní':>6} {'pandas smyčka [ms]':>19} {'numpy smyčka [ms]':>18} "
+        f"{'dávka [ms]':>11} {'zrychlení':>10} {'max. rozdíl':>12}"
+    )
+    for days in day_counts:
+        for count in series_counts:
+            histories = synthetic_histories(count, days)
+
+            batch = batch_fit_and_predict(histories, horizon)
+            difference = max_difference(loop_pandas(histories, horizon), batch)
+
+            pandas_ms = measure(lambda: loop_pandas(histories, horizon), repeat)
+            numpy_ms = measure(lambda: loop_numpy(histories, horizon), repeat)
+            batch_ms = measure(lambda: batch_fit_and_predict(histories, horizon), repeat)
+            print(
+                f"{count:>6} {days:>6} {pandas_ms:>19.1f} {numpy_ms:>18.1f} {batch_ms:>11.1f} "
+                f"{pandas_ms / batch_ms:>9.1f}x {difference:>12.2g}"
+            )
+
+    # Rozpad dávky na fáze a samotný trénink proti smyčce LinearModel
+    count = max(series_counts)
+    print(f"\nFáze dávky pro {count} měn:")
+    for days in day_counts:
+        histories = synthetic_histories(count, days)
+        codes, grid, values, mask = align_histories(histories)
+        series = [prepare_history(history).rates for history in histories.values()]
+
+        align_ms = measure(lambda: align_histories(histories), repeat)
+        fit_ms = measure(lambda: fit_linear_batch(values, mask), repeat)
+        total_ms = measure(lambda: batch_fit_and_predict(histories, horizon), repeat)
+        loop_fit_ms = measure(lambda: [LinearModel().fit(rates).forecast(horizon) for rates in series], repeat)
+        print(
+            f"  {days:>5} dní (mřížka {len(grid)} dní, vyplněno {mask.mean() * 100:.0f} %): "
+            f"zarovnání {align_ms:.1f} ms, trénink {fit_ms:.1f} ms "
+            f"(smyčka LinearModel {loop_fit_ms:.1f} ms), "
+            f"predikce a sestavení bodů {total_ms - align_ms - fit_ms:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--series", type=int, nargs="+", default=[10, 100, 1000], help="Počty měn")
+    parser.add_argument("--days", type=int, nargs="+", default=[90, 3650], help="Délky historie ve dnech")
+    parser.add_argument("--horizon", type=int, default=30, help="Horizont prognózy")
+    parser.add_argument("--repeat", type=int, default=3, help="Počet opakování každého měření")
+    args = parser.parse_args()
+
+    main(args.series, args.days, args.horizon, args.repeat)
@@ -0,0 +1,103 @@
+"""
+Benchmark - serializace prognóz v cache (kodeky z modulu codec).
+
+Pro prognózy s různým horizontem porovná původní JSON formát
+(seznam slovníků pro každý den) se sloupcovým formátem bez komprese
+a s kompresí: dobu serializace a deserializace (decode_forecast)
+a velikost jednoho záznamu v bajtech. Na závěr odhadne celkovou
+velikost cache pro zadaný počet měn s horizontem 365 dní.
+
+Spuštění (z adresáře python_service):
+    python -m benchmarks.bench_cache_codec --repeat 200 --currencies 150
+"""
+
+import argparse
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from app.smart_trend_forecaster.codec import ColumnarCodec, JsonCodec, decode_forecast
+
+
+HORIZONS = [7, 30, 90, 365]
+
+CODECS = {
+    "json": JsonCodec(),
+    "columnar": ColumnarCodec(compress_threshold=-1),
+    "columnar+zlib": ColumnarCodec(compress_threshold=0),
+}
+
+
+def synthetic_forecast(days: int, seed: int = 42) -> dict:
+    """
+    Vygeneruje prognózu ve stejném tvaru, jaký ukládá save_forecast_to_cache.
+    """
+    rng = np.random.default_rng(seed)
+    start = date(2026, 1, 19)
+    values = 25.0 + np.cumsum(rng.normal(0, 0.05, days))
+    margin = 0.31
+    return {
+        "currency": "EUR",
+        "model": "linear",
+        "generated_at": datetime(2026, 1, 18, 10, 0).isoformat(),
+        "history_points": 90,
+        "forecast": [
+            {
+                "date": (start + timedelta(days=i)).isoformat(),
+                "value": round(float(value), 4),
+                "conf_low": round(float(value - margin), 4),
+                "conf_high": round(float(value + margin), 4),
+            }
+            for i, value in enumerate(values)
+        ],
+        "cached_at": datetime(2026, 1, 18, 10, 0, 1).isoformat(),
+        "cached_ts": 1768730401.123,
+        "soft_ttl": 3600,
+    }
+
+
+def measure(fn, repeat: int) -> float:
+    """
+    Vrátí medián doby jednoho volání v mikrosekundách.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings)) * 1e6
+
+
+def main(repeat: int, currencies: int) -> None:
+    print(f"{'horizont':>9} {'kodek':>14} {'bajty':>8} {'encode [µs]':>12} {'decode [µs]':>12}")
+    sizes_365 = {}
+    for horizon in HORIZONS:
+        forecast = synthetic_forecast(horizon)
+
+        for name, codec in CODECS.items():
+            encoded = codec.encode(forecast)
+            # Kontrola, že se prognóza přečte beze ztráty
+            assert decode_forecast(encoded) == forecast, name
+
+            encode_us = measure(lambda: codec.encode(forecast), repeat)
+            decode_us = measure(lambda: decode_forecast(encoded), repeat)
+            size = len(encoded.encode("utf-8"))
+            if horizon == 365:
+                sizes_365[name] = size
+
+            print(f"{horizon:>9} {name:>14} {size:>8} {encode_us:>12.1f} {decode_us:>12.1f}")
+        print()
+
+    print(f"Odhad velikosti cache pro {currencies} měn s horizontem 365 dní:")
+    for name, size in sizes_365.items():
+        print(f"  {name:>14}: {size * currencies / 1024:>9.1f} KiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="Počet opakování každého měření")
+    parser.add_argument("--currencies", type=int, default=150, help="Počet měn pro odhad velikosti cache")
+    args = parser.parse_args()
+
+    main(args.repeat, args.currencies)
@@ -0,0 +1,124 @@
+"""
+Benchmark - odezva event loopu během hromadného přepočtu prognóz.
+
+Simuluje hromadnou aktualizaci mnoha měn s dlouhou historií a současně
+měří zpoždění event loopu (sonda, která se každých 10 ms probouzí
+a zaznamenává, o kolik se probudila později). Zpoždění sondy odpovídá
+tomu, jak dlouho by čekal souběžný healthcheck nebo HTTP požadavek.
+
+Porovnává výpočet přímo v event loopu ("inline") s poolem vláken
+a poolem procesů (ForecastExecutor). Historie se negeneruje přes
+Symfony API, ale synteticky v podtřídě CurrencyForecaster.
+
+Spuštění (z adresáře python_service):
+    python -m benchmarks.bench_event_loop --currencies 40 --history 3650
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+import numpy as np
+
+from app.smart_trend_forecaster import CurrencyForecaster, ForecastExecutor
+
+
+PROBE_INTERVAL = 0.01
+
+
+class SyntheticForecaster(CurrencyForecaster):
+    """
+    Forecaster, který místo volání Symfony API vrací syntetickou historii.
+    """
+
+    def __init__(self, history: list[dict], executor: Optional[ForecastExecutor] = None):
+        super().__init__(executor=executor)
+        self.history = history
+
+    async def fetch_history_from_symfony(self, currency: str, days: int = 90) -> Optional[list[dict]]:
+        # Krátké čekání simuluje síťové volání
+        await asyncio.sleep(0.001)
+        return self.history
+
+
+def synthetic_history(length: int, seed: int = 42) -> list[dict]:
+    """
+    Vygeneruje syntetickou historii kurzu (trend + šum).
+    """
+    rng = np.random.default_rng(seed)
+    start = date(2016, 1, 1)
+    rates = 25.0 + 0.002 * np.arange(length) + rng.normal(0, 0.15, length)
+    return [
+        {"date": (start + timedelta(days=i)).isoformat(), "rate": float(rate)}
+        for i, rate in enumerate(rates)
+    ]
+
+
+async def probe(lags: list[float], stop: asyncio.Event) -> None:
+    """
+    Sonda event loopu - zaznamenává zpoždění probuzení v milisekundách.
+    """
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - started - PROBE_INTERVAL) * 1000)
+
+
+async def run_scenario(kind: str, history: list[dict], currencies: int, workers: int) -> dict:
+    """
+    Spustí hromadný přepočet s daným druhem executoru a vrátí naměřené hodnoty.
+    """
+    executor = ForecastExecutor(kind=kind, max_workers=workers, max_pending=currencies)
+    forecaster = SyntheticForecaster(history, executor=executor)
+
+    # Zahřátí poolu (u procesů spuštění workerů a import pandas)
+    await asyncio.gather(*(forecaster.get_forecast("WARM", forecast_days=30) for _ in range(workers)))
+
+    lags: list[float] = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(forecaster.get_forecast(f"C{i:03d}", forecast_days=30) for i in range(currencies))
+    )
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe_task
+    await asyncio.to_thread(executor.shutdown)
+
+    assert all(results), "Některá prognóza se nepodařila vypočítat"
+
+    return {
+        "kind": kind,
+        "elapsed_s": elapsed,
+        "p50": float(np.percentile(lags, 50)),
+        "p99": float(np.percentile(lags, 99)),
+        "max": float(np.max(lags)),
+    }
+
+
+async def main(currencies: int, history_length: int, workers: int) -> None:
+    history = synthetic_history(history_length)
+
+    print(f"{currencies} měn, historie {history_length} dní, {workers} workery")
+    print(f"{'executor':>9} {'celkem [s]':>11} {'lag p50 [ms]':>13} {'lag p99 [ms]':>13} {'lag max [ms]':>13}")
+    for kind in ("inline", "thread", "process"):
+        result = await run_scenario(kind, history, currencies, workers)
+        print(
+            f"{result['kind']:>9} {result['elapsed_s']:>11.2f} {result['p50']:>13.2f} "
+            f"{result['p99']:>13.2f} {result['max']:>13.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--currencies", type=int, default=40, help="Počet přepočítávaných měn")
+    parser.add_argument("--history", type=int, default=3650, help="Délka historie ve dnech")
+    parser.add_argument("--workers", type=int, default=2, help="Počet workerů poolu")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.currencies, args.history, args.workers))
@@ -0,0 +1,106 @@
+"""
+Benchmark - sdílený HTTP klient vs. nový klient pro každý požadavek.
+
+Spustí lokální stub server, který napodobuje endpoint
+/api/multi-currency-wallet/history, a porovná propustnost
+(požadavky za sekundu) metody CurrencyForecaster.fetch_history_from_symfony
+s klientem vytvářeným pro každé volání a se sdíleným klientem z poolu.
+
+Spuštění (z adresáře python_service):
+    python -m benchmarks.bench_http_client --requests 2000 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from app.smart_trend_forecaster import CurrencyForecaster, create_http_client
+
+
+# Odpověď stub serveru ve stejném formátu jako Symfony API
+HISTORY_BODY = json.dumps({
+    "success": True,
+    "history": [
+        {"date": f"2026-01-{day:02d}", "rate": 25.0 + day / 100}
+        for day in range(1, 31)
+    ],
+}).encode()
+
+
+async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """
+    Obslouží jedno TCP spojení stub serveru (HTTP/1.1 s keep-alive).
+    """
+    try:
+        while True:
+            # Načtení hlaviček požadavku (tělo GET požadavky nemají)
+            head = await reader.readuntil(b"\r\n\r\n")
+            keep_alive = b"connection: close" not in head.lower()
+
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: application/json\r\n"
+                b"Content-Length: " + str(len(HISTORY_BODY)).encode() + b"\r\n"
+                + (b"" if keep_alive else b"Connection: close\r\n")
+                + b"\r\n" + HISTORY_BODY
+            )
+            await writer.drain()
+
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run_load(forecaster: CurrencyForecaster, total: int, concurrency: int) -> float:
+    """
+    Provede zadaný počet volání se zadanou souběžností a vrátí počet req/s.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_call() -> None:
+        async with semaphore:
+            history = await forecaster.fetch_history_from_symfony("EUR", 30)
+            assert history is not None
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_call() for _ in range(total)))
+    return total / (time.perf_counter() - started)
+
+
+async def main(total: int, concurrency: int) -> None:
+    server = await asyncio.start_server(handle_connection, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+
+    async with server:
+        # Původní chování - nový klient (a nové TCP spojení) pro každý požadavek
+        per_call = await run_load(CurrencyForecaster(base_url=base_url), total, concurrency)
+
+        # Sdílený klient s poolem spojení
+        client = create_http_client(max_connections=concurrency)
+        try:
+            shared = await run_load(
+                CurrencyForecaster(base_url=base_url, http_client=client),
+                total,
+                concurrency,
+            )
+        finally:
+            await client.aclose()
+
+    print(f"Požadavků: {total}, souběžnost: {concurrency}")
+    print(f"  klient pro každé volání: {per_call:10.1f} req/s")
+    print(f"  sdílený klient (pool):   {shared:10.1f} req/s")
+    print(f"  zrychlení:               {shared / per_call:10.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Celkový počet požadavků")
+    parser.add_argument("--concurrency", type=int, default=20, help="Počet souběžných požadavků")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.concurrency))
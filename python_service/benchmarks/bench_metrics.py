@@ -0,0 +1,93 @@
+"""
+Benchmark - režie metrik pro Prometheus (modul metrics).
+
+1. Mikrobenchmark jednotlivých operací horké cesty: observe na předem
+   navázaném histogramu, inc čítače, observe s vyhledáním štítků
+   (labels()) a dvojice volání time.perf_counter().
+2. Propustnost endpointu s předpočítanou odpovědí (stejná aplikace jako
+   v bench_responses, nejrychlejší endpoint služby, kde je relativní
+   režie největší) bez middleware a s MetricsMiddleware.
+
+Aplikace se volá přímo přes ASGI (bez HTTP klienta), výsledkem je
+nejlepší z několika střídavých kol.
+
+Spuštění (z adresáře python_service):
+    python -m benchmarks.bench_metrics --requests 3000 --rounds 5
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.smart_trend_forecaster.metrics import (
+    CACHE_HITS,
+    REDIS_GET_SECONDS,
+    REDIS_SECONDS,
+    MetricsMiddleware,
+    metrics_available,
+)
+from benchmarks.bench_cache_codec import synthetic_forecast
+from benchmarks.bench_responses import call_asgi, create_app, run
+
+
+def measure_ns(fn, repeat: int) -> float:
+    """
+    Vrátí průměrnou dobu jednoho volání v nanosekundách.
+    """
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e9
+
+
+def micro(repeat: int) -> None:
+    operations = {
+        "histogram.observe (navázaný)": lambda: REDIS_GET_SECONDS.observe(0.001),
+        "counter.inc (navázaný)": lambda: CACHE_HITS.inc(),
+        "histogram.labels().observe": lambda: REDIS_SECONDS.labels("get").observe(0.001),
+        "2x time.perf_counter()": lambda: time.perf_counter() - time.perf_counter(),
+        "prázdné volání (základ)": lambda: None,
+    }
+    print(f"Mikrobenchmark ({repeat} opakování):")
+    for name, fn in operations.items():
+        print(f"  {name:>30}: {measure_ns(fn, repeat):>7.0f} ns")
+
+
+async def throughput(requests: int, rounds: int, days: int) -> None:
+    forecast = synthetic_forecast(365)
+    variants = {
+        "bez metrik": create_app(forecast),
+        "s MetricsMiddleware": MetricsMiddleware(create_app(forecast)),
+    }
+    path, query = "/precomputed/EUR", f"days={days}"
+
+    for app in variants.values():
+        status, _ = await call_asgi(app, path, query)
+        assert status == 200
+        await run(app, path, query, min(requests, 200))
+
+    results = {name: 0.0 for name in variants}
+    for _ in range(rounds):
+        for name, app in variants.items():
+            results[name] = max(results[name], await run(app, path, query, requests))
+
+    print(f"\nPropustnost předpočítané odpovědi ({requests} požadavků, nejlepší z {rounds} kol):")
+    baseline = results["bez metrik"]
+    for name, rps in results.items():
+        overhead_us = (1 / rps - 1 / baseline) * 1e6
+        print(f"  {name:>20}: {rps:>9.0f} req/s ({rps / baseline:.3f}x, {overhead_us:+.1f} µs/požadavek)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200000, help="Počet opakování mikrobenchmarku")
+    parser.add_argument("--requests", type=int, default=3000, help="Počet požadavků na variantu a kolo")
+    parser.add_argument("--rounds", type=int, default=5, help="Počet střídavých kol měření")
+    parser.add_argument("--days", type=int, default=30, help="Požadovaný horizont odpovědi")
+    args = parser.parse_args()
+
+    if not metrics_available():
+        print("prometheus_client není nainstalován - metriky jsou no-op")
+
+    micro(args.repeat)
+    asyncio.run(throughput(args.requests, args.rounds, args.days))
@@ -0,0 +1,109 @@
+"""
+Benchmark - porovnání modelů z registru (přesnost a náklady).
+
+Pro každý registrovaný model a syntetickou řadu dané délky (trend,
+týdenní sezónnost a šum) změří:
+- dobu tréninku (fit) a predikce (forecast) - medián v milisekundách,
+- špičku alokované paměti při tréninku a predikci (tracemalloc),
+- chybu na odložených posledních `horizon` bodech: MAE, MAPE
+  a pokrytí 95% intervalu spolehlivosti.
+
+Spuštění (z adresáře python_service):
+    python -m benchmarks.bench_models --repeat 20 --horizon 30
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.smart_trend_forecaster.models import available_models, create_model
+
+
+SERIES_LENGTHS = [90, 365, 1000, 3650, 10000]
+
+
+def synthetic_series(length: int, seed: int = 42) -> np.ndarray:
+    """
+    Vygeneruje syntetickou řadu kurzu (trend + týdenní sezónnost + šum).
+    """
+    rng = np.random.default_rng(seed)
+    index = np.arange(length)
+    trend = 25.0 + 0.002 * index
+    season = 0.05 * np.sin(2 * np.pi * index / 7)
+    return trend + season + rng.normal(0, 0.05, length)
+
+
+def measure(fn, repeat: int) -> float:
+    """
+    Vrátí medián doby jednoho volání v milisekundách.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings)) * 1000
+
+
+def peak_memory_kib(fn) -> float:
+    """
+    Vrátí špičku paměti alokované během volání v KiB.
+    """
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def backtest(name: str, series: np.ndarray, horizon: int) -> tuple[float, float, float]:
+    """
+    Natrénuje model bez posledních `horizon` bodů a vyhodnotí predikci.
+
+    Returns:
+        tuple[float, float, float]: MAE, MAPE v procentech a pokrytí
+            95% intervalu spolehlivosti v procentech.
+    """
+    train, actual = series[:-horizon], series[-horizon:]
+    values, margins = create_model(name).fit(train).forecast(horizon)
+    errors = np.abs(actual - values)
+    mae = float(errors.mean())
+    mape = float((errors / np.abs(actual)).mean() * 100)
+    coverage = float((errors <= margins).mean() * 100)
+    return mae, mape, coverage
+
+
+def main(repeat: int, horizon: int) -> None:
+    print(
+        f"{'model':>13} {'body':>6} {'fit [ms]':>9} {'pred [ms]':>10} {'paměť [KiB]':>12} "
+        f"{'MAE':>8} {'MAPE [%]':>9} {'pokrytí [%]':>12}"
+    )
+    for length in SERIES_LENGTHS:
+        series = synthetic_series(length)
+
+        for name in available_models():
+            fitted = create_model(name).fit(series)
+
+            fit_ms = measure(lambda: create_model(name).fit(series), repeat)
+            predict_ms = measure(lambda: fitted.forecast(horizon), repeat)
+            memory = peak_memory_kib(lambda: create_model(name).fit(series).forecast(horizon))
+            mae, mape, coverage = backtest(name, series, horizon)
+
+            print(
+                f"{name:>13} {length:>6} {fit_ms:>9.3f} {predict_ms:>10.3f} {memory:>12.1f} "
+                f"{mae:>8.4f} {mape:>9.3f} {coverage:>12.1f}"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Počet opakování každého měření")
+    parser.add_argument("--horizon", type=int, default=30, help="Horizont prognózy a odložených bodů")
+    args = parser.parse_args()
+
+    main(args.repeat, args.horizon)
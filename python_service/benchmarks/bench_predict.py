@@ -0,0 +1,118 @@
+"""
+Benchmark - vektorizovaná metoda CurrencyForecaster.predict.
+
+Porovná aktuální implementaci (lineární regrese v uzavřeném tvaru v NumPy)
+s původní implementací nad scikit-learn, která volala model.predict
+v Pythonovské smyčce pro každý budoucí den. Před měřením ověří,
+že obě implementace vracejí shodné prognózy.
+
+Spuštění (z adresáře python_service):
+    python -m benchmarks.bench_predict --repeat 50
+"""
+
+import argparse
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from app.smart_trend_forecaster import CurrencyForecaster
+
+
+HISTORY_LENGTHS = [30, 90, 365, 3650]
+HORIZONS = [7, 30, 90, 365]
+
+
+def legacy_predict(df: pd.DataFrame, days: int) -> list[dict]:
+    """
+    Původní implementace predict (scikit-learn, smyčka přes dny).
+    """
+    X = df["day_index"].values.reshape(-1, 1)
+    y = df["rate"].values
+
+    model = LinearRegression()
+    model.fit(X, y)
+
+    residual_std = np.std(y - model.predict(X))
+    last_date = df["date"].max()
+    last_index = df["day_index"].max()
+
+    forecast = []
+    for i in range(1, days + 1):
+        predicted_value = model.predict([[last_index + i]])[0]
+        conf_low = predicted_value - 1.96 * residual_std
+        conf_high = predicted_value + 1.96 * residual_std
+        forecast.append({
+            "date": (last_date + timedelta(days=i)).strftime("%Y-%m-%d"),
+            "value": round(float(predicted_value), 4),
+            "conf_low": round(float(conf_low), 4),
+            "conf_high": round(float(conf_high), 4),
+        })
+    return forecast
+
+
+def synthetic_history(length: int, seed: int = 42) -> list[dict]:
+    """
+    Vygeneruje syntetickou historii kurzu (trend + šum).
+    """
+    rng = np.random.default_rng(seed)
+    start = date(2016, 1, 1)
+    rates = 25.0 + 0.002 * np.arange(length) + rng.normal(0, 0.15, length)
+    return [
+        {"date": (start + timedelta(days=i)).isoformat(), "rate": float(rate)}
+        for i, rate in enumerate(rates)
+    ]
+
+
+def assert_parity(expected: list[dict], actual: list[dict]) -> None:
+    """
+    Ověří shodu prognóz (data přesně, hodnoty s tolerancí zaokrouhlení).
+    """
+    assert len(expected) == len(actual)
+    for old, new in zip(expected, actual):
+        assert old["date"] == new["date"], (old, new)
+        for field in ("value", "conf_low", "conf_high"):
+            assert abs(old[field] - new[field]) <= 1e-4 + 1e-12, (old, new)
+
+
+def measure(fn, repeat: int) -> float:
+    """
+    Vrátí medián doby jednoho volání v milisekundách.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings)) * 1000
+
+
+def main(repeat: int) -> None:
+    forecaster = CurrencyForecaster()
+
+    print(f"{'historie':>9} {'horizont':>9} {'sklearn [ms]':>13} {'numpy [ms]':>11} {'zrychlení':>10}")
+    for length in HISTORY_LENGTHS:
+        prepared = forecaster.prepare_data(synthetic_history(length))
+        # Původní implementace pracovala s DataFrame se sloupcem day_index
+        df = pd.DataFrame({"date": prepared.dates, "rate": prepared.rates, "day_index": np.arange(len(prepared))})
+
+        for horizon in HORIZONS:
+            assert_parity(legacy_predict(df, horizon), forecaster.predict(prepared, horizon))
+
+            legacy_ms = measure(lambda: legacy_predict(df, horizon), repeat)
+            current_ms = measure(lambda: forecaster.predict(prepared, horizon), repeat)
+
+            print(
+                f"{length:>9} {horizon:>9} {legacy_ms:>13.3f} {current_ms:>11.3f} "
+                f"{legacy_ms / current_ms:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50, help="Počet opakování každého měření")
+    args = parser.parse_args()
+
+    main(args.repeat)
@@ -0,0 +1,91 @@
+"""
+Benchmark - předzpracování historie bez pandas (modul preprocess).
+
+1. Latence: medián doby prepare_data a celého fit_and_predict pro různé
+   délky historie.
+2. Paměť: špička RSS a doba importu v samostatném procesu, který
+   naimportuje forecaster a spočítá `--rss-calls` prognóz danou cestou
+   (import pandas se projeví jen u cesty "pandas").
+
+Shodu obou implementací ("numpy" a "pandas") ověřuje tests/test_preprocess.py.
+
+Spuštění (z adresáře python_service):
+    python -m benchmarks.bench_preprocess --repeat 200
+"""
+
+import argparse
+import subprocess
+import sys
+import textwrap
+
+from app.smart_trend_forecaster.forecaster import fit_and_predict
+from app.smart_trend_forecaster.preprocess import prepare_history, prepare_history_pandas
+from benchmarks.bench_models import measure
+from benchmarks.bench_predict import synthetic_history
+
+
+HISTORY_LENGTHS = [30, 90, 365, 3650]
+
+
+def latency(repeat: int) -> None:
+    print(
+        f"{'historie':>9} {'pandas [ms]':>12} {'numpy [ms]':>11} {'zrychlení':>10} "
+        f"{'fit_and_predict pandas [ms]':>28} {'numpy [ms]':>11}"
+    )
+    for length in HISTORY_LENGTHS:
+        history = synthetic_history(length)
+        pandas_ms = measure(lambda: prepare_history_pandas(history), repeat)
+        numpy_ms = measure(lambda: prepare_history(history), repeat)
+        total_pandas_ms = measure(lambda: fit_and_predict(history, 30, preprocess="pandas"), repeat)
+        total_numpy_ms = measure(lambda: fit_and_predict(history, 30, preprocess="numpy"), repeat)
+        print(
+            f"{length:>9} {pandas_ms:>12.3f} {numpy_ms:>11.3f} {pandas_ms / numpy_ms:>9.1f}x "
+            f"{total_pandas_ms:>28.3f} {total_numpy_ms:>11.3f}"
+        )
+
+
+# Skript měření paměti v samostatném procesu (parametry: implementace, počet prognóz)
+RSS_SCRIPT = textwrap.dedent(
+    """
+    import resource, sys, time
+    started = time.perf_counter()
+    from app.smart_trend_forecaster.forecaster import fit_and_predict
+    imported = time.perf_counter() - started
+    history = [{"date": f"2026-{1 + i // 28:02d}-{1 + i % 28:02d}", "rate": 25.0 + 0.01 * i} for i in range(90)]
+    for _ in range(int(sys.argv[2])):
+        fit_and_predict(history, 30, preprocess=sys.argv[1])
+    # VmHWM (Linux) se na rozdíl od ru_maxrss nedědí z rodičovského procesu přes fork/exec
+    try:
+        with open("/proc/self/status") as status:
+            peak = next(int(line.split()[1]) for line in status if line.startswith("VmHWM:"))
+    except (OSError, StopIteration):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(imported, peak, "pandas" in sys.modules)
+    """
+)
+
+
+def rss(calls: int) -> None:
+    print(f"\nPaměť procesu ({calls} prognóz z 90 bodů historie):")
+    for backend in ("pandas", "numpy"):
+        output = subprocess.run(
+            [sys.executable, "-c", RSS_SCRIPT, backend, str(calls)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        imported, max_rss_kib, pandas_loaded = float(output[0]), int(output[1]), output[2] == "True"
+        print(
+            f"  {backend:>6}: špička RSS {max_rss_kib / 1024:>6.1f} MiB, import {imported * 1000:>6.1f} ms, "
+            f"pandas načten: {'ano' if pandas_loaded else 'ne'}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="Počet opakování každého měření")
+    parser.add_argument("--rss-calls", type=int, default=1000, help="Počet prognóz v procesu měření paměti")
+    args = parser.parse_args()
+
+    latency(args.repeat)
+    rss(args.rss_calls)
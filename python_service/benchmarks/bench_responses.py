@@ -0,0 +1,149 @@
+"""
+Benchmark - předpočítaná odpověď vs. dynamicky sestavená odpověď.
+
+Na lokální FastAPI aplikaci (bez Redis, prognóza je v paměti) porovná
+propustnost (požadavky za sekundu) dvou variant endpointu prognózy.
+Aplikace se volá přímo přes ASGI rozhraní (bez HTTP klienta), takže
+se měří pouze práce na straně serveru:
+- dynamická: sestavení slovníku odpovědi a jeho serializace
+  obecným enkodérem FastAPI (původní cesta),
+- předpočítaná: spojení částí serializovaných při zápisu do cache
+  a vrácení surové Response s ETagem.
+Měří se i podmíněný GET (If-None-Match) s odpovědí 304.
+
+Spuštění (z adresáře python_service):
+    python -m benchmarks.bench_responses --requests 3000 --days 30
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi import FastAPI, Header, Response
+from typing import Optional
+
+from app.smart_trend_forecaster.responses import (
+    build_forecast_response,
+    etag_matches,
+    load_precomputed_response,
+    precompute_forecast_response,
+    render_precomputed_response,
+)
+from benchmarks.bench_cache_codec import synthetic_forecast
+
+
+def create_app(forecast: dict) -> FastAPI:
+    """
+    Vytvoří aplikaci s dynamickou a předpočítanou variantou endpointu.
+    """
+    app = FastAPI()
+    precomputed = load_precomputed_response(precompute_forecast_response("EUR", forecast))
+    cached = dict(forecast, from_cache=True, stale=False)
+
+    # Obě varianty mají stejné parametry, liší se jen sestavením odpovědi
+    @app.get("/dynamic/{currency}")
+    async def dynamic(
+        currency: str, days: int = 7, if_none_match: Optional[str] = Header(default=None)
+    ) -> dict:
+        return build_forecast_response(currency, dict(cached), days)
+
+    @app.get("/precomputed/{currency}", response_model=None)
+    async def precomputed_route(
+        currency: str, days: int = 7, if_none_match: Optional[str] = Header(default=None)
+    ) -> Response:
+        body, etag = render_precomputed_response(precomputed, days)
+        headers = {"ETag": etag, "Cache-Control": "public, max-age=3600"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    return app
+
+
+async def call_asgi(app: FastAPI, path: str, query: str, headers: Optional[dict] = None) -> tuple[int, bytes]:
+    """
+    Zavolá aplikaci přímo přes ASGI a vrátí status a tělo odpovědi.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+        "client": ("127.0.0.1", 12345),
+        "server": ("bench", 80),
+        "root_path": "",
+    }
+    messages = []
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+
+    await app(scope, receive, send)
+    status = messages[0]["status"]
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return status, body
+
+
+async def run(app: FastAPI, path: str, query: str, requests: int, headers: Optional[dict] = None) -> float:
+    """
+    Provede `requests` sekvenčních požadavků a vrátí počet požadavků za sekundu.
+    """
+    started = time.perf_counter()
+    for _ in range(requests):
+        status, _ = await call_asgi(app, path, query, headers)
+        assert status in (200, 304)
+    return requests / (time.perf_counter() - started)
+
+
+async def main(requests: int, days: int, horizon: int, rounds: int) -> None:
+    forecast = synthetic_forecast(horizon)
+    app = create_app(forecast)
+
+    query = f"days={days}"
+
+    # Obě varianty musí vracet stejný obsah
+    _, dynamic = await call_asgi(app, "/dynamic/EUR", query)
+    _, precomputed = await call_asgi(app, "/precomputed/EUR", query)
+    assert json.loads(dynamic) == json.loads(precomputed)
+    _, etag = render_precomputed_response(
+        load_precomputed_response(precompute_forecast_response("EUR", forecast)), days
+    )
+
+    variants = {
+        "dynamická": ("/dynamic/EUR", None),
+        "předpočítaná": ("/precomputed/EUR", None),
+        "předpočítaná 304": ("/precomputed/EUR", {"If-None-Match": etag}),
+    }
+
+    # Zahřátí a poté nejlepší z několika střídavých kol (potlačí šum)
+    for path, headers in variants.values():
+        await run(app, path, query, min(requests, 200), headers)
+    results = {name: 0.0 for name in variants}
+    for _ in range(rounds):
+        for name, (path, headers) in variants.items():
+            results[name] = max(results[name], await run(app, path, query, requests, headers))
+
+    print(f"Horizont odpovědi {days} dní (uloženo {horizon} dní), {requests} požadavků, nejlepší z {rounds} kol")
+    baseline = results["dynamická"]
+    for name, rps in results.items():
+        print(f"  {name:>17}: {rps:>9.0f} req/s ({rps / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000, help="Počet požadavků na variantu")
+    parser.add_argument("--days", type=int, default=30, help="Požadovaný horizont odpovědi")
+    parser.add_argument("--horizon", type=int, default=365, help="Horizont prognózy uložené v cache")
+    parser.add_argument("--rounds", type=int, default=5, help="Počet střídavých kol měření")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.days, args.horizon, args.rounds))
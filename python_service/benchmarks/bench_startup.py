@@ -0,0 +1,185 @@
+"""
+Benchmark - studený start služby (doba importu a doba do připravenosti).
+
+1. Import: medián doby `import app.main` v novém procesu. NumPy se
+   importuje odloženě (viz smart_trend_forecaster.lazy); pro srovnání se
+   změří i původní chování, kdy se NumPy importuje spolu s aplikací.
+2. První výpočet: doba první prognózy v novém procesu bez zahřátí
+   (import NumPy se zaplatí v cestě požadavku) a po zahřátí, a doba
+   první úlohy poolu procesů bez a po spuštění workerů (warm_worker).
+3. Připravenost (jen s `--ready`): spustí uvicorn s app.main:app a měří
+   dobu od spuštění procesu do první odpovědi /live a do /ready 200
+   (zahřátí dokončeno). Vyžaduje dostupný Redis (`--redis-host`,
+   `--redis-port`); bez něj /ready zůstane 503.
+
+Spuštění (z adresáře python_service):
+    python -m benchmarks.bench_startup --repeat 5
+    python -m benchmarks.bench_startup --ready --redis-host localhost
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import textwrap
+import time
+import urllib.error
+import urllib.request
+
+
+# Prostředí procesů benchmarku: bez plánovače a bez ladicích logů
+BENCH_ENV = {
+    "ENABLE_BACKGROUND_TASKS": "false",
+    "LOG_LEVEL": "WARNING",
+}
+
+# Skript měření importu (parametr: "lazy" nebo "eager")
+IMPORT_SCRIPT = textwrap.dedent(
+    """
+    import sys, time
+    started = time.perf_counter()
+    if sys.argv[1] == "eager":
+        import numpy
+    numpy_loaded = time.perf_counter()
+    import app.main
+    finished = time.perf_counter()
+    print(numpy_loaded - started, finished - numpy_loaded, "numpy" in sys.modules)
+    """
+)
+
+# Skript měření prvního výpočtu (parametr: "cold" nebo "warm")
+FIRST_FORECAST_SCRIPT = textwrap.dedent(
+    """
+    import asyncio, sys, time
+    import app.main
+    from app.smart_trend_forecaster import ForecastExecutor, load_heavy_modules
+    from app.smart_trend_forecaster.forecaster import fit_and_predict
+    from app.smart_trend_forecaster.warmup import warm_worker
+
+    history = [{"date": f"2026-{1 + i // 28:02d}-{1 + i % 28:02d}", "rate": 25.0 + 0.01 * i} for i in range(90)]
+
+    async def main(mode):
+        executor = ForecastExecutor(kind="process", max_workers=1)
+        if mode == "warm":
+            load_heavy_modules()
+            await executor.run(warm_worker)
+        started = time.perf_counter()
+        fit_and_predict(history, 30)
+        inline = time.perf_counter() - started
+        started = time.perf_counter()
+        await executor.run(fit_and_predict, history, 30)
+        pooled = time.perf_counter() - started
+        executor.shutdown()
+        print(inline, pooled)
+
+    asyncio.run(main(sys.argv[1]))
+    """
+)
+
+
+def run_script(script: str, *args: str) -> list[str]:
+    """
+    Spustí skript v novém procesu interpretu a vrátí slova jeho výstupu.
+    """
+    return subprocess.run(
+        [sys.executable, "-c", script, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, **BENCH_ENV},
+    ).stdout.split()
+
+
+def import_time(repeat: int) -> None:
+    print(f"Import app.main (medián z {repeat} procesů):")
+    for mode, label in (("eager", "NumPy při importu (původní)"), ("lazy", "odložený NumPy")):
+        numpy_times, app_times = [], []
+        for _ in range(repeat):
+            output = run_script(IMPORT_SCRIPT, mode)
+            numpy_times.append(float(output[0]))
+            app_times.append(float(output[1]))
+            numpy_loaded = output[2] == "True"
+        total_ms = (statistics.median(numpy_times) + statistics.median(app_times)) * 1000
+        print(f"  {label:>28}: {total_ms:>7.1f} ms, NumPy načten: {'ano' if numpy_loaded else 'ne'}")
+
+
+def first_forecast(repeat: int) -> None:
+    print(f"\nPrvní prognóza v novém procesu (medián z {repeat} procesů):")
+    print(f"  {'':>28} {'v procesu [ms]':>15} {'pool procesů [ms]':>18}")
+    for mode, label in (("cold", "bez zahřátí"), ("warm", "po zahřátí")):
+        inline, pooled = [], []
+        for _ in range(repeat):
+            output = run_script(FIRST_FORECAST_SCRIPT, mode)
+            inline.append(float(output[0]))
+            pooled.append(float(output[1]))
+        print(f"  {label:>28} {statistics.median(inline) * 1000:>15.1f} {statistics.median(pooled) * 1000:>18.1f}")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def poll(url: str) -> tuple[int, dict]:
+    """
+    Zavolá endpoint a vrátí status kód a tělo (0 při nedostupném serveru).
+    """
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return 0, {}
+
+
+def time_to_ready(redis_host: str, redis_port: int, timeout: float) -> None:
+    port = free_port()
+    env = {**os.environ, **BENCH_ENV, "REDIS_HOST": redis_host, "REDIS_PORT": str(redis_port)}
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    live_at = ready_at = None
+    body: dict = {}
+    try:
+        while time.perf_counter() - started < timeout:
+            if live_at is None and poll(f"http://127.0.0.1:{port}/live")[0] == 200:
+                live_at = time.perf_counter() - started
+            if live_at is not None:
+                status, body = poll(f"http://127.0.0.1:{port}/ready")
+                if status == 200:
+                    ready_at = time.perf_counter() - started
+                    break
+            time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"\nStart uvicorn (app.main:app, Redis {redis_host}:{redis_port}):")
+    print(f"  /live 200 za:  {'-' if live_at is None else f'{live_at * 1000:.0f} ms'}")
+    print(f"  /ready 200 za: {'-' if ready_at is None else f'{ready_at * 1000:.0f} ms'}")
+    if body:
+        print(f"  zahřátí: {json.dumps(body.get('warmup'), ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Počet procesů pro každé měření")
+    parser.add_argument("--ready", action="store_true", help="Změřit dobu do připravenosti serveru (vyžaduje Redis)")
+    parser.add_argument("--redis-host", default="localhost", help="Redis pro měření připravenosti")
+    parser.add_argument("--redis-port", type=int, default=6379, help="Port Redis")
+    parser.add_argument("--timeout", type=float, default=60, help="Maximální doba čekání na /ready v sekundách")
+    args = parser.parse_args()
+
+    import_time(args.repeat)
+    first_forecast(args.repeat)
+    if args.ready:
+        time_to_ready(args.redis_host, args.redis_port, args.timeout)
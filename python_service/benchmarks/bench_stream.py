@@ -0,0 +1,121 @@
+"""
+Benchmark - rozesílání aktualizací prognóz tisícům odběratelů streamu.
+
+Na jednom workeru (jeden event loop, bez Redis) připojí zadaný počet
+odběratelů ForecastBroadcaster - každý odebírá několik měn a čeká
+na události stejně jako endpoint /wallet/analytics/stream. Poté
+rozešle sérii aktualizací (zprávy ve stejném formátu, jaký publikuje
+save_forecast_to_cache) a změří:
+- dobu zpracování jedné zprávy (dispatch) v event loopu,
+- latenci doručení od přijetí zprávy po probuzení odběratele (p50/p99),
+- paměť na jednoho odběratele (tracemalloc).
+
+Spuštění (z adresáře python_service):
+    python -m benchmarks.bench_stream --subscribers 5000 --updates 20
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.smart_trend_forecaster.broadcast import ForecastBroadcaster, build_update_message
+from app.smart_trend_forecaster.cache import build_forecast_key
+from app.smart_trend_forecaster.responses import precompute_forecast_response
+from benchmarks.bench_cache_codec import synthetic_forecast
+
+
+CURRENCIES = ["EUR", "USD", "GBP", "PLN", "CHF"]
+
+# Horizonty, které si odběratelé vyžádají (tělo se sestaví jednou pro každý)
+DAYS = [7, 14, 30]
+
+
+class Receipts:
+    """
+    Časy převzetí událostí odběrateli v rámci jedné aktualizace.
+    """
+
+    def __init__(self):
+        self.times: list[float] = []
+        self.expected = 0
+        self.done = asyncio.Event()
+
+    def reset(self, expected: int) -> None:
+        self.times = []
+        self.expected = expected
+        self.done.clear()
+
+    def add(self) -> None:
+        self.times.append(time.perf_counter())
+        if len(self.times) >= self.expected:
+            self.done.set()
+
+
+async def subscriber(subscription, receipts: Receipts, stop: asyncio.Event) -> None:
+    """
+    Odběratel - čeká na události a zaznamená čas jejich převzetí.
+    """
+    while not stop.is_set():
+        if await subscription.next_events(0.5):
+            receipts.add()
+
+
+async def main(subscribers: int, updates: int, per_client: int) -> None:
+    broadcaster = ForecastBroadcaster(max_subscribers=subscribers)
+    keys = {code: build_forecast_key(code, 90, 30, "linear") for code in CURRENCIES}
+    messages = {
+        code: build_update_message(key, precompute_forecast_response(code, dict(synthetic_forecast(30), currency=code)))
+        for code, key in keys.items()
+    }
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    stop = asyncio.Event()
+    receipts = Receipts()
+    tasks = []
+    for index in range(subscribers):
+        codes = [CURRENCIES[(index + offset) % len(CURRENCIES)] for offset in range(per_client)]
+        subscription = broadcaster.subscribe([keys[code] for code in codes], DAYS[index % len(DAYS)])
+        tasks.append(asyncio.create_task(subscriber(subscription, receipts, stop)))
+    await asyncio.sleep(0.1)
+
+    per_subscriber = (tracemalloc.get_traced_memory()[0] - baseline) / subscribers
+    tracemalloc.stop()
+
+    dispatch_ms = []
+    latencies = []
+    for update in range(updates):
+        code = CURRENCIES[update % len(CURRENCIES)]
+        started = time.perf_counter()
+        delivered = broadcaster.dispatch(messages[code])
+        dispatch_ms.append((time.perf_counter() - started) * 1000)
+        # Odběratelé se probudí až při dalším await, reset je proto bezpečný
+        receipts.reset(delivered)
+
+        # Počkáme, až všichni dotčení odběratelé událost převezmou
+        await receipts.done.wait()
+        latencies.extend((received - started) * 1000 for received in receipts.times)
+
+    stop.set()
+    await asyncio.gather(*tasks)
+
+    print(f"Odběratelů: {subscribers} ({per_client} měn na odběratele), aktualizací: {updates}")
+    print(f"  paměť na odběratele:  {per_subscriber / 1024:>8.2f} KiB")
+    print(f"  dispatch zprávy:      {np.median(dispatch_ms):>8.2f} ms (medián), {max(dispatch_ms):.2f} ms (max)")
+    print(f"  latence doručení p50: {np.percentile(latencies, 50):>8.2f} ms")
+    print(f"  latence doručení p99: {np.percentile(latencies, 99):>8.2f} ms")
+    print(f"  doručeno událostí:    {broadcaster.deliveries:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=5000, help="Počet souběžných odběratelů")
+    parser.add_argument("--updates", type=int, default=20, help="Počet rozeslaných aktualizací")
+    parser.add_argument("--per-client", type=int, default=2, help="Počet měn na odběratele")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.subscribers, args.updates, args.per_client))
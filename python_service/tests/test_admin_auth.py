@@ -0,0 +1,38 @@
+"""
+Testy ověření tokenu administrátorských endpointů (X-Admin-Token).
+
+Spuštění (z adresáře python_service):
+    python -m pytest tests
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.smart_trend_forecaster.routes import _require_admin
+
+
+def make_request(admin_token: str) -> SimpleNamespace:
+    """
+    Vytvoří minimální request s nastaveným app.state.admin_token.
+    """
+    return SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(admin_token=admin_token)))
+
+
+@pytest.mark.parametrize("header", [None, "", "cokoli"])
+def test_admin_endpoints_disabled_without_token(header):
+    with pytest.raises(HTTPException) as error:
+        _require_admin(make_request(""), header)
+    assert error.value.status_code == 403
+
+
+@pytest.mark.parametrize("header", [None, "", "spatny-token", "tajny-token-navic"])
+def test_wrong_or_missing_token_rejected(header):
+    with pytest.raises(HTTPException) as error:
+        _require_admin(make_request("tajny-token"), header)
+    assert error.value.status_code == 403
+
+
+def test_matching_token_accepted():
+    _require_admin(make_request("tajny-token"), "tajny-token")
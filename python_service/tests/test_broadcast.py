@@ -0,0 +1,180 @@
+"""
+Testy rozesílání aktualizací prognóz odběratelům streamu (ForecastBroadcaster).
+
+Na jednom workeru se připojí několik tisíc odběratelů (StreamSubscription)
+a ověří se, že každý dostane právě jednu událost za klíč, že nedoručená
+událost se nahrazuje novější, limit odběratelů a odhlášení. Poslední test
+prochází celou cestou přes Redis kanál (FakeRedis pub/sub).
+
+Spuštění (z adresáře python_service):
+    python -m pytest tests
+"""
+
+import asyncio
+import json
+
+import fakeredis
+
+from app.smart_trend_forecaster.broadcast import (
+    FORECAST_UPDATES_CHANNEL,
+    ForecastBroadcaster,
+    build_update_message,
+)
+from app.smart_trend_forecaster.cache import build_forecast_key
+from app.smart_trend_forecaster.responses import precompute_forecast_response
+from benchmarks.bench_cache_codec import synthetic_forecast
+
+
+# Počet odběratelů na jednom workeru
+SUBSCRIBERS = 3000
+
+CURRENCIES = ["EUR", "USD", "GBP", "PLN", "CHF"]
+
+# Horizonty, které si odběratelé vyžádají
+DAYS = [7, 30]
+
+
+def update_message(code: str, generated_at: str = "2026-01-18T10:00:00") -> str:
+    """
+    Sestaví zprávu kanálu aktualizací stejně jako save_forecast_to_cache.
+    """
+    forecast = dict(synthetic_forecast(30), currency=code, generated_at=generated_at)
+    return build_update_message(forecast_key(code), precompute_forecast_response(code, forecast))
+
+
+def forecast_key(code: str) -> str:
+    return build_forecast_key(code, 90, 30, "linear")
+
+
+def subscriber_keys(index: int) -> list[str]:
+    """
+    Klíče odběratele - dvě různé měny podle pořadí.
+    """
+    return [forecast_key(CURRENCIES[index % 5]), forecast_key(CURRENCIES[(index + 1) % 5])]
+
+
+def event_payload(frame: bytes) -> dict:
+    """
+    Vrátí JSON tělo události Server-Sent Events.
+    """
+    data = next(line for line in frame.split(b"\n") if line.startswith(b"data: "))
+    return json.loads(data[len(b"data: "):])
+
+
+async def drain(subscription) -> list[bytes]:
+    return await subscription.next_events(timeout=0)
+
+
+def test_every_subscriber_receives_one_frame_per_key():
+    async def scenario():
+        broadcaster = ForecastBroadcaster(max_subscribers=SUBSCRIBERS)
+        subscriptions = [
+            broadcaster.subscribe(subscriber_keys(index), DAYS[index % len(DAYS)]) for index in range(SUBSCRIBERS)
+        ]
+        delivered = [broadcaster.dispatch(update_message(code)) for code in CURRENCIES]
+        received = [await drain(subscription) for subscription in subscriptions]
+        return broadcaster, subscriptions, delivered, received
+
+    broadcaster, subscriptions, delivered, received = asyncio.run(scenario())
+
+    # Každý odběratel odebírá dvě měny -> celkem 2 události na odběratele
+    assert sum(delivered) == 2 * SUBSCRIBERS
+    assert broadcaster.deliveries == 2 * SUBSCRIBERS
+    for subscription, frames in zip(subscriptions, received):
+        payloads = [event_payload(frame) for frame in frames]
+        assert sorted(payload["currency"] for payload in payloads) == sorted(
+            key.split(":")[2] for key in subscription.keys
+        )
+        assert all(len(payload["forecast"]) == subscription.days for payload in payloads)
+        assert subscription.delivered == 2
+        assert subscription.coalesced == 0
+
+
+def test_undelivered_frame_is_replaced_not_queued():
+    async def scenario():
+        broadcaster = ForecastBroadcaster()
+        subscription = broadcaster.subscribe([forecast_key("EUR")], 7)
+        broadcaster.dispatch(update_message("EUR", generated_at="2026-01-18T10:00:00"))
+        broadcaster.dispatch(update_message("EUR", generated_at="2026-01-18T11:00:00"))
+        first = await drain(subscription)
+        second = await drain(subscription)
+        return subscription, first, second
+
+    subscription, first, second = asyncio.run(scenario())
+
+    assert len(first) == 1
+    assert event_payload(first[0])["generated_at"] == "2026-01-18T11:00:00"
+    assert subscription.coalesced == 1
+    assert subscription.delivered == 1
+    # Po doručení nic nečeká
+    assert second == []
+
+
+def test_subscriptions_over_limit_are_rejected():
+    async def scenario():
+        broadcaster = ForecastBroadcaster(max_subscribers=SUBSCRIBERS)
+        subscriptions = [broadcaster.subscribe(subscriber_keys(index), 7) for index in range(SUBSCRIBERS + 10)]
+        return broadcaster, subscriptions
+
+    broadcaster, subscriptions = asyncio.run(scenario())
+
+    assert all(subscription is not None for subscription in subscriptions[:SUBSCRIBERS])
+    assert subscriptions[SUBSCRIBERS:] == [None] * 10
+    assert broadcaster.rejected == 10
+    assert broadcaster.subscriber_count == SUBSCRIBERS
+
+
+def test_unsubscribe_resets_subscriber_count():
+    async def scenario():
+        broadcaster = ForecastBroadcaster(max_subscribers=SUBSCRIBERS)
+        subscriptions = [
+            broadcaster.subscribe(subscriber_keys(index), DAYS[index % len(DAYS)]) for index in range(SUBSCRIBERS)
+        ]
+        for subscription in subscriptions:
+            broadcaster.unsubscribe(subscription)
+        # Opakované odhlášení počet nesnižuje
+        broadcaster.unsubscribe(subscriptions[0])
+        return broadcaster, broadcaster.dispatch(update_message("EUR"))
+
+    broadcaster, delivered = asyncio.run(scenario())
+
+    assert broadcaster.subscriber_count == 0
+    assert broadcaster.stats()["keys"] == 0
+    assert delivered == 0
+
+
+def test_updates_delivered_through_redis_channel():
+    subscribers = SUBSCRIBERS
+
+    async def scenario():
+        client = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer(), decode_responses=True)
+        broadcaster = ForecastBroadcaster(max_subscribers=subscribers)
+        subscriptions = [broadcaster.subscribe(subscriber_keys(index), 7) for index in range(subscribers)]
+        broadcaster.start(client)
+
+        # Počkáme, až worker kanál odebírá
+        for _ in range(100):
+            if (await client.pubsub_numsub(FORECAST_UPDATES_CHANNEL))[0][1]:
+                break
+            await asyncio.sleep(0.01)
+
+        for code in CURRENCIES:
+            await client.publish(FORECAST_UPDATES_CHANNEL, update_message(code))
+
+        received = []
+        for subscription in subscriptions:
+            frames = await subscription.next_events(timeout=2)
+            while len(frames) < 2:
+                more = await subscription.next_events(timeout=2)
+                if not more:
+                    break
+                frames += more
+            received.append(frames)
+
+        await broadcaster.stop()
+        return broadcaster, received
+
+    broadcaster, received = asyncio.run(scenario())
+
+    assert broadcaster.messages == len(CURRENCIES)
+    assert [len(frames) for frames in received] == [2] * subscribers
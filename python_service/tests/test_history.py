@@ -0,0 +1,179 @@
+"""
+Testy přírůstkového úložiště historie kurzů (HistoryStore.sync) nad FakeRedis.
+
+Symfony API nahrazuje zdroj kurzů v paměti, který zaznamenává požadované
+počty dnů; aktuální den a čas se posouvají náhradou date.today a time.time.
+
+Spuštění (z adresáře python_service):
+    python -m pytest tests
+"""
+
+import asyncio
+from datetime import date, timedelta
+
+import fakeredis
+import pytest
+
+from app.smart_trend_forecaster import history as history_module
+from app.smart_trend_forecaster.history import HistoryStore, build_history_key
+
+
+# Výchozí "dnešní" den testů
+START_DAY = date(2026, 3, 1)
+
+# Výchozí "aktuální" čas testů (v sekundách)
+START_TIME = 1_770_000_000.0
+
+
+class Clock:
+    """
+    Posouvatelný den a čas pro modul history.
+    """
+
+    def __init__(self):
+        self.today = START_DAY
+        self.now = START_TIME
+
+    def advance(self, days: int = 0, seconds: float = 0) -> None:
+        self.today += timedelta(days=days)
+        self.now += days * 86400 + seconds
+
+
+class RateSource:
+    """
+    Náhrada Symfony API - kurzy podle data a záznam požadavků.
+    """
+
+    def __init__(self, clock: Clock, last_day: date = None):
+        self.clock = clock
+        self.last_day = last_day
+        self.rates = {}
+        self.requests: list[int] = []
+
+    def rate(self, day: date) -> float:
+        return self.rates.get(day, 25.0 + 0.01 * (day - START_DAY).days)
+
+    async def fetch(self, currency: str, days: int) -> list[dict]:
+        self.requests.append(days)
+        end = min(self.clock.today, self.last_day or self.clock.today)
+        start = self.clock.today - timedelta(days=days)
+        return [
+            {"date": (start + timedelta(days=i)).isoformat(), "rate": self.rate(start + timedelta(days=i))}
+            for i in range((end - start).days + 1)
+        ]
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+
+    class FakeDate(date):
+        @classmethod
+        def today(cls):
+            return clock.today
+
+    monkeypatch.setattr(history_module, "date", FakeDate)
+    monkeypatch.setattr(history_module.time, "time", lambda: clock.now)
+    return clock
+
+
+@pytest.fixture
+def redis_client() -> fakeredis.FakeAsyncRedis:
+    return fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer(), decode_responses=True)
+
+
+def test_first_sync_fetches_full_window(clock, redis_client):
+    store = HistoryStore(redis_client)
+    source = RateSource(clock)
+
+    result = asyncio.run(store.sync("EUR", 90, source.fetch))
+
+    assert result["full_sync"] is True
+    assert source.requests == [90]
+    window = asyncio.run(store.read_window("EUR", 90))
+    assert len(window) == 91
+    assert window[-1] == {"date": START_DAY.isoformat(), "rate": source.rate(START_DAY)}
+
+
+def test_later_syncs_fetch_only_delta_and_overlap(clock, redis_client):
+    store = HistoryStore(redis_client, reconcile_interval=30 * 86400, overlap_days=2)
+    source = RateSource(clock)
+
+    async def scenario():
+        await store.sync("EUR", 90, source.fetch)
+        same_day = await store.sync("EUR", 90, source.fetch)
+        clock.advance(days=3)
+        later = await store.sync("EUR", 90, source.fetch)
+        return same_day, later
+
+    same_day, later = asyncio.run(scenario())
+
+    assert same_day["full_sync"] is False and later["full_sync"] is False
+    assert source.requests == [90, 2, 3 + 2]
+    assert same_day["changed"] is False
+    assert later["changed"] is True
+    window = asyncio.run(store.read_window("EUR", 90))
+    assert window[-1]["date"] == clock.today.isoformat()
+
+
+def test_widening_window_forces_full_sync(clock, redis_client):
+    store = HistoryStore(redis_client)
+    source = RateSource(clock)
+
+    async def scenario():
+        await store.sync("EUR", 90, source.fetch)
+        return await store.sync("EUR", 120, source.fetch)
+
+    result = asyncio.run(scenario())
+
+    assert result["full_sync"] is True
+    assert source.requests == [90, 120]
+    assert result["covered_from"] == (START_DAY - timedelta(days=120)).isoformat()
+
+
+def test_reconcile_interval_forces_full_sync_and_applies_corrections(clock, redis_client):
+    store = HistoryStore(redis_client, reconcile_interval=3600)
+    source = RateSource(clock)
+
+    async def scenario():
+        await store.sync("EUR", 90, source.fetch)
+        clock.advance(seconds=3599)
+        incremental = await store.sync("EUR", 90, source.fetch)
+        # Zpětná korekce staršího dne - přírůstek ji nevidí, plná synchronizace ano
+        source.rates[START_DAY - timedelta(days=30)] = 99.0
+        clock.advance(seconds=1)
+        reconciled = await store.sync("EUR", 90, source.fetch)
+        return incremental, reconciled
+
+    incremental, reconciled = asyncio.run(scenario())
+
+    assert incremental["full_sync"] is False
+    assert reconciled["full_sync"] is True
+    assert reconciled["changed"] is True
+    assert reconciled["rev"] == incremental["rev"] + 1
+    rates = asyncio.run(store.read_days("EUR", [(START_DAY - timedelta(days=30)).isoformat()]))
+    assert rates == [99.0]
+
+
+def test_retention_trim_bumps_revision(clock, redis_client):
+    store = HistoryStore(redis_client, reconcile_interval=30 * 86400, retention_days=30)
+    # Zdroj už nemá nové kurzy - jediná změna je ořezání nejstarších dnů
+    source = RateSource(clock, last_day=START_DAY)
+
+    async def scenario():
+        first = await store.sync("EUR", 30, source.fetch)
+        unchanged = await store.sync("EUR", 30, source.fetch)
+        clock.advance(days=5)
+        trimmed = await store.sync("EUR", 30, source.fetch)
+        stored = await redis_client.hkeys(build_history_key("EUR"))
+        return first, unchanged, trimmed, stored
+
+    first, unchanged, trimmed, stored = asyncio.run(scenario())
+
+    assert unchanged["rev"] == first["rev"]
+    assert trimmed["full_sync"] is False
+    assert trimmed["changed"] is True
+    assert trimmed["rev"] == first["rev"] + 1
+    retention_start = (clock.today - timedelta(days=30)).isoformat()
+    assert min(stored) == retention_start
+    assert trimmed["covered_from"] == retention_start
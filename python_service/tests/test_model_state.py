@@ -0,0 +1,161 @@
+"""
+Testy inkrementálního stavu lineárního modelu (ModelStateStore) nad FakeRedis.
+
+Simulace den po dni porovnává prognózu ze stavu (přírůstky, opravy
+posledních dní, klouzavé okno) s prognózou fit_and_predict z celé
+uložené historie okna. Den se posouvá náhradou date.today v modulech
+history a model_state.
+
+Spuštění (z adresáře python_service):
+    python -m pytest tests
+"""
+
+import asyncio
+from datetime import date, timedelta
+
+import fakeredis
+import pytest
+
+from app.smart_trend_forecaster import history as history_module
+from app.smart_trend_forecaster import model_state as model_state_module
+from app.smart_trend_forecaster.forecaster import fit_and_predict
+from app.smart_trend_forecaster.history import HISTORY_META_SUFFIX, HistoryStore, build_history_key
+from app.smart_trend_forecaster.model_state import ModelStateStore
+
+
+# Délka okna historie a horizont prognózy
+HISTORY_DAYS = 30
+FORECAST_DAYS = 14
+
+# Počet simulovaných dní
+SIMULATED_DAYS = 60
+
+# První simulovaný den
+START_DAY = date(2026, 3, 2)
+
+
+class Simulation:
+    """
+    Náhrada Symfony API s mezerami (víkendy) a zpětnými opravami kurzů.
+    """
+
+    def __init__(self):
+        self.today = START_DAY
+        self.rates: dict[date, float] = {}
+
+    def publish(self, day: date, rate: float) -> None:
+        # O víkendech se kurzy nevyhlašují
+        if day.weekday() < 5:
+            self.rates[day] = rate
+
+    async def fetch(self, currency: str, days: int) -> list[dict]:
+        start = self.today - timedelta(days=days)
+        return [
+            {"date": day.isoformat(), "rate": rate}
+            for day, rate in sorted(self.rates.items())
+            if start <= day <= self.today
+        ]
+
+
+@pytest.fixture
+def simulation(monkeypatch) -> Simulation:
+    simulation = Simulation()
+
+    class FakeDate(date):
+        @classmethod
+        def today(cls):
+            return simulation.today
+
+    monkeypatch.setattr(history_module, "date", FakeDate)
+    monkeypatch.setattr(model_state_module, "date", FakeDate)
+
+    # Historie před začátkem simulace
+    for offset in range(HISTORY_DAYS, 0, -1):
+        day = START_DAY - timedelta(days=offset)
+        simulation.publish(day, 25.0 + 0.01 * offset + 0.05 * (offset % 3))
+    simulation.publish(START_DAY, 25.2)
+    return simulation
+
+
+@pytest.fixture
+def stores(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer(), decode_responses=True)
+    # Bez pravidelné plné synchronizace - celá simulace běží přírůstky
+    history_store = HistoryStore(client, reconcile_interval=10**9, overlap_days=2)
+    model_store = ModelStateStore(client, history_store, sliding_window=True)
+
+    rebuilds = []
+    original = model_store._rebuild
+
+    async def counting_rebuild(currency, history_days, window_start):
+        rebuilds.append(window_start)
+        return await original(currency, history_days, window_start)
+
+    monkeypatch.setattr(model_store, "_rebuild", counting_rebuild)
+    return client, history_store, model_store, rebuilds
+
+
+def assert_same_forecast(expected, actual) -> None:
+    """
+    Ověří shodu prognóz (počet bodů, data a hodnoty s tolerancí zaokrouhlení).
+    """
+    assert actual is not None and expected is not None
+    assert actual[0] == expected[0]
+    for old, new in zip(expected[1], actual[1], strict=True):
+        assert old["date"] == new["date"]
+        for field in ("value", "conf_low", "conf_high"):
+            assert abs(old[field] - new[field]) <= 1e-4 + 1e-9, (old, new)
+
+
+async def forecast_and_reference(history_store, model_store, simulation):
+    """
+    Vrátí prognózu ze stavu a referenční prognózu z celé historie okna.
+    """
+    actual = await model_store.forecast("EUR", HISTORY_DAYS, FORECAST_DAYS, simulation.fetch)
+    window = await history_store.read_window("EUR", HISTORY_DAYS)
+    return actual, fit_and_predict(window, FORECAST_DAYS)
+
+
+def test_incremental_state_matches_full_fit(simulation, stores):
+    client, history_store, model_store, rebuilds = stores
+
+    async def scenario():
+        for step in range(SIMULATED_DAYS):
+            if step:
+                simulation.today += timedelta(days=1)
+                simulation.publish(simulation.today, 25.2 + 0.003 * step + 0.04 * (step % 4))
+            if step % 7 == 3:
+                # Zpětná oprava kurzu včerejška (v dosahu overlap_days)
+                yesterday = simulation.today - timedelta(days=1)
+                if yesterday in simulation.rates:
+                    simulation.rates[yesterday] += 0.05
+
+            actual, expected = await forecast_and_reference(history_store, model_store, simulation)
+            assert_same_forecast(expected, actual)
+
+    asyncio.run(scenario())
+
+    # Stav se sestavil z celé historie jen napoprvé, dál se jen aktualizoval
+    assert len(rebuilds) == 1
+
+
+def test_state_rebuilt_when_history_rev_does_not_match(simulation, stores):
+    client, history_store, model_store, rebuilds = stores
+
+    async def scenario():
+        await model_store.forecast("EUR", HISTORY_DAYS, FORECAST_DAYS, simulation.fetch)
+
+        # Změna historie mimo stav modelu (kurz uprostřed okna, nová revize)
+        middle = (simulation.today - timedelta(days=HISTORY_DAYS // 2)).isoformat()
+        key = build_history_key("EUR")
+        await client.hset(key, middle, repr(30.0))
+        await client.hincrby(key + HISTORY_META_SUFFIX, "rev", 1)
+
+        simulation.today += timedelta(days=1)
+        simulation.publish(simulation.today, 25.3)
+        return await forecast_and_reference(history_store, model_store, simulation)
+
+    actual, expected = asyncio.run(scenario())
+
+    assert len(rebuilds) == 2
+    assert_same_forecast(expected, actual)
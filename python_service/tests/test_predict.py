@@ -0,0 +1,28 @@
+"""
+Test shody vektorizované metody CurrencyForecaster.predict s původní
+implementací nad scikit-learn (benchmarks.bench_predict.legacy_predict).
+
+Spuštění (z adresáře python_service):
+    python -m pytest tests
+"""
+
+import pytest
+
+pytest.importorskip("sklearn")
+pd = pytest.importorskip("pandas")
+
+import numpy as np  # noqa: E402
+
+from app.smart_trend_forecaster import CurrencyForecaster  # noqa: E402
+from benchmarks.bench_predict import assert_parity, legacy_predict, synthetic_history  # noqa: E402
+
+
+@pytest.mark.parametrize("history_days", [30, 365])
+@pytest.mark.parametrize("horizon", [1, 30, 365])
+def test_predict_matches_sklearn(history_days, horizon):
+    forecaster = CurrencyForecaster()
+    prepared = forecaster.prepare_data(synthetic_history(history_days))
+    # Původní implementace pracovala s DataFrame se sloupcem day_index
+    df = pd.DataFrame({"date": prepared.dates, "rate": prepared.rates, "day_index": np.arange(len(prepared))})
+
+    assert_parity(legacy_predict(df, horizon), forecaster.predict(prepared, horizon))
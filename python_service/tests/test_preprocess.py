@@ -0,0 +1,139 @@
+"""
+Testy shody předzpracování historie: prepare_history (NumPy) a původní
+prepare_history_pandas musí pro hraniční i náhodné historie vrátit
+stejná data i kurzy (nebo obě None).
+
+Spuštění (z adresáře python_service):
+    python -m pytest tests
+"""
+
+import logging
+from datetime import date
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pandas")
+
+from app.smart_trend_forecaster.preprocess import prepare_history, prepare_history_pandas  # noqa: E402
+
+
+# Počet náhodných historií
+FUZZ_HISTORIES = 500
+
+# Hraniční případy: název -> surová historie
+EDGE_CASES = {
+    "prázdná": [],
+    "jeden bod": [{"date": "2026-01-01", "rate": 25.1}],
+    "neseřazená": [
+        {"date": "2026-01-03", "rate": 25.3},
+        {"date": "2026-01-01", "rate": 25.1},
+        {"date": "2026-01-02", "rate": 25.2},
+    ],
+    "duplicitní data": [
+        {"date": "2026-01-02", "rate": 1.0},
+        {"date": "2026-01-01", "rate": 2.0},
+        {"date": "2026-01-02", "rate": 3.0},
+        {"date": "2026-01-01", "rate": 4.0},
+        {"date": "2026-01-02", "rate": 5.0},
+    ],
+    "neplatné kurzy": [
+        {"date": "2026-01-01", "rate": None},
+        {"date": "2026-01-02", "rate": "25.2"},
+        {"date": "2026-01-03", "rate": "abc"},
+        {"date": "2026-01-04", "rate": float("nan")},
+        {"date": "2026-01-05", "rate": 25},
+        {"date": "2026-01-06", "rate": ""},
+    ],
+    "duplicita s neplatným kurzem": [
+        {"date": "2026-01-01", "rate": 25.0},
+        {"date": "2026-01-01", "rate": None},
+    ],
+    "chybějící klíč v záznamu": [
+        {"date": "2026-01-01", "rate": 25.1},
+        {"date": "2026-01-02"},
+        {"rate": 25.3},
+        {"date": "2026-01-04", "rate": 25.4},
+    ],
+    "chybějící sloupec": [{"date": "2026-01-01", "value": 25.1}],
+    "chybějící datum": [
+        {"date": None, "rate": 25.0},
+        {"date": "2026-01-02", "rate": 25.2},
+    ],
+    "neplatné datum": [
+        {"date": "2026-13-01", "rate": 25.0},
+        {"date": "2026-01-02", "rate": 25.2},
+    ],
+    "datum s časem": [
+        {"date": "2026-01-02T12:00:00", "rate": 25.2},
+        {"date": "2026-01-01T08:30:00", "rate": 25.1},
+    ],
+    "časové pásmo": [
+        {"date": "2026-01-01T23:30:00+01:00", "rate": 25.1},
+        {"date": "2026-01-02T10:00:00+01:00", "rate": 25.2},
+    ],
+    "objekty date": [
+        {"date": date(2026, 1, 2), "rate": 25.2},
+        {"date": date(2026, 1, 1), "rate": 25.1},
+    ],
+    "další sloupce": [
+        {"date": "2026-01-01", "rate": 25.1, "currency": "EUR"},
+        {"date": "2026-01-02", "rate": 25.2, "currency": "EUR"},
+    ],
+}
+
+
+def same_result(first, second) -> bool:
+    """
+    Porovná výsledky obou implementací (None, data i kurzy).
+    """
+    if first is None or second is None:
+        return first is None and second is None
+    return (
+        np.array_equal(first.dates.astype("datetime64[ns]"), second.dates.astype("datetime64[ns]"))
+        and np.array_equal(first.rates, second.rates)
+    )
+
+
+def fuzz_history(rng: np.random.Generator) -> list[dict]:
+    """
+    Vygeneruje náhodnou historii s mezerami, duplicitami, neplatnými kurzy a zamíchaným pořadím.
+    """
+    length = int(rng.integers(0, 200))
+    start = np.datetime64("2025-01-01") + int(rng.integers(0, 365))
+    days = start + rng.integers(0, max(1, length), length)
+    history = []
+    for day in days.astype(str).tolist():
+        roll = rng.random()
+        if roll < 0.03:
+            rate = None
+        elif roll < 0.05:
+            rate = "n/a"
+        elif roll < 0.1:
+            rate = f"{rng.uniform(20, 30):.4f}"
+        else:
+            rate = float(rng.uniform(20, 30))
+        history.append({"date": day, "rate": rate})
+    if rng.random() < 0.5:
+        history.sort(key=lambda point: point["date"])
+    return history
+
+
+@pytest.fixture(autouse=True)
+def quiet_warnings(caplog):
+    # Hraniční případy záměrně vyvolávají varování obou implementací
+    caplog.set_level(logging.ERROR)
+
+
+@pytest.mark.filterwarnings("ignore::UserWarning")
+@pytest.mark.parametrize("history", EDGE_CASES.values(), ids=EDGE_CASES.keys())
+def test_edge_case_parity(history):
+    assert same_result(prepare_history(history), prepare_history_pandas(history))
+
+
+@pytest.mark.filterwarnings("ignore::UserWarning")
+def test_random_history_parity():
+    rng = np.random.default_rng(42)
+    for index in range(FUZZ_HISTORIES):
+        history = fuzz_history(rng)
+        assert same_result(prepare_history(history), prepare_history_pandas(history)), (index, history)
@@ -0,0 +1,73 @@
+"""
+Testy ověření tokenu webhooku o aktualizaci kurzů (/hooks/rates-updated).
+
+Webhook zapisuje signál do Redis streamu; bez platného tokenu se do streamu
+nesmí nic zapsat (full_sync vynutí plnou synchronizaci historie).
+
+Spuštění (z adresáře python_service):
+    python -m pytest tests
+"""
+
+import fakeredis
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.smart_trend_forecaster.routes import router
+from app.smart_trend_forecaster.triggers import RATES_UPDATED_STREAM
+
+
+WEBHOOK_URL = "/wallet/analytics/hooks/rates-updated"
+
+
+@pytest.fixture
+def redis_server() -> fakeredis.FakeServer:
+    return fakeredis.FakeServer()
+
+
+def make_client(redis_server: fakeredis.FakeServer, admin_token: str) -> TestClient:
+    """
+    Vytvoří aplikaci s routerem prognóz a zapnutým přepočtem po aktualizaci kurzů.
+    """
+    app = FastAPI()
+    app.include_router(router)
+    app.state.redis = fakeredis.FakeAsyncRedis(server=redis_server, decode_responses=True)
+    app.state.admin_token = admin_token
+    app.state.rate_trigger_enabled = True
+    return TestClient(app)
+
+
+def stream_length(redis_server: fakeredis.FakeServer) -> int:
+    return fakeredis.FakeRedis(server=redis_server).xlen(RATES_UPDATED_STREAM)
+
+
+@pytest.mark.parametrize(
+    ("admin_token", "headers"),
+    [
+        ("", {}),
+        ("", {"X-Admin-Token": "cokoli"}),
+        ("tajny-token", {}),
+        ("tajny-token", {"X-Admin-Token": "spatny-token"}),
+    ],
+)
+def test_full_sync_rejected_without_valid_token(redis_server, admin_token, headers):
+    client = make_client(redis_server, admin_token)
+
+    response = client.post(WEBHOOK_URL, json={"currencies": ["EUR"], "full_sync": True}, headers=headers)
+
+    assert response.status_code == 403
+    assert stream_length(redis_server) == 0
+
+
+def test_signal_published_with_valid_token(redis_server):
+    client = make_client(redis_server, "tajny-token")
+
+    response = client.post(
+        WEBHOOK_URL,
+        json={"currencies": ["eur"], "full_sync": True},
+        headers={"X-Admin-Token": "tajny-token"},
+    )
+
+    assert response.status_code == 202
+    assert response.json()["accepted"] == ["EUR"]
+    assert stream_length(redis_server) == 1
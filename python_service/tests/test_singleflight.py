@@ -0,0 +1,139 @@
+"""
+Testy deduplikace souběžných výpočtů prognóz (single-flight + Redis zámek).
+
+Dva workery zastupují dva klienti FakeRedis nad jedním FakeServer,
+volání Symfony API nahrazuje počítající pomalá náhrada
+fetch_history_from_symfony.
+
+Spuštění (z adresáře python_service):
+    python -m pytest tests
+"""
+
+import asyncio
+from datetime import date, timedelta
+
+import fakeredis
+import pytest
+
+from app.smart_trend_forecaster.forecaster import CurrencyForecaster
+from app.smart_trend_forecaster.singleflight import RedisLock
+from app.smart_trend_forecaster.tasks import (
+    _compute_with_lock,
+    _wait_for_cached_forecast,
+    get_or_compute_forecast,
+)
+
+
+# Počet souběžných požadavků
+CONCURRENT_REQUESTS = 50
+
+# Doba "stahování" historie v náhradě Symfony API (v sekundách)
+FETCH_DELAY = 0.2
+
+
+def synthetic_history(days: int) -> list[dict]:
+    """
+    Vygeneruje historii kurzů končící dnešním dnem.
+    """
+    start = date.today() - timedelta(days=days - 1)
+    return [
+        {"date": (start + timedelta(days=i)).isoformat(), "rate": 25.0 + 0.01 * i + 0.02 * (i % 5)}
+        for i in range(days)
+    ]
+
+
+@pytest.fixture
+def fetch_calls(monkeypatch) -> list[str]:
+    """
+    Nahradí stahování historie ze Symfony API a vrátí seznam volání.
+    """
+    calls: list[str] = []
+
+    async def fake_fetch(self, currency: str, days: int = 90) -> list[dict]:
+        calls.append(currency)
+        await asyncio.sleep(FETCH_DELAY)
+        return synthetic_history(days)
+
+    monkeypatch.setattr(CurrencyForecaster, "fetch_history_from_symfony", fake_fetch)
+    return calls
+
+
+def worker_clients(count: int = 2) -> list[fakeredis.FakeAsyncRedis]:
+    """
+    Vytvoří klienty Redis "workerů" sdílející jeden server.
+    """
+    server = fakeredis.FakeServer()
+    return [fakeredis.FakeAsyncRedis(server=server, decode_responses=True) for _ in range(count)]
+
+
+def test_concurrent_requests_fetch_history_once(fetch_calls):
+    async def scenario():
+        clients = worker_clients()
+        forecasters = [CurrencyForecaster() for _ in clients]
+        return await asyncio.gather(*(
+            get_or_compute_forecast(clients[i % 2], "EUR", forecaster=forecasters[i % 2])
+            for i in range(CONCURRENT_REQUESTS)
+        ))
+
+    results = asyncio.run(scenario())
+
+    assert fetch_calls == ["EUR"]
+    assert all(result is not None for result in results)
+    assert {result["generated_at"] for result in results} == {results[0]["generated_at"]}
+
+
+def test_redis_lock_deduplicates_across_workers(fetch_calls):
+    # Přímo _compute_with_lock - obchází single-flight procesu,
+    # takže deduplikaci zajišťuje pouze zámek v Redis
+    async def scenario():
+        clients = worker_clients()
+        forecaster = CurrencyForecaster()
+        return await asyncio.gather(*(
+            _compute_with_lock(client, "USD", forecaster, 3600, 86400, 10, 90, 30, "linear")
+            for client in clients
+        ))
+
+    results = asyncio.run(scenario())
+
+    assert fetch_calls == ["USD"]
+    assert all(result is not None for result in results)
+
+
+def test_release_does_not_delete_other_holders_lock():
+    async def scenario():
+        client = worker_clients(1)[0]
+        first = RedisLock(client, "wallet:lock:forecast:test", 10_000)
+        second = RedisLock(client, "wallet:lock:forecast:test", 10_000)
+
+        assert await first.acquire()
+        assert not await second.acquire()
+
+        # Zámek prvního vlastníka vypršel a získal jej druhý
+        await client.delete(first.key)
+        assert await second.acquire()
+
+        assert not await first.release()
+        assert await client.get(second.key) == second.token
+        assert await second.release()
+        assert await client.get(second.key) is None
+
+    asyncio.run(scenario())
+
+
+def test_waiter_returns_none_when_lock_expires_without_result():
+    async def scenario():
+        client = worker_clients(1)[0]
+        holder = RedisLock(client, "wallet:lock:forecast:EUR:h90:d30:linear", 300)
+        waiter = RedisLock(client, holder.key, 300)
+        assert await holder.acquire()
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        result = await _wait_for_cached_forecast(client, "EUR", waiter, 5.0, 90, 30, "linear")
+        return result, loop.time() - started
+
+    result, elapsed = asyncio.run(scenario())
+
+    assert result is None
+    # Čekání skončí po vypršení zámku, ne až po timeoutu
+    assert elapsed < 2.0